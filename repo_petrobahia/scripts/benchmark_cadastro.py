@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark de gravação de clientes - PetroBahia S.A.
+Mede a vazão de uma importação de clientes em cada repositório: um
+salvar por cliente (arquivo e SQLite) contra o salvar_lote do SQLite
+(executemany em uma única transação) e o salvar_lote do arquivo em cada
+modo de durabilidade (sem fsync, fsync em grupo e fsync por registro),
+além de um salvar por cliente com gravação adiada (write-behind).
+
+Uso: python scripts/benchmark_cadastro.py [quantidade_de_clientes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.domain.entities import Cliente  # noqa: E402
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    DURABILIDADE_LOTE,
+    DURABILIDADE_NENHUMA,
+    DURABILIDADE_REGISTRO,
+    ClienteFileRepository,
+    ClienteSQLiteRepository,
+    ClienteWriteBehindRepository,
+)
+
+
+def gerar_clientes(total: int) -> list:
+    """Gera clientes válidos com emails distintos."""
+    return [
+        Cliente(
+            nome=f"Cliente {i}", email=f"cliente{i}@petrobahia.com", cnpj=f"{i:014d}"
+        )
+        for i in range(total)
+    ]
+
+
+def medir(nome: str, funcao, total: int) -> float:
+    """Executa a gravação e imprime a vazão em clientes por segundo."""
+    inicio = time.perf_counter()
+    funcao()
+    vazao = total / (time.perf_counter() - inicio)
+    print(f"  {nome:<40} {vazao:12,.0f} clientes/s")
+    return vazao
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    clientes = gerar_clientes(total)
+
+    print(f"\n📊 Benchmark de gravação de clientes ({total} clientes)\n")
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = ClienteFileRepository(os.path.join(diretorio, "clientes.txt"))
+
+        def salvar_arquivo():
+            for cliente in clientes:
+                arquivo.salvar(cliente)
+
+        medir("arquivo: salvar por cliente", salvar_arquivo, total)
+
+        adiado = ClienteWriteBehindRepository(
+            ClienteFileRepository(os.path.join(diretorio, "adiado.txt"))
+        )
+
+        def salvar_adiado():
+            for cliente in clientes:
+                adiado.salvar(cliente)
+            adiado.esvaziar()
+
+        medir("write-behind: salvar por cliente", salvar_adiado, total)
+        adiado.fechar()
+
+        # Um fsync (ou commit) por cliente é lento: mede com uma amostra
+        amostra = clientes[: max(total // 50, 1)]
+        for durabilidade, lista in (
+            (DURABILIDADE_NENHUMA, clientes),
+            (DURABILIDADE_LOTE, clientes),
+            (DURABILIDADE_REGISTRO, amostra),
+        ):
+            arquivo = ClienteFileRepository(
+                os.path.join(diretorio, f"lote_{durabilidade}.txt"),
+                durabilidade=durabilidade,
+            )
+            medir(
+                f"arquivo: salvar_lote (fsync {durabilidade})",
+                lambda: arquivo.salvar_lote(lista),
+                len(lista),
+            )
+
+        banco = ClienteSQLiteRepository(os.path.join(diretorio, "um_a_um.sqlite3"))
+
+        def salvar_banco():
+            for cliente in amostra:
+                banco.salvar(cliente)
+
+        um_a_um = medir("sqlite: salvar por cliente", salvar_banco, len(amostra))
+        banco.fechar()
+
+        banco = ClienteSQLiteRepository(os.path.join(diretorio, "lote.sqlite3"))
+        lote = medir("sqlite: salvar_lote", lambda: banco.salvar_lote(clientes), total)
+        banco.fechar()
+
+    print(f"\nGanho do salvar_lote no SQLite: {lote / um_a_um:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark do CNPJ - PetroBahia S.A.
+Mede a conferência dos dígitos verificadores de um lote de CNPJs (matriz
+de dígitos com numpy contra um laço com ``cnpj_valido``) e a busca por
+CNPJ no repositório em arquivo (montagem do índice e latência).
+
+Uso: python scripts/benchmark_cnpj.py [quantidade_de_cnpjs]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    ClienteFileRepository,
+)
+from clean_architecture.infrastructure.services import (  # noqa: E402
+    cnpj_valido,
+    validar_cnpjs,
+)
+
+CONSULTAS = 20_000
+
+
+def cronometrar(funcao) -> float:
+    """Tempo de uma chamada em segundos."""
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    numeros = np.random.default_rng(21).integers(0, 10**14, total)
+    cnpjs = [f"{n:014d}" for n in numeros.tolist()]
+    formatados = [f"{c[:2]}.{c[2:5]}.{c[5:8]}/{c[8:12]}-{c[12:]}" for c in cnpjs]
+
+    print(f"\n📊 Benchmark do CNPJ ({total} CNPJs)\n")
+    for rotulo, lote in (("14 dígitos", cnpjs), ("formatados", formatados)):
+        laco = cronometrar(lambda: [cnpj_valido(c) for c in lote])
+        vetor = cronometrar(lambda: validar_cnpjs(lote))
+        print(
+            f"  {'validar ' + rotulo:<28} laço {laco:7.2f} s"
+            f"   numpy {vetor:7.2f} s   ({laco / vetor:5.1f}x)"
+        )
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "clientes.txt")
+        with open(caminho, "w", encoding="utf-8") as f:
+            for i, cnpj in enumerate(cnpjs):
+                f.write(f"Cliente {i}|cliente{i}@petrobahia.com|{cnpj}\n")
+        repositorio = ClienteFileRepository(caminho, indice_persistente=False)
+        montagem = cronometrar(lambda: repositorio.buscar_por_cnpj(cnpjs[0]))
+        tempos = []
+        for cnpj in formatados[:CONSULTAS]:
+            inicio = time.perf_counter()
+            repositorio.buscar_por_cnpj(cnpj)
+            tempos.append(time.perf_counter() - inicio)
+        print(f"  {'montar índice de CNPJs':<28} {montagem:7.2f} s")
+        print(f"  {'buscar_por_cnpj':<28} {statistics.median(tempos) * 1e6:7.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark da compactação - PetroBahia S.A.
+Mede, para um arquivo de clientes em que parte dos cadastros foi
+atualizada várias vezes e parte removida, o tamanho do arquivo, a
+montagem do índice de emails (leitura do arquivo inteiro) e as buscas
+antes e depois de ``compactar``, além do tempo da própria compactação.
+
+Uso: python scripts/benchmark_compactacao.py [quantidade_de_clientes]
+     [atualizacoes_por_cliente]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.domain.entities import Cliente  # noqa: E402
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    ClienteFileRepository,
+)
+
+BUSCAS = 10_000
+
+
+def cronometrar(funcao) -> float:
+    """Tempo de uma chamada em milissegundos."""
+    inicio = time.perf_counter()
+    funcao()
+    return (time.perf_counter() - inicio) * 1e3
+
+
+def medir(caminho: str, emails) -> tuple:
+    """Montagem do índice sem o índice gravado e tempo médio das buscas."""
+    repositorio = ClienteFileRepository(caminho, indice_persistente=False)
+    montagem = cronometrar(lambda: repositorio.buscar_por_email(emails[0]))
+    buscas = cronometrar(lambda: [repositorio.buscar_por_email(e) for e in emails])
+    repositorio.fechar()
+    return montagem, buscas * 1e3 / len(emails)
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    atualizacoes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    gerador = random.Random(42)
+
+    print(
+        f"\n📊 Benchmark da compactação ({total} clientes, metade atualizada "
+        f"{atualizacoes} vezes, 20% removidos)\n"
+    )
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "clientes.txt")
+        repositorio = ClienteFileRepository(caminho)
+        repositorio.salvar_lote(
+            Cliente(nome=f"Cliente {i}", email=f"c{i}@petrobahia.com", cnpj=f"{i}")
+            for i in range(total)
+        )
+        alterados = gerador.sample(range(total), total // 2)
+        for rodada in range(atualizacoes):
+            for i in alterados:
+                repositorio.atualizar(
+                    Cliente(
+                        nome=f"Cliente {i} v{rodada}",
+                        email=f"c{i}@petrobahia.com",
+                        cnpj=f"{i}",
+                    )
+                )
+        for i in gerador.sample(range(total), total // 5):
+            repositorio.remover(f"c{i}@petrobahia.com")
+        emails = [f"c{gerador.randrange(total)}@petrobahia.com" for _ in range(BUSCAS)]
+
+        antes = os.path.getsize(caminho)
+        montagem_antes, busca_antes = medir(caminho, emails)
+        inicio = time.perf_counter()
+        _, depois = repositorio.compactar()
+        compactacao = (time.perf_counter() - inicio) * 1e3
+        repositorio.fechar()
+        montagem_depois, busca_depois = medir(caminho, emails)
+
+        linhas = [
+            (
+                "tamanho do arquivo (MiB)",
+                f"{antes / 2**20:.1f}",
+                f"{depois / 2**20:.1f}",
+            ),
+            ("montar índice (ms)", f"{montagem_antes:,.0f}", f"{montagem_depois:,.0f}"),
+            ("busca por email (µs)", f"{busca_antes:.1f}", f"{busca_depois:.1f}"),
+        ]
+        print(f"  {'':<32} {'antes':>12} {'depois':>12}")
+        for rotulo, valor_antes, valor_depois in linhas:
+            print(f"  {rotulo:<32} {valor_antes:>12} {valor_depois:>12}")
+        print(f"\n  compactação: {compactacao:,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
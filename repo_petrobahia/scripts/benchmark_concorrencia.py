@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de gravação concorrente - PetroBahia S.A.
+Mede a vazão de 1 a 16 processos (cada um com algumas threads) cadastrando
+clientes um a um no mesmo arquivo, sem trava e com a trava entre processos
+e gravação em grupo (``multiprocesso``), e confere se todas as linhas do
+arquivo estão inteiras.
+
+Uso: python scripts/benchmark_concorrencia.py [clientes_por_processo]
+     [durabilidade]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.domain.entities import Cliente  # noqa: E402
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    ClienteFileRepository,
+)
+
+PROCESSOS = (1, 2, 4, 8, 16)
+THREADS = 4
+
+
+def gravar(
+    caminho: str, durabilidade: str, multiprocesso: bool, processo: int, total: int
+):
+    """Cadastra ``total`` clientes com ``THREADS`` threads, um a um."""
+    repositorio = ClienteFileRepository(
+        caminho, durabilidade=durabilidade, multiprocesso=multiprocesso
+    )
+
+    def trabalhar(thread: int) -> None:
+        for i in range(thread, total, THREADS):
+            repositorio.salvar(
+                Cliente(
+                    nome=f"Cliente {processo}-{i}",
+                    email=f"p{processo}c{i}@petrobahia.com",
+                    cnpj="11222333000181",
+                )
+            )
+
+    threads = [threading.Thread(target=trabalhar, args=(t,)) for t in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repositorio.fechar()
+
+
+def medir(processos: int, total: int, durabilidade: str, multiprocesso: bool):
+    """Vazão (registros/s) e linhas quebradas de uma rodada."""
+    contexto = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "clientes.txt")
+        trabalhadores = [
+            contexto.Process(
+                target=gravar, args=(caminho, durabilidade, multiprocesso, p, total)
+            )
+            for p in range(processos)
+        ]
+        inicio = time.perf_counter()
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+        segundos = time.perf_counter() - inicio
+
+        with open(caminho, "rb") as f:
+            linhas = f.read().split(b"\n")
+        quebradas = sum(1 for linha in linhas[:-1] if linha.count(b"|") != 2)
+        faltando = processos * total - (len(linhas) - 1 - quebradas)
+    return processos * total / segundos, quebradas + max(faltando, 0)
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    durabilidade = sys.argv[2] if len(sys.argv) > 2 else "registro"
+
+    print(
+        f"\n📊 Benchmark de gravação concorrente ({total} clientes por processo, "
+        f"{THREADS} threads, durabilidade {durabilidade})\n"
+    )
+    print(f"  {'processos':>9}  {'sem trava':>22}  {'trava + grupo':>22}")
+    for processos in PROCESSOS:
+        colunas = []
+        for multiprocesso in (False, True):
+            vazao, quebradas = medir(processos, total, durabilidade, multiprocesso)
+            colunas.append(f"{vazao:>10,.0f} reg/s ({quebradas} ✗)")
+        print(f"  {processos:>9}  {colunas[0]:>22}  {colunas[1]:>22}")
+
+
+if __name__ == "__main__":
+    main()
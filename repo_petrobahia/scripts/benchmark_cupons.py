@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark de cupons acumulados - PetroBahia S.A.
+Mede a vazão de pedidos com 12 cupons cada no modo melhor preço, com as
+combinações pré-calculadas (plano em cache) contra a busca por força bruta
+em todos os subconjuntos de cupons, e o modo na ordem informada.
+
+Uso: python scripts/benchmark_cupons.py [quantidade_de_pedidos]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.domain.value_objects import ProdutoTipo  # noqa: E402
+from clean_architecture.infrastructure.services import (  # noqa: E402
+    CombinadorCupons,
+    RegistroCupons,
+)
+
+CUPONS_POR_PEDIDO = 12
+
+
+def gerar_cupons(total: int = 40, semente: int = 7) -> dict:
+    """Gera definições de cupons com grupos, mínimos e não acumuláveis."""
+    aleatorio = random.Random(semente)
+    produtos = [p.value for p in ProdutoTipo]
+    cupons = {}
+    for i in range(total):
+        definicao = {
+            "percentual": aleatorio.choice([0, 2, 5, 10, 15]),
+            "abatimento": aleatorio.choice([0.0, 0.0, 1.0, 5.0, 20.0]),
+            "qtd_minima": aleatorio.choice([0, 0, 0, 500, 2000]),
+        }
+        if aleatorio.random() < 0.6:
+            definicao["grupo"] = aleatorio.choice(["volume", "fidelidade", "sazonal"])
+        if aleatorio.random() < 0.1:
+            definicao["acumulavel"] = False
+        if aleatorio.random() < 0.2:
+            definicao["produtos"] = [aleatorio.choice(produtos)]
+        cupons[f"PROMO{i}"] = definicao
+    return cupons
+
+
+def gerar_pedidos(total: int, codigos: list, semente: int = 42) -> list:
+    """Gera pedidos com CUPONS_POR_PEDIDO cupons (de poucos conjuntos)."""
+    aleatorio = random.Random(semente)
+    conjuntos = [aleatorio.sample(codigos, CUPONS_POR_PEDIDO) for _ in range(50)]
+    produtos = list(ProdutoTipo)
+    return [
+        (
+            aleatorio.uniform(100.0, 50_000.0),
+            aleatorio.choice(produtos),
+            aleatorio.randint(1, 5000),
+            aleatorio.choice(conjuntos),
+        )
+        for _ in range(total)
+    ]
+
+
+def forca_bruta(registro, preco, produto, quantidade, cupons):
+    """Avalia todos os 2^n subconjuntos de cupons (referência)."""
+    regras = [registro.obter(c) for c in cupons]
+    melhor = preco
+    for mascara in range(1, 1 << len(regras)):
+        escolha = [r for i, r in enumerate(regras) if mascara >> i & 1]
+        if any(
+            not r.aceita_produto(produto) or quantidade < r.qtd_minima for r in escolha
+        ):
+            continue
+        if any(a is not b and not a.compativel(b) for a in escolha for b in escolha):
+            continue
+        fator, abatimento = 1.0, 0.0
+        for regra in sorted(escolha, key=lambda r: r.codigo):
+            fator *= regra.fator
+            abatimento += regra.abatimento
+        melhor = min(melhor, max(preco * fator - abatimento, 0.0))
+    return melhor
+
+
+def medir(nome: str, funcao, pedidos: list) -> float:
+    """Executa a função para cada pedido e imprime a vazão."""
+    inicio = time.perf_counter()
+    for pedido in pedidos:
+        funcao(*pedido)
+    vazao = len(pedidos) / (time.perf_counter() - inicio)
+    print(f"  {nome:<40} {vazao:12,.0f} pedidos/s")
+    return vazao
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    registro = RegistroCupons(gerar_cupons())
+    pedidos = gerar_pedidos(total, list(gerar_cupons()))
+    combinador = CombinadorCupons(registro)
+
+    print(f"\n📊 Benchmark de cupons acumulados ({total} pedidos,", end=" ")
+    print(f"{CUPONS_POR_PEDIDO} cupons por pedido)\n")
+
+    # Confere o modo melhor preço contra a força bruta em uma amostra
+    for pedido in pedidos[:200]:
+        assert combinador.melhor_preco(*pedido)[0] == forca_bruta(registro, *pedido)
+
+    amostra = pedidos[: max(total // 50, 1)]
+    bruta = medir(
+        "força bruta (2^n subconjuntos)",
+        lambda *p: forca_bruta(registro, *p),
+        amostra,
+    )
+    melhor = medir(
+        "melhor preço (plano pré-calculado)", combinador.melhor_preco, pedidos
+    )
+    medir("na ordem informada", combinador.em_ordem, pedidos)
+
+    print(f"\nGanho do plano sobre a força bruta: {melhor / bruta:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca por domínio - PetroBahia S.A.
+Mede, para um arquivo de clientes em vários domínios, a montagem do índice
+de domínios (``.dom``), a reabertura e o tempo de listar os clientes de um
+domínio pelo índice contra uma leitura completa do arquivo.
+
+Uso: python scripts/benchmark_dominios.py [quantidade_de_clientes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    ClienteFileRepository,
+)
+
+DOMINIOS = 1000
+
+
+def cronometrar(funcao) -> float:
+    """Tempo de uma chamada em milissegundos."""
+    inicio = time.perf_counter()
+    funcao()
+    return (time.perf_counter() - inicio) * 1e3
+
+
+def varredura(caminho: str, dominio: str) -> list:
+    """Lista os emails do domínio lendo o arquivo inteiro."""
+    sufixo = f"@{dominio}"
+    emails = []
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            dados = linha.rstrip("\n").split("|")
+            if len(dados) == 3 and dados[1].endswith(sufixo):
+                emails.append(dados[1])
+    return emails
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dominio = "empresa7.com.br"
+
+    print(f"\n📊 Benchmark da busca por domínio ({total} clientes)\n")
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "clientes.txt")
+        with open(caminho, "w", encoding="utf-8") as f:
+            for i in range(total):
+                f.write(f"Cliente {i}|cliente{i}@empresa{i % DOMINIOS}.com.br|1\n")
+
+        repositorio = ClienteFileRepository(caminho)
+        montagem = cronometrar(lambda: list(repositorio.buscar_por_dominio("x.com")))
+        repositorio.fechar()
+        repositorio = ClienteFileRepository(caminho)
+        reabertura = cronometrar(lambda: list(repositorio.buscar_por_dominio("x.com")))
+
+        linhas = [
+            ("montar índice (leitura do arquivo)", montagem),
+            ("reabrir índice (.dom)", reabertura),
+            (
+                "domínio: varredura do arquivo",
+                cronometrar(lambda: varredura(caminho, dominio)),
+            ),
+            (
+                "domínio: índice",
+                cronometrar(lambda: list(repositorio.buscar_por_dominio(dominio))),
+            ),
+            (
+                "prefixo no domínio: índice",
+                cronometrar(
+                    lambda: list(repositorio.buscar_por_dominio(dominio, "cliente10"))
+                ),
+            ),
+            (
+                "primeiro cliente do domínio",
+                cronometrar(lambda: next(repositorio.buscar_por_dominio(dominio))),
+            ),
+        ]
+        for rotulo, ms in linhas:
+            print(f"  {rotulo:<40} {ms:10,.2f} ms")
+        repositorio.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark da guarda de emails duplicados - PetroBahia S.A.
+Mede, para um arquivo de clientes, o tempo para montar o filtro de Bloom
+(leitura única do arquivo) e para reabri-lo do ``.bloom``, e a latência de
+conferir emails novos pela guarda contra buscar_por_email (índice).
+
+Uso: python scripts/benchmark_duplicados.py [quantidade_de_clientes]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    ClienteFileRepository,
+    GuardaDuplicadosBloom,
+)
+
+CONSULTAS = 20_000
+
+
+def latencia(funcao, emails) -> float:
+    """Mediana da latência em microssegundos."""
+    tempos = []
+    for email in emails:
+        inicio = time.perf_counter()
+        funcao(email)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1e6
+
+
+def cronometrar(funcao) -> float:
+    """Tempo de uma chamada em milissegundos."""
+    inicio = time.perf_counter()
+    funcao()
+    return (time.perf_counter() - inicio) * 1e3
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    novos = [f"novo{i}@petrobahia.com" for i in range(CONSULTAS)]
+
+    print(f"\n📊 Benchmark da guarda de duplicados ({total} clientes)\n")
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "clientes.txt")
+        with open(caminho, "w", encoding="utf-8") as f:
+            for i in range(total):
+                f.write(f"Cliente {i}|cliente{i}@petrobahia.com|{i:014d}\n")
+        repositorio = ClienteFileRepository(caminho, indice_persistente=False)
+
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=total)
+        montagem = cronometrar(lambda: guarda.existe(novos[0]))
+        guarda.fechar()
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=total)
+        reabertura = cronometrar(lambda: guarda.existe(novos[0]))
+        indice = cronometrar(lambda: repositorio.buscar_por_email(novos[0]))
+
+        print(f"  {'montar filtro (leitura do arquivo)':<40} {montagem:10,.0f} ms")
+        print(f"  {'reabrir filtro (.bloom)':<40} {reabertura:10,.1f} ms")
+        print(f"  {'montar índice (leitura do arquivo)':<40} {indice:10,.0f} ms")
+        print(
+            f"  {'email novo: guarda':<40}"
+            f" {latencia(guarda.existe, novos):10,.2f} µs"
+        )
+        print(
+            f"  {'email novo: buscar_por_email':<40}"
+            f" {latencia(repositorio.buscar_por_email, novos):10,.2f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
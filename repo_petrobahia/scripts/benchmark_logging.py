@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark da saída de log - PetroBahia S.A.
+Mede a vazão do processamento de pedidos com uma linha impressa por pedido
+(comportamento anterior) contra os modos resumo/silencioso dos controllers
+e o log estruturado desligado.
+
+A saída do terminal é simulada por um arquivo com buffer de linha, como um
+TTY: cada linha impressa vira uma escrita.
+
+Uso: python scripts/benchmark_logging.py [quantidade_de_pedidos]
+"""
+
+import contextlib
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.di import Container  # noqa: E402
+from clean_architecture.domain.value_objects import CupomTipo, ProdutoTipo  # noqa: E402
+from clean_architecture.infrastructure.log import configurar_logging  # noqa: E402
+from petrobahia.arredondamento import ArredondamentoService  # noqa: E402
+from petrobahia.calculos import PrecoCalculadora  # noqa: E402
+from petrobahia.descontos import DescontoService  # noqa: E402
+from petrobahia.pedidos import PedidoService  # noqa: E402
+
+
+def gerar_pedidos(total: int, semente: int = 42) -> list:
+    """Gera pedidos aleatórios (mas reprodutíveis)."""
+    aleatorio = random.Random(semente)
+    produtos = [p.value for p in ProdutoTipo]
+    cupons = [None] + [c.value for c in CupomTipo]
+    return [
+        {
+            "cliente": f"Cliente {i}",
+            "produto": aleatorio.choice(produtos),
+            "qtd": aleatorio.randint(1, 20_000),
+            "cupom": aleatorio.choice(cupons),
+        }
+        for i in range(total)
+    ]
+
+
+@contextlib.contextmanager
+def terminal_simulado():
+    """Redireciona stdout para um arquivo com buffer de linha."""
+    descritor, caminho = tempfile.mkstemp(suffix=".log")
+    os.close(descritor)
+    try:
+        with open(caminho, "w", buffering=1, encoding="utf-8") as arquivo:
+            with contextlib.redirect_stdout(arquivo):
+                yield arquivo
+    finally:
+        os.remove(caminho)
+
+
+def medir(nome: str, funcao, total: int) -> float:
+    """Executa a função e imprime a vazão em pedidos por segundo."""
+    with terminal_simulado():
+        inicio = time.perf_counter()
+        funcao()
+        decorrido = time.perf_counter() - inicio
+    vazao = total / decorrido
+    print(f"  {nome:<44} {vazao:12,.0f} pedidos/s")
+    return vazao
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    pedidos = gerar_pedidos(total)
+
+    print(f"\n📊 Benchmark de saída de log ({total} pedidos)\n")
+
+    print("Controller (clean_architecture):")
+    vazoes = {}
+    for modo in ("detalhado", "resumo", "silencioso"):
+        controller = Container({"saida_controllers": modo}).get_pedido_controller()
+        vazoes[modo] = medir(
+            f"{modo}", lambda: controller.processar_pedidos(pedidos), total
+        )
+
+    print("\nPedidoService (petrobahia):")
+    servico = PedidoService(
+        PrecoCalculadora(), DescontoService(), ArredondamentoService()
+    )
+
+    def processar():
+        for pedido in pedidos:
+            servico.processar_pedido(pedido)
+
+    # Com DEBUG ligado, o log escreve as mesmas linhas que os prints antigos
+    with terminal_simulado() as arquivo:
+        handler = logging.StreamHandler(arquivo)
+        logger = logging.getLogger("petrobahia")
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        inicio = time.perf_counter()
+        processar()
+        com_debug = total / (time.perf_counter() - inicio)
+        logger.removeHandler(handler)
+    print(f"  {'DEBUG ligado (uma linha por etapa)':<44} {com_debug:12,.0f} pedidos/s")
+    configurar_logging(logging.WARNING)
+    sem_debug = medir("DEBUG desligado", processar, total)
+
+    print("\nGanho:")
+    print(f"  controller resumo:     {vazoes['resumo'] / vazoes['detalhado']:.2f}x")
+    print(f"  controller silencioso: {vazoes['silencioso'] / vazoes['detalhado']:.2f}x")
+    print(f"  PedidoService:         {sem_debug / com_debug:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
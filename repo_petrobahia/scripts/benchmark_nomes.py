@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca por nome - PetroBahia S.A.
+Mede, para um arquivo de clientes com nomes gerados (prenomes e sobrenomes
+comuns, mais sobrenomes raros), a montagem do índice de trigramas, a
+inclusão de um cliente com o índice montado e o tempo de consultas com
+erros de digitação e nomes parciais.
+
+Uso: python scripts/benchmark_nomes.py [quantidade_de_clientes]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.domain.entities import Cliente  # noqa: E402
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    ClienteFileRepository,
+)
+
+PRENOMES = (
+    "Maria Ana Francisca Antonia Adriana Juliana Marcia Fernanda Patricia "
+    "Aline Jose Joao Antonio Francisco Carlos Paulo Pedro Lucas Luiz Marcos "
+    "Luis Gabriel Rafael Daniel Marcelo Bruno Eduardo Felipe Raimundo Rodrigo"
+).split()
+SOBRENOMES = (
+    "Silva Santos Oliveira Souza Rodrigues Ferreira Alves Pereira Lima Gomes "
+    "Costa Ribeiro Martins Carvalho Almeida Lopes Soares Fernandes Vieira "
+    "Barbosa Rocha Dias Nascimento Andrade Moreira Nunes Marques Machado "
+    "Mendes Freitas Cardoso Ramos Goncalves Santana Teixeira Cavalcanti"
+).split()
+CONSULTAS = (
+    "Carlos Slva",
+    "Maria",
+    "Juliana Cavalcanti Medeiros",
+    "Jose Olivera Sants",
+    "Tavarezini",
+)
+
+
+def sobrenome_raro(gerador: random.Random) -> str:
+    """Sobrenome inventado, da cauda longa de sobrenomes pouco repetidos."""
+    silabas = ("ta", "va", "re", "zi", "ni", "mo", "ra", "bu", "que", "li", "do")
+    return "".join(gerador.choice(silabas) for _ in range(4)).capitalize()
+
+
+def nome(gerador: random.Random) -> str:
+    """Nome com frequências desiguais, como em um cadastro real."""
+    partes = [PRENOMES[min(int(gerador.paretovariate(1.2)) - 1, len(PRENOMES) - 1)]]
+    for _ in range(gerador.choice((1, 2, 2, 3))):
+        if gerador.random() < 0.2:
+            partes.append(sobrenome_raro(gerador))
+        else:
+            indice = int(gerador.paretovariate(1.0)) - 1
+            partes.append(SOBRENOMES[min(indice, len(SOBRENOMES) - 1)])
+    return " ".join(partes)
+
+
+def cronometrar(funcao) -> float:
+    """Tempo de uma chamada em milissegundos."""
+    inicio = time.perf_counter()
+    funcao()
+    return (time.perf_counter() - inicio) * 1e3
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    gerador = random.Random(42)
+
+    print(f"\n📊 Benchmark da busca por nome ({total} clientes)\n")
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "clientes.txt")
+        with open(caminho, "w", encoding="utf-8") as f:
+            for i in range(total):
+                f.write(f"{nome(gerador)}|cliente{i}@petrobahia.com|1\n")
+
+        repositorio = ClienteFileRepository(caminho)
+        linhas = [
+            (
+                "montar índice (leitura do arquivo)",
+                cronometrar(lambda: repositorio.buscar_por_nome("x")),
+            ),
+            (
+                "salvar um cliente com o índice montado",
+                cronometrar(
+                    lambda: repositorio.salvar(
+                        Cliente(nome="Tavares Lima", email="novo@x.com", cnpj="1")
+                    )
+                ),
+            ),
+        ]
+        for consulta in CONSULTAS:
+            repositorio.buscar_por_nome(consulta)
+            linhas.append(
+                (
+                    f"buscar {consulta!r}",
+                    cronometrar(lambda: repositorio.buscar_por_nome(consulta)),
+                )
+            )
+        for rotulo, ms in linhas:
+            print(f"  {rotulo:<40} {ms:10,.2f} ms")
+        repositorio.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline de cotação - PetroBahia S.A.
+Compara o custo por pedido do ProcessarPedidoUseCase padrão (três serviços)
+com o modo de pipeline compilado (uma função por produto/cupom).
+
+Uso: python scripts/benchmark_pipeline.py [quantidade_de_pedidos]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.application.dto import PedidoInputDTO  # noqa: E402
+from clean_architecture.di import Container  # noqa: E402
+from clean_architecture.domain.value_objects import CupomTipo, ProdutoTipo  # noqa: E402
+
+
+def gerar_pedidos(total: int, semente: int = 42) -> list:
+    """Gera pedidos aleatórios (mas reprodutíveis)."""
+    aleatorio = random.Random(semente)
+    produtos = [p.value for p in ProdutoTipo]
+    cupons = [None] + [c.value for c in CupomTipo]
+    return [
+        PedidoInputDTO(
+            cliente=f"Cliente {i}",
+            produto=aleatorio.choice(produtos),
+            qtd=aleatorio.randint(1, 20_000),
+            cupom=aleatorio.choice(cupons),
+        )
+        for i in range(total)
+    ]
+
+
+def medir(nome: str, funcao, argumentos: list) -> float:
+    """Executa a função para cada argumento e imprime o custo por chamada."""
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcao(*argumento)
+    decorrido = time.perf_counter() - inicio
+    por_chamada = decorrido / len(argumentos) * 1e6
+    print(f"  {nome:<38} {por_chamada:8.3f} µs/pedido")
+    return por_chamada
+
+
+def main():
+    """Função principal"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    pedidos = gerar_pedidos(total)
+
+    padrao = Container().get_processar_pedido_use_case()
+    compilado = Container({"pipeline_compilado": True}).get_processar_pedido_use_case()
+
+    print(f"\n📊 Benchmark do pipeline de cotação ({total} pedidos)\n")
+
+    print("Caso de uso completo (execute):")
+    execute_padrao = medir(
+        "padrão (3 serviços)", padrao.execute, [(p,) for p in pedidos]
+    )
+    execute_compilado = medir(
+        "pipeline compilado", compilado.execute, [(p,) for p in pedidos]
+    )
+
+    # Apenas a etapa de cotação, sem conversão de DTO/entidade
+    tabela = padrao.calculo_preco_service.tabela_vigente()
+    argumentos = [
+        (
+            ProdutoTipo(p.produto),
+            p.qtd,
+            CupomTipo(p.cupom) if p.cupom else None,
+            tabela,
+        )
+        for p in pedidos
+    ]
+
+    def cotar_servicos(produto, quantidade, cupom, tabela):
+        preco = padrao.calculo_preco_service.calcular(produto, quantidade, tabela)
+        preco = padrao.desconto_service.aplicar_desconto(
+            preco, produto, quantidade, cupom
+        )
+        return padrao.arredondamento_service.arredondar(preco, produto)
+
+    print("\nSomente a cotação:")
+    cotar_padrao = medir("padrão (3 serviços)", cotar_servicos, argumentos)
+    cotar_compilado = medir(
+        "pipeline compilado", compilado.pipeline_preco.cotar, argumentos
+    )
+
+    print("\nGanho:")
+    print(f"  execute: {execute_padrao / execute_compilado:.2f}x")
+    print(f"  cotação: {cotar_padrao / cotar_compilado:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
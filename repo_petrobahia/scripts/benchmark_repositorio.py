@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark do repositório de clientes - PetroBahia S.A.
+Mede a latência de buscar_por_email em função do tamanho do arquivo:
+leitura sequencial (comportamento anterior) contra o índice (montagem do
+índice e buscas seguintes), e o tempo para reabrir o repositório pelo
+índice persistente (.idx) com 1000 clientes escritos depois do checkpoint.
+
+Uso: python scripts/benchmark_repositorio.py [tamanhos separados por vírgula]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.domain.entities import Cliente  # noqa: E402
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    ClienteFileRepository,
+)
+
+BUSCAS = 2000
+CAUDA = 1000
+
+
+def gerar_arquivo(caminho: str, total: int) -> None:
+    """Grava ``total`` clientes no formato nome|email|cnpj."""
+    with open(caminho, "w", encoding="utf-8") as f:
+        for i in range(total):
+            f.write(f"Cliente {i}|cliente{i}@petrobahia.com|{i:014d}\n")
+
+
+def busca_sequencial(caminho: str, email: str):
+    """Busca lendo o arquivo inteiro (implementação anterior)."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            dados = linha.strip().split("|")
+            if len(dados) == 3 and dados[1] == email:
+                return Cliente(nome=dados[0], email=dados[1], cnpj=dados[2])
+    return None
+
+
+def latencias(funcao, emails) -> float:
+    """Mediana da latência em microssegundos."""
+    tempos = []
+    for email in emails:
+        inicio = time.perf_counter()
+        funcao(email)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1e6
+
+
+def main():
+    """Função principal"""
+    tamanhos = (
+        [int(t) for t in sys.argv[1].split(",")]
+        if len(sys.argv) > 1
+        else [10_000, 100_000, 1_000_000]
+    )
+    aleatorio = random.Random(42)
+
+    print("\n📊 Benchmark de buscar_por_email (mediana por busca)\n")
+    print(
+        f"  {'clientes':>10} {'sequencial':>14} {'montar índice':>15}"
+        f" {'índice':>10} {'reabrir (.idx)':>15}"
+    )
+    with tempfile.TemporaryDirectory() as diretorio:
+        for total in tamanhos:
+            caminho = os.path.join(diretorio, f"clientes_{total}.txt")
+            gerar_arquivo(caminho, total)
+            emails = [
+                f"cliente{aleatorio.randrange(total)}@petrobahia.com"
+                for _ in range(BUSCAS)
+            ]
+
+            # A leitura sequencial é lenta: poucas buscas bastam
+            sequencial = latencias(lambda e: busca_sequencial(caminho, e), emails[:20])
+
+            repositorio = ClienteFileRepository(caminho)
+            inicio = time.perf_counter()
+            repositorio.buscar_por_email(emails[0])
+            montagem = (time.perf_counter() - inicio) * 1e3
+            indexada = latencias(repositorio.buscar_por_email, emails)
+
+            # Índice persistente até aqui e mais CAUDA clientes depois dele
+            repositorio.salvar_indice()
+            repositorio.fechar()
+            with open(caminho, "a", encoding="utf-8") as f:
+                for i in range(total, total + CAUDA):
+                    f.write(f"Cliente {i}|cliente{i}@petrobahia.com|{i:014d}\n")
+            inicio = time.perf_counter()
+            reaberto = ClienteFileRepository(caminho)
+            reaberto.buscar_por_email(f"cliente{total + CAUDA - 1}@petrobahia.com")
+            reabertura = (time.perf_counter() - inicio) * 1e3
+            reaberto.fechar()
+
+            print(
+                f"  {total:>10,} {sequencial:>11,.0f} µs {montagem:>12,.0f} ms"
+                f" {indexada:>7,.1f} µs {reabertura:>12,.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
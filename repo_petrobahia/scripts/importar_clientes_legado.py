@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Importação de clientes do legado - PetroBahia S.A.
+Lê um arquivo de clientes do sistema legado (uma linha ``str(dict)`` por
+cliente) e grava os clientes válidos no repositório da Clean Architecture,
+mostrando a vazão e as rejeições. Com ``--checkpoint``, uma importação
+interrompida continua de onde parou; com ``--validar-cnpj``, clientes com
+CNPJ inválido são rejeitados.
+
+Uso: python scripts/importar_clientes_legado.py clientes.txt [opções]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from clean_architecture.di import Container  # noqa: E402
+from clean_architecture.infrastructure.persistence import (  # noqa: E402
+    LeitorClientesLegado,
+)
+
+
+def mostrar_progresso(resultado) -> None:
+    """Mostra o andamento depois de cada lote gravado."""
+    print(
+        f"\r  {resultado.lidos:>12,} lidos  {resultado.rejeitados:>10,} rejeitados"
+        f"  {resultado.vazao:>10,.0f} registros/s  (posição {resultado.posicao:,})",
+        end="",
+        flush=True,
+    )
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Importa clientes do legado.")
+    parser.add_argument("origem", help="arquivo str(dict) do legado")
+    parser.add_argument("--destino", default="clientes_clean_arch.txt")
+    parser.add_argument("--backend", choices=("arquivo", "sqlite"), default="arquivo")
+    parser.add_argument(
+        "--durabilidade", choices=("nenhuma", "lote", "registro"), default="lote"
+    )
+    parser.add_argument("--inicio", type=int, help="byte da origem para começar")
+    parser.add_argument("--checkpoint", help="arquivo com a posição importada")
+    parser.add_argument("--lote", type=int, default=10_000)
+    parser.add_argument(
+        "--validar-cnpj",
+        action="store_true",
+        help="rejeita CNPJs com dígitos verificadores errados",
+    )
+    args = parser.parse_args()
+
+    container = Container(
+        {
+            "cliente_backend": args.backend,
+            "cliente_file": args.destino,
+            "cliente_db_file": args.destino,
+            "cliente_durabilidade": args.durabilidade,
+            "importacao_lote": args.lote,
+            "importacao_checkpoint_file": args.checkpoint,
+            "validar_cnpj": args.validar_cnpj,
+        }
+    )
+    use_case = container.get_importar_clientes_use_case()
+
+    print(f"\n📊 Importação de {args.origem} para {args.destino}\n")
+    resultado = use_case.execute(
+        LeitorClientesLegado(args.origem), args.inicio, mostrar_progresso
+    )
+    print(
+        f"\n\n  Importados: {resultado.importados:,}"
+        f"\n  Rejeitados: {resultado.rejeitados:,}"
+        f"\n  Tempo: {resultado.segundos:.1f} s ({resultado.vazao:,.0f} registros/s)"
+        f"\n  Posição final: {resultado.posicao:,}"
+    )
+    for rejeicao in resultado.rejeicoes[:10]:
+        print(f"  ❌ {rejeicao}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
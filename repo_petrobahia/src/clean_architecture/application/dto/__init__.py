@@ -1,7 +1,9 @@
 """Data Transfer Objects (DTOs) para comunicação entre camadas."""
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
 
 
 @dataclass
@@ -26,12 +28,17 @@ class ClienteOutputDTO:
 
 @dataclass
 class PedidoInputDTO:
-    """DTO para entrada de dados de pedido."""
+    """
+    DTO para entrada de dados de pedido.
+
+    ``cupons`` permite informar vários cupons, que se somam a ``cupom``.
+    """
 
     cliente: str
     produto: str
     qtd: int
     cupom: Optional[str] = None
+    cupons: Optional[List[str]] = None
 
 
 @dataclass
@@ -44,3 +51,69 @@ class PedidoOutputDTO:
     valor_final: float
     sucesso: bool
     mensagem: Optional[str] = None
+    versao_preco: Optional[str] = None
+    cupons_aplicados: Optional[List[str]] = None  # Só com vários cupons
+
+
+@dataclass
+class CurvaPrecoOutputDTO:
+    """
+    DTO para saída da curva de preços de um produto/cupom.
+
+    ``precos[i]`` é o preço final de ``qtd_min + i`` litros e ``faixas``
+    traz as quantidades em que uma nova faixa de volume começa.
+    """
+
+    produto: str
+    cupom: Optional[str]
+    qtd_min: int
+    qtd_max: int
+    precos: np.ndarray
+    faixas: List[int] = field(default_factory=list)
+    sucesso: bool = True
+    mensagem: Optional[str] = None
+    versao_preco: Optional[str] = None
+
+    def preco(self, quantidade: int) -> float:
+        """Retorna o preço final de uma quantidade da curva."""
+        if not self.qtd_min <= quantidade <= self.qtd_max:
+            raise ValueError(f"Quantidade fora da curva: {quantidade}")
+        return float(self.precos[quantidade - self.qtd_min])
+
+
+@dataclass
+class OrcamentoOutputDTO:
+    """DTO para saída da maior quantidade que cabe em um orçamento."""
+
+    produto: str
+    cupom: Optional[str]
+    orcamento: float
+    quantidade: int
+    valor_final: float
+    sucesso: bool
+    mensagem: Optional[str] = None
+    versao_preco: Optional[str] = None
+
+
+@dataclass
+class ImportacaoOutputDTO:
+    """
+    DTO para saída de uma importação de clientes.
+
+    ``posicao`` é a posição na fonte até onde os registros foram gravados:
+    uma importação interrompida é retomada a partir dela. ``rejeicoes``
+    traz os primeiros registros rejeitados (``"posição N: motivo"``).
+    """
+
+    posicao_inicial: int
+    posicao: int
+    lidos: int = 0
+    importados: int = 0
+    rejeitados: int = 0
+    segundos: float = 0.0
+    rejeicoes: List[str] = field(default_factory=list)
+
+    @property
+    def vazao(self) -> float:
+        """Registros lidos por segundo."""
+        return self.lidos / self.segundos if self.segundos > 0 else 0.0
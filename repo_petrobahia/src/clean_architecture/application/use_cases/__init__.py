@@ -1,6 +1,15 @@
 """Use Cases da aplicação."""
 
 from .cadastrar_cliente import CadastrarClienteUseCase
+from .calcular_quantidade_maxima import CalcularQuantidadeMaximaUseCase
+from .cotar_curva import CotarCurvaUseCase
+from .importar_clientes import ImportarClientesUseCase
 from .processar_pedido import ProcessarPedidoUseCase
 
-__all__ = ["CadastrarClienteUseCase", "ProcessarPedidoUseCase"]
+__all__ = [
+    "CadastrarClienteUseCase",
+    "CalcularQuantidadeMaximaUseCase",
+    "CotarCurvaUseCase",
+    "ImportarClientesUseCase",
+    "ProcessarPedidoUseCase",
+]
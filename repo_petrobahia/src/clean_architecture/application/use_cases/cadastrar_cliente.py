@@ -1,11 +1,12 @@
 """Casos de uso (Use Cases) da aplicação."""
 
-from typing import Optional
+from typing import List, Optional, Sequence
 
 from ...domain.entities import Cliente
-from ...domain.exceptions import ClienteInvalidoError
+from ...domain.exceptions import ClienteDuplicadoError, ClienteInvalidoError
 from ...domain.repositories import (
     ClienteRepositoryInterface,
+    GuardaDuplicadosInterface,
     NotificationServiceInterface,
 )
 from ..dto import ClienteInputDTO, ClienteOutputDTO
@@ -19,51 +20,115 @@ class CadastrarClienteUseCase:
     - Validar dados do cliente
     - Persistir cliente
     - Notificar cliente
+
+    ``execute_lote`` cadastra vários clientes gravando todos os válidos com
+    uma única chamada a ``salvar_lote`` do repositório.
+
+    Com um ``guarda_duplicados``, um email já cadastrado (ou repetido no
+    mesmo lote) é rejeitado com ``ClienteDuplicadoError``.
     """
 
     def __init__(
         self,
         cliente_repository: ClienteRepositoryInterface,
         notification_service: NotificationServiceInterface,
+        guarda_duplicados: Optional[GuardaDuplicadosInterface] = None,
     ):
         self.cliente_repository = cliente_repository
         self.notification_service = notification_service
+        self.guarda_duplicados = guarda_duplicados
 
     def execute(self, dto: ClienteInputDTO) -> ClienteOutputDTO:
         """Executa o caso de uso de cadastro de cliente."""
         try:
             # 1. Criar entidade de domínio (validação automática)
             cliente = Cliente(nome=dto.nome, email=dto.email, cnpj=dto.cnpj)
+            self._verificar_duplicado(cliente.email)
 
             # 2. Persistir
             self.cliente_repository.salvar(cliente)
+            if self.guarda_duplicados is not None:
+                self.guarda_duplicados.registrar((cliente.email,))
 
             # 3. Notificar
             self.notification_service.enviar_boas_vindas(
                 email=cliente.email, nome=cliente.nome
             )
 
-            return ClienteOutputDTO(
-                nome=cliente.nome,
-                email=cliente.email,
-                cnpj=cliente.cnpj,
-                sucesso=True,
-                mensagem="Cliente cadastrado com sucesso",
-            )
+            return self._sucesso(cliente)
 
         except ClienteInvalidoError as e:
-            return ClienteOutputDTO(
-                nome=dto.nome,
-                email=dto.email,
-                cnpj=dto.cnpj,
-                sucesso=False,
-                mensagem=f"Erro de validação: {str(e)}",
-            )
+            return self._falha(dto, f"Erro de validação: {str(e)}")
         except Exception as e:
-            return ClienteOutputDTO(
-                nome=dto.nome,
-                email=dto.email,
-                cnpj=dto.cnpj,
-                sucesso=False,
-                mensagem=f"Erro inesperado: {str(e)}",
-            )
+            return self._falha(dto, f"Erro inesperado: {str(e)}")
+
+    def execute_lote(self, dtos: Sequence[ClienteInputDTO]) -> List[ClienteOutputDTO]:
+        """Executa o cadastro de vários clientes, com uma gravação em lote."""
+        resultados: List[Optional[ClienteOutputDTO]] = [None] * len(dtos)
+
+        # 1. Criar entidades de domínio (validação automática)
+        validos = []
+        vistos = set()
+        for i, dto in enumerate(dtos):
+            try:
+                cliente = Cliente(nome=dto.nome, email=dto.email, cnpj=dto.cnpj)
+                if self.guarda_duplicados is not None:
+                    if cliente.email in vistos:
+                        raise ClienteDuplicadoError(
+                            f"Email repetido no lote: {cliente.email}"
+                        )
+                    self._verificar_duplicado(cliente.email)
+                    vistos.add(cliente.email)
+                validos.append((i, cliente))
+            except ClienteInvalidoError as e:
+                resultados[i] = self._falha(dto, f"Erro de validação: {str(e)}")
+            except Exception as e:
+                resultados[i] = self._falha(dto, f"Erro inesperado: {str(e)}")
+
+        # 2. Persistir todos os válidos de uma vez
+        try:
+            self.cliente_repository.salvar_lote([cliente for _, cliente in validos])
+        except Exception as e:
+            for i, _ in validos:
+                resultados[i] = self._falha(dtos[i], f"Erro inesperado: {str(e)}")
+            return resultados
+        if self.guarda_duplicados is not None:
+            self.guarda_duplicados.registrar(cliente.email for _, cliente in validos)
+
+        # 3. Notificar
+        for i, cliente in validos:
+            try:
+                self.notification_service.enviar_boas_vindas(
+                    email=cliente.email, nome=cliente.nome
+                )
+                resultados[i] = self._sucesso(cliente)
+            except Exception as e:
+                resultados[i] = self._falha(dtos[i], f"Erro inesperado: {str(e)}")
+        return resultados
+
+    def _verificar_duplicado(self, email: str) -> None:
+        """Gera ``ClienteDuplicadoError`` se o email já estiver cadastrado."""
+        if self.guarda_duplicados is not None and self.guarda_duplicados.existe(email):
+            raise ClienteDuplicadoError(f"Email já cadastrado: {email}")
+
+    @staticmethod
+    def _sucesso(cliente: Cliente) -> ClienteOutputDTO:
+        """Monta a resposta de cadastro bem-sucedido."""
+        return ClienteOutputDTO(
+            nome=cliente.nome,
+            email=cliente.email,
+            cnpj=cliente.cnpj,
+            sucesso=True,
+            mensagem="Cliente cadastrado com sucesso",
+        )
+
+    @staticmethod
+    def _falha(dto: ClienteInputDTO, mensagem: str) -> ClienteOutputDTO:
+        """Monta a resposta de erro."""
+        return ClienteOutputDTO(
+            nome=dto.nome,
+            email=dto.email,
+            cnpj=dto.cnpj,
+            sucesso=False,
+            mensagem=mensagem,
+        )
@@ -0,0 +1,161 @@
+"""Caso de uso: Calcular Quantidade Máxima para um Orçamento."""
+
+from typing import Callable, List, Optional, Tuple, Union
+
+from ...domain.exceptions import ProdutoNaoEncontradoError
+from ...domain.services import (
+    ArredondamentoServiceInterface,
+    CalculoPrecoServiceInterface,
+    DescontoServiceInterface,
+    TabelaPrecosInterface,
+)
+from ...domain.value_objects import Cupom, ProdutoTipo, codigo_cupom
+from ..dto import OrcamentoOutputDTO
+from .cupons import converter_cupom
+
+# Maior quantidade considerada pelo solver (evita busca sem fim se o preço
+# de uma faixa não crescer com a quantidade)
+MAX_QUANTIDADE = 10**12
+
+
+class CalcularQuantidadeMaximaUseCase:
+    """
+    Caso de uso: Encontrar a maior quantidade que cabe em um orçamento.
+
+    Responsabilidades:
+    - Validar o produto, o cupom e o orçamento
+    - Encontrar a maior quantidade cujo preço final (com desconto e
+      arredondamento) não passa do orçamento
+
+    O preço final não é monótono na quantidade inteira: ao entrar em uma
+    faixa de volume com desconto, ele pode cair. Dentro de cada faixa,
+    porém, ele só cresce. Por isso a busca é feita por faixa, da mais alta
+    para a mais baixa: a primeira faixa cujo início cabe no orçamento
+    contém a resposta, encontrada por busca binária (a última faixa, sem
+    fim, é delimitada por busca exponencial). São O(log n) cotações por
+    faixa, todas feitas pelos três serviços na mesma versão da tabela.
+    """
+
+    def __init__(
+        self,
+        calculo_preco_service: CalculoPrecoServiceInterface,
+        desconto_service: DescontoServiceInterface,
+        arredondamento_service: ArredondamentoServiceInterface,
+    ):
+        self.calculo_preco_service = calculo_preco_service
+        self.desconto_service = desconto_service
+        self.arredondamento_service = arredondamento_service
+
+    def execute(
+        self,
+        produto: Union[ProdutoTipo, str],
+        cupom: Optional[Cupom],
+        orcamento: float,
+    ) -> OrcamentoOutputDTO:
+        """Executa o caso de uso de cálculo da quantidade máxima."""
+        try:
+            produto = ProdutoTipo(produto)
+            cupom = converter_cupom(cupom, self.desconto_service)
+            if orcamento <= 0:
+                raise ValueError("Orçamento deve ser maior que zero")
+
+            # Todas as cotações usam a mesma versão da tabela de preços
+            tabela = self.calculo_preco_service.tabela_vigente()
+
+            def cotar(quantidade: int) -> float:
+                preco = self.calculo_preco_service.calcular(produto, quantidade, tabela)
+                preco = self.desconto_service.aplicar_desconto(
+                    preco, produto, quantidade, cupom
+                )
+                return self.arredondamento_service.arredondar(preco, produto)
+
+            quantidade, valor = self._resolver(
+                cotar, self._segmentos(produto, tabela), orcamento
+            )
+
+            return OrcamentoOutputDTO(
+                produto=produto.value,
+                cupom=codigo_cupom(cupom),
+                orcamento=orcamento,
+                quantidade=quantidade,
+                valor_final=valor,
+                sucesso=True,
+                mensagem=(
+                    "Quantidade máxima calculada com sucesso"
+                    if quantidade
+                    else "Orçamento insuficiente para uma unidade"
+                ),
+                versao_preco=tabela.versao,
+            )
+
+        except ValueError as e:
+            return self._falha(produto, cupom, orcamento, f"Erro de validação: {e}")
+        except ProdutoNaoEncontradoError as e:
+            return self._falha(
+                produto, cupom, orcamento, f"Produto não encontrado: {e}"
+            )
+
+    @staticmethod
+    def _segmentos(
+        produto: ProdutoTipo, tabela: TabelaPrecosInterface
+    ) -> List[Tuple[int, Optional[int]]]:
+        """Intervalos ``(início, fim)`` de cada faixa; a última não tem fim."""
+        inicios = [1] + [limite + 1 for limite in tabela.limites(produto)]
+        fins: List[Optional[int]] = [inicio - 1 for inicio in inicios[1:]] + [None]
+        return list(zip(inicios, fins))
+
+    @staticmethod
+    def _resolver(
+        cotar: Callable[[int], float],
+        segmentos: List[Tuple[int, Optional[int]]],
+        orcamento: float,
+    ) -> Tuple[int, float]:
+        """Retorna a maior quantidade dentro do orçamento e o seu preço."""
+        for inicio, fim in reversed(segmentos):
+            valor_inicio = cotar(inicio)
+            if valor_inicio > orcamento:
+                continue
+
+            # Invariante: cotar(baixo) <= orcamento < cotar(alto)
+            baixo, valor_baixo = inicio, valor_inicio
+            if fim is None:
+                passo = 1
+                while True:
+                    alto = inicio + passo
+                    if alto > MAX_QUANTIDADE:
+                        alto = MAX_QUANTIDADE + 1
+                        break
+                    valor_alto = cotar(alto)
+                    if valor_alto > orcamento:
+                        break
+                    baixo, valor_baixo = alto, valor_alto
+                    passo *= 2
+            else:
+                valor_fim = cotar(fim)
+                if valor_fim <= orcamento:
+                    return fim, valor_fim
+                alto = fim
+
+            while alto - baixo > 1:
+                meio = (baixo + alto) // 2
+                valor_meio = cotar(meio)
+                if valor_meio <= orcamento:
+                    baixo, valor_baixo = meio, valor_meio
+                else:
+                    alto = meio
+            return baixo, valor_baixo
+
+        return 0, 0.0
+
+    @staticmethod
+    def _falha(produto, cupom, orcamento, mensagem) -> OrcamentoOutputDTO:
+        """Monta a resposta de erro."""
+        return OrcamentoOutputDTO(
+            produto=getattr(produto, "value", produto),
+            cupom=getattr(cupom, "value", cupom),
+            orcamento=orcamento,
+            quantidade=0,
+            valor_final=0.0,
+            sucesso=False,
+            mensagem=mensagem,
+        )
@@ -0,0 +1,145 @@
+"""Caso de uso: Cotar Curva de Preços."""
+
+from typing import List, Optional, Union
+
+import numpy as np
+
+from ...domain.exceptions import ProdutoNaoEncontradoError
+from ...domain.services import (
+    ArredondamentoServiceInterface,
+    CalculoPrecoServiceInterface,
+    DescontoServiceInterface,
+    TabelaPrecosInterface,
+)
+from ...domain.value_objects import CODIGOS_PRODUTO, Cupom, ProdutoTipo, codigo_cupom
+from ..dto import CurvaPrecoOutputDTO
+from .cupons import converter_cupom
+
+# Limite de pontos por curva (protege contra pedidos de curvas gigantes)
+MAX_PONTOS_CURVA = 1_000_000
+
+
+class CotarCurvaUseCase:
+    """
+    Caso de uso: Cotar o preço final de cada quantidade de um intervalo.
+
+    Responsabilidades:
+    - Validar o produto, o cupom e o intervalo de quantidades
+    - Calcular a curva de preços finais (preço, desconto e arredondamento)
+    - Informar as quantidades em que a faixa de volume muda
+
+    Quando os serviços oferecem as versões em lote (``calcular_lote``,
+    ``aplicar_desconto_lote`` e ``arredondar_lote``), a curva inteira é
+    calculada em uma passada vetorizada; caso contrário, as três chamadas
+    escalares são feitas para cada quantidade. Os preços são idênticos aos
+    de ``ProcessarPedidoUseCase`` na mesma versão da tabela.
+    """
+
+    def __init__(
+        self,
+        calculo_preco_service: CalculoPrecoServiceInterface,
+        desconto_service: DescontoServiceInterface,
+        arredondamento_service: ArredondamentoServiceInterface,
+    ):
+        self.calculo_preco_service = calculo_preco_service
+        self.desconto_service = desconto_service
+        self.arredondamento_service = arredondamento_service
+
+    def execute(
+        self,
+        produto: Union[ProdutoTipo, str],
+        cupom: Optional[Cupom],
+        qtd_min: int,
+        qtd_max: int,
+    ) -> CurvaPrecoOutputDTO:
+        """Executa o caso de uso de cotação da curva de preços."""
+        try:
+            produto = ProdutoTipo(produto)
+            cupom = converter_cupom(cupom, self.desconto_service)
+            if qtd_min <= 0:
+                raise ValueError("Quantidade mínima deve ser maior que zero")
+            if qtd_max < qtd_min:
+                raise ValueError("Quantidade máxima deve ser maior que a mínima")
+            if qtd_max - qtd_min + 1 > MAX_PONTOS_CURVA:
+                raise ValueError(f"Curva limitada a {MAX_PONTOS_CURVA} quantidades")
+
+            # A curva inteira usa a mesma versão da tabela de preços
+            tabela = self.calculo_preco_service.tabela_vigente()
+            quantidades = np.arange(qtd_min, qtd_max + 1, dtype=np.int64)
+
+            return CurvaPrecoOutputDTO(
+                produto=produto.value,
+                cupom=codigo_cupom(cupom),
+                qtd_min=qtd_min,
+                qtd_max=qtd_max,
+                precos=self._cotar(produto, cupom, quantidades, tabela),
+                faixas=self._faixas(produto, qtd_min, qtd_max, tabela),
+                mensagem="Curva cotada com sucesso",
+                versao_preco=tabela.versao,
+            )
+
+        except ValueError as e:
+            return self._falha(
+                produto, cupom, qtd_min, qtd_max, f"Erro de validação: {e}"
+            )
+        except ProdutoNaoEncontradoError as e:
+            return self._falha(
+                produto, cupom, qtd_min, qtd_max, f"Produto não encontrado: {e}"
+            )
+
+    def _cotar(
+        self,
+        produto: ProdutoTipo,
+        cupom: Optional[Cupom],
+        quantidades: np.ndarray,
+        tabela: TabelaPrecosInterface,
+    ) -> np.ndarray:
+        """Calcula o preço final de cada quantidade."""
+        vetorizado = (
+            callable(getattr(self.calculo_preco_service, "calcular_lote", None))
+            and callable(getattr(self.desconto_service, "aplicar_desconto_lote", None))
+            and callable(getattr(self.arredondamento_service, "arredondar_lote", None))
+        )
+        if vetorizado:
+            codigos = np.full(quantidades.shape, CODIGOS_PRODUTO[produto])
+            precos = self.calculo_preco_service.calcular_lote(
+                codigos, quantidades, tabela
+            )
+            precos = self.desconto_service.aplicar_desconto_lote(
+                precos, produto, cupom, quantidades
+            )
+            return self.arredondamento_service.arredondar_lote(precos, produto)
+
+        precos = np.empty(quantidades.shape, dtype=np.float64)
+        for i, quantidade in enumerate(quantidades.tolist()):
+            preco = self.calculo_preco_service.calcular(produto, quantidade, tabela)
+            preco = self.desconto_service.aplicar_desconto(
+                preco, produto, quantidade, cupom
+            )
+            precos[i] = self.arredondamento_service.arredondar(preco, produto)
+        return precos
+
+    @staticmethod
+    def _faixas(
+        produto: ProdutoTipo, qtd_min: int, qtd_max: int, tabela: TabelaPrecosInterface
+    ) -> List[int]:
+        """Quantidades do intervalo em que começa uma nova faixa de volume."""
+        # Uma faixa vale para quantidades acima do seu limite
+        return [
+            limite + 1
+            for limite in tabela.limites(produto)
+            if qtd_min < limite + 1 <= qtd_max
+        ]
+
+    @staticmethod
+    def _falha(produto, cupom, qtd_min, qtd_max, mensagem) -> CurvaPrecoOutputDTO:
+        """Monta a resposta de erro, sem preços."""
+        return CurvaPrecoOutputDTO(
+            produto=getattr(produto, "value", produto),
+            cupom=getattr(cupom, "value", cupom),
+            qtd_min=qtd_min,
+            qtd_max=qtd_max,
+            precos=np.empty(0, dtype=np.float64),
+            sucesso=False,
+            mensagem=mensagem,
+        )
@@ -0,0 +1,28 @@
+"""Conversão de códigos de cupom recebidos pelos casos de uso."""
+
+from typing import Optional
+
+from ...domain.services import DescontoServiceInterface
+from ...domain.value_objects import Cupom, CupomTipo
+
+
+def converter_cupom(
+    codigo: Optional[Cupom], desconto_service: DescontoServiceInterface
+) -> Optional[Cupom]:
+    """
+    Converte o código recebido no cupom do domínio.
+
+    Os cupons fixos viram ``CupomTipo``; os demais são aceitos como texto
+    se o serviço de desconto os tiver registrados. Código desconhecido gera
+    ``ValueError``.
+    """
+    if not codigo:
+        return None
+    if isinstance(codigo, CupomTipo):
+        return codigo
+    try:
+        return CupomTipo(codigo)
+    except ValueError:
+        if desconto_service.cupom_registrado(codigo):
+            return codigo
+        raise ValueError(f"Cupom desconhecido: {codigo}") from None
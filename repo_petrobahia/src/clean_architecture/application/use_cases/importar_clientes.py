@@ -0,0 +1,142 @@
+"""Caso de uso: Importar Clientes."""
+
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ...domain.entities import Cliente
+from ...domain.exceptions import ClienteInvalidoError
+from ...domain.repositories import ClienteRepositoryInterface, FonteClientesInterface
+from ...domain.services import ValidadorCnpjInterface
+from ..dto import ImportacaoOutputDTO
+
+
+class ImportarClientesUseCase:
+    """
+    Caso de uso: Importar clientes de uma fonte (ex: arquivo legado).
+
+    Os registros são lidos em fluxo e validados em lotes de ``tamanho_lote``;
+    os válidos de cada lote são gravados com um único ``salvar_lote``. Os
+    clientes importados não são notificados, e um email repetido segue a
+    regra do repositório (vale o primeiro cadastro). Com ``validador_cnpj``,
+    os dígitos verificadores dos CNPJs de cada lote são conferidos de uma
+    vez, e os clientes com CNPJ inválido são rejeitados.
+
+    Depois de cada lote gravado, a posição na fonte vai para
+    ``checkpoint_file`` (se houver) e para ``progresso`` (se houver). Sem
+    ``inicio``, a importação continua da posição do ``checkpoint_file``.
+    Para retomar com segurança depois de uma queda de energia, o
+    repositório precisa gravar com ``fsync`` (ex: durabilidade ``"lote"``).
+    """
+
+    # Rejeições guardadas no resultado (as demais só entram na contagem)
+    MAX_REJEICOES = 100
+
+    def __init__(
+        self,
+        cliente_repository: ClienteRepositoryInterface,
+        tamanho_lote: int = 10_000,
+        checkpoint_file: Optional[str] = None,
+        validador_cnpj: Optional[ValidadorCnpjInterface] = None,
+    ):
+        if tamanho_lote <= 0:
+            raise ValueError("Tamanho do lote deve ser maior que zero.")
+        self.cliente_repository = cliente_repository
+        self.tamanho_lote = tamanho_lote
+        self.checkpoint_file = checkpoint_file
+        self.validador_cnpj = validador_cnpj
+
+    def execute(
+        self,
+        fonte: FonteClientesInterface,
+        inicio: Optional[int] = None,
+        progresso: Optional[Callable[[ImportacaoOutputDTO], None]] = None,
+    ) -> ImportacaoOutputDTO:
+        """Importa os registros da fonte a partir de ``inicio``."""
+        if inicio is None:
+            inicio = self._ler_checkpoint()
+        resultado = ImportacaoOutputDTO(posicao_inicial=inicio, posicao=inicio)
+        comeco = time.perf_counter()
+
+        lote: List[Tuple[int, Optional[Dict[str, Optional[str]]]]] = []
+        for registro in fonte.registros(inicio):
+            lote.append(registro)
+            if len(lote) == self.tamanho_lote:
+                self._importar_lote(lote, resultado, comeco, progresso)
+                lote = []
+        if lote:
+            self._importar_lote(lote, resultado, comeco, progresso)
+
+        resultado.segundos = time.perf_counter() - comeco
+        return resultado
+
+    def _importar_lote(
+        self,
+        lote: List[Tuple[int, Optional[Dict[str, Optional[str]]]]],
+        resultado: ImportacaoOutputDTO,
+        comeco: float,
+        progresso: Optional[Callable[[ImportacaoOutputDTO], None]],
+    ) -> None:
+        """Valida o lote, grava os válidos e avança a posição."""
+        clientes = []
+        inicio = resultado.posicao
+        cnpjs_validos = None
+        if self.validador_cnpj is not None:
+            cnpjs_validos = self.validador_cnpj.validar_lote(
+                [(dados.get("cnpj") or "") if dados else "" for _, dados in lote]
+            )
+        for i, (fim, dados) in enumerate(lote):
+            try:
+                if dados is None:
+                    raise ClienteInvalidoError("Registro ilegível.")
+                cliente = Cliente(
+                    nome=dados.get("nome") or "",
+                    email=dados.get("email") or "",
+                    cnpj=dados.get("cnpj") or "",
+                )
+                if cnpjs_validos is not None and not cnpjs_validos[i]:
+                    raise ClienteInvalidoError(f"CNPJ inválido: {cliente.cnpj}")
+                clientes.append(cliente)
+            except ClienteInvalidoError as e:
+                resultado.rejeitados += 1
+                if len(resultado.rejeicoes) < self.MAX_REJEICOES:
+                    resultado.rejeicoes.append(f"posição {inicio}: {e}")
+            inicio = fim
+
+        # Um erro na gravação interrompe a importação: a posição continua a
+        # do último lote gravado
+        self.cliente_repository.salvar_lote(clientes)
+        if callable(getattr(self.cliente_repository, "esvaziar", None)):
+            # Gravação adiada: o checkpoint não pode passar à frente dos dados
+            self.cliente_repository.esvaziar()
+        resultado.lidos += len(lote)
+        resultado.importados += len(clientes)
+        resultado.posicao = lote[-1][0]
+        resultado.segundos = time.perf_counter() - comeco
+        self._gravar_checkpoint(resultado.posicao)
+        if progresso is not None:
+            progresso(resultado)
+
+    def _ler_checkpoint(self) -> int:
+        """Posição gravada no checkpoint, ou 0 se não houver."""
+        if self.checkpoint_file is None:
+            return 0
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                return int(json.load(f)["posicao"])
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise ValueError(
+                f"Checkpoint de importação inválido em {self.checkpoint_file}: {e}"
+            ) from e
+
+    def _gravar_checkpoint(self, posicao: int) -> None:
+        """Grava a posição (escrita atômica com ``os.replace``)."""
+        if self.checkpoint_file is None:
+            return
+        temporario = f"{self.checkpoint_file}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"posicao": posicao}, f)
+        os.replace(temporario, self.checkpoint_file)
@@ -1,16 +1,21 @@
 """Caso de uso: Processar Pedido."""
 
-from typing import Optional
+from typing import Optional, Tuple
 
 from ...domain.entities import Pedido
-from ...domain.exceptions import ProdutoNaoEncontradoError
+from ...domain.exceptions import LimiteCupomError, ProdutoNaoEncontradoError
 from ...domain.services import (
     ArredondamentoServiceInterface,
     CalculoPrecoServiceInterface,
+    CotacaoCacheInterface,
     DescontoServiceInterface,
+    LivroResgatesInterface,
+    PipelinePrecoInterface,
+    TabelaPrecosInterface,
 )
-from ...domain.value_objects import CupomTipo, ProdutoTipo
+from ...domain.value_objects import Cupom, ProdutoTipo, codigo_cupom
 from ..dto import PedidoInputDTO, PedidoOutputDTO
+from .cupons import converter_cupom
 
 
 class ProcessarPedidoUseCase:
@@ -22,6 +27,20 @@ class ProcessarPedidoUseCase:
     - Calcular preço
     - Aplicar descontos
     - Arredondar valor final
+
+    Com um ``cotacao_cache``, cotações repetidas de (produto, quantidade,
+    cupom) na mesma versão da tabela de preços são servidas do cache. Com um
+    ``pipeline_preco`` compilado, a cotação é feita por uma única função
+    especializada por produto/cupom em vez das três chamadas de serviço.
+    Com um ``livro_resgates``, cada pedido em que o cupom dá desconto
+    (produto e quantidade elegíveis) reserva um resgate antes da cotação
+    (respeitando os limites do cupom) e o estorna se ela falhar.
+
+    Um pedido com vários cupons é cotado pelas três chamadas de serviço,
+    sem cache nem pipeline: ``aplicar_descontos`` escolhe os cupons que
+    valem, e só esses são reservados no livro de resgates. Se um deles já
+    atingiu o limite, ele sai do pedido e a combinação é escolhida de novo
+    com os demais.
     """
 
     def __init__(
@@ -29,40 +48,56 @@ class ProcessarPedidoUseCase:
         calculo_preco_service: CalculoPrecoServiceInterface,
         desconto_service: DescontoServiceInterface,
         arredondamento_service: ArredondamentoServiceInterface,
+        cotacao_cache: Optional[CotacaoCacheInterface] = None,
+        pipeline_preco: Optional[PipelinePrecoInterface] = None,
+        livro_resgates: Optional[LivroResgatesInterface] = None,
     ):
         self.calculo_preco_service = calculo_preco_service
         self.desconto_service = desconto_service
         self.arredondamento_service = arredondamento_service
+        self.cotacao_cache = cotacao_cache
+        self.pipeline_preco = pipeline_preco
+        self.livro_resgates = livro_resgates
 
     def execute(self, dto: PedidoInputDTO) -> PedidoOutputDTO:
         """Executa o caso de uso de processamento de pedido."""
         try:
             # 1. Converter dados para tipos de domínio
             produto = ProdutoTipo(dto.produto)
-            cupom = CupomTipo(dto.cupom) if dto.cupom else None
+            cupons = self._converter_cupons(dto)
 
             # 2. Criar entidade de domínio
             pedido = Pedido(
-                cliente=dto.cliente, produto=produto, quantidade=dto.qtd, cupom=cupom
+                cliente=dto.cliente,
+                produto=produto,
+                quantidade=dto.qtd,
+                cupom=cupons[0] if len(cupons) == 1 else None,
+                cupons=cupons if len(cupons) > 1 else (),
             )
+            if pedido.cupons:
+                return self._processar_acumulado(pedido)
 
-            # 3. Calcular preço base
-            preco = self.calculo_preco_service.calcular(
-                produto=pedido.produto, quantidade=pedido.quantidade
+            # 3. Reservar o resgate do cupom (gera LimiteCupomError no limite)
+            reservado = (
+                self.livro_resgates is not None
+                and pedido.cupom is not None
+                and self.desconto_service.cupom_vale(
+                    pedido.cupom, pedido.produto, pedido.quantidade
+                )
             )
+            if reservado:
+                self.livro_resgates.reservar(pedido.cupom, pedido.cliente)
 
-            # 4. Aplicar desconto
-            preco_com_desconto = self.desconto_service.aplicar_desconto(
-                preco=preco,
-                produto=pedido.produto,
-                quantidade=pedido.quantidade,
-                cupom=pedido.cupom,
-            )
+            try:
+                # 4. Fixar a versão da tabela de preços (o pedido inteiro usa a mesma)
+                tabela = self.calculo_preco_service.tabela_vigente()
 
-            # 5. Arredondar
-            preco_final = self.arredondamento_service.arredondar(
-                preco=preco_com_desconto, produto=pedido.produto
-            )
+                # 5. Cotar (calcular, descontar e arredondar), com cache opcional
+                preco_final = self._cotar_com_cache(pedido, tabela)
+            except Exception:
+                if reservado:
+                    self.livro_resgates.estornar(pedido.cupom, pedido.cliente)
+                raise
 
             return PedidoOutputDTO(
                 cliente=pedido.cliente,
@@ -71,6 +106,7 @@ class ProcessarPedidoUseCase:
                 valor_final=preco_final,
                 sucesso=True,
                 mensagem="Pedido processado com sucesso",
+                versao_preco=tabela.versao,
             )
 
         except ValueError as e:
@@ -100,3 +136,106 @@ class ProcessarPedidoUseCase:
                 sucesso=False,
                 mensagem=f"Erro inesperado: {str(e)}",
             )
+
+    def _converter_cupons(self, dto: PedidoInputDTO) -> Tuple[Cupom, ...]:
+        """Converte ``cupom`` e ``cupons`` do DTO, sem repetições."""
+        codigos = [dto.cupom] + list(dto.cupons or [])
+        cupons = []
+        for codigo in codigos:
+            cupom = converter_cupom(codigo, self.desconto_service)
+            if cupom is not None and cupom not in cupons:
+                cupons.append(cupom)
+        return tuple(cupons)
+
+    def _processar_acumulado(self, pedido: Pedido) -> PedidoOutputDTO:
+        """Processa um pedido com vários cupons."""
+        tabela = self.calculo_preco_service.tabela_vigente()
+        preco = self.calculo_preco_service.calcular(
+            produto=pedido.produto, quantidade=pedido.quantidade, tabela=tabela
+        )
+        candidatos = tuple(pedido.cupons)
+        while True:
+            com_desconto, aplicados = self.desconto_service.aplicar_descontos(
+                preco, pedido.produto, pedido.quantidade, candidatos
+            )
+            preco_final = self.arredondamento_service.arredondar(
+                preco=com_desconto, produto=pedido.produto
+            )
+            esgotado = self._reservar_todos(aplicados, pedido.cliente)
+            if esgotado is None:
+                break
+            # Cupom no limite sai, e a combinação é escolhida de novo
+            candidatos = tuple(c for c in candidatos if codigo_cupom(c) != esgotado)
+
+        return PedidoOutputDTO(
+            cliente=pedido.cliente,
+            produto=pedido.produto.value,
+            quantidade=pedido.quantidade,
+            valor_final=preco_final,
+            sucesso=True,
+            mensagem="Pedido processado com sucesso",
+            versao_preco=tabela.versao,
+            cupons_aplicados=list(aplicados),
+        )
+
+    def _reservar_todos(self, codigos: Tuple[str, ...], cliente: str) -> Optional[str]:
+        """
+        Reserva um resgate de cada cupom, tudo ou nada.
+
+        Returns:
+            None se todos foram reservados, ou o código do cupom que atingiu
+            o limite (nesse caso, nenhum resgate fica reservado)
+        """
+        if self.livro_resgates is None:
+            return None
+        reservados = []
+        try:
+            for codigo in codigos:
+                self.livro_resgates.reservar(codigo, cliente)
+                reservados.append(codigo)
+        except Exception as e:
+            for reservado in reservados:
+                self.livro_resgates.estornar(reservado, cliente)
+            if isinstance(e, LimiteCupomError):
+                return codigo
+            raise
+        return None
+
+    def _cotar_com_cache(self, pedido: Pedido, tabela: TabelaPrecosInterface) -> float:
+        """Cota o pedido, consultando antes o cache de cotações, se houver."""
+        if self.cotacao_cache is None:
+            return self._cotar(pedido, tabela)
+        chave = (pedido.produto, pedido.quantidade, pedido.cupom, tabela.versao)
+        preco_final = self.cotacao_cache.obter(chave)
+        if preco_final is None:
+            preco_final = self._cotar(pedido, tabela)
+            # Pedido iniciado antes de uma troca de tabela não devolve a
+            # versão substituída ao cache
+            if tabela.versao == self.calculo_preco_service.tabela_vigente().versao:
+                self.cotacao_cache.guardar(chave, preco_final)
+        return preco_final
+
+    def _cotar(self, pedido: Pedido, tabela: TabelaPrecosInterface) -> float:
+        """Calcula o preço final do pedido com a versão de tabela informada."""
+        if self.pipeline_preco is not None:
+            return self.pipeline_preco.cotar(
+                pedido.produto, pedido.quantidade, pedido.cupom, tabela
+            )
+
+        # Calcular preço base
+        preco = self.calculo_preco_service.calcular(
+            produto=pedido.produto, quantidade=pedido.quantidade, tabela=tabela
+        )
+
+        # Aplicar desconto
+        preco_com_desconto = self.desconto_service.aplicar_desconto(
+            preco=preco,
+            produto=pedido.produto,
+            quantidade=pedido.quantidade,
+            cupom=pedido.cupom,
+        )
+
+        # Arredondar
+        return self.arredondamento_service.arredondar(
+            preco=preco_com_desconto, produto=pedido.produto
+        )
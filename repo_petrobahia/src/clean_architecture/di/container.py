@@ -5,25 +5,54 @@ Responsável por criar e configurar todas as dependências da aplicação.
 Este é o Composition Root da aplicação.
 """
 
-from ..application.use_cases import CadastrarClienteUseCase, ProcessarPedidoUseCase
+from typing import Optional
+
+from ..application.use_cases import (
+    CadastrarClienteUseCase,
+    CalcularQuantidadeMaximaUseCase,
+    CotarCurvaUseCase,
+    ImportarClientesUseCase,
+    ProcessarPedidoUseCase,
+)
 from ..domain.repositories import (
     ClienteRepositoryInterface,
+    GuardaDuplicadosInterface,
     NotificationServiceInterface,
 )
 from ..domain.services import (
     ArredondamentoServiceInterface,
     CalculoPrecoServiceInterface,
+    CotacaoCacheInterface,
     DescontoServiceInterface,
+    LivroResgatesInterface,
+    PipelinePrecoInterface,
+    TabelaPrecosProviderInterface,
+    ValidadorCnpjInterface,
 )
+from ..infrastructure.cache import CotacaoCacheLRU
 from ..infrastructure.notification import PrintNotificationService
-from ..infrastructure.persistence import ClienteFileRepository
+from ..infrastructure.persistence import (
+    DURABILIDADE_NENHUMA,
+    ClienteFileRepository,
+    ClienteSQLiteRepository,
+    ClienteWriteBehindRepository,
+    GuardaDuplicadosBloom,
+)
+from ..infrastructure.resgates import LivroResgatesCompartilhado, LivroResgatesMemoria
 from ..infrastructure.services import (
+    MODO_ORDEM,
     ArredondamentoService,
     CalculoPrecoService,
     DescontoService,
+    PipelinePrecoCompilado,
+    RegistroCupons,
+    TabelaPrecosArquivoProvider,
+    TabelaPrecosFixa,
+    ValidadorCnpjVetorizado,
 )
 from ..presentation.cliente_controller import ClienteController
 from ..presentation.pedido_controller import PedidoController
+from ..presentation.saida import SAIDA_DETALHADA
 
 
 class Container:
@@ -48,12 +77,95 @@ class Container:
     # ===== INFRASTRUCTURE LAYER =====
 
     def get_cliente_repository(self) -> ClienteRepositoryInterface:
-        """Retorna a implementação do repositório de cliente."""
+        """
+        Retorna a implementação do repositório de cliente.
+
+        ``cliente_backend`` escolhe o armazenamento: ``"arquivo"`` (padrão,
+        em ``cliente_file``) ou ``"sqlite"`` (em ``cliente_db_file``).
+
+        No arquivo, o índice de emails é persistido em ``<cliente_file>.idx``
+        (desligado com ``cliente_indice_persistente: False``) a cada
+        ``cliente_checkpoint_indice`` clientes novos. ``cliente_durabilidade``
+        escolhe quando o arquivo recebe fsync (``"nenhuma"``, ``"lote"`` ou
+        ``"registro"``); no modo lote, a cada ``cliente_fsync_registros``
+        clientes ou ``cliente_fsync_ms`` milissegundos. Com
+        ``cliente_multiprocesso: True``, vários processos podem gravar no
+        mesmo arquivo (trava ``fcntl`` e gravação em grupo). Com
+        ``cliente_compactar_apos``, o arquivo é compactado a cada tantas
+        atualizações e remoções.
+
+        Com ``cliente_write_behind: True``, o repositório escolhido é
+        decorado por ``ClienteWriteBehindRepository`` (fila de até
+        ``cliente_write_behind_fila`` clientes, gravados em lotes de
+        ``cliente_write_behind_lote`` em no máximo
+        ``cliente_write_behind_intervalo`` segundos).
+        """
         if "cliente_repository" not in self._instances:
-            filepath = self.config.get("cliente_file", "clientes_clean_arch.txt")
-            self._instances["cliente_repository"] = ClienteFileRepository(filepath)
+            backend = self.config.get("cliente_backend", "arquivo")
+            if backend == "sqlite":
+                repositorio = ClienteSQLiteRepository(
+                    self.config.get("cliente_db_file", "clientes_clean_arch.sqlite3")
+                )
+            elif backend == "arquivo":
+                repositorio = ClienteFileRepository(
+                    self.config.get("cliente_file", "clientes_clean_arch.txt"),
+                    indice_persistente=self.config.get(
+                        "cliente_indice_persistente", True
+                    ),
+                    checkpoint_indice=self.config.get(
+                        "cliente_checkpoint_indice", 100_000
+                    ),
+                    durabilidade=self.config.get(
+                        "cliente_durabilidade", DURABILIDADE_NENHUMA
+                    ),
+                    fsync_registros=self.config.get("cliente_fsync_registros", 1000),
+                    fsync_ms=self.config.get("cliente_fsync_ms", 50.0),
+                    multiprocesso=self.config.get("cliente_multiprocesso", False),
+                    compactar_apos=self.config.get("cliente_compactar_apos"),
+                )
+            else:
+                raise ValueError(f"Backend de clientes desconhecido: {backend}")
+            if self.config.get("cliente_write_behind"):
+                repositorio = ClienteWriteBehindRepository(
+                    repositorio,
+                    tamanho_fila=self.config.get("cliente_write_behind_fila", 10_000),
+                    tamanho_lote=self.config.get("cliente_write_behind_lote", 1000),
+                    intervalo=self.config.get("cliente_write_behind_intervalo", 0.05),
+                )
+            self._instances["cliente_repository"] = repositorio
         return self._instances["cliente_repository"]
 
+    def get_guarda_duplicados(self) -> Optional[GuardaDuplicadosInterface]:
+        """
+        Retorna a guarda de emails duplicados, ou None se estiver desligada.
+
+        Ligada com ``cliente_guarda_duplicados: True``. O filtro de Bloom é
+        gravado em ``<arquivo do repositório>.bloom``, dimensionado para
+        ``cliente_bloom_capacidade`` emails (padrão: 1000000) com
+        ``cliente_bloom_taxa`` de falsos positivos (padrão: 0.01).
+        """
+        if not self.config.get("cliente_guarda_duplicados"):
+            return None
+        if "guarda_duplicados" not in self._instances:
+            self._instances["guarda_duplicados"] = GuardaDuplicadosBloom(
+                self.get_cliente_repository(),
+                capacidade=self.config.get("cliente_bloom_capacidade", 1_000_000),
+                taxa_falsos=self.config.get("cliente_bloom_taxa", 0.01),
+            )
+        return self._instances["guarda_duplicados"]
+
+    def get_validador_cnpj(self) -> Optional[ValidadorCnpjInterface]:
+        """
+        Retorna o validador de CNPJs em lote, ou None se estiver desligado.
+
+        Ligado com ``validar_cnpj: True``.
+        """
+        if not self.config.get("validar_cnpj"):
+            return None
+        if "validador_cnpj" not in self._instances:
+            self._instances["validador_cnpj"] = ValidadorCnpjVetorizado()
+        return self._instances["validador_cnpj"]
+
     def get_notification_service(self) -> NotificationServiceInterface:
         """Retorna a implementação do serviço de notificação."""
         if "notification_service" not in self._instances:
@@ -61,16 +173,63 @@ class Container:
             self._instances["notification_service"] = PrintNotificationService()
         return self._instances["notification_service"]
 
+    def get_tabela_precos_provider(self) -> TabelaPrecosProviderInterface:
+        """
+        Retorna o fornecedor da tabela de preços vigente.
+
+        Com ``tabela_precos_file`` configurado, os preços vêm desse arquivo
+        e, se ``tabela_precos_intervalo`` (segundos) também estiver
+        configurado, são recarregados automaticamente quando ele mudar.
+        """
+        if "tabela_precos_provider" not in self._instances:
+            filepath = self.config.get("tabela_precos_file")
+            if filepath:
+                provider = TabelaPrecosArquivoProvider(filepath)
+                intervalo = self.config.get("tabela_precos_intervalo")
+                if intervalo:
+                    provider.iniciar_monitoramento(intervalo)
+            else:
+                provider = TabelaPrecosFixa()
+            self._instances["tabela_precos_provider"] = provider
+        return self._instances["tabela_precos_provider"]
+
     def get_calculo_preco_service(self) -> CalculoPrecoServiceInterface:
         """Retorna a implementação do serviço de cálculo de preço."""
         if "calculo_preco_service" not in self._instances:
-            self._instances["calculo_preco_service"] = CalculoPrecoService()
+            self._instances["calculo_preco_service"] = CalculoPrecoService(
+                tabela_provider=self.get_tabela_precos_provider()
+            )
         return self._instances["calculo_preco_service"]
 
+    def get_registro_cupons(self) -> RegistroCupons:
+        """
+        Retorna o registro de cupons ativos.
+
+        As regras vêm de ``cupons`` (dicionário ``{codigo: definicao}``), do
+        arquivo JSON ``cupons_file`` ou, sem configuração, de
+        ``CUPONS_PADRAO``.
+        """
+        if "registro_cupons" not in self._instances:
+            filepath = self.config.get("cupons_file")
+            if filepath:
+                registro = RegistroCupons.de_arquivo(filepath)
+            else:
+                registro = RegistroCupons(self.config.get("cupons"))
+            self._instances["registro_cupons"] = registro
+        return self._instances["registro_cupons"]
+
     def get_desconto_service(self) -> DescontoServiceInterface:
-        """Retorna a implementação do serviço de desconto."""
+        """
+        Retorna a implementação do serviço de desconto.
+
+        ``modo_cupons`` define como vários cupons de um pedido se combinam:
+        ``"ordem"`` (padrão) ou ``"melhor"`` (combinação de menor preço).
+        """
         if "desconto_service" not in self._instances:
-            self._instances["desconto_service"] = DescontoService()
+            self._instances["desconto_service"] = DescontoService(
+                registro=self.get_registro_cupons(),
+                modo_acumulo=self.config.get("modo_cupons", MODO_ORDEM),
+            )
         return self._instances["desconto_service"]
 
     def get_arredondamento_service(self) -> ArredondamentoServiceInterface:
@@ -79,6 +238,67 @@ class Container:
             self._instances["arredondamento_service"] = ArredondamentoService()
         return self._instances["arredondamento_service"]
 
+    def get_cotacao_cache(self) -> Optional[CotacaoCacheInterface]:
+        """
+        Retorna o cache de cotações, ou None se estiver desligado.
+
+        Ligado com ``cache_cotacoes: True``; o tamanho máximo vem de
+        ``cache_cotacoes_tamanho`` (padrão: 10000 cotações).
+        """
+        if not self.config.get("cache_cotacoes"):
+            return None
+        if "cotacao_cache" not in self._instances:
+            tamanho = self.config.get("cache_cotacoes_tamanho", 10_000)
+            self._instances["cotacao_cache"] = CotacaoCacheLRU(tamanho)
+        return self._instances["cotacao_cache"]
+
+    def get_pipeline_preco(self) -> Optional[PipelinePrecoInterface]:
+        """
+        Retorna o pipeline de cotação compilado, ou None se desligado.
+
+        Ligado com ``pipeline_compilado: True``. As funções de todos os pares
+        produto/cupom são compiladas aqui, na montagem do container.
+        """
+        if not self.config.get("pipeline_compilado"):
+            return None
+        if "pipeline_preco" not in self._instances:
+            pipeline = PipelinePrecoCompilado(
+                calculo_preco_service=self.get_calculo_preco_service(),
+                desconto_service=self.get_desconto_service(),
+                arredondamento_service=self.get_arredondamento_service(),
+            )
+            pipeline.compilar()
+            self._instances["pipeline_preco"] = pipeline
+        return self._instances["pipeline_preco"]
+
+    def get_livro_resgates(self) -> Optional[LivroResgatesInterface]:
+        """
+        Retorna o livro de resgates de cupons, ou None se desligado.
+
+        ``livro_resgates`` escolhe a implementação: ``"memoria"`` (threads) ou
+        ``"compartilhado"`` (processos). Com ``resgates_checkpoint_file``, os
+        contadores são restaurados desse arquivo e salvos nele a cada
+        ``resgates_checkpoint_intervalo`` segundos (padrão: 5).
+        """
+        tipo = self.config.get("livro_resgates")
+        if not tipo:
+            return None
+        if "livro_resgates" not in self._instances:
+            classes = {
+                "memoria": LivroResgatesMemoria,
+                "compartilhado": LivroResgatesCompartilhado,
+            }
+            if tipo not in classes:
+                raise ValueError(f"Livro de resgates desconhecido: {tipo}")
+            filepath = self.config.get("resgates_checkpoint_file")
+            livro = classes[tipo](self.get_registro_cupons(), checkpoint_file=filepath)
+            if filepath:
+                livro.iniciar_checkpoint(
+                    self.config.get("resgates_checkpoint_intervalo", 5.0)
+                )
+            self._instances["livro_resgates"] = livro
+        return self._instances["livro_resgates"]
+
     # ===== APPLICATION LAYER =====
 
     def get_cadastrar_cliente_use_case(self) -> CadastrarClienteUseCase:
@@ -87,9 +307,28 @@ class Container:
             self._instances["cadastrar_cliente_use_case"] = CadastrarClienteUseCase(
                 cliente_repository=self.get_cliente_repository(),
                 notification_service=self.get_notification_service(),
+                guarda_duplicados=self.get_guarda_duplicados(),
             )
         return self._instances["cadastrar_cliente_use_case"]
 
+    def get_importar_clientes_use_case(self) -> ImportarClientesUseCase:
+        """
+        Retorna o caso de uso de importação de clientes.
+
+        Os registros são validados e gravados em lotes de ``importacao_lote``
+        (padrão: 10000), com a posição salva em ``importacao_checkpoint_file``.
+        Com ``validar_cnpj: True``, os CNPJs com dígitos verificadores
+        errados são rejeitados.
+        """
+        if "importar_clientes_use_case" not in self._instances:
+            self._instances["importar_clientes_use_case"] = ImportarClientesUseCase(
+                cliente_repository=self.get_cliente_repository(),
+                tamanho_lote=self.config.get("importacao_lote", 10_000),
+                checkpoint_file=self.config.get("importacao_checkpoint_file"),
+                validador_cnpj=self.get_validador_cnpj(),
+            )
+        return self._instances["importar_clientes_use_case"]
+
     def get_processar_pedido_use_case(self) -> ProcessarPedidoUseCase:
         """Retorna o caso de uso de processamento de pedido."""
         if "processar_pedido_use_case" not in self._instances:
@@ -97,16 +336,52 @@ class Container:
                 calculo_preco_service=self.get_calculo_preco_service(),
                 desconto_service=self.get_desconto_service(),
                 arredondamento_service=self.get_arredondamento_service(),
+                cotacao_cache=self.get_cotacao_cache(),
+                pipeline_preco=self.get_pipeline_preco(),
+                livro_resgates=self.get_livro_resgates(),
             )
         return self._instances["processar_pedido_use_case"]
 
+    def get_cotar_curva_use_case(self) -> CotarCurvaUseCase:
+        """Retorna o caso de uso de cotação da curva de preços."""
+        if "cotar_curva_use_case" not in self._instances:
+            self._instances["cotar_curva_use_case"] = CotarCurvaUseCase(
+                calculo_preco_service=self.get_calculo_preco_service(),
+                desconto_service=self.get_desconto_service(),
+                arredondamento_service=self.get_arredondamento_service(),
+            )
+        return self._instances["cotar_curva_use_case"]
+
+    def get_calcular_quantidade_maxima_use_case(
+        self,
+    ) -> CalcularQuantidadeMaximaUseCase:
+        """Retorna o caso de uso de quantidade máxima para um orçamento."""
+        if "calcular_quantidade_maxima_use_case" not in self._instances:
+            self._instances["calcular_quantidade_maxima_use_case"] = (
+                CalcularQuantidadeMaximaUseCase(
+                    calculo_preco_service=self.get_calculo_preco_service(),
+                    desconto_service=self.get_desconto_service(),
+                    arredondamento_service=self.get_arredondamento_service(),
+                )
+            )
+        return self._instances["calcular_quantidade_maxima_use_case"]
+
     # ===== PRESENTATION LAYER =====
 
+    def _modo_saida(self) -> str:
+        """
+        Modo de saída dos controllers (``saida_controllers``).
+
+        ``"detalhado"`` (padrão), ``"resumo"`` ou ``"silencioso"``.
+        """
+        return self.config.get("saida_controllers", SAIDA_DETALHADA)
+
     def get_cliente_controller(self) -> ClienteController:
         """Retorna o controller de cliente."""
         if "cliente_controller" not in self._instances:
             self._instances["cliente_controller"] = ClienteController(
-                cadastrar_cliente_use_case=self.get_cadastrar_cliente_use_case()
+                cadastrar_cliente_use_case=self.get_cadastrar_cliente_use_case(),
+                modo_saida=self._modo_saida(),
             )
         return self._instances["cliente_controller"]
 
@@ -114,6 +389,7 @@ class Container:
         """Retorna o controller de pedido."""
         if "pedido_controller" not in self._instances:
             self._instances["pedido_controller"] = PedidoController(
-                processar_pedido_use_case=self.get_processar_pedido_use_case()
+                processar_pedido_use_case=self.get_processar_pedido_use_case(),
+                modo_saida=self._modo_saida(),
             )
         return self._instances["pedido_controller"]
@@ -2,10 +2,10 @@
 
 import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 from ..exceptions import ClienteInvalidoError
-from ..value_objects import CupomTipo, ProdutoTipo
+from ..value_objects import Cupom, ProdutoTipo
 
 
 @dataclass
@@ -17,6 +17,9 @@ class Cliente:
     cnpj: str
 
     REG_EMAIL = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+    _PADRAO_EMAIL = re.compile(REG_EMAIL)
+    # Separadores dos campos e dos registros no arquivo de clientes
+    _PADRAO_SEPARADOR = re.compile(r"[|\r\n]")
 
     def __post_init__(self):
         """Valida os dados do cliente após inicialização."""
@@ -27,7 +30,13 @@ class Cliente:
         if not self.nome or not self.email:
             raise ClienteInvalidoError("Nome e email são obrigatórios.")
 
-        if not re.match(self.REG_EMAIL, self.email):
+        for campo in (self.nome, self.email, self.cnpj):
+            if self._PADRAO_SEPARADOR.search(campo):
+                raise ClienteInvalidoError(
+                    "Nome, email e CNPJ não podem ter '|' nem quebras de linha."
+                )
+
+        if not self._PADRAO_EMAIL.match(self.email):
             raise ClienteInvalidoError(f"Email inválido: {self.email}")
 
         if not self.cnpj:
@@ -36,12 +45,18 @@ class Cliente:
 
 @dataclass
 class Pedido:
-    """Entidade Pedido."""
+    """
+    Entidade Pedido.
+
+    Um pedido com vários cupons os traz em ``cupons``; ``cupom`` é usado
+    quando há um só.
+    """
 
     cliente: str
     produto: ProdutoTipo
     quantidade: int
-    cupom: Optional[CupomTipo] = None
+    cupom: Optional[Cupom] = None
+    cupons: Tuple[Cupom, ...] = ()
 
     def __post_init__(self):
         """Valida os dados do pedido após inicialização."""
@@ -51,4 +66,4 @@ class Pedido:
     @property
     def tem_cupom(self) -> bool:
         """Verifica se o pedido possui cupom."""
-        return self.cupom is not None
+        return self.cupom is not None or bool(self.cupons)
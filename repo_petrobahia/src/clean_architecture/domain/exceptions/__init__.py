@@ -23,3 +23,21 @@ class ClienteInvalidoError(DomainException):
     """Erro quando os dados do cliente são inválidos."""
 
     pass
+
+
+class ClienteDuplicadoError(ClienteInvalidoError):
+    """Erro quando já existe um cliente cadastrado com o email."""
+
+    pass
+
+
+class CupomInvalidoError(ValidacaoError, ValueError):
+    """Erro quando um cupom desconhecido ou mal definido é usado."""
+
+    pass
+
+
+class LimiteCupomError(CupomInvalidoError):
+    """Erro quando o limite de resgates de um cupom foi atingido."""
+
+    pass
@@ -1,7 +1,7 @@
 """Interfaces de repositórios (contratos)."""
 
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ..entities import Cliente
 
@@ -19,6 +19,92 @@ class ClienteRepositoryInterface(ABC):
         """Busca um cliente por email."""
         pass
 
+    def salvar_lote(self, clientes: Iterable[Cliente]) -> None:
+        """
+        Salva vários clientes.
+
+        Por padrão, chama ``salvar`` para cada um; implementações podem
+        gravar o lote de uma vez.
+        """
+        for cliente in clientes:
+            self.salvar(cliente)
+
+    @abstractmethod
+    def atualizar(self, cliente: Cliente) -> bool:
+        """
+        Substitui os dados do cliente com o mesmo email.
+
+        Retorna False se o email não estiver cadastrado.
+        """
+        pass
+
+    @abstractmethod
+    def remover(self, email: str) -> bool:
+        """
+        Remove o cliente com o email; depois disso, o email pode ser
+        cadastrado de novo. Retorna False se ele não estiver cadastrado.
+        """
+        pass
+
+    @abstractmethod
+    def buscar_por_cnpj(self, cnpj: str) -> Optional[Cliente]:
+        """
+        Busca o primeiro cliente cadastrado com o CNPJ.
+
+        O CNPJ é comparado normalizado (ver ``normalizar_cnpj``): com ou sem
+        pontuação e zeros à esquerda.
+        """
+        pass
+
+    @abstractmethod
+    def buscar_por_nome(self, consulta: str, limite: int = 10) -> List[Cliente]:
+        """
+        Busca aproximada por nome: até ``limite`` clientes, do nome mais
+        parecido com a consulta ao menos.
+        """
+        pass
+
+    @abstractmethod
+    def buscar_por_dominio(
+        self, dominio: str, prefixo: str = "", subdominios: bool = False
+    ) -> Iterator[Cliente]:
+        """
+        Lista os clientes com email ``<prefixo>...@<dominio>`` (com
+        ``subdominios``, também os dos subdomínios), sem montar uma lista.
+        """
+        pass
+
+
+class FonteClientesInterface(ABC):
+    """Interface para uma fonte de clientes a importar (ex: arquivo legado)."""
+
+    @abstractmethod
+    def registros(
+        self, inicio: int = 0
+    ) -> Iterator[Tuple[int, Optional[Dict[str, Optional[str]]]]]:
+        """
+        Lista os registros a partir da posição ``inicio`` da fonte.
+
+        Cada item é ``(posição depois do registro, dados)``, com ``dados``
+        None para um registro ilegível. Retomar a leitura da posição de um
+        item continua do registro seguinte.
+        """
+        pass
+
+
+class GuardaDuplicadosInterface(ABC):
+    """Interface para a verificação de emails já cadastrados."""
+
+    @abstractmethod
+    def existe(self, email: str) -> bool:
+        """Retorna se já existe um cliente cadastrado com o email."""
+        pass
+
+    @abstractmethod
+    def registrar(self, emails: Iterable[str]) -> None:
+        """Registra emails que acabaram de ser cadastrados."""
+        pass
+
 
 class NotificationServiceInterface(ABC):
     """Interface para serviço de notificações."""
@@ -1,17 +1,62 @@
 """Serviços de domínio (Domain Services)."""
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Hashable, Optional, Sequence, Tuple
 
-from ..value_objects import CupomTipo, ProdutoTipo
+from ..value_objects import Cupom, ProdutoTipo, codigo_cupom
+
+
+class TabelaPrecosInterface(ABC):
+    """
+    Interface para uma versão imutável da tabela de preços.
+
+    Uma instância nunca muda depois de criada: uma nova tabela de preços é
+    publicada como uma nova instância, com outra ``versao``.
+    """
+
+    versao: str
+
+    @abstractmethod
+    def calcular(self, produto: ProdutoTipo, quantidade: int) -> float:
+        """Calcula o preço base do pedido por esta versão da tabela."""
+        pass
+
+    @abstractmethod
+    def limites(self, produto: ProdutoTipo) -> Tuple[int, ...]:
+        """Retorna os limites das faixas de volume do produto."""
+        pass
+
+
+class TabelaPrecosProviderInterface(ABC):
+    """Interface para o fornecedor da tabela de preços vigente."""
+
+    @abstractmethod
+    def atual(self) -> TabelaPrecosInterface:
+        """Retorna a versão vigente da tabela de preços."""
+        pass
 
 
 class CalculoPrecoServiceInterface(ABC):
     """Interface para serviço de cálculo de preço."""
 
     @abstractmethod
-    def calcular(self, produto: ProdutoTipo, quantidade: int) -> float:
-        """Calcula o preço base do pedido."""
+    def calcular(
+        self,
+        produto: ProdutoTipo,
+        quantidade: int,
+        tabela: Optional[TabelaPrecosInterface] = None,
+    ) -> float:
+        """
+        Calcula o preço base do pedido.
+
+        Se ``tabela`` for informada, usa essa versão da tabela de preços em
+        vez da vigente (útil para manter um pedido inteiro na mesma versão).
+        """
+        pass
+
+    @abstractmethod
+    def tabela_vigente(self) -> TabelaPrecosInterface:
+        """Retorna a versão da tabela de preços vigente neste momento."""
         pass
 
 
@@ -24,11 +69,45 @@ class DescontoServiceInterface(ABC):
         preco: float,
         produto: ProdutoTipo,
         quantidade: int,
-        cupom: Optional[CupomTipo],
+        cupom: Optional[Cupom],
     ) -> float:
         """Aplica desconto ao preço."""
         pass
 
+    def cupom_registrado(self, codigo: str) -> bool:
+        """
+        Indica se o serviço conhece um cupom fora de ``CupomTipo``.
+
+        Por padrão, só os cupons de ``CupomTipo`` são aceitos.
+        """
+        return False
+
+    def cupom_vale(self, cupom: Cupom, produto: ProdutoTipo, quantidade: int) -> bool:
+        """
+        Indica se o cupom dá desconto ao pedido (produto e quantidade).
+
+        Por padrão, todo cupom informado vale.
+        """
+        return True
+
+    def aplicar_descontos(
+        self,
+        preco: float,
+        produto: ProdutoTipo,
+        quantidade: int,
+        cupons: Sequence[Cupom],
+    ) -> Tuple[float, Tuple[str, ...]]:
+        """
+        Aplica vários cupons ao preço e retorna ``(preco, cupons_aplicados)``.
+
+        Por padrão, cupons acumulados não são aceitos.
+        """
+        if len(cupons) > 1:
+            raise ValueError("Cupons acumulados não são aceitos.")
+        cupom = cupons[0] if cupons else None
+        preco_final = self.aplicar_desconto(preco, produto, quantidade, cupom)
+        return preco_final, tuple(codigo_cupom(c) for c in cupons)
+
 
 class ArredondamentoServiceInterface(ABC):
     """Interface para serviço de arredondamento."""
@@ -37,3 +116,74 @@ class ArredondamentoServiceInterface(ABC):
     def arredondar(self, preco: float, produto: ProdutoTipo) -> float:
         """Arredonda o preço de acordo com as regras do produto."""
         pass
+
+
+class CotacaoCacheInterface(ABC):
+    """
+    Interface para cache de cotações (preço final já calculado).
+
+    A chave identifica a cotação por completo, incluindo a versão da tabela
+    de preços: ``(produto, quantidade, cupom, versao)``.
+    """
+
+    @abstractmethod
+    def obter(self, chave: Hashable) -> Optional[float]:
+        """Retorna o preço final em cache, ou None se não houver."""
+        pass
+
+    @abstractmethod
+    def guardar(self, chave: Hashable, valor: float) -> None:
+        """Guarda o preço final de uma cotação."""
+        pass
+
+
+class PipelinePrecoInterface(ABC):
+    """
+    Interface para um pipeline de cotação pré-compilado.
+
+    Produz o mesmo preço final que a sequência calcular -> aplicar_desconto
+    -> arredondar dos serviços de domínio.
+    """
+
+    @abstractmethod
+    def cotar(
+        self,
+        produto: ProdutoTipo,
+        quantidade: int,
+        cupom: Optional[Cupom],
+        tabela: TabelaPrecosInterface,
+    ) -> float:
+        """Retorna o preço final do pedido na versão de tabela informada."""
+        pass
+
+
+class LivroResgatesInterface(ABC):
+    """
+    Interface para o livro de resgates de cupons.
+
+    Controla os limites de uso de cada cupom (total e por cliente).
+    """
+
+    @abstractmethod
+    def reservar(self, cupom: Cupom, cliente: str) -> None:
+        """
+        Registra um resgate do cupom pelo cliente.
+
+        Gera ``LimiteCupomError`` (sem registrar nada) se algum limite do
+        cupom já foi atingido.
+        """
+        pass
+
+    @abstractmethod
+    def estornar(self, cupom: Cupom, cliente: str) -> None:
+        """Desfaz um resgate reservado (ex: o pedido falhou depois)."""
+        pass
+
+
+class ValidadorCnpjInterface(ABC):
+    """Interface para a conferência dos dígitos verificadores de CNPJs."""
+
+    @abstractmethod
+    def validar_lote(self, cnpjs: Sequence[str]) -> Sequence[bool]:
+        """Indica, para cada CNPJ, se os dígitos verificadores conferem."""
+        pass
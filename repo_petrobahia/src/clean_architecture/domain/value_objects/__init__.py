@@ -1,6 +1,7 @@
 """Value Objects do domínio."""
 
 from enum import Enum
+from typing import Optional, Union
 
 
 class ProdutoTipo(Enum):
@@ -20,6 +21,35 @@ class CupomTipo(Enum):
     LUB2 = "LUB2"
 
 
+# Um cupom é um dos cupons fixos do sistema ou o código (texto) de um cupom
+# cadastrado no registro de cupons
+Cupom = Union[CupomTipo, str]
+
+
+def codigo_cupom(cupom: Optional[Cupom]) -> Optional[str]:
+    """Retorna o código textual do cupom (``None`` se não houver cupom)."""
+    if isinstance(cupom, CupomTipo):
+        return cupom.value
+    return cupom or None
+
+
+# Pontuação aceita em um CNPJ formatado (ex: 12.345.678/0001-95)
+_PONTUACAO_CNPJ = str.maketrans("", "", "./- ")
+
+
+def normalizar_cnpj(cnpj: str) -> Optional[str]:
+    """
+    Retorna o CNPJ com 14 dígitos (sem pontuação, com zeros à esquerda).
+
+    Retorna None se, sem a pontuação, sobrar algo que não seja dígito ou
+    mais de 14 dígitos. Os dígitos verificadores não são conferidos aqui.
+    """
+    digitos = cnpj.translate(_PONTUACAO_CNPJ)
+    if not digitos.isascii() or not digitos.isdigit() or len(digitos) > 14:
+        return None
+    return digitos.zfill(14)
+
+
 # Constantes de preço base (podem ser movidas para configuração externa)
 BASES_PRECO = {
     "diesel": 3.99,
@@ -27,3 +57,40 @@ BASES_PRECO = {
     "etanol": 3.59,
     "lubrificante": 25.0,
 }
+
+# Códigos inteiros dos produtos, usados no processamento vetorizado em lote
+CODIGOS_PRODUTO = {produto: codigo for codigo, produto in enumerate(ProdutoTipo)}
+
+# Definição tarifária padrão: preço base e faixas de volume de cada produto.
+# Cada faixa vale para quantidades ACIMA de ``limite`` e aplica um ``fator``
+# multiplicativo e/ou um ``abatimento`` fixo em reais (nessa ordem).
+TARIFAS_PADRAO = {
+    "diesel": {
+        "base": BASES_PRECO["diesel"],
+        "faixas": [
+            {"limite": 500, "fator": 0.95},  # 5% desconto
+            {"limite": 1000, "fator": 0.90},  # 10% desconto
+        ],
+    },
+    "gasolina": {
+        "base": BASES_PRECO["gasolina"],
+        "faixas": [{"limite": 200, "abatimento": 100}],  # Desconto fixo
+    },
+    "etanol": {
+        "base": BASES_PRECO["etanol"],
+        "faixas": [{"limite": 80, "fator": 0.97}],  # 3% desconto
+    },
+    "lubrificante": {
+        "base": BASES_PRECO["lubrificante"],
+        "faixas": [],
+    },
+}
+
+# Regras dos cupons padrão. Cada cupom aplica ``percentual`` de desconto e/ou
+# um ``abatimento`` fixo em reais (nessa ordem), opcionalmente restrito a
+# alguns ``produtos`` e a pedidos com pelo menos ``qtd_minima`` unidades.
+CUPONS_PADRAO = {
+    "MEGA10": {"percentual": 10, "grupo": "percentual"},  # 10% desconto
+    "NOVO5": {"percentual": 5, "grupo": "percentual"},  # 5% desconto
+    "LUB2": {"abatimento": 2.0, "produtos": ["lubrificante"]},
+}
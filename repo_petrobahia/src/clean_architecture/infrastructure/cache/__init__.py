@@ -0,0 +1,82 @@
+"""Implementações de cache."""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from ...domain.services import CotacaoCacheInterface
+
+
+class CotacaoCacheLRU(CotacaoCacheInterface):
+    """
+    Cache LRU limitado de cotações, com contadores de uso.
+
+    A chave termina com a versão da tabela de preços, e o cache só guarda
+    entradas de uma versão por vez. Consultar outra versão é apenas uma
+    falha, sem efeito no conteúdo. Guardar uma cotação de outra versão passa
+    a ser a versão do cache e descarta as entradas da anterior; qualquer
+    versão pode voltar a ser a do cache (por exemplo, ao reverter o arquivo
+    de preços).
+    """
+
+    def __init__(self, tamanho_maximo: int = 10_000):
+        if tamanho_maximo <= 0:
+            raise ValueError("Tamanho máximo do cache deve ser maior que zero.")
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._versao = None
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.invalidacoes = 0
+
+    def obter(self, chave: Hashable) -> Optional[float]:
+        """Retorna o preço em cache e marca a entrada como recente."""
+        with self._lock:
+            valor = self._entradas.get(chave)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave: Hashable, valor: float) -> None:
+        """Guarda o preço, removendo a entrada menos recente se necessário."""
+        with self._lock:
+            if chave[-1] != self._versao:
+                self._invalidar(chave[-1])
+            self._entradas[chave] = valor
+            self._entradas.move_to_end(chave)
+            if len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+                self.remocoes += 1
+
+    def _invalidar(self, versao) -> None:
+        """Descarta as entradas da versão anterior e adota a nova."""
+        if self._entradas:
+            self.invalidacoes += 1
+        self._entradas.clear()
+        self._versao = versao
+
+    def limpar(self) -> None:
+        """Descarta todas as entradas."""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Retorna os contadores de uso do cache."""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "tamanho": len(self._entradas),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "remocoes": self.remocoes,
+                "invalidacoes": self.invalidacoes,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
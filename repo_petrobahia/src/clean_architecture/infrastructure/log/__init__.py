@@ -0,0 +1,92 @@
+"""
+Log estruturado.
+
+Eventos são registrados com um nome e campos (``chave=valor``) sobre o
+``logging`` da biblioteca padrão, sob o logger raiz ``petrobahia``. O nível
+é verificado antes de qualquer formatação: com o nível desligado, registrar
+um evento custa apenas a consulta ao nível (que o ``logging`` guarda em
+cache por logger).
+"""
+
+import json
+import logging
+import sys
+from typing import Any, Dict, Optional, TextIO
+
+LOGGER_RAIZ = "petrobahia"
+
+FORMATO_TEXTO = "texto"
+FORMATO_JSON = "json"
+
+
+class FormatadorEstruturado(logging.Formatter):
+    """
+    Formata registros como ``chave=valor`` (logfmt) ou como uma linha JSON.
+
+    O nome do evento é a mensagem do registro e os campos vêm do atributo
+    ``campos``, preenchido por ``registrar``.
+    """
+
+    def __init__(self, formato: str = FORMATO_TEXTO):
+        super().__init__()
+        if formato not in (FORMATO_TEXTO, FORMATO_JSON):
+            raise ValueError(f"Formato de log desconhecido: {formato}")
+        self.formato = formato
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados: Dict[str, Any] = {
+            "nivel": record.levelname,
+            "logger": record.name,
+            "evento": record.getMessage(),
+        }
+        dados.update(getattr(record, "campos", {}))
+        if self.formato == FORMATO_JSON:
+            return json.dumps(dados, ensure_ascii=False, default=str)
+        return " ".join(f"{chave}={_valor_logfmt(v)}" for chave, v in dados.items())
+
+
+def _valor_logfmt(valor: Any) -> str:
+    """Formata um valor para logfmt, com aspas quando há espaços."""
+    texto = str(valor)
+    if not texto or any(c in texto for c in ' "='):
+        return json.dumps(texto, ensure_ascii=False)
+    return texto
+
+
+def obter_logger(nome: str) -> logging.Logger:
+    """Retorna um logger filho de ``petrobahia`` (ex: ``petrobahia.pedidos``)."""
+    return logging.getLogger(f"{LOGGER_RAIZ}.{nome}")
+
+
+def registrar(logger: logging.Logger, nivel: int, evento: str, **campos: Any) -> None:
+    """
+    Registra um evento estruturado se o nível estiver habilitado.
+
+    Em laços quentes, verifique ``logger.isEnabledFor(nivel)`` uma vez fora
+    do laço para não montar nem os argumentos desta chamada.
+    """
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, evento, extra={"campos": campos})
+
+
+def configurar_logging(
+    nivel: int = logging.WARNING,
+    formato: str = FORMATO_TEXTO,
+    stream: Optional[TextIO] = None,
+) -> logging.Logger:
+    """
+    Configura o logger ``petrobahia`` com o formatador estruturado.
+
+    Chamadas repetidas substituem o handler anterior em vez de acumular.
+    """
+    raiz = logging.getLogger(LOGGER_RAIZ)
+    for handler in list(raiz.handlers):
+        if getattr(handler, "_petrobahia", False):
+            raiz.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(FormatadorEstruturado(formato))
+    handler._petrobahia = True
+    raiz.addHandler(handler)
+    raiz.setLevel(nivel)
+    raiz.propagate = False
+    return raiz
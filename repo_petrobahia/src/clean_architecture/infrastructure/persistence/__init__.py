@@ -1,33 +1,1077 @@
 """Implementações de repositórios de persistência."""
 
-from typing import Optional
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from ...domain.entities import Cliente
 from ...domain.repositories import ClienteRepositoryInterface
+from .bloom import FiltroBloom, GuardaDuplicadosBloom
+from .dominios import (
+    IndiceDominios,
+    IndiceDominiosSidecar,
+    chave_dominio,
+    inverter_dominio,
+)
+from .indice import (
+    ENTRADA,
+    IndiceOrdenado,
+    IndiceSidecar,
+    assinatura,
+    chave_cnpj,
+    hash_email,
+)
+from .legado import LeitorClientesLegado, ler_linha_legado
+from .sqlite import ClienteSQLiteRepository
+from .travas import TravaArquivo
+from .trigramas import IndiceTrigramas, trigramas
+from .write_behind import ClienteWriteBehindRepository
+
+# Modos de durabilidade das gravações (quando chamar fsync)
+DURABILIDADE_NENHUMA = "nenhuma"  # Nunca: o sistema operacional decide
+DURABILIDADE_LOTE = "lote"  # A cada N registros ou T ms, e no fim do lote
+DURABILIDADE_REGISTRO = "registro"  # A cada registro
+MODOS_DURABILIDADE = (DURABILIDADE_NENHUMA, DURABILIDADE_LOTE, DURABILIDADE_REGISTRO)
+
+# Buffer de escrita dos lotes
+TAMANHO_BUFFER = 1 << 20
+
+# Registros aplicados de cada vez ao índice de emails na leitura do arquivo
+_BLOCO_REGISTROS = 65536
+
+
+# Tipos de registro do arquivo. Uma inclusão é a linha ``nome|email|cnpj``
+# e só vale se o email não existir (ou tiver sido removido); uma
+# atualização (``U|nome|email|cnpj``) substitui o cliente do email, e uma
+# remoção (``D|email``) o apaga. Na leitura, vale o último registro.
+REGISTRO_INCLUSAO = "I"
+REGISTRO_ATUALIZACAO = "U"
+REGISTRO_REMOCAO = "D"
+
+# Tipo, email e cliente (None na remoção) de um registro
+Registro = Tuple[str, str, Optional[Cliente]]
+# O mesmo, mais a posição da linha (uma tupla só: os lotes guardam milhões)
+RegistroGravado = Tuple[str, str, Optional[Cliente], int]
+
+
+def _dividir(linha: bytes) -> Optional[Tuple[str, List[str]]]:
+    """
+    Tipo e campos de uma linha válida: ``[nome, email, cnpj]``, ou
+    ``[email]`` na remoção.
+    """
+    dados = linha.decode("utf-8").strip().split("|")
+    if len(dados) == 3:
+        return REGISTRO_INCLUSAO, dados
+    if len(dados) == 4 and dados[0] == REGISTRO_ATUALIZACAO:
+        return REGISTRO_ATUALIZACAO, dados[1:]
+    if len(dados) == 2 and dados[0] == REGISTRO_REMOCAO:
+        return REGISTRO_REMOCAO, dados[1:]
+    return None
+
+
+def _linha_do_registro(registro: Registro) -> bytes:
+    """Converte um registro em linha do arquivo."""
+    tipo, email, cliente = registro
+    if tipo == REGISTRO_INCLUSAO:
+        linha = f"{cliente.nome}|{cliente.email}|{cliente.cnpj}\n"
+    elif tipo == REGISTRO_ATUALIZACAO:
+        linha = f"U|{cliente.nome}|{cliente.email}|{cliente.cnpj}\n"
+    else:
+        linha = f"D|{email}\n"
+    return linha.encode("utf-8")
+
+
+def _e_remocao(linha: bytes) -> bool:
+    """Retorna se a linha é um registro de remoção."""
+    registro = _dividir(linha)
+    return registro is not None and registro[0] == REGISTRO_REMOCAO
+
+
+def _ler_cliente(linha: bytes) -> Optional[Cliente]:
+    """Converte uma linha de inclusão ou atualização do arquivo em cliente."""
+    registro = _dividir(linha)
+    if registro is None or registro[0] == REGISTRO_REMOCAO:
+        return None
+    nome, email, cnpj = registro[1]
+    return Cliente(nome=nome, email=email, cnpj=cnpj)
+
+
+def _email_da_linha(linha: bytes) -> Optional[str]:
+    """Retorna o email de uma linha válida, sem montar o cliente."""
+    registro = _dividir(linha)
+    if registro is None:
+        return None
+    return registro[1][0] if registro[0] == REGISTRO_REMOCAO else registro[1][1]
+
+
+def _cnpj_da_linha(linha: bytes) -> Optional[int]:
+    """Retorna a chave do CNPJ de uma linha com cliente (ver ``chave_cnpj``)."""
+    registro = _dividir(linha)
+    if registro is None or registro[0] == REGISTRO_REMOCAO:
+        return None
+    return chave_cnpj(registro[1][2])
+
+
+def _fim_das_linhas(f) -> int:
+    """Posição logo depois da última linha completa (terminada em ``\\n``)."""
+    fim = f.seek(0, os.SEEK_END)
+    while fim > 0:
+        inicio = max(0, fim - 4096)
+        f.seek(inicio)
+        ultima = f.read(fim - inicio).rfind(b"\n")
+        if ultima >= 0:
+            return inicio + ultima + 1
+        fim = inicio
+    return 0
+
+
+@dataclass
+class _PedidoGravacao:
+    """Linhas de uma chamada esperando a gravação em grupo."""
+
+    dados: bytes
+    novos: List[RegistroGravado]  # Com a posição da linha em ``dados``
+    concluido: bool = False
+    erro: Optional[BaseException] = None
 
 
 class ClienteFileRepository(ClienteRepositoryInterface):
-    """Implementação de repositório que salva clientes em arquivo."""
+    """
+    Implementação de repositório que salva clientes em arquivo.
+
+    O arquivo é um log: só recebe linhas no fim. ``salvar`` acrescenta uma
+    inclusão, que só vale se o email não estiver cadastrado (como antes,
+    vale o primeiro cadastro); ``atualizar`` e ``remover`` acrescentam um
+    registro de atualização ou de remoção, e o último registro de cada
+    email é o que vale. ``compactar`` reescreve o arquivo só com os
+    clientes atuais e o troca pelo antigo de uma vez.
+
+    As buscas por email usam um índice ``email -> posição`` do registro
+    atual no arquivo: a busca é uma consulta ao índice mais um ``seek`` e
+    uma leitura.
+
+    O índice tem duas partes:
+    - o índice persistente (``<arquivo>.idx``), aberto com ``mmap``, que
+      cobre o arquivo até o seu checkpoint;
+    - um dicionário em memória com os registros escritos depois do
+      checkpoint, montado na primeira busca e atualizado a cada gravação.
+      Linhas acrescentadas ao arquivo por outro processo são indexadas na
+      busca seguinte.
+
+    Assim, abrir o repositório só relê o fim do arquivo. Quando o dicionário
+    passa de ``checkpoint_indice`` emails, os dois são fundidos em um novo
+    índice persistente (ou quando ``salvar_indice`` é chamado).
+
+    ``buscar_por_cnpj`` usa um índice ``CNPJ -> posição`` só em memória
+    (``IndiceOrdenado``), montado com uma leitura do arquivo na primeira
+    busca por CNPJ e mantido como o de emails. Ele guarda a primeira linha
+    de cada CNPJ; se ela não for mais a atual do seu email, o arquivo é
+    lido dali em diante até o primeiro registro atual com o CNPJ.
 
-    def __init__(self, filepath: str = "clientes_clean_arch.txt"):
+    ``buscar_por_dominio`` usa um índice ordenado por domínio invertido e
+    parte local (``<arquivo>.dom``, ver ``dominios``), montado na primeira
+    consulta e aberto com ``mmap`` nas seguintes; como o de emails, ele é
+    regravado a cada ``checkpoint_indice`` emails novos.
+
+    ``buscar_por_nome`` usa um índice de trigramas dos nomes em memória
+    (``IndiceTrigramas``), montado na primeira busca por nome e atualizado
+    a cada ``salvar``.
+
+    ``salvar_lote`` abre o arquivo uma vez e escreve por um buffer grande.
+    A ``durabilidade`` define quando os dados vão para o disco (``fsync``):
+    nunca explicitamente, em grupo (a cada ``fsync_registros`` registros ou
+    ``fsync_ms`` milissegundos, e no fim de cada lote) ou a cada registro.
+
+    Com ``multiprocesso``, vários processos podem gravar no mesmo arquivo:
+    as gravações passam por uma trava ``fcntl`` em ``<arquivo>.lock`` (ver
+    ``TravaArquivo``), que todos eles precisam usar. As chamadas a
+    ``salvar`` de várias threads entram em uma fila, e uma delas grava a
+    fila inteira de uma vez (gravação em grupo): uma aquisição da trava, uma
+    escrita e, se a durabilidade não for ``"nenhuma"``, um ``fsync`` para
+    todos os clientes do grupo, que só retornam depois dele.
+
+    Nas leituras do fim do arquivo, uma última linha sem ``\\n`` ainda está
+    sendo escrita: ela fica de fora até ser completada, então as buscas
+    nunca veem linhas pela metade.
+
+    Um arquivo trocado (compactado por outro processo) é reconhecido pelo
+    inode: os índices em memória são descartados e remontados. Com vários
+    processos gravando, só compacte no modo ``multiprocesso``, em que a
+    compactação segura a trava entre processos. Com ``compactar_apos``, o
+    arquivo é compactado a cada tantas chamadas a ``atualizar`` e
+    ``remover`` deste repositório.
+    """
+
+    def __init__(
+        self,
+        filepath: str = "clientes_clean_arch.txt",
+        indice_persistente: bool = True,
+        checkpoint_indice: int = 100_000,
+        durabilidade: str = DURABILIDADE_NENHUMA,
+        fsync_registros: int = 1000,
+        fsync_ms: float = 50.0,
+        multiprocesso: bool = False,
+        compactar_apos: Optional[int] = None,
+    ):
+        if durabilidade not in MODOS_DURABILIDADE:
+            raise ValueError(f"Modo de durabilidade inválido: {durabilidade}")
+        self._trava_arquivo = (
+            TravaArquivo(f"{filepath}.lock") if multiprocesso else None
+        )
         self.filepath = filepath
+        self.durabilidade = durabilidade
+        self.fsync_registros = fsync_registros
+        self.fsync_ms = fsync_ms
+        self.indice_file = f"{filepath}.idx" if indice_persistente else None
+        self.dominios_file = f"{filepath}.dom" if indice_persistente else None
+        self.checkpoint_indice = checkpoint_indice
+        self.compactar_apos = compactar_apos
+        self._alteracoes = 0  # Atualizações e remoções desde a compactação
+        self._inode: Optional[int] = None  # Arquivo a que os índices se referem
+        self._base: Optional[IndiceSidecar] = None
+        # Registros após o checkpoint (``~posição`` na remoção)
+        self._indice: Optional[Dict[str, int]] = None
+        self._indexado_ate = 0  # Bytes do arquivo já indexados
+        self._cnpjs: Optional[IndiceOrdenado] = None
+        self._cnpjs_ate = 0  # Bytes do arquivo com os CNPJs indexados
+        self._dominios: Optional[IndiceDominios] = None
+        self._dominios_ate = 0  # Bytes do arquivo com os domínios indexados
+        self._nomes: Optional[IndiceTrigramas] = None
+        self._nomes_ate = 0  # Bytes do arquivo com os nomes indexados
+        self._trava = threading.Lock()
+        # Gravação em grupo (multiprocesso)
+        self._grupo = threading.Condition()
+        self._fila_grupo: deque = deque()
+        self._gravando_grupo = False
 
     def salvar(self, cliente: Cliente) -> None:
         """Salva o cliente em arquivo."""
         try:
-            with open(self.filepath, "a", encoding="utf-8") as f:
-                f.write(f"{cliente.nome}|{cliente.email}|{cliente.cnpj}\n")
+            self._gravar(((REGISTRO_INCLUSAO, cliente.email, cliente),))
         except IOError as e:
             raise Exception(f"Erro ao salvar cliente: {e}")
 
+    def salvar_lote(self, clientes: Iterable[Cliente]) -> None:
+        """Salva vários clientes abrindo o arquivo uma única vez."""
+        try:
+            self._gravar((REGISTRO_INCLUSAO, c.email, c) for c in clientes)
+        except IOError as e:
+            raise Exception(f"Erro ao salvar clientes: {e}")
+
+    def atualizar(self, cliente: Cliente) -> bool:
+        """Acrescenta um registro de atualização, se o email existir."""
+        return self._alterar(
+            (REGISTRO_ATUALIZACAO, cliente.email, cliente), "atualizar"
+        )
+
+    def remover(self, email: str) -> bool:
+        """Acrescenta um registro de remoção, se o email existir."""
+        return self._alterar((REGISTRO_REMOCAO, email, None), "remover")
+
+    def _alterar(self, registro: Registro, acao: str) -> bool:
+        """
+        Grava uma atualização ou remoção de um email cadastrado.
+
+        A consulta e a gravação não são uma operação só: entre elas, outra
+        gravação pode remover o email, e vale o último registro.
+        """
+        try:
+            if self.buscar_por_email(registro[1]) is None:
+                return False
+            self._gravar((registro,))
+        except IOError as e:
+            raise Exception(f"Erro ao {acao} cliente: {e}")
+        if self.compactar_apos is not None:
+            with self._trava:
+                self._alteracoes += 1
+                compactar = self._alteracoes >= self.compactar_apos
+                if compactar:
+                    self._alteracoes = 0
+            if compactar:
+                self.compactar()
+        return True
+
+    def _gravar(self, registros: Iterable[Registro]) -> None:
+        """Acrescenta os registros ao arquivo e atualiza o índice."""
+        if self._trava_arquivo is not None:
+            self._gravar_em_grupo(registros)
+            return
+        lote = self.durabilidade == DURABILIDADE_LOTE
+        por_registro = self.durabilidade == DURABILIDADE_REGISTRO
+        novos = []
+        with self._trava:
+            with open(self.filepath, "ab", buffering=TAMANHO_BUFFER) as f:
+                self._conferir_inode(os.fstat(f.fileno()).st_ino)
+                inicio = posicao = f.tell()
+                pendentes, ultimo_fsync = 0, time.monotonic()
+                # Sem índices em memória, não há o que atualizar depois
+                indexar = self._indices_carregados()
+                for registro in registros:
+                    tipo, _, cliente = registro
+                    if tipo == REGISTRO_INCLUSAO:
+                        linha = f"{cliente.nome}|{cliente.email}|{cliente.cnpj}\n"
+                        linha = linha.encode("utf-8")
+                    else:
+                        linha = _linha_do_registro(registro)
+                    f.write(linha)
+                    if indexar:
+                        novos.append((tipo, registro[1], cliente, posicao))
+                    posicao += len(linha)
+                    if por_registro:
+                        self._sincronizar(f)
+                    elif lote:
+                        pendentes += 1
+                        agora = time.monotonic()
+                        if (
+                            pendentes >= self.fsync_registros
+                            or (agora - ultimo_fsync) * 1000 >= self.fsync_ms
+                        ):
+                            self._sincronizar(f)
+                            pendentes, ultimo_fsync = 0, agora
+                if pendentes:
+                    self._sincronizar(f)
+            self._atualizar_indices(inicio, novos, posicao)
+
+    def _indices_carregados(self) -> bool:
+        """Retorna se algum índice está em memória (com a trava)."""
+        return not (
+            self._indice is None
+            and self._cnpjs is None
+            and self._nomes is None
+            and self._dominios is None
+        )
+
+    def _atualizar_indices(
+        self, inicio: int, novos: List[RegistroGravado], fim: int
+    ) -> None:
+        """Indexa as linhas gravadas de ``inicio`` a ``fim`` (com a trava)."""
+        # Só atualiza se o índice cobre o arquivo até aqui; senão a
+        # próxima busca indexa o trecho que falta
+        if self._indice is not None and inicio == self._indexado_ate:
+            self._aplicar(novos)
+            self._indexado_ate = fim
+            self._checkpoint_automatico()
+        if self._cnpjs is not None and inicio == self._cnpjs_ate:
+            for _, _, cliente, posicao_linha in novos:
+                chave = None if cliente is None else chave_cnpj(cliente.cnpj)
+                if chave is not None:
+                    self._cnpjs.adicionar(chave, posicao_linha)
+            self._cnpjs_ate = fim
+        if self._nomes is not None and inicio == self._nomes_ate:
+            for _, _, cliente, posicao_linha in novos:
+                if cliente is not None:
+                    self._nomes.adicionar(cliente.nome, posicao_linha)
+            self._nomes_ate = fim
+        if self._dominios is not None and inicio == self._dominios_ate:
+            for _, email, _, posicao_linha in novos:
+                self._dominios.adicionar(email, posicao_linha)
+            self._dominios_ate = fim
+            self._checkpoint_dominios()
+
+    def _gravar_em_grupo(self, registros: Iterable[Registro]) -> None:
+        """Grava os registros pela fila do grupo, em pedidos de até 1 MiB."""
+        dados, novos = bytearray(), []
+        for registro in registros:
+            novos.append((*registro, len(dados)))
+            dados += _linha_do_registro(registro)
+            if len(dados) >= TAMANHO_BUFFER:
+                self._pedir_gravacao(_PedidoGravacao(bytes(dados), novos))
+                dados, novos = bytearray(), []
+        if novos:
+            self._pedir_gravacao(_PedidoGravacao(bytes(dados), novos))
+
+    def _pedir_gravacao(self, pedido: _PedidoGravacao) -> None:
+        """
+        Coloca o pedido na fila e espera a gravação.
+
+        Se nenhuma thread estiver gravando, esta grava a fila inteira (o
+        próprio pedido e os que chegaram enquanto o grupo anterior era
+        gravado); senão, espera o grupo dela.
+        """
+        with self._grupo:
+            self._fila_grupo.append(pedido)
+            while self._gravando_grupo and not pedido.concluido:
+                self._grupo.wait()
+            if not pedido.concluido:
+                grupo = list(self._fila_grupo)
+                self._fila_grupo.clear()
+                self._gravando_grupo = True
+        if not pedido.concluido:
+            erro = None
+            try:
+                self._gravar_grupo(grupo)
+            except BaseException as e:
+                erro = e
+                raise
+            finally:
+                with self._grupo:
+                    for gravado in grupo:
+                        gravado.concluido, gravado.erro = True, erro
+                    self._gravando_grupo = False
+                    self._grupo.notify_all()
+        if pedido.erro is not None:
+            # A falha foi na gravação de outra thread, que já a recebeu
+            raise IOError(pedido.erro)
+
+    def _gravar_grupo(self, grupo: List[_PedidoGravacao]) -> None:
+        """Grava os pedidos com uma aquisição da trava entre processos."""
+        dados = memoryview(b"".join(pedido.dados for pedido in grupo))
+        with self._trava_arquivo:
+            # Aberto com a trava: antes dela, uma compactação em outro
+            # processo poderia trocar o arquivo
+            fd = os.open(self.filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+            try:
+                # Com a trava, nenhum outro processo escreve: o fim do
+                # arquivo é onde os dados vão ficar
+                estado = os.fstat(fd)
+                inicio = estado.st_size
+                escritos = 0
+                while escritos < len(dados):
+                    escritos += os.write(fd, dados[escritos:])
+            except BaseException:
+                os.close(fd)
+                raise
+        try:
+            # O fsync fora da trava deixa o próximo processo já escrever
+            if self.durabilidade != DURABILIDADE_NENHUMA:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        novos, posicao = [], inicio
+        for pedido in grupo:
+            novos.extend(
+                (tipo, email, cliente, posicao + linha)
+                for tipo, email, cliente, linha in pedido.novos
+            )
+            posicao += len(pedido.dados)
+        with self._trava:
+            self._conferir_inode(estado.st_ino)
+            self._atualizar_indices(inicio, novos, posicao)
+
+    @staticmethod
+    def _sincronizar(f) -> None:
+        """Esvazia o buffer e grava os dados no disco."""
+        f.flush()
+        os.fsync(f.fileno())
+
     def buscar_por_email(self, email: str) -> Optional[Cliente]:
-        """Busca um cliente por email (implementação simplificada)."""
+        """Busca um cliente por email pelo índice."""
+        try:
+            with self._trava:
+                linha = self._buscar_linha(email)
+        except FileNotFoundError:
+            with self._trava:
+                self._descartar_indice()
+            return None
+        return None if linha is None else _ler_cliente(linha)
+
+    def buscar_por_cnpj(self, cnpj: str) -> Optional[Cliente]:
+        """Busca o primeiro cliente com o CNPJ pelo índice de CNPJs."""
+        chave = chave_cnpj(cnpj)
+        if chave is None:
+            return None
+        try:
+            with self._trava:
+                linha = self._buscar_linha_cnpj(chave)
+        except FileNotFoundError:
+            with self._trava:
+                self._cnpjs, self._cnpjs_ate = None, 0
+            return None
+        return None if linha is None else _ler_cliente(linha)
+
+    def buscar_por_nome(self, consulta: str, limite: int = 10) -> List[Cliente]:
+        """
+        Busca aproximada por nome (partes do nome ou erros de digitação).
+
+        Retorna até ``limite`` clientes, do nome mais parecido com a
+        consulta ao menos (ver ``IndiceTrigramas.buscar``), um por email
+        (o primeiro cadastro).
+        """
+        try:
+            with self._trava:
+                return self._buscar_nomes(consulta, limite)
+        except FileNotFoundError:
+            with self._trava:
+                self._nomes, self._nomes_ate = None, 0
+            return []
+
+    def buscar_por_dominio(
+        self, dominio: str, prefixo: str = "", subdominios: bool = False
+    ) -> Iterator[Cliente]:
+        """
+        Lista, sob demanda, os clientes com email ``<prefixo>...@<dominio>``.
+
+        Com ``subdominios``, inclui os emails dos subdomínios (ex:
+        ``sul.transportadora.com.br``). Os clientes saem em ordem de domínio
+        invertido e email, um por email (com o seu registro atual).
+        """
+        with self._trava:
+            try:
+                pares = self._pares_dominio(dominio, prefixo, subdominios)
+            except FileNotFoundError:
+                self._descartar_dominios()
+                return
+            indice = self._dominios
+        try:
+            f = open(self.filepath, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            for chave, posicao in pares:
+                f.seek(posicao)
+                linha = f.readline()
+                email = _email_da_linha(linha)
+                if email is None or chave_dominio(email) != chave:
+                    # O arquivo foi reescrito por fora: a próxima consulta
+                    # refaz o índice
+                    with self._trava:
+                        if self._dominios is indice:
+                            self._descartar_dominios()
+                    continue
+                # O índice guarda uma linha por email: vale o registro atual
+                try:
+                    with self._trava:
+                        atual = self._buscar_linha(email, posicao)
+                except FileNotFoundError:
+                    return
+                if atual is not None:
+                    yield _ler_cliente(atual)
+
+    def marca_emails(self) -> int:
+        """Fim da última linha completa do arquivo (marca para ``emails``)."""
+        try:
+            with open(self.filepath, "rb") as f:
+                return _fim_das_linhas(f)
+        except FileNotFoundError:
+            return 0
+
+    def assinatura_emails(self, marca: int) -> bytes:
+        """
+        Assinatura dos bytes do arquivo logo antes da marca: muda quando
+        uma compactação reescreve o arquivo, mesmo que ele volte a crescer
+        além da marca.
+        """
+        try:
+            return assinatura(self.filepath, marca)
+        except FileNotFoundError:
+            return b""
+
+    def emails(self, desde: int = 0) -> Iterator[str]:
+        """Lista os emails das linhas a partir da posição ``desde``."""
+        try:
+            f = open(self.filepath, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(desde)
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break  # Linha ainda sendo escrita
+                email = _email_da_linha(linha)
+                if email is not None:
+                    yield email
+
+    def salvar_indice(self) -> None:
+        """Grava os índices persistentes com tudo o que já foi indexado."""
+        if self.indice_file is None:
+            return
+        try:
+            with self._trava:
+                tamanho = self._tamanho_arquivo()
+                self._carregar_indice()
+                if tamanho > self._indexado_ate:
+                    self._indexar_restante()
+                self._gravar_indice()
+                if self._dominios is not None:
+                    if self._tamanho_arquivo() > self._dominios_ate:
+                        self._indexar_dominios()
+                    self._gravar_dominios()
+        except FileNotFoundError:
+            return
+
+    def compactar(self) -> Tuple[int, int]:
+        """
+        Reescreve o arquivo só com o registro atual de cada email e o troca
+        pelo antigo de uma vez (``os.replace``).
+
+        As atualizações viram inclusões, e as remoções, as inclusões
+        ignoradas e as linhas inválidas saem. Os clientes ficam na ordem dos
+        seus registros atuais. Retorna o tamanho do arquivo antes e depois.
+        """
         try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                for linha in f:
-                    dados = linha.strip().split("|")
-                    if len(dados) == 3 and dados[1] == email:
-                        return Cliente(nome=dados[0], email=dados[1], cnpj=dados[2])
+            with self._sem_gravacoes():
+                return self._compactar()
         except FileNotFoundError:
+            return 0, 0
+
+    def fechar(self) -> None:
+        """Libera os índices persistentes mapeados em memória e a trava."""
+        with self._trava:
+            self._esquecer_indices()
+        if self._trava_arquivo is not None:
+            with self._grupo:
+                self._trava_arquivo.fechar()
+
+    def _tamanho_arquivo(self) -> int:
+        """Tamanho do arquivo, conferindo antes se ele foi trocado (com a trava)."""
+        estado = os.stat(self.filepath)
+        self._conferir_inode(estado.st_ino)
+        return estado.st_size
+
+    def _conferir_inode(self, inode: int) -> None:
+        """Esquece os índices se o arquivo não é mais o indexado (com a trava)."""
+        if inode != self._inode:
+            # Arquivo novo ou trocado (ex: compactado por outro processo)
+            self._esquecer_indices()
+            self._inode = inode
+
+    def _esquecer_indices(self) -> None:
+        """Esquece todos os índices em memória; as buscas os recarregam."""
+        self._descartar_indice()
+        self._descartar_dominios()
+        self._cnpjs, self._cnpjs_ate = None, 0
+        self._nomes, self._nomes_ate = None, 0
+
+    @contextmanager
+    def _sem_gravacoes(self):
+        """
+        Segura as gravações deste repositório e, com ``multiprocesso``, as
+        dos outros processos, além da trava dos índices.
+        """
+        if self._trava_arquivo is None:
+            with self._trava:
+                yield
+            return
+        # Ocupa a vez da gravação em grupo: as chamadas a ``salvar`` esperam
+        with self._grupo:
+            while self._gravando_grupo:
+                self._grupo.wait()
+            self._gravando_grupo = True
+        try:
+            with self._trava_arquivo, self._trava:
+                yield
+        finally:
+            with self._grupo:
+                self._gravando_grupo = False
+                self._grupo.notify_all()
+
+    def _compactar(self) -> Tuple[int, int]:
+        """Compacta o arquivo (sem gravações em andamento)."""
+        tamanho = self._tamanho_arquivo()
+        if self._indice is None or tamanho < self._indexado_ate:
+            self._descartar_indice()
+            self._carregar_indice()
+        if tamanho > self._indexado_ate:
+            self._indexar_restante()
+        entradas = self._entradas_atuais()
+        entradas = entradas[np.argsort(entradas["posicao"], kind="stable")]
+
+        temporario = f"{self.filepath}.compactando"
+        hashes, posicoes, escrito = [], [], 0
+        with open(self.filepath, "rb") as origem, open(
+            temporario, "wb", buffering=TAMANHO_BUFFER
+        ) as destino:
+            for h, posicao in zip(
+                entradas["hash"].tolist(), entradas["posicao"].tolist()
+            ):
+                origem.seek(posicao)
+                cliente = _ler_cliente(origem.readline())
+                if cliente is None:
+                    continue
+                linha = _linha_do_registro((REGISTRO_INCLUSAO, cliente.email, cliente))
+                destino.write(linha)
+                hashes.append(h)
+                posicoes.append(escrito)
+                escrito += len(linha)
+            self._sincronizar(destino)
+        os.replace(temporario, self.filepath)
+        self._conferir_inode(os.stat(self.filepath).st_ino)
+
+        # O índice de domínios gravado era do arquivo antigo
+        if self.dominios_file is not None and os.path.exists(self.dominios_file):
+            os.remove(self.dominios_file)
+        if self.indice_file is not None:
+            novas = np.empty(len(hashes), dtype=ENTRADA)
+            novas["hash"], novas["posicao"] = hashes, posicoes
+            IndiceSidecar.gravar(self.indice_file, self.filepath, novas, escrito)
+        return tamanho, escrito
+
+    def _buscar_linha(
+        self, email: str, conhecida: Optional[int] = None
+    ) -> Optional[bytes]:
+        """
+        Lê o registro atual do email no arquivo, ou None se não houver.
+
+        ``conhecida`` é a posição de uma linha do email, se quem chama tiver
+        uma: um email nessa linha que o índice não conhece mostra que o
+        arquivo foi reescrito por fora.
+        """
+        tamanho = self._tamanho_arquivo()
+        if self._indice is None or tamanho < self._indexado_ate:
+            self._descartar_indice()
+            self._carregar_indice()
+        if tamanho > self._indexado_ate:
+            # Registros novos podem ter alterado ou removido o email
+            self._indexar_restante()
+            self._checkpoint_automatico()
+            if tamanho > self._indexado_ate:
+                # Ficou o índice gravado por outro processo, que cobre menos
+                self._indexar_restante()
+
+        posicao = self._indice.get(email)
+        if posicao is not None:
+            with open(self.filepath, "rb") as f:
+                f.seek(posicao if posicao >= 0 else ~posicao)
+                linha = f.readline()
+            if _email_da_linha(linha) != email:
+                # O arquivo foi reescrito por fora: refaz o índice
+                self._descartar_indice()
+                return self._buscar_linha(email)
+        else:
+            linha = self._linha_na_base(email)
+            if linha is None:
+                if conhecida is not None and conhecida < self._indexado_ate:
+                    # O arquivo foi reescrito por fora: refaz o índice
+                    self._descartar_indice()
+                    return self._buscar_linha(email)
+                return None
+        return None if _e_remocao(linha) else linha
+
+    def _linha_na_base(self, email: str) -> Optional[bytes]:
+        """Lê o registro do email no índice persistente, ou None se não houver."""
+        if self._base is None:
+            return None
+        posicoes = self._base.posicoes(hash_email(email))
+        if not len(posicoes):
+            return None
+        with open(self.filepath, "rb") as f:
+            # Hashes iguais de emails diferentes são possíveis: confere a linha
+            for posicao in posicoes.tolist():
+                f.seek(posicao)
+                linha = f.readline()
+                if _email_da_linha(linha) == email:
+                    return linha
+        return None
+
+    def _buscar_linha_cnpj(self, chave: int) -> Optional[bytes]:
+        """Lê o primeiro registro atual com o CNPJ, ou None se não houver."""
+        tamanho = self._tamanho_arquivo()
+        if self._cnpjs is None or tamanho < self._cnpjs_ate:
+            self._cnpjs = IndiceOrdenado(self.checkpoint_indice)
+            self._cnpjs_ate = 0
+
+        posicao = self._cnpjs.posicao(chave)
+        if posicao is None and tamanho > self._cnpjs_ate:
+            self._indexar_cnpjs()
+            posicao = self._cnpjs.posicao(chave)
+        if posicao is None:
             return None
+        with open(self.filepath, "rb") as f:
+            f.seek(posicao)
+            linha = f.readline()
+
+        if _cnpj_da_linha(linha) != chave:
+            # O arquivo foi reescrito por fora: refaz o índice
+            self._cnpjs = None
+            return self._buscar_linha_cnpj(chave)
+        if self._buscar_linha(_email_da_linha(linha), posicao) != linha:
+            # O cliente foi alterado ou removido depois
+            return self._procurar_cnpj(chave, posicao)
+        return linha
+
+    def _procurar_cnpj(self, chave: int, inicio: int) -> Optional[bytes]:
+        """Lê o arquivo de ``inicio`` até o primeiro registro atual com o CNPJ."""
+        with open(self.filepath, "rb") as f:
+            f.seek(inicio)
+            posicao = inicio
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break  # Linha ainda sendo escrita
+                if (
+                    _cnpj_da_linha(linha) == chave
+                    and self._buscar_linha(_email_da_linha(linha), posicao) == linha
+                ):
+                    return linha
+                posicao += len(linha)
         return None
+
+    def _indexar_cnpjs(self) -> None:
+        """Indexa os CNPJs das linhas a partir de ``_cnpjs_ate``."""
+        chaves, posicoes = [], []
+        with open(self.filepath, "rb") as f:
+            f.seek(self._cnpjs_ate)
+            posicao = self._cnpjs_ate
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break  # Linha ainda sendo escrita
+                chave = _cnpj_da_linha(linha)
+                if chave is not None:
+                    chaves.append(chave)
+                    posicoes.append(posicao)
+                posicao += len(linha)
+        self._cnpjs.adicionar_varios(
+            np.array(chaves, dtype=np.uint64), np.array(posicoes, dtype=np.uint64)
+        )
+        self._cnpjs_ate = posicao
+
+    def _buscar_nomes(self, consulta: str, limite: int) -> List[Cliente]:
+        """Busca por nome (chamado com a trava)."""
+        tamanho = self._tamanho_arquivo()
+        if self._nomes is None or tamanho < self._nomes_ate:
+            self._nomes, self._nomes_ate = IndiceTrigramas(), 0
+        if tamanho > self._nomes_ate:
+            self._indexar_nomes()
+
+        # Linhas que não são o registro atual do email não contam: se
+        # sobrarem menos de ``limite`` clientes, pede mais resultados ao
+        # índice (o daqui: um arquivo trocado no meio da busca o descarta)
+        nomes, pedidos = self._nomes, limite
+        with open(self.filepath, "rb") as f:
+            while True:
+                achados = nomes.buscar(consulta, pedidos)
+                clientes, emails = [], set()
+                for _, posicao in achados:
+                    f.seek(posicao)
+                    linha = f.readline()
+                    cliente = _ler_cliente(linha)
+                    if cliente is None:
+                        # O arquivo foi reescrito por fora: refaz o índice
+                        self._nomes = None
+                        return self._buscar_nomes(consulta, limite)
+                    if (
+                        cliente.email in emails
+                        or self._buscar_linha(cliente.email, posicao) != linha
+                    ):
+                        continue
+                    emails.add(cliente.email)
+                    clientes.append(cliente)
+                    if len(clientes) == limite:
+                        return clientes
+                if len(achados) < pedidos:
+                    return clientes
+                pedidos *= 2
+
+    def _indexar_nomes(self) -> None:
+        """Indexa os nomes das linhas a partir de ``_nomes_ate``."""
+        with open(self.filepath, "rb") as f:
+            f.seek(self._nomes_ate)
+            posicao = self._nomes_ate
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break  # Linha ainda sendo escrita
+                registro = _dividir(linha)
+                if registro is not None and registro[0] != REGISTRO_REMOCAO:
+                    self._nomes.adicionar(registro[1][0], posicao)
+                posicao += len(linha)
+        self._nomes_ate = posicao
+
+    def _pares_dominio(
+        self, dominio: str, prefixo: str, subdominios: bool
+    ) -> Iterator[Tuple[bytes, int]]:
+        """Faixas do índice de domínios para a consulta (chamado com a trava)."""
+        tamanho = self._tamanho_arquivo()
+        if self._dominios is None or tamanho < self._dominios_ate:
+            self._descartar_dominios()
+            base = None
+            if self.dominios_file is not None:
+                base = IndiceDominiosSidecar.abrir(self.dominios_file, self.filepath)
+            self._dominios = IndiceDominios(base)
+            self._dominios_ate = self._dominios.checkpoint
+        if tamanho > self._dominios_ate:
+            self._indexar_dominios()
+            self._checkpoint_dominios()
+            if tamanho > self._dominios_ate:
+                # Ficou o índice gravado por outro processo, que cobre menos
+                self._indexar_dominios()
+
+        raiz = inverter_dominio(dominio).encode("utf-8")
+        local = prefixo.encode("utf-8")
+        pares = self._dominios.faixa(raiz + b"@" + local)
+        if not subdominios:
+            return pares
+        # Nos subdomínios, a parte local vem depois de rótulos variáveis:
+        # o prefixo é conferido chave a chave
+        abaixo = (
+            par
+            for par in self._dominios.faixa(raiz + b".")
+            if par[0].split(b"@", 1)[1].startswith(local)
+        )
+        return itertools.chain(abaixo, pares)
+
+    def _indexar_dominios(self) -> None:
+        """Indexa os domínios das linhas a partir de ``_dominios_ate``."""
+        with open(self.filepath, "rb") as f:
+            f.seek(self._dominios_ate)
+            posicao = self._dominios_ate
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break  # Linha ainda sendo escrita
+                email = _email_da_linha(linha)
+                if email is not None:
+                    self._dominios.adicionar(email, posicao)
+                posicao += len(linha)
+        self._dominios_ate = posicao
+
+    def _checkpoint_dominios(self) -> None:
+        """Grava o índice de domínios se as chaves recentes ficaram muitas."""
+        if (
+            self.dominios_file is not None
+            and len(self._dominios.recentes) >= self.checkpoint_indice
+        ):
+            self._gravar_dominios()
+
+    def _gravar_dominios(self) -> None:
+        """Funde e grava o índice de domínios."""
+        if self.dominios_file is None:
+            return
+        self._dominios = self._dominios.gravar(
+            self.dominios_file, self.filepath, self._dominios_ate
+        )
+        # Sem o índice reaberto (não deveria acontecer), reindexa tudo
+        self._dominios_ate = self._dominios.checkpoint
+
+    def _descartar_dominios(self) -> None:
+        """Esquece o índice de domínios; a próxima consulta o recarrega."""
+        if self._dominios is not None:
+            self._dominios.fechar()
+        self._dominios, self._dominios_ate = None, 0
+
+    def _carregar_indice(self) -> None:
+        """Abre o índice persistente, se houver, e retoma do seu checkpoint."""
+        if self._indice is not None:
+            return
+        if self.indice_file is not None:
+            self._base = IndiceSidecar.abrir(self.indice_file, self.filepath)
+        self._indice = {}
+        self._indexado_ate = 0 if self._base is None else self._base.checkpoint
+
+    def _descartar_indice(self) -> None:
+        """Esquece o índice; a próxima busca o recarrega."""
+        if self._base is not None:
+            self._base.fechar()
+        self._base, self._indice, self._indexado_ate = None, None, 0
+
+    def _indexar_restante(self) -> None:
+        """Indexa as linhas do arquivo a partir de ``_indexado_ate``."""
+        registros = []
+        with open(self.filepath, "rb") as f:
+            f.seek(self._indexado_ate)
+            posicao = self._indexado_ate
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break  # Linha ainda sendo escrita
+                registro = _dividir(linha)
+                if registro is not None:
+                    tipo, dados = registro
+                    email = dados[0] if tipo == REGISTRO_REMOCAO else dados[1]
+                    registros.append((tipo, email, None, posicao))
+                    if len(registros) == _BLOCO_REGISTROS:
+                        self._aplicar(registros)
+                        registros = []
+                posicao += len(linha)
+        self._aplicar(registros)
+        self._indexado_ate = posicao
+
+    def _aplicar(self, registros: List[RegistroGravado]) -> None:
+        """Aplica os registros ao índice de emails, em ordem (com a trava)."""
+        # A inclusão só vale se o email não existir (ou tiver sido removido).
+        # Os emails novos são procurados no índice persistente de uma vez,
+        # e só os de hash encontrado têm a linha conferida
+        suspeitos = set()
+        if self._base is not None and len(self._base):
+            incluidos = [
+                email
+                for tipo, email, _, _ in registros
+                if tipo == REGISTRO_INCLUSAO and email not in self._indice
+            ]
+            hashes = np.fromiter(
+                (hash_email(e) for e in incluidos),
+                dtype=np.uint64,
+                count=len(incluidos),
+            )
+            suspeitos = {
+                incluidos[i] for i in np.flatnonzero(self._base.contem(hashes))
+            }
+
+        indice = self._indice
+        for tipo, email, _, posicao in registros:
+            if tipo == REGISTRO_INCLUSAO:
+                atual = indice.get(email)
+                if atual is None:
+                    if email in suspeitos:
+                        linha = self._linha_na_base(email)
+                        if linha is not None and not _e_remocao(linha):
+                            continue
+                elif atual >= 0:
+                    continue
+                indice[email] = posicao
+            elif tipo == REGISTRO_ATUALIZACAO:
+                indice[email] = posicao
+            else:
+                indice[email] = ~posicao
+
+    def _checkpoint_automatico(self) -> None:
+        """Grava o índice persistente se o dicionário ficou grande."""
+        if self.indice_file is not None and len(self._indice) >= self.checkpoint_indice:
+            self._gravar_indice()
+
+    def _entradas_atuais(self) -> np.ndarray:
+        """
+        Entradas ``(hash, posição)`` do registro atual de cada email: as do
+        índice persistente que o dicionário não substitui, mais as do
+        dicionário. Os emails removidos ficam com a posição da remoção.
+        """
+        hashes = np.fromiter(
+            (hash_email(e) for e in self._indice),
+            dtype=np.uint64,
+            count=len(self._indice),
+        )
+        posicoes = np.fromiter(
+            self._indice.values(), dtype=np.int64, count=len(self._indice)
+        )
+        novas = np.empty(len(self._indice), dtype=ENTRADA)
+        novas["hash"] = hashes
+        novas["posicao"] = np.where(posicoes >= 0, posicoes, ~posicoes)
+        if self._base is None:
+            return novas
+
+        entradas = self._base.entradas()
+        # Só as entradas com hash de um email do dicionário (ou repetido,
+        # de índices gravados antes dos registros de alteração) podem sair:
+        # confere as linhas delas
+        repetidas = np.zeros(len(entradas), dtype=bool)
+        repetidas[1:] = entradas["hash"][1:] == entradas["hash"][:-1]
+        repetidas[:-1] |= repetidas[1:]
+        suspeitas = np.flatnonzero(repetidas | np.isin(entradas["hash"], hashes))
+        if len(suspeitas):
+            manter = np.ones(len(entradas), dtype=bool)
+            vistos = set()
+            with open(self.filepath, "rb") as f:
+                for i in suspeitas.tolist():
+                    f.seek(int(entradas["posicao"][i]))
+                    email = _email_da_linha(f.readline())
+                    if email in self._indice or email in vistos:
+                        manter[i] = False
+                    vistos.add(email)
+            entradas = entradas[manter]
+        return np.concatenate([entradas, novas])
+
+    def _gravar_indice(self) -> None:
+        """Funde o índice persistente com o dicionário e grava o resultado."""
+        novas = self._entradas_atuais()
+        if self._base is not None:
+            self._base.fechar()
+        IndiceSidecar.gravar(self.indice_file, self.filepath, novas, self._indexado_ate)
+        self._base = IndiceSidecar.abrir(self.indice_file, self.filepath)
+        self._indice = {}
+        # Outro processo pode ter gravado o índice logo depois, com outro
+        # checkpoint: retoma do checkpoint do índice que ficou
+        self._indexado_ate = 0 if self._base is None else self._base.checkpoint
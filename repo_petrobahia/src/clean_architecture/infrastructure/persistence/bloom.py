@@ -0,0 +1,298 @@
+"""
+Guarda de emails duplicados com filtro de Bloom (arquivo ``.bloom``).
+
+O filtro de Bloom responde "com certeza não existe" sem tocar no
+repositório; só quando ele responde "talvez exista" o email é conferido
+com ``buscar_por_email``. Com a taxa de falsos positivos padrão (1%), quase
+todo cadastro novo é liberado sem nenhuma leitura do repositório.
+
+O filtro é gravado ao lado do arquivo do repositório com a ``marca`` até
+onde ele cobre o repositório (posição no arquivo ou maior id no SQLite) e,
+se o repositório oferecer ``assinatura_emails``, a assinatura do
+repositório nessa marca. Ao abrir, os emails gravados depois da marca são
+acrescentados; sem o arquivo, com um arquivo inválido ou com a assinatura
+diferente (o arquivo do repositório foi compactado ou reescrito), o filtro
+é reconstruído lendo os emails do repositório uma única vez.
+"""
+
+import hashlib
+import math
+import struct
+import threading
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from ...domain.repositories import ClienteRepositoryInterface, GuardaDuplicadosInterface
+from .indice import escrita_atomica
+
+MAGICO = b"PBBF"
+VERSAO = 2
+
+# magico, versao, hashes, bits, contagem, capacidade, marca, assinatura
+# (80 bytes)
+_CABECALHO = struct.Struct("<4sIIQQQQ32s4x")
+
+_MASCARA_64 = (1 << 64) - 1
+
+# Emails por bloco ao acrescentar muitos emails de uma vez
+_BLOCO = 65_536
+
+
+def _digest(email: str) -> bytes:
+    """Hash de 128 bits do email (dois hashes de 64 bits)."""
+    return hashlib.blake2b(email.encode("utf-8"), digest_size=16).digest()
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom com ``bits`` bits e ``hashes`` funções de hash.
+
+    As posições de um email são ``h1 + i * h2`` (módulo 2^64 e depois
+    módulo ``bits``), com ``h1`` e ``h2`` tirados de um único blake2b.
+    """
+
+    def __init__(
+        self,
+        bits: int,
+        hashes: int,
+        capacidade: int,
+        contagem: int = 0,
+        dados: Optional[bytearray] = None,
+    ):
+        self.bits = bits
+        self.hashes = hashes
+        self.capacidade = capacidade
+        self.contagem = contagem
+        self._dados = bytearray((bits + 7) // 8) if dados is None else dados
+        self._vetor = np.frombuffer(self._dados, dtype=np.uint8)
+
+    @classmethod
+    def para_capacidade(cls, capacidade: int, taxa_falsos: float) -> "FiltroBloom":
+        """Cria o filtro ótimo para ``capacidade`` emails e a taxa dada."""
+        if capacidade <= 0 or not 0 < taxa_falsos < 1:
+            raise ValueError("Capacidade e taxa de falsos positivos inválidas")
+        bits = -capacidade * math.log(taxa_falsos) / math.log(2) ** 2
+        bits = max(int(math.ceil(bits)), 64)
+        hashes = max(int(round(bits / capacidade * math.log(2))), 1)
+        return cls(bits, hashes, capacidade)
+
+    def _posicoes(self, email: str):
+        digest = _digest(email)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [((h1 + i * h2) & _MASCARA_64) % self.bits for i in range(self.hashes)]
+
+    def adicionar(self, email: str) -> None:
+        """Adiciona um email ao filtro."""
+        dados = self._dados
+        for posicao in self._posicoes(email):
+            dados[posicao >> 3] |= 1 << (posicao & 7)
+        self.contagem += 1
+
+    def adicionar_varios(self, emails: Iterable[str]) -> None:
+        """Adiciona muitos emails, calculando as posições com numpy."""
+        bloco = []
+        for email in emails:
+            bloco.append(_digest(email))
+            if len(bloco) == _BLOCO:
+                self._adicionar_digests(bloco)
+                bloco = []
+        if bloco:
+            self._adicionar_digests(bloco)
+
+    def _adicionar_digests(self, digests) -> None:
+        pares = np.frombuffer(b"".join(digests), dtype="<u8").reshape(-1, 2)
+        h1, h2 = pares[:, 0], pares[:, 1] | np.uint64(1)
+        bits = np.uint64(self.bits)
+        for i in range(self.hashes):
+            # Aritmética de uint64 dá a mesma volta módulo 2^64 de _posicoes
+            posicoes = (h1 + np.uint64(i) * h2) % bits
+            np.bitwise_or.at(
+                self._vetor,
+                (posicoes >> np.uint64(3)).astype(np.intp),
+                (np.uint8(1) << (posicoes & np.uint64(7)).astype(np.uint8)),
+            )
+        self.contagem += len(digests)
+
+    def contem(self, email: str) -> bool:
+        """Retorna False se o email com certeza não foi adicionado."""
+        digest = _digest(email)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        dados, bits = self._dados, self.bits
+        # Para no primeiro bit zerado: emails novos costumam parar cedo
+        for i in range(self.hashes):
+            posicao = ((h1 + i * h2) & _MASCARA_64) % bits
+            if not dados[posicao >> 3] & (1 << (posicao & 7)):
+                return False
+        return True
+
+    def gravar(self, caminho: str, marca: int, assinatura: bytes = b"") -> None:
+        """Grava o filtro (escrita atômica com ``os.replace``)."""
+        cabecalho = _CABECALHO.pack(
+            MAGICO,
+            VERSAO,
+            self.hashes,
+            self.bits,
+            self.contagem,
+            self.capacidade,
+            marca,
+            assinatura,
+        )
+        with escrita_atomica(caminho) as f:
+            f.write(cabecalho)
+            f.write(self._dados)
+
+    @classmethod
+    def abrir(cls, caminho: str) -> Optional[Tuple["FiltroBloom", int, bytes]]:
+        """
+        Lê o filtro, a sua marca e a assinatura do repositório na marca, ou
+        None se ele não existir ou não valer.
+        """
+        try:
+            with open(caminho, "rb") as f:
+                (
+                    magico,
+                    versao,
+                    hashes,
+                    bits,
+                    contagem,
+                    capacidade,
+                    marca,
+                    assinatura,
+                ) = _CABECALHO.unpack(f.read(_CABECALHO.size))
+                dados = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+        if (
+            magico != MAGICO
+            or versao != VERSAO
+            or hashes == 0
+            or len(dados) != (bits + 7) // 8
+        ):
+            return None
+        filtro = cls(bits, hashes, capacidade, contagem, dados)
+        # struct completa a assinatura com zeros até 32 bytes
+        return filtro, marca, assinatura.rstrip(b"\0")
+
+
+class GuardaDuplicadosBloom(GuardaDuplicadosInterface):
+    """
+    Guarda de duplicados com filtro de Bloom sobre os emails cadastrados.
+
+    O repositório precisa oferecer ``marca_emails()`` (até onde ele vai
+    agora) e ``emails(desde)`` (os emails gravados depois de uma marca).
+    Se a marca for uma posição que volta a valer depois de uma compactação
+    (como no repositório em arquivo), o repositório oferece também
+    ``assinatura_emails(marca)``. Emails gravados por outros processos
+    entram no filtro ao reabri-lo ou com ``sincronizar``.
+
+    Quando o filtro passa da capacidade, a taxa de falsos positivos sobe:
+    ele é reconstruído com o dobro da capacidade.
+    """
+
+    def __init__(
+        self,
+        repositorio: ClienteRepositoryInterface,
+        filtro_file: Optional[str] = None,
+        capacidade: int = 1_000_000,
+        taxa_falsos: float = 0.01,
+    ):
+        if not callable(getattr(repositorio, "emails", None)) or not callable(
+            getattr(repositorio, "marca_emails", None)
+        ):
+            raise ValueError("O repositório não permite listar os emails")
+        if filtro_file is None:
+            filtro_file = f"{repositorio.filepath}.bloom"
+        self.repositorio = repositorio
+        self.filtro_file = filtro_file
+        self.capacidade = capacidade
+        self.taxa_falsos = taxa_falsos
+        self._filtro: Optional[FiltroBloom] = None
+        self._marca = 0
+        self._assinatura = b""
+        self._trava = threading.Lock()
+
+    def existe(self, email: str) -> bool:
+        """Confere no repositório só os emails que o filtro não descarta."""
+        with self._trava:
+            self._carregar()
+            if not self._filtro.contem(email):
+                return False
+        return self.repositorio.buscar_por_email(email) is not None
+
+    def registrar(self, emails: Iterable[str]) -> None:
+        """Adiciona ao filtro emails recém-cadastrados."""
+        with self._trava:
+            self._carregar()
+            for email in emails:
+                self._filtro.adicionar(email)
+            if self._filtro.contagem > self._filtro.capacidade:
+                self._reconstruir(2 * self._filtro.capacidade)
+
+    def sincronizar(self) -> None:
+        """Acrescenta ao filtro os emails gravados no repositório por fora."""
+        with self._trava:
+            self._carregar()
+            self._acrescentar_novos()
+
+    def salvar_filtro(self) -> None:
+        """Grava o filtro ao lado do arquivo do repositório."""
+        with self._trava:
+            if self._filtro is not None:
+                self._filtro.gravar(self.filtro_file, self._marca, self._assinatura)
+
+    def fechar(self) -> None:
+        """Grava o filtro e o libera da memória."""
+        self.salvar_filtro()
+        with self._trava:
+            self._filtro, self._marca = None, 0
+
+    def _carregar(self) -> None:
+        """Abre o filtro gravado ou o reconstrói a partir do repositório."""
+        if self._filtro is not None:
+            return
+        aberto = FiltroBloom.abrir(self.filtro_file)
+        if (
+            aberto is None
+            or aberto[1] > self.repositorio.marca_emails()
+            or aberto[2] != self._assinatura_repositorio(aberto[1])
+        ):
+            # Sem filtro, ou o repositório encolheu ou foi reescrito
+            self._reconstruir(self.capacidade)
+            return
+        self._filtro, self._marca, self._assinatura = aberto
+        self._acrescentar_novos()
+
+    def _acrescentar_novos(self) -> None:
+        """Acrescenta os emails gravados depois da marca do filtro."""
+        # A marca vem antes da leitura: o que for gravado durante a leitura
+        # é relido da próxima vez (um email a mais no filtro não faz mal)
+        marca = self.repositorio.marca_emails()
+        if marca < self._marca or (
+            self._assinatura != self._assinatura_repositorio(self._marca)
+        ):
+            # O repositório foi compactado: as posições mudaram, e ler a
+            # partir da marca antiga pularia emails
+            self._reconstruir(self.capacidade)
+        elif marca > self._marca:
+            self._filtro.adicionar_varios(self.repositorio.emails(self._marca))
+            self._marca = marca
+            self._assinatura = self._assinatura_repositorio(marca)
+
+    def _assinatura_repositorio(self, marca: int) -> bytes:
+        """Assinatura do repositório na marca (vazia se ele não oferecer)."""
+        funcao = getattr(self.repositorio, "assinatura_emails", None)
+        return funcao(marca) if callable(funcao) else b""
+
+    def _reconstruir(self, capacidade: int) -> None:
+        """Monta o filtro com uma leitura dos emails do repositório."""
+        self._filtro = FiltroBloom.para_capacidade(capacidade, self.taxa_falsos)
+        self._marca, self._assinatura = 0, self._assinatura_repositorio(0)
+        self._acrescentar_novos()
+        if self._filtro.contagem > capacidade:
+            # A capacidade configurada era pequena para o repositório
+            self._reconstruir(2 * self._filtro.contagem)
+            return
+        self._filtro.gravar(self.filtro_file, self._marca, self._assinatura)
@@ -0,0 +1,266 @@
+"""
+Índice de emails por domínio (arquivo ``.dom`` ao lado do arquivo de dados).
+
+Cada email vira a chave ``domínio invertido@parte local`` (ex:
+``ana@transportadora.com.br`` vira ``br.com.transportadora@ana``), e as
+chaves ficam em ordem. Assim, os clientes de um domínio (e os de um prefixo
+da parte local dentro dele) ocupam uma faixa contínua do índice, e os
+subdomínios (``br.com.transportadora.sul@...``) ficam logo antes dela. Uma
+consulta é uma busca binária mais a leitura da faixa: O(log n + k).
+
+O arquivo tem um cabeçalho fixo, os deslocamentos das chaves, as posições
+das linhas e as chaves concatenadas (UTF-8). Ele é aberto com ``mmap``,
+como o índice de emails, com o mesmo ``checkpoint`` e a mesma assinatura.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .indice import assinatura, escrita_atomica
+
+MAGICO = b"PBDX"
+VERSAO = 1
+
+# magico, versao, entradas, checkpoint, bytes das chaves, assinatura (64 bytes)
+_CABECALHO = struct.Struct("<4sIQQQ32s")
+
+# Entradas convertidas por vez ao percorrer uma faixa
+_BLOCO = 65_536
+
+ParDominio = Tuple[bytes, int]
+
+
+def inverter_dominio(dominio: str) -> str:
+    """Domínio com os rótulos invertidos (ex: ``br.com.transportadora``)."""
+    return ".".join(reversed(dominio.lower().split(".")))
+
+
+def chave_dominio(email: str) -> Optional[bytes]:
+    """Chave do email no índice, ou None se ele não tiver domínio."""
+    local, arroba, dominio = email.rpartition("@")
+    if not arroba or not dominio:
+        return None
+    return f"{inverter_dominio(dominio)}@{local}".encode("utf-8")
+
+
+def sucessor(prefixo: bytes) -> Optional[bytes]:
+    """Menor chave maior que todas as que começam com o prefixo."""
+    # Chaves UTF-8 não têm o byte 0xff
+    prefixo = prefixo.rstrip(b"\xff")
+    if not prefixo:
+        return None
+    return prefixo[:-1] + bytes((prefixo[-1] + 1,))
+
+
+def _percorrer(
+    deslocamentos: np.ndarray, posicoes: np.ndarray, chaves, inicio: int, fim: int
+) -> Iterator[ParDominio]:
+    for bloco in range(inicio, fim, _BLOCO):
+        ate = min(bloco + _BLOCO, fim)
+        limites = deslocamentos[bloco : ate + 1].tolist()
+        for i, posicao in enumerate(posicoes[bloco:ate].tolist()):
+            yield bytes(chaves[limites[i] : limites[i + 1]]), posicao
+
+
+def _fundir(base: Iterator[ParDominio], recentes: List[ParDominio]):
+    """Junta duas sequências ordenadas; na mesma chave, vale a da base."""
+    i = 0
+    for chave, posicao in base:
+        while i < len(recentes) and recentes[i][0] < chave:
+            yield recentes[i]
+            i += 1
+        if i < len(recentes) and recentes[i][0] == chave:
+            i += 1
+        yield chave, posicao
+    yield from recentes[i:]
+
+
+class IndiceDominiosSidecar:
+    """Parte persistente do índice de domínios (somente leitura)."""
+
+    def __init__(
+        self,
+        deslocamentos: np.ndarray,
+        posicoes: np.ndarray,
+        chaves,
+        checkpoint: int,
+        mapa=None,
+    ):
+        self._deslocamentos = deslocamentos
+        self._posicoes = posicoes
+        self._chaves = chaves
+        self._mapa = mapa
+        self.checkpoint = checkpoint
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    def chave(self, i: int) -> bytes:
+        """Chave da entrada ``i``."""
+        inicio, fim = self._deslocamentos[i : i + 2].tolist()
+        return bytes(self._chaves[inicio:fim])
+
+    def limite(self, chave: Optional[bytes]) -> int:
+        """Primeira entrada com chave maior ou igual (fim para None)."""
+        if chave is None:
+            return len(self)
+        baixo, alto = 0, len(self)
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self.chave(meio) < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        return baixo
+
+    def pares(self, inicio: int = 0, fim: Optional[int] = None) -> Iterator[ParDominio]:
+        """
+        Percorre as entradas ``[inicio, fim)`` em ordem de chave.
+
+        O percurso guarda o mapeamento: ele continua valendo mesmo depois
+        de ``fechar``.
+        """
+        fim = len(self) if fim is None else fim
+        return _percorrer(
+            self._deslocamentos, self._posicoes, self._chaves, inicio, fim
+        )
+
+    @classmethod
+    def abrir(
+        cls, caminho: str, data_filepath: str
+    ) -> Optional["IndiceDominiosSidecar"]:
+        """Abre o índice, ou retorna None se ele não existir ou não valer."""
+        try:
+            with open(caminho, "rb") as f:
+                magico, versao, total, checkpoint, tamanho_chaves, marca = (
+                    _CABECALHO.unpack(f.read(_CABECALHO.size))
+                )
+                tamanho = os.fstat(f.fileno()).st_size
+                if (
+                    magico != MAGICO
+                    or versao != VERSAO
+                    or tamanho != _CABECALHO.size + 16 * total + 8 + tamanho_chaves
+                    or os.path.getsize(data_filepath) < checkpoint
+                    or assinatura(data_filepath, checkpoint) != marca
+                ):
+                    return None
+                if total == 0:
+                    vazio = np.zeros(1, dtype="<u8")
+                    return cls(vazio, vazio[:0], b"", checkpoint)
+                mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, struct.error):
+            return None
+        inicio = _CABECALHO.size
+        deslocamentos = np.frombuffer(mapa, "<u8", total + 1, inicio)
+        inicio += 8 * (total + 1)
+        posicoes = np.frombuffer(mapa, "<u8", total, inicio)
+        inicio += 8 * total
+        chaves = memoryview(mapa)[inicio : inicio + tamanho_chaves]
+        return cls(deslocamentos, posicoes, chaves, checkpoint, mapa)
+
+    @staticmethod
+    def gravar(
+        caminho: str,
+        data_filepath: str,
+        pares: List[ParDominio],
+        checkpoint: int,
+    ) -> None:
+        """Grava pares já ordenados e sem chaves repetidas (escrita atômica)."""
+        chaves = [chave for chave, _ in pares]
+        deslocamentos = np.zeros(len(chaves) + 1, dtype="<u8")
+        np.cumsum([len(chave) for chave in chaves], out=deslocamentos[1:])
+        posicoes = np.fromiter(
+            (posicao for _, posicao in pares), dtype="<u8", count=len(pares)
+        )
+        cabecalho = _CABECALHO.pack(
+            MAGICO,
+            VERSAO,
+            len(pares),
+            checkpoint,
+            int(deslocamentos[-1]),
+            assinatura(data_filepath, checkpoint),
+        )
+        with escrita_atomica(caminho) as f:
+            f.write(cabecalho)
+            f.write(deslocamentos.tobytes())
+            f.write(posicoes.tobytes())
+            f.write(b"".join(chaves))
+
+    def fechar(self) -> None:
+        """Libera o mapeamento do arquivo."""
+        self._deslocamentos = np.zeros(1, dtype="<u8")
+        self._posicoes = self._deslocamentos[:0]
+        self._chaves = b""
+        if self._mapa is not None:
+            mapa, self._mapa = self._mapa, None
+            try:
+                mapa.close()
+            except BufferError:
+                # Ainda há faixas sendo percorridas; o GC libera o mapa
+                pass
+
+
+class IndiceDominios:
+    """
+    Índice de domínios: a parte persistente mais as chaves acrescentadas
+    depois do seu checkpoint, em um dicionário. Como no índice de emails,
+    vale a primeira posição de cada email.
+    """
+
+    def __init__(self, base: Optional[IndiceDominiosSidecar] = None):
+        self.base = base
+        self.checkpoint = 0 if base is None else base.checkpoint
+        self.recentes: Dict[bytes, int] = {}
+        self._ordenadas: Optional[List[ParDominio]] = None
+
+    def adicionar(self, email: str, posicao: int) -> None:
+        """Acrescenta a linha de um email (ignorada se o email já existir)."""
+        chave = chave_dominio(email)
+        if chave is not None and chave not in self.recentes:
+            self.recentes[chave] = posicao
+            self._ordenadas = None
+
+    def faixa(self, prefixo: bytes) -> Iterator[ParDominio]:
+        """
+        Pares ``(chave, posição)`` das chaves que começam com o prefixo, em
+        ordem de chave.
+
+        As chaves recentes são copiadas na chamada; a parte persistente é
+        lida sob demanda e não muda enquanto a faixa é percorrida.
+        """
+        fim = sucessor(prefixo)
+        if self._ordenadas is None:
+            self._ordenadas = sorted(self.recentes.items())
+        ordenadas = self._ordenadas
+        # (chave,) vem antes de todo par (chave, posição)
+        inicio = bisect.bisect_left(ordenadas, (prefixo,))
+        ate = len(ordenadas) if fim is None else bisect.bisect_left(ordenadas, (fim,))
+        recentes = ordenadas[inicio:ate]
+        if self.base is None:
+            return iter(recentes)
+        base = self.base.pares(self.base.limite(prefixo), self.base.limite(fim))
+        return _fundir(base, recentes)
+
+    def gravar(self, caminho: str, data_filepath: str, checkpoint: int):
+        """Funde as partes, grava o índice e o retorna reaberto."""
+        pares = list(self.base.pares()) if self.base is not None else []
+        pares.extend(self.recentes.items())
+        # Ordenação estável: na mesma chave, a da base (gravada antes) vem antes
+        pares.sort(key=lambda par: par[0])
+        unicos = [
+            par for i, par in enumerate(pares) if i == 0 or pares[i - 1][0] != par[0]
+        ]
+        if self.base is not None:
+            self.base.fechar()
+        IndiceDominiosSidecar.gravar(caminho, data_filepath, unicos, checkpoint)
+        return IndiceDominios(IndiceDominiosSidecar.abrir(caminho, data_filepath))
+
+    def fechar(self) -> None:
+        """Libera a parte persistente."""
+        if self.base is not None:
+            self.base.fechar()
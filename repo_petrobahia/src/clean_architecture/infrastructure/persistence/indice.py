@@ -0,0 +1,231 @@
+"""
+Índice de emails persistente (arquivo ``.idx`` ao lado do arquivo de dados).
+
+O índice é um array de entradas ``(hash do email, posição da linha)``
+ordenado por hash (e por posição, entre hashes iguais), precedido de um
+cabeçalho fixo. Ele é aberto com ``mmap``: abrir um índice de milhões de
+clientes não lê o arquivo, e cada busca é uma busca binária que toca
+poucas páginas.
+
+O cabeçalho guarda o ``checkpoint`` (quantos bytes do arquivo de dados o
+índice cobre) e uma assinatura dos bytes do arquivo de dados logo antes do
+checkpoint, para detectar um arquivo de dados reescrito.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from ...domain.value_objects import normalizar_cnpj
+
+MAGICO = b"PBIX"
+VERSAO = 1
+
+# magico, versao, entradas, checkpoint, assinatura (64 bytes, alinhado)
+_CABECALHO = struct.Struct("<4sIQQ32s8x")
+
+ENTRADA = np.dtype([("hash", "<u8"), ("posicao", "<u8")])
+ENTRADA_PAR = np.dtype([("chave", "<u8"), ("posicao", "<u8")])
+
+# Bytes do arquivo de dados cobertos pela assinatura
+_TRECHO_ASSINATURA = 4096
+
+
+def hash_email(email: str) -> int:
+    """Hash estável de 64 bits do email."""
+    digest = hashlib.blake2b(email.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def chave_cnpj(cnpj: str) -> Optional[int]:
+    """Chave inteira do CNPJ normalizado, ou None se ele não for numérico."""
+    normalizado = normalizar_cnpj(cnpj)
+    return None if normalizado is None else int(normalizado)
+
+
+@contextmanager
+def escrita_atomica(caminho: str) -> Iterator:
+    """
+    Abre um arquivo temporário para escrita e, no fim do bloco, o grava no
+    disco e o troca por ``caminho`` (``os.replace``).
+
+    O temporário tem o processo e a thread no nome: gravações do mesmo
+    arquivo por processos diferentes não se atrapalham, e vale a última.
+    """
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporario, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def assinatura(data_filepath: str, checkpoint: int) -> bytes:
+    """Assinatura dos últimos bytes do arquivo de dados antes do checkpoint."""
+    inicio = max(checkpoint - _TRECHO_ASSINATURA, 0)
+    with open(data_filepath, "rb") as f:
+        f.seek(inicio)
+        trecho = f.read(checkpoint - inicio)
+    return hashlib.blake2b(trecho, digest_size=32).digest()
+
+
+class IndiceSidecar:
+    """Índice persistente aberto em memória (somente leitura)."""
+
+    def __init__(self, entradas: np.ndarray, checkpoint: int, mapa=None):
+        self._entradas = entradas
+        self._hashes = entradas["hash"]
+        self._mapa = mapa
+        self.checkpoint = checkpoint
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    @classmethod
+    def abrir(cls, caminho: str, data_filepath: str) -> Optional["IndiceSidecar"]:
+        """
+        Abre o índice, ou retorna None se ele não existir ou não valer.
+
+        O índice não vale se estiver corrompido, se o arquivo de dados for
+        menor que o checkpoint ou se os bytes antes do checkpoint mudaram.
+        """
+        try:
+            with open(caminho, "rb") as f:
+                magico, versao, total, checkpoint, marca = _CABECALHO.unpack(
+                    f.read(_CABECALHO.size)
+                )
+                tamanho = os.fstat(f.fileno()).st_size
+                if (
+                    magico != MAGICO
+                    or versao != VERSAO
+                    or tamanho != _CABECALHO.size + total * ENTRADA.itemsize
+                    or os.path.getsize(data_filepath) < checkpoint
+                    or assinatura(data_filepath, checkpoint) != marca
+                ):
+                    return None
+                if total == 0:
+                    return cls(np.empty(0, dtype=ENTRADA), checkpoint)
+                mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, struct.error):
+            return None
+        entradas = np.frombuffer(
+            mapa, dtype=ENTRADA, count=total, offset=_CABECALHO.size
+        )
+        return cls(entradas, checkpoint, mapa)
+
+    @staticmethod
+    def gravar(
+        caminho: str,
+        data_filepath: str,
+        entradas: np.ndarray,
+        checkpoint: int,
+    ) -> None:
+        """Grava o índice (escrita atômica com ``os.replace``)."""
+        # lexsort é bem mais rápido que np.sort(order=...) em arrays estruturados
+        entradas = entradas[np.lexsort((entradas["posicao"], entradas["hash"]))]
+        cabecalho = _CABECALHO.pack(
+            MAGICO,
+            VERSAO,
+            len(entradas),
+            checkpoint,
+            assinatura(data_filepath, checkpoint),
+        )
+        with escrita_atomica(caminho) as f:
+            f.write(cabecalho)
+            f.write(entradas.astype(ENTRADA, copy=False).tobytes())
+
+    def entradas(self) -> np.ndarray:
+        """Cópia das entradas do índice."""
+        return np.array(self._entradas)
+
+    def posicoes(self, h: int) -> np.ndarray:
+        """Posições das linhas com o hash ``h``, em ordem crescente."""
+        h = np.uint64(h)
+        inicio = int(np.searchsorted(self._hashes, h, side="left"))
+        fim = inicio
+        while fim < len(self._hashes) and self._hashes[fim] == h:
+            fim += 1
+        return self._entradas["posicao"][inicio:fim]
+
+    def contem(self, hashes: np.ndarray) -> np.ndarray:
+        """Máscara dos hashes que estão no índice."""
+        if not len(self._hashes):
+            return np.zeros(len(hashes), dtype=bool)
+        i = np.searchsorted(self._hashes, hashes)
+        return self._hashes[np.minimum(i, len(self._hashes) - 1)] == hashes
+
+    def fechar(self) -> None:
+        """Libera o mapeamento do arquivo."""
+        self._entradas = np.empty(0, dtype=ENTRADA)
+        self._hashes = self._entradas["hash"]
+        if self._mapa is not None:
+            mapa, self._mapa = self._mapa, None
+            try:
+                mapa.close()
+            except BufferError:
+                # Ainda há arrays apontando para o mapa; o GC o libera
+                pass
+
+
+class IndiceOrdenado:
+    """
+    Índice em memória ``chave inteira -> posição``, com a primeira posição
+    de cada chave.
+
+    As chaves ficam em dois arrays ordenados (16 bytes por chave, contra
+    cerca de 100 de um dicionário) mais um dicionário com as chaves
+    acrescentadas depois da montagem. Quando o dicionário passa de
+    ``limite_recentes`` chaves, ele é fundido nos arrays.
+    """
+
+    def __init__(self, limite_recentes: int = 100_000):
+        self.limite_recentes = limite_recentes
+        self._chaves = np.empty(0, dtype=np.uint64)
+        self._posicoes = np.empty(0, dtype=np.uint64)
+        self._recentes: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._chaves) + len(self._recentes)
+
+    def adicionar_varios(self, chaves: np.ndarray, posicoes: np.ndarray) -> None:
+        """Acrescenta chaves em ordem de posição (posições crescentes)."""
+        recentes = np.fromiter(self._recentes.items(), dtype=ENTRADA_PAR)
+        chaves = np.concatenate([self._chaves, recentes["chave"], chaves])
+        posicoes = np.concatenate([self._posicoes, recentes["posicao"], posicoes])
+        ordem = np.lexsort((posicoes, chaves))
+        chaves, posicoes = chaves[ordem], posicoes[ordem]
+        # Depois da ordenação, a primeira de cada chave tem a menor posição
+        unicas, primeiras = np.unique(chaves, return_index=True)
+        self._chaves, self._posicoes = unicas, posicoes[primeiras]
+        self._recentes = {}
+
+    def adicionar(self, chave: int, posicao: int) -> None:
+        """Acrescenta uma chave (ignorada se já estiver no índice)."""
+        if self._na_base(chave) is None:
+            self._recentes.setdefault(chave, posicao)
+            if len(self._recentes) > self.limite_recentes:
+                self.adicionar_varios(
+                    np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64)
+                )
+
+    def posicao(self, chave: int) -> Optional[int]:
+        """Primeira posição da chave, ou None se ela não estiver no índice."""
+        posicao = self._na_base(chave)
+        return self._recentes.get(chave) if posicao is None else posicao
+
+    def _na_base(self, chave: int) -> Optional[int]:
+        i = int(np.searchsorted(self._chaves, np.uint64(chave)))
+        if i < len(self._chaves) and self._chaves[i] == chave:
+            return int(self._posicoes[i])
+        return None
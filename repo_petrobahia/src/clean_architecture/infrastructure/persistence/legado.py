@@ -0,0 +1,100 @@
+"""
+Leitura dos arquivos de clientes do sistema legado.
+
+O ``cadastrar_cliente`` legado e o ``ClienteFileRepository`` de
+``petrobahia.clientes`` gravam uma linha ``str(dict)`` por cliente, como::
+
+    {'nome': 'Ana Paula', 'email': 'ana@petrobahia.com', 'cnpj': '123'}
+
+As linhas são lidas por expressões regulares compiladas, bem mais rápido
+que um ``ast.literal_eval`` por linha: uma só expressão para o formato mais
+comum (as três chaves nessa ordem, com textos simples) e, para as demais,
+um ``fullmatch`` que valida a linha inteira e um ``findall`` que extrai os
+pares. Só linhas com escapes (``\\``), raras, passam pelo
+``ast.literal_eval``.
+"""
+
+import ast
+import re
+from typing import Dict, Iterator, Optional, Tuple
+
+from ...domain.repositories import FonteClientesInterface
+
+# Valores que o legado grava: texto (repr com aspas simples ou duplas),
+# inteiros e None
+_TEXTO = r"'([^'\\]*)'|\"([^\"\\]*)\""
+_VALOR = rf"{_TEXTO}|(-?\d+)|(None)"
+_PAR = rf"(?:{_TEXTO}): (?:{_VALOR})"
+_LINHA = re.compile(rf"\{{(?:{_PAR}(?:, {_PAR})*)?\}}")
+_PARES = re.compile(_PAR)
+_COMUM = re.compile(
+    r"\{'nome': '([^'\\]*)', 'email': '([^'\\]*)', 'cnpj': '([^'\\]*)'\}"
+)
+
+# Buffer de leitura do arquivo legado
+TAMANHO_BUFFER = 1 << 20
+
+
+def ler_linha_legado(linha: str) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Converte uma linha ``str(dict)`` em dicionário de textos.
+
+    Inteiros viram texto e ``None`` é mantido. Retorna None se a linha não
+    for um dicionário de valores simples.
+    """
+    comum = _COMUM.fullmatch(linha)
+    if comum is not None:
+        nome, email, cnpj = comum.groups()
+        return {"nome": nome, "email": email, "cnpj": cnpj}
+    if _LINHA.fullmatch(linha) is not None:
+        return {
+            chave or chave2: None if nulo else (inteiro or texto or texto2)
+            for chave, chave2, texto, texto2, inteiro, nulo in _PARES.findall(linha)
+        }
+    if "\\" not in linha:
+        return None
+    return _ler_com_escapes(linha)
+
+
+def _ler_com_escapes(linha: str) -> Optional[Dict[str, Optional[str]]]:
+    """Lê uma linha com escapes pelo ``ast.literal_eval``."""
+    try:
+        valor = ast.literal_eval(linha)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+    if not isinstance(valor, dict):
+        return None
+    dados = {}
+    for chave, item in valor.items():
+        if not isinstance(chave, str) or not (
+            item is None or isinstance(item, (str, int))
+        ):
+            return None
+        dados[chave] = item if item is None or isinstance(item, str) else str(item)
+    return dados
+
+
+class LeitorClientesLegado(FonteClientesInterface):
+    """Fonte de clientes lida de um arquivo ``str(dict)`` do legado."""
+
+    def __init__(self, filepath: str = "clientes.txt"):
+        self.filepath = filepath
+
+    def registros(
+        self, inicio: int = 0
+    ) -> Iterator[Tuple[int, Optional[Dict[str, Optional[str]]]]]:
+        """Lê as linhas a partir do byte ``inicio``; pula linhas vazias."""
+        with open(self.filepath, "rb", buffering=TAMANHO_BUFFER) as f:
+            f.seek(inicio)
+            posicao = inicio
+            for linha in f:
+                posicao += len(linha)
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    texto = linha.decode("utf-8")
+                except UnicodeDecodeError:
+                    yield posicao, None
+                    continue
+                yield posicao, ler_linha_legado(texto)
@@ -0,0 +1,374 @@
+"""Repositório de clientes em SQLite."""
+
+import json
+import sqlite3
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from ...domain.entities import Cliente
+from ...domain.repositories import ClienteRepositoryInterface
+from .dominios import chave_dominio, inverter_dominio, sucessor
+from .indice import chave_cnpj
+from .trigramas import IndiceTrigramas, trigramas
+
+# Com AUTOINCREMENT, o id de um cliente removido nunca volta a ser usado: o
+# maior id já dado (``sqlite_sequence``) só cresce e serve de marca
+_CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS {tabela} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome TEXT NOT NULL,
+    email TEXT NOT NULL,
+    cnpj TEXT NOT NULL,
+    cnpj_chave INTEGER,
+    dominio_chave BLOB
+)
+"""
+_CRIAR_INDICE = "CREATE UNIQUE INDEX IF NOT EXISTS clientes_email ON clientes (email)"
+_CRIAR_INDICE_CNPJ = "CREATE INDEX IF NOT EXISTS clientes_cnpj ON clientes (cnpj_chave)"
+_CRIAR_INDICE_DOMINIO = (
+    "CREATE INDEX IF NOT EXISTS clientes_dominio ON clientes (dominio_chave)"
+)
+
+# Clientes com o nome trocado, para o índice de nomes em memória; o
+# gatilho vale para qualquer conexão que grave no banco
+_CRIAR_ALTERACOES = """
+CREATE TABLE IF NOT EXISTS clientes_alteracoes (
+    id INTEGER PRIMARY KEY,
+    cliente_id INTEGER NOT NULL
+)
+"""
+_CRIAR_GATILHO_NOME = """
+CREATE TRIGGER IF NOT EXISTS clientes_nome_alterado
+AFTER UPDATE OF nome ON clientes WHEN NEW.nome IS NOT OLD.nome
+BEGIN
+    INSERT INTO clientes_alteracoes (cliente_id) VALUES (NEW.id);
+END
+"""
+
+# Bancos criados antes das colunas cnpj_chave e dominio_chave, ou sem
+# AUTOINCREMENT (a tabela é recriada, com os mesmos ids)
+_SQL_TABELA = "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'clientes'"
+_COPIAR_TABELA = (
+    "INSERT INTO clientes_nova (id, nome, email, cnpj, cnpj_chave, dominio_chave)"
+    " SELECT id, nome, email, cnpj, cnpj_chave, dominio_chave FROM clientes"
+)
+_APAGAR_TABELA = "DROP TABLE clientes"
+_RENOMEAR_TABELA = "ALTER TABLE clientes_nova RENAME TO clientes"
+_COLUNAS = "PRAGMA table_info(clientes)"
+_ADICIONAR_CHAVE_CNPJ = "ALTER TABLE clientes ADD COLUMN cnpj_chave INTEGER"
+_LISTAR_CNPJS = "SELECT id, cnpj FROM clientes"
+_PREENCHER_CHAVE_CNPJ = "UPDATE clientes SET cnpj_chave = ? WHERE id = ?"
+_ADICIONAR_CHAVE_DOMINIO = "ALTER TABLE clientes ADD COLUMN dominio_chave BLOB"
+_LISTAR_EMAILS_TODOS = "SELECT id, email FROM clientes"
+_PREENCHER_CHAVE_DOMINIO = "UPDATE clientes SET dominio_chave = ? WHERE id = ?"
+
+# Como no arquivo, vale o primeiro cadastro de cada email
+_INSERIR = (
+    "INSERT OR IGNORE INTO clientes (nome, email, cnpj, cnpj_chave, dominio_chave)"
+    " VALUES (?, ?, ?, ?, ?)"
+)
+_ATUALIZAR = "UPDATE clientes SET nome = ?, cnpj = ?, cnpj_chave = ? WHERE email = ?"
+_REMOVER = "DELETE FROM clientes WHERE email = ?"
+_BUSCAR = "SELECT nome, email, cnpj FROM clientes WHERE email = ?"
+_BUSCAR_CNPJ = (
+    "SELECT nome, email, cnpj FROM clientes WHERE cnpj_chave = ? ORDER BY id LIMIT 1"
+)
+_MARCA = "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'clientes'"
+_LISTAR_EMAILS = "SELECT id, email FROM clientes WHERE id > ? ORDER BY id LIMIT ?"
+_BUSCAR_DOMINIO = (
+    "SELECT nome, email, cnpj, dominio_chave FROM clientes"
+    " WHERE dominio_chave >= ? AND dominio_chave < ?"
+    " ORDER BY dominio_chave LIMIT ?"
+)
+_MARCA_ALTERACOES = "SELECT COALESCE(MAX(id), 0) FROM clientes_alteracoes"
+_LISTAR_ALTERACOES = (
+    "SELECT id, cliente_id FROM clientes_alteracoes WHERE id > ? ORDER BY id"
+)
+_LISTAR_NOMES = "SELECT id, nome FROM clientes WHERE id > ? ORDER BY id"
+_NOMES_DOS_IDS = (
+    "SELECT id, nome FROM clientes WHERE id IN (SELECT value FROM json_each(?))"
+)
+_CLIENTES_DOS_IDS = (
+    "SELECT id, nome, email, cnpj FROM clientes"
+    " WHERE id IN (SELECT value FROM json_each(?))"
+)
+
+# Emails lidos por consulta em ``emails``
+_BLOCO_EMAILS = 10_000
+
+
+def _parametros(
+    cliente: Cliente,
+) -> Tuple[str, str, str, Optional[int], Optional[bytes]]:
+    """Parâmetros de ``_INSERIR`` para o cliente."""
+    return (
+        cliente.nome,
+        cliente.email,
+        cliente.cnpj,
+        chave_cnpj(cliente.cnpj),
+        chave_dominio(cliente.email),
+    )
+
+
+class ClienteSQLiteRepository(ClienteRepositoryInterface):
+    """
+    Implementação de repositório que salva clientes em SQLite.
+
+    O banco usa WAL (leituras não esperam escritas) e um índice único no
+    email. As instruções SQL são constantes, preparadas uma vez e
+    reaproveitadas pelo cache de instruções do ``sqlite3``. ``salvar_lote``
+    grava muitos clientes com um ``executemany`` em uma única transação.
+
+    Um email repetido não gera erro: como no repositório em arquivo, vale
+    o primeiro cadastro. ``atualizar`` e ``remover`` alteram a linha do
+    email.
+
+    ``buscar_por_cnpj`` usa um índice na coluna ``cnpj_chave`` (o CNPJ
+    normalizado como inteiro, ver ``chave_cnpj``) e ``buscar_por_dominio``
+    um índice na coluna ``dominio_chave`` (ver ``chave_dominio``).
+    Bancos criados sem essas colunas são preenchidos ao abrir.
+
+    ``buscar_por_nome`` usa, como o repositório em arquivo, um
+    ``IndiceTrigramas`` em memória, montado na primeira busca. A cada
+    busca, entram os clientes com id acima do último indexado e os que
+    aparecem em ``clientes_alteracoes`` (nome trocado, por esta ou outra
+    conexão). Um cliente trocado continua no índice com o nome antigo, e
+    um removido também: cada resultado é conferido com o cliente atual.
+    """
+
+    def __init__(self, filepath: str = "clientes_clean_arch.sqlite3"):
+        self.filepath = filepath
+        self._trava = threading.Lock()
+        self._nomes: Optional[IndiceTrigramas] = None
+        self._nomes_ate = 0  # Maior id indexado
+        self._alteracoes_ate = 0  # Última alteração lida
+        try:
+            self._conexao = sqlite3.connect(filepath, check_same_thread=False)
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            # Com WAL, NORMAL só perde as últimas transações em queda de energia
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            with self._conexao:
+                # Uma transação só: outro processo abrindo o banco espera
+                self._conexao.execute("BEGIN IMMEDIATE")
+                self._conexao.execute(_CRIAR_TABELA.format(tabela="clientes"))
+                self._migrar_colunas()
+                self._migrar_autoincremento()
+                self._conexao.execute(_CRIAR_INDICE)
+                self._conexao.execute(_CRIAR_ALTERACOES)
+                self._conexao.execute(_CRIAR_GATILHO_NOME)
+                self._conexao.execute(_CRIAR_INDICE_CNPJ)
+                self._conexao.execute(_CRIAR_INDICE_DOMINIO)
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao abrir banco de clientes: {e}")
+
+    def salvar(self, cliente: Cliente) -> None:
+        """Salva o cliente no banco."""
+        try:
+            with self._trava, self._conexao:
+                self._conexao.execute(_INSERIR, _parametros(cliente))
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao salvar cliente: {e}")
+
+    def salvar_lote(self, clientes: Iterable[Cliente]) -> None:
+        """Salva vários clientes em uma única transação."""
+        try:
+            with self._trava, self._conexao:
+                self._conexao.executemany(_INSERIR, map(_parametros, clientes))
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao salvar clientes: {e}")
+
+    def atualizar(self, cliente: Cliente) -> bool:
+        """Substitui o nome e o CNPJ do cliente com o mesmo email."""
+        nome, email, cnpj, chave, _ = _parametros(cliente)
+        try:
+            with self._trava, self._conexao:
+                cursor = self._conexao.execute(_ATUALIZAR, (nome, cnpj, chave, email))
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao atualizar cliente: {e}")
+        return cursor.rowcount > 0
+
+    def remover(self, email: str) -> bool:
+        """Remove o cliente com o email."""
+        try:
+            with self._trava, self._conexao:
+                cursor = self._conexao.execute(_REMOVER, (email,))
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao remover cliente: {e}")
+        return cursor.rowcount > 0
+
+    def buscar_por_email(self, email: str) -> Optional[Cliente]:
+        """Busca um cliente por email pelo índice único."""
+        with self._trava:
+            linha = self._conexao.execute(_BUSCAR, (email,)).fetchone()
+        if linha is None:
+            return None
+        return Cliente(nome=linha[0], email=linha[1], cnpj=linha[2])
+
+    def buscar_por_cnpj(self, cnpj: str) -> Optional[Cliente]:
+        """Busca o primeiro cliente com o CNPJ pelo índice de CNPJs."""
+        chave = chave_cnpj(cnpj)
+        if chave is None:
+            return None
+        with self._trava:
+            linha = self._conexao.execute(_BUSCAR_CNPJ, (chave,)).fetchone()
+        if linha is None:
+            return None
+        return Cliente(nome=linha[0], email=linha[1], cnpj=linha[2])
+
+    def buscar_por_nome(self, consulta: str, limite: int = 10) -> List[Cliente]:
+        """
+        Busca aproximada por nome (partes do nome ou erros de digitação).
+
+        Retorna até ``limite`` clientes, do nome mais parecido com a
+        consulta ao menos (ver ``IndiceTrigramas.buscar``).
+        """
+        if limite <= 0:
+            return []
+        conjunto = trigramas(consulta)
+        with self._trava:
+            self._indexar_nomes()
+            # Entradas com um nome que não é mais o do cliente não contam:
+            # se sobrarem menos de ``limite`` clientes, pede mais resultados
+            pedidos = limite
+            while True:
+                achados = self._nomes.buscar(consulta, pedidos)
+                ids = json.dumps([id_ for _, id_ in achados])
+                linhas = {
+                    linha[0]: linha[1:]
+                    for linha in self._conexao.execute(_CLIENTES_DOS_IDS, (ids,))
+                }
+                clientes, vistos = [], set()
+                for semelhanca, id_ in achados:
+                    linha = linhas.get(id_)
+                    if linha is None or id_ in vistos:
+                        continue
+                    comuns = len(trigramas(linha[0]) & conjunto)
+                    if comuns != round(semelhanca * len(conjunto)):
+                        continue
+                    vistos.add(id_)
+                    clientes.append(
+                        Cliente(nome=linha[0], email=linha[1], cnpj=linha[2])
+                    )
+                    if len(clientes) == limite:
+                        return clientes
+                if len(achados) < pedidos:
+                    return clientes
+                pedidos *= 2
+
+    def buscar_por_dominio(
+        self, dominio: str, prefixo: str = "", subdominios: bool = False
+    ) -> Iterator[Cliente]:
+        """
+        Lista, sob demanda, os clientes com email ``<prefixo>...@<dominio>``.
+
+        Com ``subdominios``, inclui os emails dos subdomínios. Os clientes
+        saem em ordem de domínio invertido e email, como no repositório em
+        arquivo.
+        """
+        raiz = inverter_dominio(dominio).encode("utf-8")
+        local = prefixo.encode("utf-8")
+        if subdominios:
+            # Nos subdomínios, a parte local vem depois de rótulos variáveis
+            for cliente, chave in self._faixa_dominio(raiz + b"."):
+                if chave.split(b"@", 1)[1].startswith(local):
+                    yield cliente
+        for cliente, _ in self._faixa_dominio(raiz + b"@" + local):
+            yield cliente
+
+    def marca_emails(self) -> int:
+        """Maior id gravado (marca para ``emails``)."""
+        with self._trava:
+            return self._conexao.execute(_MARCA).fetchone()[0]
+
+    def emails(self, desde: int = 0) -> Iterator[str]:
+        """Lista os emails dos clientes com id maior que ``desde``."""
+        ultimo = desde
+        while True:
+            # Em blocos, para não prender a conexão durante toda a leitura
+            with self._trava:
+                linhas = self._conexao.execute(
+                    _LISTAR_EMAILS, (ultimo, _BLOCO_EMAILS)
+                ).fetchall()
+            if not linhas:
+                return
+            for _, email in linhas:
+                yield email
+            ultimo = linhas[-1][0]
+
+    def _indexar_nomes(self) -> None:
+        """Põe em dia o índice de nomes (chamado com a trava)."""
+        conexao = self._conexao
+        if self._nomes is None:
+            self._nomes, self._nomes_ate = IndiceTrigramas(), 0
+            self._alteracoes_ate = conexao.execute(_MARCA_ALTERACOES).fetchone()[0]
+        alteracoes = conexao.execute(
+            _LISTAR_ALTERACOES, (self._alteracoes_ate,)
+        ).fetchall()
+        if alteracoes:
+            self._alteracoes_ate = alteracoes[-1][0]
+        indexado_ate = self._nomes_ate
+        alterados = [id_ for _, id_ in alteracoes if id_ <= indexado_ate]
+        if alterados:
+            for id_, nome in conexao.execute(_NOMES_DOS_IDS, (json.dumps(alterados),)):
+                self._nomes.adicionar(nome, id_)
+        for id_, nome in conexao.execute(_LISTAR_NOMES, (indexado_ate,)):
+            self._nomes.adicionar(nome, id_)
+            indexado_ate = id_
+        self._nomes_ate = indexado_ate
+
+    def _faixa_dominio(self, inicio: bytes) -> Iterator[Tuple[Cliente, bytes]]:
+        """Clientes com ``dominio_chave`` começando por ``inicio``, em blocos."""
+        # Chaves UTF-8 não têm o byte 0xff
+        fim = sucessor(inicio) or b"\xff"
+        while True:
+            # Em blocos, para não prender a conexão durante toda a leitura
+            with self._trava:
+                linhas = self._conexao.execute(
+                    _BUSCAR_DOMINIO, (inicio, fim, _BLOCO_EMAILS)
+                ).fetchall()
+            if not linhas:
+                return
+            for nome, email, cnpj, chave in linhas:
+                yield Cliente(nome=nome, email=email, cnpj=cnpj), chave
+            # Menor chave depois da última lida
+            inicio = linhas[-1][3] + b"\x00"
+
+    def _migrar_colunas(self) -> None:
+        """Cria e preenche as colunas de busca em bancos antigos."""
+        colunas = {linha[1] for linha in self._conexao.execute(_COLUNAS)}
+        if "cnpj_chave" not in colunas:
+            self._conexao.execute(_ADICIONAR_CHAVE_CNPJ)
+            self._conexao.executemany(
+                _PREENCHER_CHAVE_CNPJ,
+                (
+                    (chave_cnpj(cnpj), id_)
+                    for id_, cnpj in self._conexao.execute(_LISTAR_CNPJS).fetchall()
+                ),
+            )
+        if "dominio_chave" not in colunas:
+            self._conexao.execute(_ADICIONAR_CHAVE_DOMINIO)
+            self._conexao.executemany(
+                _PREENCHER_CHAVE_DOMINIO,
+                (
+                    (chave_dominio(email), id_)
+                    for id_, email in self._conexao.execute(
+                        _LISTAR_EMAILS_TODOS
+                    ).fetchall()
+                ),
+            )
+
+    def _migrar_autoincremento(self) -> None:
+        """Recria sem perder os ids a tabela de bancos criados sem AUTOINCREMENT."""
+        sql = self._conexao.execute(_SQL_TABELA).fetchone()[0]
+        if "AUTOINCREMENT" in sql.upper():
+            return
+        # Os índices e o gatilho da tabela antiga saem com ela
+        self._conexao.execute(_CRIAR_TABELA.format(tabela="clientes_nova"))
+        self._conexao.execute(_COPIAR_TABELA)
+        self._conexao.execute(_APAGAR_TABELA)
+        self._conexao.execute(_RENOMEAR_TABELA)
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._trava:
+            self._conexao.close()
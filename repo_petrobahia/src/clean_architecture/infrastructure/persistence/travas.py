@@ -0,0 +1,48 @@
+"""
+Trava entre processos para as gravações no arquivo de clientes.
+
+A trava é consultiva (``fcntl.flock``): ela só separa os processos que a
+usam, então todos os que gravam no mesmo arquivo precisam usá-la. Ela fica
+em um arquivo ``.lock`` à parte, e não no arquivo de dados, para continuar
+valendo se o arquivo de dados for trocado por outro.
+"""
+
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem travas consultivas
+    fcntl = None
+
+
+class TravaArquivo:
+    """
+    Trava exclusiva entre processos, usada como gerenciador de contexto.
+
+    Cada processo abre o seu próprio descritor: o ``flock`` vale por
+    descritor aberto, e um descritor herdado no ``fork`` seria o mesmo
+    nos dois processos.
+    """
+
+    def __init__(self, caminho: str):
+        if fcntl is None:
+            raise ValueError("Travas entre processos exigem fcntl (Unix)")
+        self.caminho = caminho
+        self._fd = None
+        self._pid = None
+
+    def __enter__(self) -> "TravaArquivo":
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.caminho, os.O_RDWR | os.O_CREAT, 0o666)
+            self._pid = os.getpid()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def fechar(self) -> None:
+        """Fecha o arquivo da trava (no processo que o abriu)."""
+        if self._fd is not None and self._pid == os.getpid():
+            os.close(self._fd)
+        self._fd = self._pid = None
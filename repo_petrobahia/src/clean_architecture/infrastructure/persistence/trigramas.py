@@ -0,0 +1,240 @@
+"""
+Índice de trigramas dos nomes de clientes, para busca aproximada.
+
+O nome é normalizado (minúsculas, sem acentos, só letras e dígitos) e cada
+palavra, com dois espaços antes e um depois, gera os seus trigramas:
+``"ana"`` vira ``"  a"``, ``" an"``, ``"ana"`` e ``"na "``, como no
+``pg_trgm`` do PostgreSQL. Um erro de digitação ("Carlos Slva") só desfaz
+os poucos trigramas em volta dele, e a semelhança de um nome com a consulta
+é a fração dos trigramas da consulta que estão no nome.
+
+Cada trigrama tem uma lista invertida com os números dos nomes que o contêm,
+em um ``array`` de inteiros de 32 bits. Os números crescem com a ordem de
+inclusão, então as listas ficam ordenadas sem nenhum custo e um novo nome
+só acrescenta um item a poucas listas.
+"""
+
+import math
+import re
+import unicodedata
+from array import array
+from typing import Dict, FrozenSet, List, Tuple
+
+import numpy as np
+
+# ``array("I")`` guarda um ``unsigned int`` do C
+_TIPO_NUMERO = np.dtype(np.uintc)
+
+
+def _tabela_sem_acentos() -> Dict[int, str]:
+    """Tabela de ``str.translate`` das letras latinas acentuadas."""
+    tabela = {}
+    for codigo in range(0xC0, 0x250):
+        base = unicodedata.normalize("NFKD", chr(codigo))[0]
+        if base.isascii() and base.isalpha():
+            tabela[codigo] = base
+    return tabela
+
+
+_SEM_ACENTOS = _tabela_sem_acentos()
+
+# Palavras com os trigramas guardados durante a inclusão de nomes
+_MAX_PALAVRAS = 100_000
+
+# Candidatos conferidos por vez na busca (o bloco dobra a cada passo)
+_BLOCO_INICIAL = 1024
+_BLOCO = 65536
+_AMOSTRA = 256
+_SEPARADORES = re.compile(r"[\W_]+")
+
+
+def normalizar_nome(nome: str) -> str:
+    """Nome em minúsculas, sem acentos e com as palavras separadas por espaço."""
+    return _SEPARADORES.sub(" ", nome.translate(_SEM_ACENTOS).lower()).strip()
+
+
+def trigramas(nome: str) -> FrozenSet[str]:
+    """Conjunto de trigramas do nome (ver o início do módulo)."""
+    conjunto = set()
+    for palavra in normalizar_nome(nome).split():
+        palavra = f"  {palavra} "
+        conjunto.update(palavra[i : i + 3] for i in range(len(palavra) - 2))
+    return frozenset(conjunto)
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido ``trigrama -> números dos nomes``, em memória.
+
+    Cada nome incluído recebe um número sequencial, com a posição da sua
+    linha no arquivo e a quantidade de trigramas (usada no desempate).
+    """
+
+    def __init__(self):
+        self._listas: Dict[str, array] = {}
+        self._posicoes = array("Q")
+        self._tamanhos = array("H")
+        self._palavras: Dict[str, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    def adicionar(self, nome: str, posicao: int) -> None:
+        """Inclui o nome da linha em ``posicao``."""
+        numero = len(self._posicoes)
+        conjunto = set()
+        palavras = self._palavras
+        for palavra in normalizar_nome(nome).split():
+            # Nomes repetem muito as mesmas palavras: guarda os trigramas
+            grupo = palavras.get(palavra)
+            if grupo is None:
+                if len(palavras) >= _MAX_PALAVRAS:
+                    palavras.clear()
+                grupo = palavras[palavra] = tuple(trigramas(palavra))
+            conjunto.update(grupo)
+        listas = self._listas
+        for trigrama in conjunto:
+            lista = listas.get(trigrama)
+            if lista is None:
+                lista = listas[trigrama] = array("I")
+            lista.append(numero)
+        self._posicoes.append(posicao)
+        self._tamanhos.append(min(len(conjunto), 0xFFFF))
+
+    def buscar(
+        self, consulta: str, limite: int = 10, semelhanca_minima: float = 0.5
+    ) -> List[Tuple[float, int]]:
+        """
+        Pares ``(semelhança, posição)`` dos ``limite`` nomes mais parecidos
+        com a consulta.
+
+        A semelhança é a fração dos trigramas da consulta que estão no nome
+        (uma consulta parcial, como só o sobrenome, também encontra o nome
+        completo); no empate, vem o nome com menos trigramas (o mais
+        próximo da consulta) e depois o incluído antes. Nomes com semelhança
+        abaixo de ``semelhanca_minima`` ficam de fora.
+
+        Um nome com ``t`` trigramas da consulta está em pelo menos uma das
+        ``n - t + 1`` listas mais curtas, das ``n`` listas não vazias (os
+        trigramas de um erro de digitação costumam não ter nenhum nome). A
+        busca começa com ``t = n`` e diminui ``t`` até achar ``limite``
+        nomes. Em cada passo, os candidatos (os nomes dessas listas, menos
+        os já achados) são conferidos por busca binária nas listas, dos
+        nomes mais curtos aos mais longos; um candidato sai assim que perde
+        mais de ``n - t`` trigramas. Os nomes fora dos passos anteriores têm
+        no máximo ``t_anterior - 1`` trigramas em comum: achados os nomes
+        que faltam com esse máximo, os seguintes (mais longos) não podem
+        passar à frente, e a busca para.
+        """
+        conjunto = trigramas(consulta)
+        if not conjunto or limite <= 0:
+            return []
+        listas = sorted(
+            (
+                np.frombuffer(self._listas[trigrama], _TIPO_NUMERO)
+                for trigrama in conjunto
+                if trigrama in self._listas
+            ),
+            key=len,
+        )
+        n = len(listas)
+        minimo = max(1, math.ceil(semelhanca_minima * len(conjunto) - 1e-9))
+        if n < minimo:
+            return []
+        tamanhos = np.frombuffer(self._tamanhos, np.uint16)
+
+        numeros = np.empty(0, dtype=_TIPO_NUMERO)
+        comuns = np.empty(0, dtype=np.int64)
+        t, teto, passo = n, n, 1
+        while True:
+            candidatos = _uniao(listas[: n - t + 1])
+            if len(numeros):
+                candidatos = candidatos[~_contidos(np.sort(numeros), candidatos)]
+            novos, comuns_novos = self._conferir(
+                candidatos, tamanhos[candidatos], listas, t, teto, limite - len(numeros)
+            )
+            numeros = np.concatenate((numeros, novos))
+            comuns = np.concatenate((comuns, comuns_novos))
+            if len(numeros) >= limite or t == minimo:
+                break
+            # Sem nomes suficientes: desce t cada vez mais rápido
+            t, teto, passo = max(t - passo, minimo), t - 1, 2 * passo
+
+        ordem = np.lexsort((numeros, tamanhos[numeros], -comuns))[:limite]
+        posicoes = np.frombuffer(self._posicoes, np.uint64)[numeros[ordem]]
+        total = len(conjunto)
+        return list(zip((comuns[ordem] / total).tolist(), posicoes.tolist()))
+
+    @staticmethod
+    def _conferir(
+        candidatos: np.ndarray,
+        tamanhos: np.ndarray,
+        listas: List[np.ndarray],
+        t: int,
+        teto: int,
+        limite: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidatos com pelo menos ``t`` trigramas e os trigramas de cada um,
+        até ``limite`` candidatos com ``teto`` (o máximo possível).
+        """
+        total = len(listas)
+        # Confere antes as listas que mais eliminam candidatos, estimadas
+        # por uma amostra (as listas mais curtas costumam ser as da própria
+        # palavra que gerou os candidatos)
+        amostra = candidatos[:: max(1, len(candidatos) // _AMOSTRA)]
+        acertos = [np.count_nonzero(_contidos(numeros, amostra)) for numeros in listas]
+        listas = [listas[i] for i in np.argsort(acertos, kind="stable")]
+
+        # Em vez de ordenar os candidatos pelo tamanho, confere por faixas
+        # de tamanho: ou um tamanho só (em blocos, na ordem de inclusão), ou
+        # vários com menos de ``bloco`` candidatos ao todo
+        acumulados = np.cumsum(np.bincount(tamanhos))
+        achados, comuns = [], []
+        completos, conferidos, bloco = 0, 0, _BLOCO_INICIAL
+        tamanho = -1  # Maior tamanho já conferido
+        while completos < limite and conferidos < len(candidatos):
+            ate = int(np.searchsorted(acumulados, conferidos + bloco))
+            ate = min(ate, len(acumulados) - 1)
+            if ate > tamanho + 1 and acumulados[ate - 1] > conferidos:
+                ate -= 1
+            faixa = candidatos[(tamanhos > tamanho) & (tamanhos <= ate)]
+            for inicio in range(0, len(faixa), bloco):
+                parte = faixa[inicio : inicio + bloco]
+                faltas = np.zeros(len(parte), dtype=np.int64)
+                for numeros in listas:
+                    faltas += ~_contidos(numeros, parte)
+                    vivos = faltas <= total - t
+                    parte, faltas = parte[vivos], faltas[vivos]
+                    if not len(parte):
+                        break
+                achados.append(parte)
+                comuns.append(total - faltas)
+                completos += np.count_nonzero(faltas <= total - teto)
+                if completos >= limite:
+                    break
+            conferidos, tamanho = int(acumulados[ate]), ate
+            bloco = min(2 * bloco, _BLOCO)
+        if not achados:
+            return np.empty(0, dtype=_TIPO_NUMERO), np.empty(0, dtype=np.int64)
+        return np.concatenate(achados), np.concatenate(comuns)
+
+
+def _uniao(listas: List[np.ndarray]) -> np.ndarray:
+    """União ordenada de listas ordenadas."""
+    if len(listas) == 1:
+        return listas[0]
+    numeros = np.sort(np.concatenate(listas))
+    primeiros = np.empty(len(numeros), dtype=bool)
+    primeiros[:1] = True
+    np.not_equal(numeros[1:], numeros[:-1], out=primeiros[1:])
+    return numeros[primeiros]
+
+
+def _contidos(ordenados: np.ndarray, valores: np.ndarray) -> np.ndarray:
+    """Máscara dos ``valores`` que estão no array ordenado ``ordenados``."""
+    if not len(ordenados):
+        return np.zeros(len(valores), dtype=bool)
+    indices = np.searchsorted(ordenados, valores)
+    np.minimum(indices, len(ordenados) - 1, out=indices)
+    return ordenados[indices] == valores
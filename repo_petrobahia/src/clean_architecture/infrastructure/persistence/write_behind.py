@@ -0,0 +1,248 @@
+"""Repositório de clientes com gravação adiada (write-behind)."""
+
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ...domain.entities import Cliente
+from ...domain.repositories import ClienteRepositoryInterface
+from ..log import obter_logger
+from .indice import chave_cnpj
+
+logger = obter_logger("clientes")
+
+
+class ClienteWriteBehindRepository(ClienteRepositoryInterface):
+    """
+    Decorador que adia as gravações de outro repositório de clientes.
+
+    ``salvar`` só coloca o cliente em uma fila em memória; uma thread grava
+    a fila no repositório decorado com ``salvar_lote``, em lotes de até
+    ``tamanho_lote`` clientes, assim que um lote enche ou ``intervalo``
+    segundos depois do primeiro cliente pendente.
+
+    A fila tem no máximo ``tamanho_fila`` clientes: com ela cheia, ``salvar``
+    espera a thread gravar (contrapressão). ``buscar_por_email`` enxerga os
+    clientes ainda não gravados, com a mesma regra do arquivo: vale o
+    primeiro cadastro de cada email (``buscar_por_cnpj`` também, com o
+    primeiro de cada CNPJ).
+
+    Uma falha na gravação mantém o lote na fila para nova tentativa, e o
+    erro é repassado na próxima chamada a ``salvar``, ``esvaziar`` ou
+    ``fechar``. ``esvaziar`` espera a fila ser gravada; ``fechar`` esvazia
+    a fila, para a thread e fecha o repositório decorado (também chamado na
+    saída do interpretador).
+    """
+
+    def __init__(
+        self,
+        repositorio: ClienteRepositoryInterface,
+        tamanho_fila: int = 10_000,
+        tamanho_lote: int = 1000,
+        intervalo: float = 0.05,
+    ):
+        if tamanho_fila <= 0 or tamanho_lote <= 0:
+            raise ValueError("Tamanhos da fila e do lote devem ser maiores que zero.")
+        self.repositorio = repositorio
+        self.filepath = getattr(repositorio, "filepath", None)
+        self.tamanho_fila = tamanho_fila
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._fila: deque = deque()
+        # Clientes na fila ou sendo gravados: primeiro de cada email
+        self._pendentes: Dict[str, Cliente] = {}
+        self._pendentes_cnpj: Dict[int, Cliente] = {}
+        self._gravando = 0
+        self._esvaziando = 0
+        self._erro: Optional[Exception] = None
+        self._fechado = False
+        self._condicao = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._gravar_periodicamente,
+            name="clientes-write-behind",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.fechar)
+
+    def salvar(self, cliente: Cliente) -> None:
+        """Coloca o cliente na fila de gravação."""
+        self.salvar_lote((cliente,))
+
+    def salvar_lote(self, clientes: Iterable[Cliente]) -> None:
+        """Coloca os clientes na fila, esperando se ela estiver cheia."""
+        with self._condicao:
+            estava_vazia = not self._fila
+            for cliente in clientes:
+                while len(self._fila) >= self.tamanho_fila and not self._fechado:
+                    self._repassar_erro()
+                    self._condicao.notify_all()
+                    self._condicao.wait()
+                self._repassar_erro()
+                if self._fechado:
+                    raise Exception("Erro ao salvar cliente: repositório fechado")
+                self._fila.append(cliente)
+                self._pendentes.setdefault(cliente.email, cliente)
+                chave = chave_cnpj(cliente.cnpj)
+                if chave is not None:
+                    self._pendentes_cnpj.setdefault(chave, cliente)
+            # Acorda a thread com um lote cheio ou para contar o intervalo
+            # a partir do primeiro pendente
+            if len(self._fila) >= self.tamanho_lote or (estava_vazia and self._fila):
+                self._condicao.notify_all()
+
+    def atualizar(self, cliente: Cliente) -> bool:
+        """Esvazia a fila e atualiza o cliente no repositório decorado."""
+        self.esvaziar()
+        return self.repositorio.atualizar(cliente)
+
+    def remover(self, email: str) -> bool:
+        """Esvazia a fila e remove o cliente do repositório decorado."""
+        self.esvaziar()
+        return self.repositorio.remover(email)
+
+    def buscar_por_email(self, email: str) -> Optional[Cliente]:
+        """Busca o cliente no repositório decorado ou na fila."""
+        # Consulta a fila antes: um cliente gravado entre as duas consultas
+        # ainda é encontrado
+        with self._condicao:
+            pendente = self._pendentes.get(email)
+        cliente = self.repositorio.buscar_por_email(email)
+        return cliente if cliente is not None else pendente
+
+    def buscar_por_cnpj(self, cnpj: str) -> Optional[Cliente]:
+        """Busca o cliente com o CNPJ no repositório decorado ou na fila."""
+        chave = chave_cnpj(cnpj)
+        with self._condicao:
+            pendente = None if chave is None else self._pendentes_cnpj.get(chave)
+        cliente = self.repositorio.buscar_por_cnpj(cnpj)
+        return cliente if cliente is not None else pendente
+
+    def buscar_por_nome(self, consulta: str, limite: int = 10) -> List[Cliente]:
+        """Esvazia a fila e busca pelo nome no repositório decorado."""
+        self.esvaziar()
+        return self.repositorio.buscar_por_nome(consulta, limite)
+
+    def buscar_por_dominio(
+        self, dominio: str, prefixo: str = "", subdominios: bool = False
+    ) -> Iterator[Cliente]:
+        """Esvazia a fila e lista os clientes do domínio no repositório decorado."""
+        self.esvaziar()
+        return self.repositorio.buscar_por_dominio(dominio, prefixo, subdominios)
+
+    def marca_emails(self) -> int:
+        """Esvazia a fila e retorna a marca do repositório decorado."""
+        self.esvaziar()
+        return self.repositorio.marca_emails()
+
+    def assinatura_emails(self, marca: int) -> bytes:
+        """Assinatura do repositório decorado na marca (se ele oferecer)."""
+        funcao = getattr(self.repositorio, "assinatura_emails", None)
+        return funcao(marca) if callable(funcao) else b""
+
+    def emails(self, desde: int = 0) -> Iterator[str]:
+        """Esvazia a fila e lista os emails do repositório decorado."""
+        self.esvaziar()
+        return self.repositorio.emails(desde)
+
+    def esvaziar(self) -> None:
+        """Espera todos os clientes da fila serem gravados."""
+        with self._condicao:
+            # Sem esperar o intervalo: a thread grava o que houver na fila
+            self._esvaziando += 1
+            self._condicao.notify_all()
+            try:
+                while (self._fila or self._gravando) and self._erro is None:
+                    self._condicao.wait()
+            finally:
+                self._esvaziando -= 1
+            self._repassar_erro()
+
+    def fechar(self) -> None:
+        """Grava a fila, para a thread e fecha o repositório decorado."""
+        with self._condicao:
+            if self._fechado:
+                return
+        try:
+            self.esvaziar()
+        finally:
+            with self._condicao:
+                self._fechado = True
+                self._condicao.notify_all()
+            self._thread.join()
+            atexit.unregister(self.fechar)
+            if callable(getattr(self.repositorio, "fechar", None)):
+                self.repositorio.fechar()
+
+    def _repassar_erro(self) -> None:
+        """Gera o erro da última gravação, se houver (chamado com a trava)."""
+        if self._erro is not None:
+            erro, self._erro = self._erro, None
+            raise Exception(f"Erro ao salvar clientes: {erro}")
+
+    def _proximo_lote(self) -> Optional[List[Cliente]]:
+        """Espera um lote para gravar; None quando o repositório fecha."""
+        with self._condicao:
+            while True:
+                if self._fechado and not self._fila:
+                    return None
+                if self._fila and (
+                    len(self._fila) >= self.tamanho_lote
+                    or self._fechado
+                    or self._esvaziando
+                ):
+                    break
+                if self._fila:
+                    # Espera o lote encher ou o intervalo passar
+                    limite = time.monotonic() + self.intervalo
+                    while not (
+                        len(self._fila) >= self.tamanho_lote
+                        or self._fechado
+                        or self._esvaziando
+                    ):
+                        restante = limite - time.monotonic()
+                        if restante <= 0:
+                            break
+                        self._condicao.wait(restante)
+                    if self._fila:
+                        break
+                else:
+                    self._condicao.wait()
+            quantidade = min(len(self._fila), self.tamanho_lote)
+            lote = [self._fila.popleft() for _ in range(quantidade)]
+            self._gravando = quantidade
+            # Há espaço na fila para quem espera em salvar
+            self._condicao.notify_all()
+            return lote
+
+    def _gravar_periodicamente(self) -> None:
+        """Laço da thread de gravação."""
+        while True:
+            lote = self._proximo_lote()
+            if lote is None:
+                return
+            try:
+                self.repositorio.salvar_lote(lote)
+            except Exception as e:
+                logger.warning("Lote de clientes não gravado: %s", e)
+                with self._condicao:
+                    # Devolve o lote ao início da fila e tenta de novo depois
+                    self._fila.extendleft(reversed(lote))
+                    self._gravando = 0
+                    self._erro = e
+                    self._condicao.notify_all()
+                    if self._fechado:
+                        return
+                    self._condicao.wait(self.intervalo)
+                continue
+            with self._condicao:
+                for cliente in lote:
+                    if self._pendentes.get(cliente.email) is cliente:
+                        del self._pendentes[cliente.email]
+                    chave = chave_cnpj(cliente.cnpj)
+                    if self._pendentes_cnpj.get(chave) is cliente:
+                        del self._pendentes_cnpj[chave]
+                self._gravando = 0
+                self._condicao.notify_all()
@@ -0,0 +1,384 @@
+"""
+Livros de resgates de cupons.
+
+Contam quantas vezes cada cupom foi resgatado (no total e por cliente) para
+aplicar os limites ``limite_total`` e ``limite_por_cliente`` do registro de
+cupons. Há duas implementações:
+
+- ``LivroResgatesMemoria``: contadores em dicionários, protegidos por travas
+  listradas (cada chave cai em uma das N travas), para threads;
+- ``LivroResgatesCompartilhado``: tabela hash de endereçamento aberto em
+  memória compartilhada, para processos de ``multiprocessing``.
+
+Os contadores são salvos em disco periodicamente (``iniciar_checkpoint``),
+e não a cada pedido: reservar um resgate custa só a trava e a contagem.
+"""
+
+import ctypes
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from abc import abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from ...domain.exceptions import LimiteCupomError, ValidacaoError
+from ...domain.services import LivroResgatesInterface
+from ...domain.value_objects import Cupom, codigo_cupom
+from ..log import obter_logger
+from ..services import RegistroCupons
+
+logger = obter_logger("resgates")
+
+# Separa código e cliente na chave do contador por cliente
+SEPARADOR = "\x1f"
+
+
+class _LivroResgatesBase(LivroResgatesInterface):
+    """Regras de limite e checkpoint comuns aos livros de resgates."""
+
+    FORMATO = ""
+
+    def __init__(self, registro: RegistroCupons, checkpoint_file: Optional[str]):
+        self.registro = registro
+        self.checkpoint_file = checkpoint_file
+        self._checkpoint: Optional[threading.Thread] = None
+        self._parar_checkpoint = threading.Event()
+
+    # ===== LIMITES =====
+
+    def _itens(self, cupom: Cupom, cliente: str) -> List[Tuple[str, int]]:
+        """Chaves de contador e limites que valem para o resgate."""
+        regra = self.registro.obter(cupom)
+        itens = []
+        if regra.limite_total is not None:
+            itens.append((regra.codigo, regra.limite_total))
+        if regra.limite_por_cliente is not None:
+            itens.append(
+                (f"{regra.codigo}{SEPARADOR}{cliente}", regra.limite_por_cliente)
+            )
+        return itens
+
+    def reservar(self, cupom: Cupom, cliente: str) -> None:
+        """Registra um resgate, ou gera ``LimiteCupomError`` se não houver."""
+        itens = self._itens(cupom, cliente)
+        if itens and not self._incrementar(itens):
+            raise LimiteCupomError(
+                f"Limite de resgates do cupom {codigo_cupom(cupom)} atingido."
+            )
+
+    def estornar(self, cupom: Cupom, cliente: str) -> None:
+        """Desfaz um resgate reservado."""
+        itens = self._itens(cupom, cliente)
+        if itens:
+            self._decrementar([chave for chave, _ in itens])
+
+    def resgates(self, cupom: Cupom, cliente: Optional[str] = None) -> int:
+        """Número de resgates do cupom (no total, ou do cliente)."""
+        chave = codigo_cupom(cupom)
+        if cliente is not None:
+            chave = f"{chave}{SEPARADOR}{cliente}"
+        return self._contagem(chave)
+
+    # ===== CONTADORES (implementados pelas subclasses) =====
+
+    @abstractmethod
+    def _incrementar(self, itens: List[Tuple[str, int]]) -> bool:
+        """Incrementa todas as chaves se nenhuma atingiu o limite (atômico)."""
+        pass
+
+    @abstractmethod
+    def _decrementar(self, chaves: List[str]) -> None:
+        """Decrementa as chaves (sem passar de zero)."""
+        pass
+
+    @abstractmethod
+    def _contagem(self, chave: str) -> int:
+        """Valor atual do contador da chave."""
+        pass
+
+    @abstractmethod
+    def _exportar(self) -> Dict[str, int]:
+        """Contadores no formato do checkpoint (``FORMATO``)."""
+        pass
+
+    @abstractmethod
+    def _importar(self, contadores: Dict[str, int]) -> None:
+        """Restaura os contadores lidos do checkpoint."""
+        pass
+
+    # ===== CHECKPOINT =====
+
+    def salvar_checkpoint(self) -> None:
+        """Grava os contadores em disco (escrita atômica com ``os.replace``)."""
+        if not self.checkpoint_file:
+            return
+        dados = {"formato": self.FORMATO, "contadores": self._exportar()}
+        temporario = f"{self.checkpoint_file}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.checkpoint_file)
+
+    def _carregar_checkpoint(self) -> None:
+        """Restaura os contadores do último checkpoint, se existir."""
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados.get("formato") != self.FORMATO:
+                raise ValueError(f"formato {dados.get('formato')!r}")
+            contadores = {str(k): int(v) for k, v in dados["contadores"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValidacaoError(
+                f"Checkpoint de resgates inválido em {self.checkpoint_file}: {e}"
+            ) from e
+        self._importar(contadores)
+
+    def iniciar_checkpoint(self, intervalo: float = 5.0) -> None:
+        """Inicia uma thread que salva os contadores a cada ``intervalo`` s."""
+        if self._checkpoint is not None:
+            return
+        self._parar_checkpoint.clear()
+        self._checkpoint = threading.Thread(
+            target=self._checkpoint_periodico,
+            args=(intervalo,),
+            name="resgates-checkpoint",
+            daemon=True,
+        )
+        self._checkpoint.start()
+
+    def parar_checkpoint(self) -> None:
+        """Interrompe a thread de checkpoint e grava um último checkpoint."""
+        if self._checkpoint is None:
+            return
+        self._parar_checkpoint.set()
+        self._checkpoint.join()
+        self._checkpoint = None
+        self.salvar_checkpoint()
+
+    def _checkpoint_periodico(self, intervalo: float) -> None:
+        """Laço da thread de checkpoint."""
+        while not self._parar_checkpoint.wait(intervalo):
+            try:
+                self.salvar_checkpoint()
+            except OSError as e:
+                logger.warning("Checkpoint de resgates não gravado: %s", e)
+
+
+class LivroResgatesMemoria(_LivroResgatesBase):
+    """
+    Livro de resgates em memória, seguro entre threads.
+
+    Cada chave de contador pertence a uma de ``faixas`` travas (pelo hash da
+    chave). Um resgate trava só as faixas das suas chaves (no máximo duas,
+    sempre em ordem crescente para não haver deadlock), então resgates de
+    cupons e clientes diferentes raramente disputam a mesma trava.
+    """
+
+    FORMATO = "chave"
+
+    def __init__(
+        self,
+        registro: RegistroCupons,
+        faixas: int = 64,
+        checkpoint_file: Optional[str] = None,
+    ):
+        super().__init__(registro, checkpoint_file)
+        if faixas <= 0:
+            raise ValueError("Número de faixas deve ser maior que zero.")
+        self._travas = [threading.Lock() for _ in range(faixas)]
+        self._contadores: List[Dict[str, int]] = [{} for _ in range(faixas)]
+        self._carregar_checkpoint()
+
+    def _faixa(self, chave: str) -> int:
+        return hash(chave) % len(self._travas)
+
+    def _travar(self, chaves: List[str]) -> List[threading.Lock]:
+        """Adquire as travas das chaves, em ordem, e as retorna."""
+        travas = [self._travas[i] for i in sorted({self._faixa(c) for c in chaves})]
+        for trava in travas:
+            trava.acquire()
+        return travas
+
+    def _incrementar(self, itens: List[Tuple[str, int]]) -> bool:
+        travas = self._travar([chave for chave, _ in itens])
+        try:
+            for chave, limite in itens:
+                if self._contadores[self._faixa(chave)].get(chave, 0) >= limite:
+                    return False
+            for chave, _ in itens:
+                contadores = self._contadores[self._faixa(chave)]
+                contadores[chave] = contadores.get(chave, 0) + 1
+            return True
+        finally:
+            for trava in reversed(travas):
+                trava.release()
+
+    def _decrementar(self, chaves: List[str]) -> None:
+        travas = self._travar(chaves)
+        try:
+            for chave in chaves:
+                contadores = self._contadores[self._faixa(chave)]
+                if contadores.get(chave, 0) > 0:
+                    contadores[chave] -= 1
+        finally:
+            for trava in reversed(travas):
+                trava.release()
+
+    def _contagem(self, chave: str) -> int:
+        return self._contadores[self._faixa(chave)].get(chave, 0)
+
+    def _exportar(self) -> Dict[str, int]:
+        contadores = {}
+        for trava, faixa in zip(self._travas, self._contadores):
+            with trava:
+                contadores.update(faixa)
+        return contadores
+
+    def _importar(self, contadores: Dict[str, int]) -> None:
+        for chave, valor in contadores.items():
+            self._contadores[self._faixa(chave)][chave] = valor
+
+
+def _hash_chave(chave: str) -> int:
+    """Hash estável de 64 bits (igual em todos os processos), nunca zero."""
+    digest = hashlib.blake2b(chave.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True) or 1
+
+
+class LivroResgatesCompartilhado(_LivroResgatesBase):
+    """
+    Livro de resgates em memória compartilhada, seguro entre processos.
+
+    Os contadores ficam em um ``RawArray`` dividido em ``faixas`` segmentos,
+    cada um uma tabela hash de endereçamento aberto (sondagem linear) com a
+    sua trava de ``multiprocessing``. Uma entrada são dois ``int64``: o hash
+    de 64 bits da chave (0 = livre) e a contagem.
+
+    Como os objetos de ``multiprocessing`` só podem ser herdados, o livro
+    deve ser passado aos processos na criação (argumento do ``Process`` ou
+    ``initializer`` do ``Pool``). O checkpoint guarda os hashes das chaves.
+    """
+
+    FORMATO = "hash"
+
+    def __init__(
+        self,
+        registro: RegistroCupons,
+        capacidade: int = 1 << 16,
+        faixas: int = 64,
+        checkpoint_file: Optional[str] = None,
+    ):
+        super().__init__(registro, checkpoint_file)
+        if faixas <= 0 or capacidade < faixas:
+            raise ValueError("Capacidade deve ser maior que o número de faixas.")
+        self._por_faixa = -(-capacidade // faixas)
+        self._travas = [multiprocessing.Lock() for _ in range(faixas)]
+        self._tabela = multiprocessing.RawArray(
+            ctypes.c_int64, 2 * self._por_faixa * faixas
+        )
+        self._carregar_checkpoint()
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        # Threads e eventos não atravessam processos; o checkpoint é do pai
+        estado["_checkpoint"] = None
+        estado["_parar_checkpoint"] = None
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._parar_checkpoint = threading.Event()
+
+    def _localizar(self, h: int, criar: bool) -> int:
+        """
+        Índice da entrada do hash ``h`` (a trava da faixa deve estar presa).
+
+        Retorna -1 se não existir e ``criar`` for falso.
+        """
+        faixa = (h & 0xFFFFFFFF) % len(self._travas)
+        inicio = faixa * self._por_faixa
+        posicao = ((h >> 32) & 0xFFFFFFFF) % self._por_faixa
+        tabela = self._tabela
+        for _ in range(self._por_faixa):
+            indice = 2 * (inicio + posicao)
+            atual = tabela[indice]
+            if atual == h:
+                return indice
+            if atual == 0:
+                if not criar:
+                    return -1
+                tabela[indice] = h
+                return indice
+            posicao = (posicao + 1) % self._por_faixa
+        if not criar:
+            return -1
+        raise ValidacaoError("Livro de resgates cheio: aumente a capacidade.")
+
+    def _faixa(self, h: int) -> int:
+        return (h & 0xFFFFFFFF) % len(self._travas)
+
+    def _travar(self, hashes: List[int]) -> list:
+        travas = [self._travas[i] for i in sorted({self._faixa(h) for h in hashes})]
+        for trava in travas:
+            trava.acquire()
+        return travas
+
+    def _incrementar(self, itens: List[Tuple[str, int]]) -> bool:
+        hashes = [_hash_chave(chave) for chave, _ in itens]
+        travas = self._travar(hashes)
+        try:
+            indices = [self._localizar(h, criar=True) for h in hashes]
+            limites = [limite for _, limite in itens]
+            if any(self._tabela[i + 1] >= lim for i, lim in zip(indices, limites)):
+                return False
+            for indice in indices:
+                self._tabela[indice + 1] += 1
+            return True
+        finally:
+            for trava in reversed(travas):
+                trava.release()
+
+    def _decrementar(self, chaves: List[str]) -> None:
+        hashes = [_hash_chave(chave) for chave in chaves]
+        travas = self._travar(hashes)
+        try:
+            for h in hashes:
+                indice = self._localizar(h, criar=False)
+                if indice >= 0 and self._tabela[indice + 1] > 0:
+                    self._tabela[indice + 1] -= 1
+        finally:
+            for trava in reversed(travas):
+                trava.release()
+
+    def _contagem(self, chave: str) -> int:
+        h = _hash_chave(chave)
+        travas = self._travar([h])
+        try:
+            indice = self._localizar(h, criar=False)
+            return self._tabela[indice + 1] if indice >= 0 else 0
+        finally:
+            travas[0].release()
+
+    def _exportar(self) -> Dict[str, int]:
+        contadores = {}
+        for faixa, trava in enumerate(self._travas):
+            with trava:
+                inicio = 2 * faixa * self._por_faixa
+                for indice in range(inicio, inicio + 2 * self._por_faixa, 2):
+                    if self._tabela[indice] and self._tabela[indice + 1]:
+                        contadores[str(self._tabela[indice])] = self._tabela[indice + 1]
+        return contadores
+
+    def _importar(self, contadores: Dict[str, int]) -> None:
+        for chave, valor in contadores.items():
+            h = int(chave)
+            travas = self._travar([h])
+            try:
+                self._tabela[self._localizar(h, criar=True) + 1] = valor
+            finally:
+                travas[0].release()
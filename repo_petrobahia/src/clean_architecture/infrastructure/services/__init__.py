@@ -1,82 +1,223 @@
 """Implementações dos serviços de domínio."""
 
-from typing import Optional
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from ...domain.exceptions import ProdutoNaoEncontradoError
 from ...domain.services import (
     ArredondamentoServiceInterface,
     CalculoPrecoServiceInterface,
     DescontoServiceInterface,
+    TabelaPrecosInterface,
+    TabelaPrecosProviderInterface,
+)
+from ...domain.value_objects import CODIGOS_PRODUTO, Cupom, ProdutoTipo
+from .arredondamento import aplicar_regra_lote
+from .centavos import MODO_COMPATIVEL, MODO_EXATO, MotorPrecoCentavos
+from .cnpj import ValidadorCnpjVetorizado, cnpj_valido, validar_cnpjs
+from .cupons import (
+    MODO_MELHOR_PRECO,
+    MODO_ORDEM,
+    MODOS_ACUMULO,
+    CombinadorCupons,
+    RegistroCupons,
+    RegraCupom,
 )
-from ...domain.value_objects import BASES_PRECO, CupomTipo, ProdutoTipo
+from .pipeline import PipelinePrecoCompilado
+from .tabela_precos import TabelaPrecosArquivoProvider, TabelaPrecosFixa
+from .tarifas import TabelaTarifaria
+
+# ===== CODIFICAÇÃO DE PRODUTOS PARA LOTES =====
+
+
+def _codigo_produto(produto: Union[ProdutoTipo, str, int]) -> int:
+    """Retorna o código inteiro de um produto."""
+    if isinstance(produto, (int, np.integer)):
+        return int(produto)
+    return CODIGOS_PRODUTO[ProdutoTipo(produto)]
+
+
+def codificar_produtos(
+    produtos: Union[np.ndarray, Sequence[Union[ProdutoTipo, str, int]]],
+) -> np.ndarray:
+    """Converte uma sequência de produtos em um array de códigos inteiros.
+
+    Aceita ``ProdutoTipo``, o valor textual do produto (ex: ``"diesel"``)
+    ou o próprio código de ``CODIGOS_PRODUTO``.
+    """
+    if isinstance(produtos, np.ndarray) and np.issubdtype(produtos.dtype, np.integer):
+        codigos = produtos.astype(np.int64, copy=False)
+    else:
+        try:
+            codigos = np.fromiter(
+                (_codigo_produto(p) for p in produtos), dtype=np.int64
+            )
+        except ValueError as e:
+            raise ProdutoNaoEncontradoError(f"Produto não suportado: {e}") from e
+
+    if codigos.size and (codigos.min() < 0 or codigos.max() >= len(CODIGOS_PRODUTO)):
+        raise ProdutoNaoEncontradoError("Código de produto não suportado no lote.")
+    return codigos
+
 
 # ===== SERVIÇO DE CÁLCULO DE PREÇO =====
 
 
 class CalculoPrecoService(CalculoPrecoServiceInterface):
-    """Implementação do serviço de cálculo de preço usando Strategy Pattern."""
+    """
+    Implementação do serviço de cálculo de preço.
 
-    def calcular(self, produto: ProdutoTipo, quantidade: int) -> float:
-        """Calcula o preço base com descontos por volume."""
+    As faixas de volume vêm de uma ``TabelaTarifaria`` compilada, que é
+    compartilhada pelo cálculo escalar e pelo cálculo em lote. A tabela
+    vigente é obtida de um ``TabelaPrecosProviderInterface``, o que permite
+    trocar os preços sem reiniciar o processo.
+    """
 
-        if produto == ProdutoTipo.DIESEL:
-            preco = BASES_PRECO["diesel"] * quantidade
-            if quantidade > 1000:
-                preco *= 0.90  # 10% desconto
-            elif quantidade > 500:
-                preco *= 0.95  # 5% desconto
-            return preco
+    def __init__(
+        self,
+        tabela: Optional[TabelaTarifaria] = None,
+        tabela_provider: Optional[TabelaPrecosProviderInterface] = None,
+    ):
+        self.tabela_provider = tabela_provider or TabelaPrecosFixa(tabela)
 
-        elif produto == ProdutoTipo.GASOLINA:
-            preco = BASES_PRECO["gasolina"] * quantidade
-            if quantidade > 200:
-                preco -= 100  # Desconto fixo
-            return preco
+    def tabela_vigente(self) -> TabelaPrecosInterface:
+        """Retorna a versão da tabela de preços vigente neste momento."""
+        return self.tabela_provider.atual()
 
-        elif produto == ProdutoTipo.ETANOL:
-            preco = BASES_PRECO["etanol"] * quantidade
-            if quantidade > 80:
-                preco *= 0.97  # 3% desconto
-            return preco
+    def calcular(
+        self,
+        produto: ProdutoTipo,
+        quantidade: int,
+        tabela: Optional[TabelaPrecosInterface] = None,
+    ) -> float:
+        """Calcula o preço base com descontos por volume."""
+        tabela = tabela or self.tabela_provider.atual()
+        return tabela.calcular(produto, quantidade)
 
-        elif produto == ProdutoTipo.LUBRIFICANTE:
-            return BASES_PRECO["lubrificante"] * quantidade
+    def calcular_lote(
+        self,
+        produtos: Union[np.ndarray, Sequence[Union[ProdutoTipo, str, int]]],
+        quantidades: Union[np.ndarray, Sequence[int]],
+        tabela: Optional[TabelaTarifaria] = None,
+    ) -> np.ndarray:
+        """
+        Calcula o preço base de um lote de pedidos de uma só vez.
 
-        else:
-            raise ProdutoNaoEncontradoError(f"Produto não suportado: {produto}")
+        As faixas de volume são resolvidas com ``np.searchsorted`` sobre a
+        mesma tabela compilada do caminho escalar. As operações de ponto
+        flutuante são as mesmas, então o resultado é idêntico bit a bit.
+        O lote inteiro é calculado com uma única versão da tabela.
+
+        Args:
+            produtos: Códigos de ``CODIGOS_PRODUTO`` (ou ``ProdutoTipo``/str)
+            quantidades: Quantidades de cada pedido, na mesma ordem
+            tabela: Versão da tabela a usar (padrão: a vigente)
+
+        Returns:
+            Array ``float64`` com o preço base de cada pedido
+        """
+        codigos = codificar_produtos(produtos)
+        qtd = np.asarray(quantidades, dtype=np.int64)
+        if codigos.shape != qtd.shape:
+            raise ValueError("Produtos e quantidades devem ter o mesmo tamanho.")
+        tabela = tabela or self.tabela_provider.atual()
+        return tabela.calcular_lote(codigos, qtd)
 
 
 # ===== SERVIÇO DE DESCONTO =====
 
 
 class DescontoService(DescontoServiceInterface):
-    """Implementação do serviço de aplicação de descontos por cupom."""
+    """
+    Implementação do serviço de aplicação de descontos por cupom.
+
+    As regras dos cupons vêm de um ``RegistroCupons`` (padrão:
+    ``CUPONS_PADRAO``); novos cupons são apenas configuração. Vários cupons
+    no mesmo pedido são combinados conforme ``modo_acumulo``: na ordem
+    informada (``MODO_ORDEM``) ou pela combinação de menor preço
+    (``MODO_MELHOR_PRECO``).
+    """
+
+    def __init__(
+        self,
+        registro: Optional[RegistroCupons] = None,
+        modo_acumulo: str = MODO_ORDEM,
+    ):
+        if modo_acumulo not in MODOS_ACUMULO:
+            raise ValueError(f"Modo de acúmulo de cupons inválido: {modo_acumulo}")
+        self.registro = registro or RegistroCupons()
+        self.modo_acumulo = modo_acumulo
+        self.combinador = CombinadorCupons(self.registro)
+
+    def cupom_registrado(self, codigo: str) -> bool:
+        """Indica se o cupom está no registro."""
+        return codigo in self.registro
+
+    def cupom_vale(self, cupom: Cupom, produto: ProdutoTipo, quantidade: int) -> bool:
+        """Indica se o cupom do registro dá desconto ao pedido."""
+        return self.registro.obter(cupom).vale(produto, quantidade)
+
+    def regra_desconto(
+        self, produto: ProdutoTipo, cupom: Optional[Cupom]
+    ) -> Tuple[float, float]:
+        """
+        Retorna a regra do cupom para o produto como ``(fator, abatimento)``.
+
+        O preço com desconto é ``preco * fator - abatimento``; sem desconto,
+        a regra é ``(1.0, 0.0)``. A quantidade mínima do cupom não entra
+        aqui (ver ``quantidade_minima``).
+        """
+        if cupom is None:
+            return 1.0, 0.0
+        return self.registro.obter(cupom).regra(produto)
+
+    def quantidade_minima(self, cupom: Optional[Cupom]) -> int:
+        """Retorna a quantidade mínima para o cupom valer (0: sem mínimo)."""
+        if cupom is None:
+            return 0
+        return self.registro.obter(cupom).qtd_minima
 
     def aplicar_desconto(
         self,
         preco: float,
         produto: ProdutoTipo,
         quantidade: int,
-        cupom: Optional[CupomTipo],
+        cupom: Optional[Cupom],
     ) -> float:
         """Aplica desconto baseado no cupom."""
+        return self.registro.aplicar(cupom, preco, produto, quantidade)
 
-        if cupom is None:
-            return preco
-
-        if cupom == CupomTipo.MEGA10:
-            return preco * 0.90  # 10% desconto
-
-        elif cupom == CupomTipo.NOVO5:
-            return preco * 0.95  # 5% desconto
+    def aplicar_descontos(
+        self,
+        preco: float,
+        produto: ProdutoTipo,
+        quantidade: int,
+        cupons: Sequence[Cupom],
+    ) -> Tuple[float, Tuple[str, ...]]:
+        """Aplica vários cupons e retorna ``(preco, cupons_aplicados)``."""
+        if self.modo_acumulo == MODO_MELHOR_PRECO:
+            return self.combinador.melhor_preco(preco, produto, quantidade, cupons)
+        return self.combinador.em_ordem(preco, produto, quantidade, cupons)
 
-        elif cupom == CupomTipo.LUB2:
-            # Cupom LUB2 só funciona para lubrificante
-            if produto == ProdutoTipo.LUBRIFICANTE:
-                return preco - 2.0
-            return preco
+    def aplicar_desconto_lote(
+        self,
+        precos: np.ndarray,
+        produto: ProdutoTipo,
+        cupom: Optional[Cupom],
+        quantidades: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Aplica o desconto do cupom a um array de preços do mesmo produto.
 
-        return preco
+        Sem ``quantidades``, todos os pedidos são tratados como elegíveis à
+        quantidade mínima do cupom.
+        """
+        precos = np.asarray(precos, dtype=np.float64)
+        if quantidades is None:
+            quantidades = np.full(precos.shape, np.iinfo(np.int64).max)
+        codigos = np.full(precos.shape, CODIGOS_PRODUTO[produto])
+        return self.registro.aplicar_lote(cupom, precos, codigos, quantidades)
 
 
 # ===== SERVIÇO DE ARREDONDAMENTO =====
@@ -85,17 +226,67 @@ class DescontoService(DescontoServiceInterface):
 class ArredondamentoService(ArredondamentoServiceInterface):
     """Implementação do serviço de arredondamento por tipo de produto."""
 
-    def arredondar(self, preco: float, produto: ProdutoTipo) -> float:
-        """Arredonda o preço de acordo com as regras do produto."""
+    def regra_arredondamento(self, produto: ProdutoTipo) -> Tuple[str, int]:
+        """
+        Retorna a regra do produto como ``(modo, casas)``.
+
+        O modo é ``"arredondar"`` (``round``) ou ``"truncar"``.
+        """
 
         if produto == ProdutoTipo.DIESEL:
             # Diesel: sem casas decimais
-            return round(preco, 0)
+            return "arredondar", 0
 
         elif produto == ProdutoTipo.GASOLINA:
             # Gasolina: 2 casas decimais
-            return round(preco, 2)
+            return "arredondar", 2
 
         else:
             # Etanol e Lubrificante: trunca em 2 casas (comportamento legado)
-            return float(int(preco * 100) / 100.0)
+            return "truncar", 2
+
+    def arredondar(self, preco: float, produto: ProdutoTipo) -> float:
+        """Arredonda o preço de acordo com as regras do produto."""
+        modo, casas = self.regra_arredondamento(produto)
+        if modo == "arredondar":
+            return round(preco, casas)
+        escala = 10**casas
+        return float(int(preco * escala) / float(escala))
+
+    def arredondar_lote(self, precos: np.ndarray, produto: ProdutoTipo) -> np.ndarray:
+        """
+        Arredonda um array de preços do mesmo produto.
+
+        O resultado é idêntico elemento a elemento ao de ``arredondar``.
+        """
+        return aplicar_regra_lote(precos, *self.regra_arredondamento(produto))
+
+    def arredondar_lote_misto(
+        self,
+        precos: np.ndarray,
+        produtos: Union[np.ndarray, Sequence[Union[ProdutoTipo, str, int]]],
+    ) -> np.ndarray:
+        """
+        Arredonda um array de preços de produtos diferentes.
+
+        ``produtos`` traz o produto de cada preço (como em
+        ``codificar_produtos``). Cada regra de arredondamento é aplicada de
+        uma vez aos preços dos seus produtos, selecionados por máscara.
+        """
+        precos = np.asarray(precos, dtype=np.float64)
+        codigos = codificar_produtos(produtos)
+        if codigos.shape != precos.shape:
+            raise ValueError("Preços e produtos devem ter o mesmo tamanho.")
+
+        regras = sorted({self.regra_arredondamento(p) for p in CODIGOS_PRODUTO})
+        regra_do_codigo = np.empty(len(CODIGOS_PRODUTO), dtype=np.int64)
+        for produto, codigo in CODIGOS_PRODUTO.items():
+            regra_do_codigo[codigo] = regras.index(self.regra_arredondamento(produto))
+        regra_do_preco = regra_do_codigo[codigos]
+
+        arredondados = np.empty_like(precos)
+        for indice, (modo, casas) in enumerate(regras):
+            mascara = regra_do_preco == indice
+            if mascara.any():
+                arredondados[mascara] = aplicar_regra_lote(precos[mascara], modo, casas)
+        return arredondados
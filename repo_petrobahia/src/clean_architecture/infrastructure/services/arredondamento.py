@@ -0,0 +1,57 @@
+"""
+Kernels vetorizados de arredondamento.
+
+Cada regra de ``ArredondamentoService.regra_arredondamento`` tem um kernel
+que recebe e devolve arrays, com resultado idêntico, elemento a elemento, ao
+da versão escalar (``round`` e ``int(preco * escala) / escala``) para
+valores finitos.
+"""
+
+from typing import Callable, Dict
+
+import numpy as np
+
+KernelArredondamento = Callable[[np.ndarray, int], np.ndarray]
+
+
+def arredondar_casas(precos: np.ndarray, casas: int) -> np.ndarray:
+    """Equivalente vetorizado de ``round(preco, casas)``."""
+    precos = np.asarray(precos, dtype=np.float64)
+    if casas == 0:
+        # round(x, 0) e np.rint arredondam metade para o par, sem erro
+        return np.rint(precos)
+
+    # round(x, casas) arredonda o valor decimal exato de x; np.rint sobre
+    # x * escala só pode divergir quando o produto cai perto de um .5 (ou
+    # estoura para infinito), e esses poucos casos usam o round do Python
+    escala = 10**casas
+    escalados = precos * escala
+    arredondados = np.rint(escalados) / float(escala)
+    distancia = np.abs(escalados - np.floor(escalados) - 0.5)
+    duvidosos = (distancia <= 4 * np.abs(np.spacing(escalados))) | ~np.isfinite(
+        escalados
+    )
+    for i in np.flatnonzero(duvidosos):
+        arredondados[i] = round(float(precos[i]), casas)
+    return arredondados
+
+
+def truncar_casas(precos: np.ndarray, casas: int) -> np.ndarray:
+    """Equivalente vetorizado de ``float(int(preco * escala) / escala)``."""
+    escala = 10**casas
+    # int() trunca em direção a zero, assim como np.trunc; como o int volta
+    # a float na divisão, o resultado é o mesmo. O + 0.0 troca -0.0 por 0.0,
+    # como int() faz.
+    return np.trunc(np.asarray(precos, dtype=np.float64) * escala) / float(escala) + 0.0
+
+
+# Kernel de cada modo de ``regra_arredondamento``
+KERNELS: Dict[str, KernelArredondamento] = {
+    "arredondar": arredondar_casas,
+    "truncar": truncar_casas,
+}
+
+
+def aplicar_regra_lote(precos: np.ndarray, modo: str, casas: int) -> np.ndarray:
+    """Aplica a regra ``(modo, casas)`` a um array de preços."""
+    return KERNELS[modo](precos, casas)
@@ -0,0 +1,314 @@
+"""Motor de preços em centavos inteiros (aritmética de ponto fixo)."""
+
+from bisect import bisect_left
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ...domain.exceptions import (
+    CupomInvalidoError,
+    ProdutoNaoEncontradoError,
+    ValidacaoError,
+)
+from ...domain.services import ArredondamentoServiceInterface, DescontoServiceInterface
+from ...domain.value_objects import CODIGOS_PRODUTO, Cupom, CupomTipo, ProdutoTipo
+from .arredondamento import aplicar_regra_lote
+from .tarifas import TabelaTarifaria
+
+# Fatores são representados em pontos-base: 0.95 -> 9500
+PONTOS_BASE = 10_000
+
+# Os valores intermediários ficam em 1/10^8 de centavo (dois fatores em
+# pontos-base multiplicados), o que é exato para qualquer regra vigente.
+DENOMINADOR = PONTOS_BASE * PONTOS_BASE
+
+MODO_EXATO = "exato"
+MODO_COMPATIVEL = "compat"
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _para_inteiro(valor: float, escala: int, descricao: str) -> int:
+    """Converte ``valor * escala`` para inteiro, exigindo que seja exato."""
+    inteiro = round(valor * escala)
+    if abs(valor * escala - inteiro) > 1e-6:
+        raise ValidacaoError(
+            f"{descricao} ({valor}) não é representável em 1/{escala} exato."
+        )
+    return inteiro
+
+
+def _dividir_arredondando(numerador: int, divisor: int, modo: str) -> int:
+    """Divisão inteira com o modo de arredondamento do produto."""
+    if modo == "truncar":
+        quociente = abs(numerador) // divisor
+        return quociente if numerador >= 0 else -quociente
+    # "arredondar": metade para o par, como o round() do Python
+    quociente, resto = divmod(numerador, divisor)
+    if 2 * resto > divisor or (2 * resto == divisor and quociente % 2):
+        quociente += 1
+    return quociente
+
+
+def _dividir_arredondando_lote(
+    numeradores: np.ndarray, divisor: int, modo: str
+) -> np.ndarray:
+    """Versão vetorizada de ``_dividir_arredondando``."""
+    if modo == "truncar":
+        quocientes = np.abs(numeradores) // divisor
+        return np.where(numeradores >= 0, quocientes, -quocientes)
+    quocientes, restos = np.divmod(numeradores, divisor)
+    sobe = (2 * restos > divisor) | ((2 * restos == divisor) & (quocientes % 2 == 1))
+    return quocientes + sobe
+
+
+class _RegraCentavos(NamedTuple):
+    """Regras de preço de um produto convertidas para inteiros."""
+
+    base: int  # centavos
+    limites: Tuple[int, ...]
+    fatores: Tuple[int, ...]  # pontos-base
+    abatimentos: Tuple[int, ...]  # centavos
+    limites_np: np.ndarray
+    fatores_np: np.ndarray
+    abatimentos_np: np.ndarray
+    modo: str  # "arredondar" ou "truncar"
+    unidade: int  # unidade final em centavos (100 = reais inteiros)
+
+
+class MotorPrecoCentavos:
+    """
+    Motor de preços alternativo que representa dinheiro em centavos inteiros.
+
+    Preços base e abatimentos viram centavos e os fatores (faixas de volume
+    e cupons) viram pontos-base inteiros. Em modo ``"exato"`` (padrão) todo o
+    cálculo é feito em inteiros e o arredondamento de cada produto é
+    aplicado uma única vez, sobre o valor exato:
+
+    - diesel: reais inteiros, metade para o par (como ``round(x, 0)``);
+    - gasolina: centavos, metade para o par (como ``round(x, 2)``);
+    - etanol e lubrificante: centavos, truncando (como ``int(x * 100)``).
+
+    Como o valor é exato, o modo ``"exato"`` corrige os centavos perdidos
+    pelo motor em ``float`` (ex: 11 L de etanol valem R$ 39,49; em float,
+    ``int(39.49 * 100)`` dá 3948). Totais de lote são somas inteiras exatas.
+
+    Modo de compatibilidade (``"compat"``): reproduz centavo a centavo o
+    resultado atual dos serviços em ``float``, inclusive esses desvios. O
+    preço é calculado com as mesmas operações em ``float64`` e só o
+    resultado final é convertido para centavos. Use-o para conciliar com
+    pedidos já faturados pelo motor antigo.
+
+    Limite: no caminho vetorizado os intermediários usam ``int64``; lotes
+    com quantidades acima do suportado geram ``ValueError``.
+    """
+
+    def __init__(
+        self,
+        tabela: TabelaTarifaria,
+        desconto_service: DescontoServiceInterface,
+        arredondamento_service: ArredondamentoServiceInterface,
+        modo: str = MODO_EXATO,
+    ):
+        if modo not in (MODO_EXATO, MODO_COMPATIVEL):
+            raise ValueError(f"Modo de cálculo desconhecido: {modo}")
+        self.tabela = tabela
+        self.desconto_service = desconto_service
+        self.arredondamento_service = arredondamento_service
+        self.modo = modo
+        self._produtos: Dict[ProdutoTipo, _RegraCentavos] = {}
+        self._cupons: Dict[Tuple[ProdutoTipo, Optional[Cupom]], Tuple] = {}
+        self._compilar()
+
+    def _compilar(self) -> None:
+        """Converte as regras dos serviços para inteiros."""
+        for produto in ProdutoTipo:
+            try:
+                base, limites, fatores, abatimentos = self.tabela.regra_preco(produto)
+            except ProdutoNaoEncontradoError:
+                continue
+            modo, casas = self.arredondamento_service.regra_arredondamento(produto)
+            if casas > 2:
+                raise ValidacaoError(
+                    f"Arredondamento em {casas} casas não cabe em centavos."
+                )
+            fatores_bp = tuple(
+                _para_inteiro(f, PONTOS_BASE, "Fator de faixa") for f in fatores
+            )
+            abatimentos_c = tuple(
+                _para_inteiro(a, 100, "Abatimento de faixa") for a in abatimentos
+            )
+            self._produtos[produto] = _RegraCentavos(
+                base=_para_inteiro(base, 100, f"Preço base de {produto.value}"),
+                limites=limites,
+                fatores=fatores_bp,
+                abatimentos=abatimentos_c,
+                limites_np=np.array(limites, dtype=np.int64),
+                fatores_np=np.array(fatores_bp, dtype=np.int64),
+                abatimentos_np=np.array(abatimentos_c, dtype=np.int64),
+                modo=modo,
+                unidade=10 ** (2 - casas),
+            )
+            for cupom in (None, *CupomTipo):
+                try:
+                    self._regra_cupom(produto, cupom)
+                except CupomInvalidoError:
+                    continue  # Cupom fixo fora do registro: cotar gera o erro
+
+    def _regra_cupom(
+        self, produto: ProdutoTipo, cupom: Optional[Cupom]
+    ) -> Tuple[int, int, int]:
+        """
+        Regra inteira do cupom: ``(fator_bp, abatimento_c, qtd_minima)``.
+
+        Os cupons de ``CupomTipo`` são convertidos na criação do motor; os
+        demais, no primeiro uso.
+        """
+        regra = self._cupons.get((produto, cupom))
+        if regra is None:
+            fator, abatimento = self.desconto_service.regra_desconto(produto, cupom)
+            quantidade_minima = getattr(
+                self.desconto_service, "quantidade_minima", lambda cupom: 0
+            )
+            regra = (
+                _para_inteiro(fator, PONTOS_BASE, "Fator de cupom"),
+                _para_inteiro(abatimento, 100, "Abatimento de cupom"),
+                quantidade_minima(cupom),
+            )
+            self._cupons[(produto, cupom)] = regra
+        return regra
+
+    def _regras(self, produto: ProdutoTipo) -> _RegraCentavos:
+        """Retorna as regras inteiras do produto."""
+        regras = self._produtos.get(produto)
+        if regras is None:
+            raise ProdutoNaoEncontradoError(f"Produto não suportado: {produto}")
+        return regras
+
+    # ===== CÁLCULO ESCALAR =====
+
+    def cotar(
+        self,
+        produto: ProdutoTipo,
+        quantidade: int,
+        cupom: Optional[Cupom] = None,
+    ) -> int:
+        """Retorna o preço final do pedido em centavos."""
+        if self.modo == MODO_COMPATIVEL:
+            return self._cotar_compat(produto, quantidade, cupom)
+
+        regra = self._regras(produto)
+        fator_cupom, abatimento_cupom, qtd_minima = self._regra_cupom(produto, cupom)
+        if quantidade < qtd_minima:
+            fator_cupom, abatimento_cupom = PONTOS_BASE, 0
+        faixa = bisect_left(regra.limites, quantidade)
+
+        # Numerador em 1/DENOMINADOR de centavo
+        numerador = (
+            quantidade * regra.base * regra.fatores[faixa]
+            - regra.abatimentos[faixa] * PONTOS_BASE
+        ) * fator_cupom - abatimento_cupom * DENOMINADOR
+        divisor = DENOMINADOR * regra.unidade
+        return _dividir_arredondando(numerador, divisor, regra.modo) * regra.unidade
+
+    def _cotar_compat(
+        self, produto: ProdutoTipo, quantidade: int, cupom: Optional[Cupom]
+    ) -> int:
+        """Calcula pelo caminho em float e converte o resultado para centavos."""
+        self._regras(produto)
+        preco = self.tabela.calcular(produto, quantidade)
+        preco = self.desconto_service.aplicar_desconto(
+            preco, produto, quantidade, cupom
+        )
+        preco = self.arredondamento_service.arredondar(preco, produto)
+        return round(preco * 100)
+
+    # ===== CÁLCULO EM LOTE =====
+
+    def cotar_lote(
+        self,
+        produtos: Sequence[ProdutoTipo],
+        quantidades: Union[np.ndarray, Sequence[int]],
+        cupons: Optional[Sequence[Optional[Cupom]]] = None,
+    ) -> np.ndarray:
+        """
+        Retorna o preço final de cada pedido do lote em centavos (``int64``).
+
+        Os pedidos são agrupados por (produto, cupom) e cada grupo é
+        calculado de uma vez com arrays inteiros.
+        """
+        produtos = list(produtos)
+        qtd = np.asarray(quantidades, dtype=np.int64)
+        if len(produtos) != qtd.shape[0]:
+            raise ValueError("Produtos e quantidades devem ter o mesmo tamanho.")
+        cupons = [None] * len(produtos) if cupons is None else list(cupons)
+        if len(cupons) != len(produtos):
+            raise ValueError("Cupons e quantidades devem ter o mesmo tamanho.")
+
+        grupos: Dict[Tuple, list] = {}
+        for indice, par in enumerate(zip(produtos, cupons)):
+            grupos.setdefault(par, []).append(indice)
+
+        centavos = np.empty(qtd.shape, dtype=np.int64)
+        for (produto, cupom), indices in grupos.items():
+            indices = np.array(indices, dtype=np.int64)
+            centavos[indices] = self._cotar_grupo(produto, cupom, qtd[indices])
+        return centavos
+
+    def _cotar_grupo(
+        self, produto: ProdutoTipo, cupom: Optional[Cupom], q: np.ndarray
+    ) -> np.ndarray:
+        """Calcula um grupo de pedidos do mesmo produto e cupom."""
+        regra = self._regras(produto)
+        if self.modo == MODO_COMPATIVEL:
+            return self._cotar_grupo_compat(produto, cupom, q)
+
+        fator, abatimento, qtd_minima = self._regra_cupom(produto, cupom)
+        if q.size:
+            # Estimativa (em float) do maior intermediário, com folga
+            maior = (
+                float(np.abs(q).max()) * regra.base * max(regra.fatores)
+                + max(regra.abatimentos) * PONTOS_BASE
+            ) * max(fator, PONTOS_BASE) + abatimento * DENOMINADOR
+            if maior >= _INT64_MAX / 4:
+                raise ValueError("Quantidade grande demais para o cálculo em int64.")
+
+        faixa = np.searchsorted(regra.limites_np, q, side="left")
+        elegiveis = q >= qtd_minima
+        fator_cupom = np.where(elegiveis, fator, PONTOS_BASE)
+        abatimento_cupom = np.where(elegiveis, abatimento, 0)
+        numeradores = (
+            q * regra.base * regra.fatores_np[faixa]
+            - regra.abatimentos_np[faixa] * PONTOS_BASE
+        ) * fator_cupom - abatimento_cupom * DENOMINADOR
+        divisor = DENOMINADOR * regra.unidade
+        return (
+            _dividir_arredondando_lote(numeradores, divisor, regra.modo) * regra.unidade
+        )
+
+    def _cotar_grupo_compat(
+        self, produto: ProdutoTipo, cupom: Optional[Cupom], q: np.ndarray
+    ) -> np.ndarray:
+        """Reproduz o caminho em float para um grupo e converte para centavos."""
+        codigos = np.full(q.shape, CODIGOS_PRODUTO[produto], dtype=np.int64)
+        precos = self.tabela.calcular_lote(codigos, q)
+        fator, abatimento = self.desconto_service.regra_desconto(produto, cupom)
+        elegiveis = q >= self._regra_cupom(produto, cupom)[2]
+        precos = precos * np.where(elegiveis, fator, 1.0) - np.where(
+            elegiveis, abatimento, 0.0
+        )
+
+        # Os mesmos kernels de ArredondamentoService.arredondar_lote; o
+        # resultado é múltiplo de 1/100, então x * 100 fica a um ulp do inteiro
+        regra = self.arredondamento_service.regra_arredondamento(produto)
+        arredondados = aplicar_regra_lote(precos, *regra)
+        return np.rint(arredondados * 100).astype(np.int64)
+
+    def total_lote(
+        self,
+        produtos: Sequence[ProdutoTipo],
+        quantidades: Union[np.ndarray, Sequence[int]],
+        cupons: Optional[Sequence[Optional[Cupom]]] = None,
+    ) -> int:
+        """Retorna a soma exata do lote em centavos."""
+        return int(self.cotar_lote(produtos, quantidades, cupons).sum(dtype=np.int64))
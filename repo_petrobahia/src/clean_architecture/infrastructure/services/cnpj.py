@@ -0,0 +1,99 @@
+"""
+Conferência vetorizada dos dígitos verificadores de CNPJ.
+
+Os CNPJs de um lote viram uma matriz ``n x 14`` de dígitos, e os dois
+dígitos verificadores (módulo 11) de todas as linhas saem de dois produtos
+da matriz pelos pesos, sem laço em Python por CNPJ. ``cnpj_valido`` é a
+versão escalar, com o mesmo resultado.
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from ...domain.services import ValidadorCnpjInterface
+from ...domain.value_objects import normalizar_cnpj
+
+PESOS_1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_2 = (6,) + PESOS_1
+
+_PESOS_1 = np.array(PESOS_1, dtype=np.int32)
+_PESOS_2 = np.array(PESOS_2, dtype=np.int32)
+
+# Linha usada no lugar dos CNPJs mal formados (descartada pela máscara)
+_VAZIO = "0" * 14
+
+
+def _digito(soma: int) -> int:
+    resto = soma % 11
+    return 0 if resto < 2 else 11 - resto
+
+
+def cnpj_valido(cnpj: str) -> bool:
+    """Indica se os dígitos verificadores do CNPJ conferem."""
+    normalizado = normalizar_cnpj(cnpj) if isinstance(cnpj, str) else None
+    if normalizado is None or normalizado == normalizado[0] * 14:
+        return False
+    digitos = [int(d) for d in normalizado]
+    d1 = _digito(sum(p * d for p, d in zip(PESOS_1, digitos)))
+    d2 = _digito(sum(p * d for p, d in zip(PESOS_2, digitos)))
+    return digitos[12] == d1 and digitos[13] == d2
+
+
+def matriz_digitos(cnpjs: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Monta a matriz ``n x 14`` de dígitos dos CNPJs.
+
+    Retorna a matriz e a máscara dos CNPJs bem formados (ver
+    ``normalizar_cnpj``); as linhas dos demais são zeradas.
+    """
+    total = len(cnpjs)
+    try:
+        texto = "".join(cnpjs)
+    except TypeError:
+        texto = ""
+    if (
+        len(texto) == 14 * total
+        # Com o total certo, nenhum maior que 14 quer dizer todos com 14
+        and max(map(len, cnpjs), default=14) == 14
+        and texto.isascii()
+        and texto.isdigit()
+    ):
+        # Caso comum: todos já normalizados, sem normalizar um a um
+        bem_formados = np.ones(total, dtype=bool)
+    else:
+        normalizados = [
+            normalizar_cnpj(c) if isinstance(c, str) else None for c in cnpjs
+        ]
+        bem_formados = np.fromiter(
+            (n is not None for n in normalizados), dtype=bool, count=total
+        )
+        texto = "".join(n or _VAZIO for n in normalizados)
+    bytes_ = np.frombuffer(texto.encode("ascii"), dtype=np.uint8)
+    return (bytes_ - ord("0")).reshape(total, 14), bem_formados
+
+
+def validar_cnpjs(cnpjs: Sequence[str]) -> np.ndarray:
+    """
+    Confere os dígitos verificadores de um lote de CNPJs de uma vez.
+
+    Retorna um array booleano, na ordem de ``cnpjs``, idêntico elemento a
+    elemento ao de ``cnpj_valido``: CNPJs mal formados ou com os 14 dígitos
+    iguais não valem.
+    """
+    matriz, validos = matriz_digitos(cnpjs)
+    restos_1 = matriz[:, :12] @ _PESOS_1 % 11
+    restos_2 = matriz[:, :13] @ _PESOS_2 % 11
+    d1 = np.where(restos_1 < 2, 0, 11 - restos_1)
+    d2 = np.where(restos_2 < 2, 0, 11 - restos_2)
+    validos &= (matriz[:, 12] == d1) & (matriz[:, 13] == d2)
+    validos &= (matriz != matriz[:, :1]).any(axis=1)
+    return validos
+
+
+class ValidadorCnpjVetorizado(ValidadorCnpjInterface):
+    """Validador de CNPJs em lote com matrizes de dígitos (numpy)."""
+
+    def validar_lote(self, cnpjs: Sequence[str]) -> np.ndarray:
+        """Indica, para cada CNPJ, se os dígitos verificadores conferem."""
+        return validar_cnpjs(cnpjs)
@@ -0,0 +1,445 @@
+"""Registro de cupons: regras de desconto definidas por configuração."""
+
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from ...domain.exceptions import CupomInvalidoError
+from ...domain.value_objects import (
+    CODIGOS_PRODUTO,
+    CUPONS_PADRAO,
+    Cupom,
+    ProdutoTipo,
+    codigo_cupom,
+)
+
+AplicarCupom = Callable[[float, ProdutoTipo, int], float]
+
+# Modos de acúmulo de cupons em um mesmo pedido
+MODO_ORDEM = "ordem"  # Na ordem informada, pulando os conflitantes
+MODO_MELHOR_PRECO = "melhor"  # A combinação permitida de menor preço
+MODOS_ACUMULO = (MODO_ORDEM, MODO_MELHOR_PRECO)
+
+# Maior número de combinações avaliadas para um conjunto de cupons
+MAX_COMBINACOES = 1 << 16
+
+
+@dataclass(frozen=True)
+class RegraCupom:
+    """
+    Regra compilada de um cupom.
+
+    O preço com desconto é ``preco * fator - abatimento`` para pedidos
+    elegíveis (produto permitido e quantidade mínima atingida); para os
+    demais o cupom não altera o preço.
+    """
+
+    codigo: str
+    fator: float
+    abatimento: float
+    produtos: Optional[FrozenSet[ProdutoTipo]] = None  # None: todos
+    qtd_minima: int = 0
+    limite_total: Optional[int] = None  # Resgates no total (None: ilimitado)
+    limite_por_cliente: Optional[int] = None  # Resgates por cliente
+    acumulavel: bool = True  # Pode ser usado junto com outros cupons
+    grupo: Optional[str] = None  # No máximo um cupom de cada grupo
+
+    def compativel(self, outra: "RegraCupom") -> bool:
+        """Indica se os dois cupons podem ser usados no mesmo pedido."""
+        return (
+            self.acumulavel
+            and outra.acumulavel
+            and (self.grupo is None or self.grupo != outra.grupo)
+        )
+
+    @property
+    def tem_limite(self) -> bool:
+        """Indica se o cupom tem limite de resgates."""
+        return self.limite_total is not None or self.limite_por_cliente is not None
+
+    def aceita_produto(self, produto: ProdutoTipo) -> bool:
+        """Indica se o cupom vale para o produto."""
+        return self.produtos is None or produto in self.produtos
+
+    def vale(self, produto: ProdutoTipo, quantidade: int) -> bool:
+        """Indica se o cupom dá desconto ao pedido (produto e quantidade)."""
+        return quantidade >= self.qtd_minima and self.aceita_produto(produto)
+
+    def regra(self, produto: ProdutoTipo) -> Tuple[float, float]:
+        """Retorna ``(fator, abatimento)`` do cupom para o produto."""
+        if self.aceita_produto(produto):
+            return self.fator, self.abatimento
+        return 1.0, 0.0
+
+
+def compilar_regra(codigo: str, definicao: Mapping) -> RegraCupom:
+    """
+    Valida e compila a definição de um cupom.
+
+    Campos: ``percentual`` (0 a 100), ``abatimento`` (reais), ``produtos``
+    (lista de nomes de produto), ``qtd_minima``, ``limite_total`` e
+    ``limite_por_cliente`` (número máximo de resgates), ``acumulavel`` e
+    ``grupo`` (regras de acúmulo com outros cupons).
+    """
+    if not codigo or not isinstance(codigo, str):
+        raise CupomInvalidoError(f"Código de cupom inválido: {codigo!r}")
+
+    percentual = float(definicao.get("percentual", 0))
+    if not 0 <= percentual <= 100:
+        raise CupomInvalidoError(f"Percentual inválido no cupom {codigo}: {percentual}")
+    abatimento = float(definicao.get("abatimento", 0.0))
+    if abatimento < 0:
+        raise CupomInvalidoError(f"Abatimento negativo no cupom {codigo}.")
+    qtd_minima = int(definicao.get("qtd_minima", 0))
+    if qtd_minima < 0:
+        raise CupomInvalidoError(f"Quantidade mínima negativa no cupom {codigo}.")
+
+    limites = {}
+    for campo in ("limite_total", "limite_por_cliente"):
+        if definicao.get(campo) is not None:
+            limites[campo] = int(definicao[campo])
+            if limites[campo] < 0:
+                raise CupomInvalidoError(f"Limite negativo no cupom {codigo}.")
+
+    acumulavel = definicao.get("acumulavel", True)
+    if not isinstance(acumulavel, bool):
+        raise CupomInvalidoError(f"Campo acumulavel inválido no cupom {codigo}.")
+    grupo = definicao.get("grupo")
+    if grupo is not None and not isinstance(grupo, str):
+        raise CupomInvalidoError(f"Grupo inválido no cupom {codigo}: {grupo!r}")
+
+    produtos = definicao.get("produtos")
+    if produtos is not None:
+        try:
+            produtos = frozenset(ProdutoTipo(p) for p in produtos)
+        except ValueError as e:
+            raise CupomInvalidoError(f"Produto inválido no cupom {codigo}: {e}") from e
+
+    return RegraCupom(
+        codigo=codigo,
+        # (100 - p) / 100 dá exatamente 0.9 para 10%, 0.95 para 5% etc.
+        fator=(100 - percentual) / 100,
+        abatimento=abatimento,
+        produtos=produtos,
+        qtd_minima=qtd_minima,
+        acumulavel=acumulavel,
+        grupo=grupo,
+        **limites,
+    )
+
+
+def _compilar_funcao(regra: RegraCupom) -> AplicarCupom:
+    """Gera a função de aplicação do cupom, sem testes desnecessários."""
+    fator, abatimento = regra.fator, regra.abatimento
+    produtos, qtd_minima = regra.produtos, regra.qtd_minima
+
+    if produtos is None and qtd_minima <= 1:
+
+        def aplicar(preco: float, produto: ProdutoTipo, quantidade: int) -> float:
+            return preco * fator - abatimento
+
+    else:
+
+        def aplicar(preco: float, produto: ProdutoTipo, quantidade: int) -> float:
+            if quantidade < qtd_minima or (
+                produtos is not None and produto not in produtos
+            ):
+                return preco
+            return preco * fator - abatimento
+
+    return aplicar
+
+
+class RegistroCupons:
+    """
+    Registro dos cupons ativos, carregado de configuração.
+
+    Cada cupom é compilado uma única vez em uma ``RegraCupom`` e em uma
+    função de aplicação. Aplicar um cupom é uma consulta ao dicionário mais
+    uma chamada, independente de quantos cupons estejam ativos.
+    """
+
+    def __init__(self, definicoes: Optional[Mapping[str, Mapping]] = None):
+        definicoes = CUPONS_PADRAO if definicoes is None else definicoes
+        self._regras: Dict[str, RegraCupom] = {}
+        self._funcoes: Dict[str, AplicarCupom] = {}
+        for codigo, definicao in definicoes.items():
+            regra = compilar_regra(codigo, definicao)
+            self._regras[codigo] = regra
+            self._funcoes[codigo] = _compilar_funcao(regra)
+
+    @classmethod
+    def de_arquivo(cls, filepath: str) -> "RegistroCupons":
+        """Carrega o registro de um arquivo JSON ``{codigo: definicao}``."""
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                definicoes = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CupomInvalidoError(
+                f"Arquivo de cupons inválido ({filepath}): {e}"
+            ) from e
+        return cls(definicoes)
+
+    def __getstate__(self):
+        # As funções compiladas são closures; recompiladas em __setstate__
+        return {"_regras": self._regras}
+
+    def __setstate__(self, estado):
+        self._regras = estado["_regras"]
+        self._funcoes = {
+            codigo: _compilar_funcao(regra) for codigo, regra in self._regras.items()
+        }
+
+    def __contains__(self, cupom: Cupom) -> bool:
+        return codigo_cupom(cupom) in self._regras
+
+    def __len__(self) -> int:
+        return len(self._regras)
+
+    def obter(self, cupom: Cupom) -> RegraCupom:
+        """Retorna a regra compilada do cupom."""
+        regra = self._regras.get(codigo_cupom(cupom))
+        if regra is None:
+            raise CupomInvalidoError(f"Cupom desconhecido: {codigo_cupom(cupom)}")
+        return regra
+
+    def aplicar(
+        self,
+        cupom: Optional[Cupom],
+        preco: float,
+        produto: ProdutoTipo,
+        quantidade: int,
+    ) -> float:
+        """Aplica o cupom a um preço."""
+        if cupom is None:
+            return preco
+        funcao = self._funcoes.get(codigo_cupom(cupom))
+        if funcao is None:
+            raise CupomInvalidoError(f"Cupom desconhecido: {codigo_cupom(cupom)}")
+        return funcao(preco, produto, quantidade)
+
+    def aplicar_lote(
+        self,
+        cupom: Optional[Cupom],
+        precos: np.ndarray,
+        produtos: np.ndarray,
+        quantidades: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Aplica um cupom a um lote de preços de uma só vez.
+
+        ``produtos`` são códigos de ``CODIGOS_PRODUTO``. Pedidos não
+        elegíveis ficam com o preço original, como em ``aplicar``.
+        """
+        precos = np.asarray(precos, dtype=np.float64)
+        if cupom is None:
+            return precos.copy()
+        regra = self.obter(cupom)
+
+        elegiveis = np.asarray(quantidades) >= regra.qtd_minima
+        if regra.produtos is not None:
+            codigos = [CODIGOS_PRODUTO[p] for p in regra.produtos]
+            elegiveis &= np.isin(produtos, codigos)
+        # x * 1.0 - 0.0 == x, então os não elegíveis ficam intactos
+        fatores = np.where(elegiveis, regra.fator, 1.0)
+        abatimentos = np.where(elegiveis, regra.abatimento, 0.0)
+        return precos * fatores - abatimentos
+
+
+class _PlanoCupons(NamedTuple):
+    """Combinações candidatas de um conjunto de cupons para um produto."""
+
+    codigos: List[Tuple[str, ...]]
+    fatores: np.ndarray
+    abatimentos: np.ndarray
+    qtd_minimas: np.ndarray
+
+
+def _domina(a: RegraCupom, b: RegraCupom) -> bool:
+    """``a`` dá sempre preço menor ou igual a ``b`` e vale sempre que ``b``."""
+    return (
+        a.fator <= b.fator
+        and a.abatimento >= b.abatimento
+        and a.qtd_minima <= b.qtd_minima
+    )
+
+
+class CombinadorCupons:
+    """
+    Aplica vários cupons a um pedido, respeitando as regras de acúmulo.
+
+    Dois cupons acumulam se ambos forem ``acumulavel`` e não forem do mesmo
+    ``grupo``. O preço com uma combinação é ``preco * produto(fatores) -
+    soma(abatimentos)``, nunca negativo.
+
+    No modo ``MODO_MELHOR_PRECO``, as combinações permitidas de cada
+    conjunto de cupons são pré-calculadas por produto (e guardadas em um
+    cache LRU): cupons que não valem para o produto saem, e dentro de cada
+    grupo ficam só os cupons não dominados por outro (fator menor,
+    abatimento maior e quantidade mínima menor). Como nenhum cupom aumenta
+    o preço, um grupo só fica sem cupom na combinação se todos os seus
+    cupons tiverem quantidade mínima. Por pedido, resta avaliar os
+    candidatos de uma vez com numpy e escolher o mais barato.
+    """
+
+    def __init__(self, registro: "RegistroCupons", tamanho_cache: int = 4096):
+        self.registro = registro
+        self.tamanho_cache = tamanho_cache
+        self._planos: "OrderedDict[tuple, _PlanoCupons]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _regras(self, cupons: Sequence[Cupom]) -> List[RegraCupom]:
+        """Regras dos cupons, sem repetições, na ordem informada."""
+        regras: Dict[str, RegraCupom] = {}
+        for cupom in cupons:
+            regra = self.registro.obter(cupom)
+            regras.setdefault(regra.codigo, regra)
+        return list(regras.values())
+
+    def em_ordem(
+        self,
+        preco: float,
+        produto: ProdutoTipo,
+        quantidade: int,
+        cupons: Sequence[Cupom],
+    ) -> Tuple[float, Tuple[str, ...]]:
+        """
+        Aplica os cupons na ordem informada.
+
+        Cupons que não valem para o pedido ou que conflitam com um cupom já
+        aplicado são ignorados. Retorna o preço e os cupons aplicados.
+        """
+        aplicadas: List[RegraCupom] = []
+        for regra in self._regras(cupons):
+            if not regra.vale(produto, quantidade):
+                continue
+            if all(regra.compativel(outra) for outra in aplicadas):
+                aplicadas.append(regra)
+        fator, abatimento = _combinar(aplicadas)
+        return max(preco * fator - abatimento, 0.0), _codigos(aplicadas)
+
+    def melhor_preco(
+        self,
+        preco: float,
+        produto: ProdutoTipo,
+        quantidade: int,
+        cupons: Sequence[Cupom],
+    ) -> Tuple[float, Tuple[str, ...]]:
+        """
+        Aplica a combinação permitida de cupons com o menor preço.
+
+        Em empate, fica a combinação com menos cupons. Retorna o preço e os
+        cupons aplicados.
+        """
+        plano = self.planejar(produto, cupons)
+        precos = preco * plano.fatores - plano.abatimentos
+        precos[plano.qtd_minimas > quantidade] = np.inf
+        indice = int(np.argmin(precos))
+        return max(float(precos[indice]), 0.0), plano.codigos[indice]
+
+    def planejar(self, produto: ProdutoTipo, cupons: Sequence[Cupom]) -> _PlanoCupons:
+        """Retorna (do cache, se possível) as combinações candidatas."""
+        chave = (produto, tuple(sorted({codigo_cupom(c) for c in cupons})))
+        with self._lock:
+            plano = self._planos.get(chave)
+            if plano is not None:
+                self._planos.move_to_end(chave)
+                return plano
+        # Montado fora da trava: duas threads podem montar o mesmo plano
+        plano = self._montar_plano(produto, cupons)
+        with self._lock:
+            self._planos[chave] = plano
+            if len(self._planos) > self.tamanho_cache:
+                self._planos.popitem(last=False)
+        return plano
+
+    def _montar_plano(
+        self, produto: ProdutoTipo, cupons: Sequence[Cupom]
+    ) -> _PlanoCupons:
+        """Monta as combinações candidatas de um conjunto de cupons."""
+        regras = [r for r in self._regras(cupons) if r.aceita_produto(produto)]
+
+        # Cupons não acumuláveis só entram sozinhos
+        combinacoes: List[Tuple[RegraCupom, ...]] = [()]
+        combinacoes += [(r,) for r in regras if not r.acumulavel]
+
+        # Cupom acumulável sem grupo forma um grupo só seu
+        grupos: Dict[Tuple[bool, str], List[RegraCupom]] = {}
+        for regra in regras:
+            if regra.acumulavel:
+                chave = (regra.grupo is None, regra.grupo or regra.codigo)
+                grupos.setdefault(chave, []).append(regra)
+
+        opcoes: List[List[Optional[RegraCupom]]] = []
+        for membros in grupos.values():
+            nao_dominados = [
+                r
+                for i, r in enumerate(membros)
+                if not any(
+                    _domina(o, r) and (not _domina(r, o) or j < i)
+                    for j, o in enumerate(membros)
+                    if j != i
+                )
+            ]
+            if all(r.qtd_minima > 1 for r in nao_dominados):
+                nao_dominados.append(None)
+            opcoes.append(nao_dominados)
+
+        total = 1
+        for opcao in opcoes:
+            total *= len(opcao)
+        if total > MAX_COMBINACOES:
+            raise CupomInvalidoError(
+                f"Cupons demais para combinar ({total} combinações possíveis)."
+            )
+        combinacoes += [
+            tuple(r for r in escolha if r is not None)
+            for escolha in itertools.product(*opcoes)
+        ]
+        # Em empate de preço, argmin fica com a primeira (menos cupons)
+        combinacoes = sorted(set(combinacoes), key=lambda c: (len(c), _codigos(c)))
+        regras_combinadas = [_combinar(c) for c in combinacoes]
+
+        return _PlanoCupons(
+            codigos=[_codigos(c) for c in combinacoes],
+            fatores=np.array([fator for fator, _ in regras_combinadas]),
+            abatimentos=np.array([abatimento for _, abatimento in regras_combinadas]),
+            qtd_minimas=np.array(
+                [max((r.qtd_minima for r in c), default=0) for c in combinacoes],
+                dtype=np.int64,
+            ),
+        )
+
+
+def _combinar(regras: Sequence[RegraCupom]) -> Tuple[float, float]:
+    """
+    ``(fator, abatimento)`` de uma combinação de cupons.
+
+    Os cupons entram sempre na ordem dos códigos, para que a mesma
+    combinação dê o mesmo preço nos dois modos.
+    """
+    fator, abatimento = 1.0, 0.0
+    for regra in sorted(regras, key=lambda r: r.codigo):
+        fator *= regra.fator
+        abatimento += regra.abatimento
+    return fator, abatimento
+
+
+def _codigos(regras: Sequence[RegraCupom]) -> Tuple[str, ...]:
+    """Códigos dos cupons, na ordem em que foram aplicados."""
+    return tuple(r.codigo for r in regras)
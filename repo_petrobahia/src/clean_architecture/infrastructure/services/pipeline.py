@@ -0,0 +1,200 @@
+"""Pipeline de cotação compilado: uma função especializada por produto/cupom."""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Tuple
+
+from ...domain.exceptions import CupomInvalidoError, ProdutoNaoEncontradoError
+from ...domain.services import (
+    ArredondamentoServiceInterface,
+    CalculoPrecoServiceInterface,
+    DescontoServiceInterface,
+    PipelinePrecoInterface,
+    TabelaPrecosInterface,
+)
+from ...domain.value_objects import Cupom, CupomTipo, ProdutoTipo
+
+Cotador = Callable[[int], float]
+
+
+def _fundir(
+    base: float,
+    limites: Tuple[int, ...],
+    fatores: Tuple[float, ...],
+    abatimentos: Tuple[float, ...],
+    fator_cupom: float,
+    abatimento_cupom: float,
+    modo: str,
+    casas: int,
+    qtd_minima: int = 0,
+) -> Cotador:
+    """
+    Gera a função de cotação de um par produto/cupom.
+
+    Todas as regras viram constantes da closure, e as operações de ponto
+    flutuante são exatamente as dos três serviços, na mesma ordem.
+    """
+    if qtd_minima > 1:
+        # Abaixo do mínimo o cupom não vale: x * 1.0 - 0.0 == x
+        com_cupom = _fundir(
+            base,
+            limites,
+            fatores,
+            abatimentos,
+            fator_cupom,
+            abatimento_cupom,
+            modo,
+            casas,
+        )
+        sem_cupom = _fundir(base, limites, fatores, abatimentos, 1.0, 0.0, modo, casas)
+
+        def cotar(quantidade: int) -> float:
+            if quantidade < qtd_minima:
+                return sem_cupom(quantidade)
+            return com_cupom(quantidade)
+
+        return cotar
+
+    if modo == "arredondar":
+
+        def cotar(quantidade: int) -> float:
+            faixa = bisect_left(limites, quantidade)
+            preco = base * quantidade * fatores[faixa] - abatimentos[faixa]
+            return round(preco * fator_cupom - abatimento_cupom, casas)
+
+    else:
+        escala = 10**casas
+        divisor = float(escala)
+
+        def cotar(quantidade: int) -> float:
+            faixa = bisect_left(limites, quantidade)
+            preco = base * quantidade * fatores[faixa] - abatimentos[faixa]
+            preco = preco * fator_cupom - abatimento_cupom
+            return float(int(preco * escala) / divisor)
+
+    return cotar
+
+
+class PipelinePrecoCompilado(PipelinePrecoInterface):
+    """
+    Pipeline de cotação com uma função especializada por (produto, cupom).
+
+    Na compilação, as regras de cada serviço são resolvidas uma única vez
+    (faixas da tabela, regra do cupom, regra de arredondamento) e fundidas
+    em uma closure. Cotar passa a ser um lookup em dicionário mais uma
+    chamada, sem os três despachos virtuais e os if/elif por pedido.
+
+    Os serviços continuam sendo a fonte das regras: se algum deles não
+    expõe a sua regra (``regra_preco``, ``regra_desconto``,
+    ``regra_arredondamento``), o par é compilado como a composição das três
+    chamadas, preservando a extensibilidade das interfaces.
+
+    As funções são compiladas para uma versão da tabela de preços e
+    recompiladas quando a versão muda. ``compilar`` prepara os cupons de
+    ``CupomTipo``; os demais cupons do registro são compilados no primeiro
+    uso, para não gerar funções para milhares de códigos promocionais.
+    """
+
+    def __init__(
+        self,
+        calculo_preco_service: CalculoPrecoServiceInterface,
+        desconto_service: DescontoServiceInterface,
+        arredondamento_service: ArredondamentoServiceInterface,
+    ):
+        self.calculo_preco_service = calculo_preco_service
+        self.desconto_service = desconto_service
+        self.arredondamento_service = arredondamento_service
+        self._compilado: Tuple[Optional[str], Dict] = (None, {})
+
+    def compilar(self, tabela: Optional[TabelaPrecosInterface] = None) -> None:
+        """Compila todos os pares produto/cupom para a tabela informada."""
+        tabela = tabela or self.calculo_preco_service.tabela_vigente()
+        self._compilado = (tabela.versao, self._compilar_funcoes(tabela))
+
+    def _compilar_funcoes(
+        self, tabela: TabelaPrecosInterface
+    ) -> Dict[Tuple[ProdutoTipo, Optional[Cupom]], Cotador]:
+        """Gera o dicionário de funções para uma versão da tabela."""
+        funcoes = {}
+        for produto in ProdutoTipo:
+            try:
+                tabela.limites(produto)
+            except ProdutoNaoEncontradoError:
+                continue  # Produto fora desta tabela: cotar gera o erro
+            for cupom in (None, *CupomTipo):
+                try:
+                    funcoes[(produto, cupom)] = self._compilar_par(
+                        produto, cupom, tabela
+                    )
+                except CupomInvalidoError:
+                    continue  # Cupom fixo fora do registro: cotar gera o erro
+        return funcoes
+
+    def _compilar_sob_demanda(
+        self,
+        funcoes: Dict,
+        produto: ProdutoTipo,
+        cupom: Optional[Cupom],
+        tabela: TabelaPrecosInterface,
+    ) -> Cotador:
+        """Compila um par ainda não compilado (ex: cupom promocional)."""
+        try:
+            tabela.limites(produto)
+        except ProdutoNaoEncontradoError as e:
+            raise ProdutoNaoEncontradoError(f"Produto não suportado: {produto}") from e
+        funcao = self._compilar_par(produto, cupom, tabela)
+        funcoes[(produto, cupom)] = funcao
+        return funcao
+
+    def _compilar_par(
+        self,
+        produto: ProdutoTipo,
+        cupom: Optional[Cupom],
+        tabela: TabelaPrecosInterface,
+    ) -> Cotador:
+        """Compila a função de cotação de um par produto/cupom."""
+        fundivel = (
+            callable(getattr(tabela, "regra_preco", None))
+            and callable(getattr(self.desconto_service, "regra_desconto", None))
+            and callable(
+                getattr(self.arredondamento_service, "regra_arredondamento", None)
+            )
+        )
+        if fundivel:
+            quantidade_minima = getattr(
+                self.desconto_service, "quantidade_minima", lambda cupom: 0
+            )
+            return _fundir(
+                *tabela.regra_preco(produto),
+                *self.desconto_service.regra_desconto(produto, cupom),
+                *self.arredondamento_service.regra_arredondamento(produto),
+                quantidade_minima(cupom),
+            )
+
+        calcular = self.calculo_preco_service.calcular
+        aplicar_desconto = self.desconto_service.aplicar_desconto
+        arredondar = self.arredondamento_service.arredondar
+
+        def cotar(quantidade: int) -> float:
+            preco = calcular(produto, quantidade, tabela)
+            preco = aplicar_desconto(preco, produto, quantidade, cupom)
+            return arredondar(preco, produto)
+
+        return cotar
+
+    def cotar(
+        self,
+        produto: ProdutoTipo,
+        quantidade: int,
+        cupom: Optional[Cupom],
+        tabela: TabelaPrecosInterface,
+    ) -> float:
+        """Retorna o preço final do pedido na versão de tabela informada."""
+        versao, funcoes = self._compilado
+        if versao != tabela.versao:
+            funcoes = self._compilar_funcoes(tabela)
+            if tabela is self.calculo_preco_service.tabela_vigente():
+                self._compilado = (tabela.versao, funcoes)
+        funcao = funcoes.get((produto, cupom))
+        if funcao is None:
+            funcao = self._compilar_sob_demanda(funcoes, produto, cupom, tabela)
+        return funcao(quantidade)
@@ -0,0 +1,156 @@
+"""Fornecedores da tabela de preços vigente (fixa ou recarregável de arquivo)."""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+from ...domain.exceptions import DomainException, ValidacaoError
+from ...domain.services import TabelaPrecosProviderInterface
+from ..log import obter_logger
+from .tarifas import TabelaTarifaria
+
+logger = obter_logger("tabela_precos")
+
+
+class TabelaPrecosFixa(TabelaPrecosProviderInterface):
+    """Fornecedor que sempre devolve a mesma tabela de preços."""
+
+    def __init__(self, tabela: Optional[TabelaTarifaria] = None):
+        self._tabela = tabela or TabelaTarifaria()
+
+    def atual(self) -> TabelaTarifaria:
+        """Retorna a tabela configurada."""
+        return self._tabela
+
+
+class TabelaPrecosArquivoProvider(TabelaPrecosProviderInterface):
+    """
+    Fornecedor de tabela de preços recarregável a partir de um arquivo JSON.
+
+    Formato do arquivo::
+
+        {
+            "versao": "2026-10-01",
+            "tarifas": {"diesel": {"base": 3.99, "faixas": [...]}, ...}
+        }
+
+    As ``tarifas`` seguem o formato de ``TARIFAS_PADRAO``. Sem ``versao``, a
+    versão é derivada do conteúdo do arquivo. Alterar os preços mantendo a
+    mesma ``versao`` declarada é rejeitado, pois caches e pedidos já
+    processados identificam os preços pela versão.
+
+    Cada carga compila uma nova ``TabelaTarifaria`` imutável e a publica com
+    uma única atribuição de referência. ``atual()`` apenas lê essa referência,
+    sem trava: quem já pegou a tabela anterior termina o pedido nela, e os
+    pedidos seguintes enxergam a nova. A trava só serializa as recargas.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._hash = None
+        self._monitor: Optional[threading.Thread] = None
+        self._parar_monitor = threading.Event()
+        self._atual = self._carregar()
+
+    def atual(self) -> TabelaTarifaria:
+        """Retorna a versão vigente da tabela (sem trava)."""
+        return self._atual
+
+    def _carregar(self) -> Optional[TabelaTarifaria]:
+        """
+        Lê e compila o arquivo, sem publicar a nova tabela.
+
+        Retorna None se o conteúdo não mudou desde a última carga.
+        """
+        try:
+            # Assinatura tirada antes da leitura: se o arquivo mudar durante
+            # ela, a próxima verificação vê a diferença e relê
+            estado = os.stat(self.filepath)
+            with open(self.filepath, "rb") as f:
+                conteudo = f.read()
+        except OSError as e:
+            raise ValidacaoError(
+                f"Tabela de preços inválida em {self.filepath}: {e}"
+            ) from e
+        # Conteúdo já lido, mesmo se rejeitado, só é relido quando o arquivo
+        # mudar de novo (o monitor não repete o aviso a cada intervalo)
+        self._assinatura = (estado.st_mtime_ns, estado.st_size)
+        conteudo_hash = hashlib.sha256(conteudo).hexdigest()
+        if conteudo_hash == self._hash:
+            return None
+        try:
+            dados = json.loads(conteudo.decode("utf-8"))
+            versao = str(dados.get("versao") or conteudo_hash[:12])
+            tabela = TabelaTarifaria(dados["tarifas"], versao=versao)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValidacaoError(
+                f"Tabela de preços inválida em {self.filepath}: {e}"
+            ) from e
+
+        if self._hash is not None and versao == self._atual.versao:
+            raise ValidacaoError(
+                f"Tabela de preços alterada sem mudar a versão ({versao})."
+            )
+        self._hash = conteudo_hash
+        return tabela
+
+    def recarregar(self) -> bool:
+        """
+        Recarrega o arquivo e publica a nova tabela.
+
+        Se o arquivo for inválido, a tabela vigente é mantida e o erro é
+        propagado.
+
+        Returns:
+            True se uma nova versão foi publicada
+        """
+        with self._lock:
+            nova = self._carregar()
+            if nova is None:
+                return False
+            self._atual = nova
+            return True
+
+    def recarregar_se_modificado(self) -> bool:
+        """Recarrega apenas se o arquivo mudou desde a última carga."""
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == self._assinatura:
+            return False
+        return self.recarregar()
+
+    def iniciar_monitoramento(self, intervalo: float = 5.0) -> None:
+        """Inicia uma thread que verifica o arquivo a cada ``intervalo`` s."""
+        if self._monitor is not None:
+            return
+        self._parar_monitor.clear()
+        self._monitor = threading.Thread(
+            target=self._monitorar,
+            args=(intervalo,),
+            name="tabela-precos-monitor",
+            daemon=True,
+        )
+        self._monitor.start()
+
+    def parar_monitoramento(self) -> None:
+        """Interrompe a thread de monitoramento, se estiver ativa."""
+        if self._monitor is None:
+            return
+        self._parar_monitor.set()
+        self._monitor.join()
+        self._monitor = None
+
+    def _monitorar(self, intervalo: float) -> None:
+        """Laço da thread de monitoramento."""
+        while not self._parar_monitor.wait(intervalo):
+            try:
+                self.recarregar_se_modificado()
+            except DomainException as e:
+                # Arquivo em edição ou inválido: mantém a versão vigente
+                logger.warning("Tabela de preços não recarregada: %s", e)
@@ -0,0 +1,142 @@
+"""Tabela tarifária compilada para busca de faixas de volume por bisseção."""
+
+from bisect import bisect_left
+from typing import Dict, Tuple
+
+import numpy as np
+
+from ...domain.exceptions import ProdutoNaoEncontradoError, ValidacaoError
+from ...domain.services import TabelaPrecosInterface
+from ...domain.value_objects import CODIGOS_PRODUTO, TARIFAS_PADRAO, ProdutoTipo
+
+
+class TabelaTarifaria(TabelaPrecosInterface):
+    """
+    Tabela de preços compilada a partir de uma definição tarifária.
+
+    A definição (ver ``TARIFAS_PADRAO``) é compilada uma única vez em arrays
+    ordenados por produto: limites das faixas, fatores e abatimentos. A faixa
+    de um pedido é encontrada com ``bisect`` em O(log faixas), e a mesma
+    tabela alimenta o cálculo escalar e o vetorizado.
+
+    A faixa ``i`` vale para quantidades acima de ``limites[i - 1]``; a faixa
+    0 não tem ajuste (fator 1.0, abatimento 0.0). O preço é sempre
+    ``base * quantidade * fator - abatimento``.
+
+    A tabela é imutável depois de compilada, o que permite publicá-la entre
+    threads sem cópia nem trava (ver ``TabelaPrecosArquivoProvider``).
+    """
+
+    def __init__(self, definicao: Dict = None, versao: str = "padrao"):
+        self._versao = versao
+        definicao = TARIFAS_PADRAO if definicao is None else definicao
+
+        total = len(CODIGOS_PRODUTO)
+        self._bases = [None] * total
+        self._limites = [()] * total
+        self._fatores = [()] * total
+        self._abatimentos = [()] * total
+
+        for nome, tarifa in definicao.items():
+            try:
+                codigo = CODIGOS_PRODUTO[ProdutoTipo(nome)]
+            except ValueError as e:
+                raise ProdutoNaoEncontradoError(f"Produto não suportado: {nome}") from e
+            self._compilar_produto(codigo, nome, tarifa)
+
+        # Versões NumPy das mesmas tabelas, para o caminho vetorizado
+        self._limites_np = [np.array(lim, dtype=np.int64) for lim in self._limites]
+        self._fatores_np = [np.array(f, dtype=np.float64) for f in self._fatores]
+        self._abatimentos_np = [
+            np.array(a, dtype=np.float64) for a in self._abatimentos
+        ]
+        for array in self._limites_np + self._fatores_np + self._abatimentos_np:
+            array.flags.writeable = False
+
+    @property
+    def versao(self) -> str:
+        """Identificador da versão desta tabela."""
+        return self._versao
+
+    def _compilar_produto(self, codigo: int, nome: str, tarifa: Dict) -> None:
+        """Valida e compila as faixas de um produto."""
+        base = float(tarifa["base"])
+        if base < 0:
+            raise ValidacaoError(f"Preço base negativo para {nome}.")
+
+        faixas = sorted(tarifa.get("faixas", []), key=lambda f: f["limite"])
+        limites = tuple(int(f["limite"]) for f in faixas)
+        if len(set(limites)) != len(limites):
+            raise ValidacaoError(f"Limites de faixa repetidos para {nome}.")
+
+        fatores = [1.0]
+        abatimentos = [0.0]
+        for faixa in faixas:
+            fator = float(faixa.get("fator", 1.0))
+            if fator <= 0:
+                raise ValidacaoError(f"Fator inválido na faixa de {nome}: {fator}")
+            fatores.append(fator)
+            abatimentos.append(float(faixa.get("abatimento", 0.0)))
+
+        self._bases[codigo] = base
+        self._limites[codigo] = limites
+        self._fatores[codigo] = tuple(fatores)
+        self._abatimentos[codigo] = tuple(abatimentos)
+
+    def _codigo(self, produto: ProdutoTipo) -> int:
+        """Retorna o código do produto, garantindo que ele está na tabela."""
+        codigo = CODIGOS_PRODUTO.get(produto)
+        if codigo is None or self._bases[codigo] is None:
+            raise ProdutoNaoEncontradoError(f"Produto não suportado: {produto}")
+        return codigo
+
+    def base(self, produto: ProdutoTipo) -> float:
+        """Retorna o preço base unitário do produto."""
+        return self._bases[self._codigo(produto)]
+
+    def limites(self, produto: ProdutoTipo) -> Tuple[int, ...]:
+        """Retorna os limites de faixa do produto, em ordem crescente."""
+        return self._limites[self._codigo(produto)]
+
+    def regra_preco(
+        self, produto: ProdutoTipo
+    ) -> Tuple[float, Tuple[int, ...], Tuple[float, ...], Tuple[float, ...]]:
+        """Retorna ``(base, limites, fatores, abatimentos)`` do produto."""
+        codigo = self._codigo(produto)
+        return (
+            self._bases[codigo],
+            self._limites[codigo],
+            self._fatores[codigo],
+            self._abatimentos[codigo],
+        )
+
+    def calcular(self, produto: ProdutoTipo, quantidade: int) -> float:
+        """Calcula o preço base com o ajuste da faixa de volume."""
+        codigo = self._codigo(produto)
+        faixa = bisect_left(self._limites[codigo], quantidade)
+        return (
+            self._bases[codigo] * quantidade * self._fatores[codigo][faixa]
+            - self._abatimentos[codigo][faixa]
+        )
+
+    def calcular_lote(self, codigos: np.ndarray, quantidades: np.ndarray) -> np.ndarray:
+        """
+        Calcula o preço base de um lote a partir de códigos de produto.
+
+        Usa ``np.searchsorted`` (equivalente vetorizado do ``bisect_left``)
+        sobre os mesmos arrays compilados do caminho escalar.
+        """
+        precos = np.empty(quantidades.shape, dtype=np.float64)
+        for codigo in np.unique(codigos):
+            if self._bases[codigo] is None:
+                raise ProdutoNaoEncontradoError(
+                    f"Produto não suportado: {list(ProdutoTipo)[codigo]}"
+                )
+            mascara = codigos == codigo
+            q = quantidades[mascara]
+            faixa = np.searchsorted(self._limites_np[codigo], q, side="left")
+            precos[mascara] = (
+                self._bases[codigo] * q * self._fatores_np[codigo][faixa]
+                - self._abatimentos_np[codigo][faixa]
+            )
+        return precos
@@ -1,32 +1,74 @@
 """Controller para operações de cliente."""
 
+import logging
 from typing import Dict, List
 
 from ..application.dto import ClienteInputDTO, ClienteOutputDTO
 from ..application.use_cases import CadastrarClienteUseCase
+from ..infrastructure.log import obter_logger, registrar
+from .saida import SAIDA_DETALHADA, SAIDA_RESUMO, validar_modo_saida
+
+logger = obter_logger("clientes")
+
+# Clientes por chamada a execute_lote (limita a memória de cada lote)
+LOTE_CADASTRO = 10_000
 
 
 class ClienteController:
-    """Controller responsável por gerenciar operações de cliente."""
+    """
+    Controller responsável por gerenciar operações de cliente.
 
-    def __init__(self, cadastrar_cliente_use_case: CadastrarClienteUseCase):
+    O ``modo_saida`` funciona como no ``PedidoController``. Os clientes
+    são cadastrados com ``execute_lote``, que grava o lote de uma vez.
+    """
+
+    def __init__(
+        self,
+        cadastrar_cliente_use_case: CadastrarClienteUseCase,
+        modo_saida: str = SAIDA_DETALHADA,
+    ):
         self.cadastrar_cliente_use_case = cadastrar_cliente_use_case
+        self.modo_saida = validar_modo_saida(modo_saida)
 
     def cadastrar_clientes(self, clientes_data: List[Dict]) -> List[ClienteOutputDTO]:
         """Cadastra uma lista de clientes."""
         resultados = []
+        cadastrados = 0
+        detalhado = self.modo_saida == SAIDA_DETALHADA
+        log_clientes = logger.isEnabledFor(logging.DEBUG)
 
-        for cliente_data in clientes_data:
-            # Converte dict para DTO
-            dto = ClienteInputDTO(
+        # Converte dicts para DTOs e cadastra em lotes (uma gravação por lote)
+        dtos = [
+            ClienteInputDTO(
                 nome=cliente_data.get("nome", ""),
                 email=cliente_data.get("email", ""),
                 cnpj=cliente_data.get("cnpj", ""),
             )
+            for cliente_data in clientes_data
+        ]
+        for inicio in range(0, len(dtos), LOTE_CADASTRO):
+            resultados.extend(
+                self.cadastrar_cliente_use_case.execute_lote(
+                    dtos[inicio : inicio + LOTE_CADASTRO]
+                )
+            )
 
-            # Executa o caso de uso
-            resultado = self.cadastrar_cliente_use_case.execute(dto)
-            resultados.append(resultado)
+        for resultado in resultados:
+            cadastrados += resultado.sucesso
+
+            if log_clientes:
+                logger.debug(
+                    "cliente_cadastrado" if resultado.sucesso else "cliente_rejeitado",
+                    extra={
+                        "campos": {
+                            "nome": resultado.nome,
+                            "email": resultado.email,
+                            "mensagem": resultado.mensagem,
+                        }
+                    },
+                )
+            if not detalhado:
+                continue
 
             # Log do resultado
             if resultado.sucesso:
@@ -34,4 +76,18 @@ class ClienteController:
             else:
                 print(f"❌ Erro ao cadastrar cliente: {resultado.mensagem}")
 
+        registrar(
+            logger,
+            logging.INFO,
+            "lote_clientes",
+            clientes=len(resultados),
+            cadastrados=cadastrados,
+        )
+        if self.modo_saida == SAIDA_RESUMO and resultados:
+            falhas = len(resultados) - cadastrados
+            print(
+                f"📋 {len(resultados)} clientes: {cadastrados} cadastrados, "
+                f"{falhas} com erro"
+            )
+
         return resultados
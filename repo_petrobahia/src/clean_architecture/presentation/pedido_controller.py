@@ -1,21 +1,40 @@
 """Controller para operações de pedido."""
 
+import logging
 from typing import Dict, List
 
 from ..application.dto import PedidoInputDTO, PedidoOutputDTO
 from ..application.use_cases import ProcessarPedidoUseCase
+from ..infrastructure.log import obter_logger, registrar
+from .saida import SAIDA_DETALHADA, SAIDA_SILENCIOSA, validar_modo_saida
+
+logger = obter_logger("pedidos")
 
 
 class PedidoController:
-    """Controller responsável por gerenciar operações de pedido."""
+    """
+    Controller responsável por gerenciar operações de pedido.
+
+    O ``modo_saida`` controla o terminal: ``"detalhado"`` (uma linha por
+    pedido e o total), ``"resumo"`` (apenas o resumo do lote) ou
+    ``"silencioso"``. Cada pedido também gera um evento ``DEBUG`` no log
+    estruturado, que só é montado quando esse nível está habilitado.
+    """
 
-    def __init__(self, processar_pedido_use_case: ProcessarPedidoUseCase):
+    def __init__(
+        self,
+        processar_pedido_use_case: ProcessarPedidoUseCase,
+        modo_saida: str = SAIDA_DETALHADA,
+    ):
         self.processar_pedido_use_case = processar_pedido_use_case
+        self.modo_saida = validar_modo_saida(modo_saida)
 
     def processar_pedidos(self, pedidos_data: List[Dict]) -> List[PedidoOutputDTO]:
         """Processa uma lista de pedidos."""
         resultados = []
         valores = []
+        detalhado = self.modo_saida == SAIDA_DETALHADA
+        log_pedidos = logger.isEnabledFor(logging.DEBUG)
 
         for pedido_data in pedidos_data:
             # Converte dict para DTO
@@ -24,15 +43,22 @@ class PedidoController:
                 produto=pedido_data.get("produto", ""),
                 qtd=pedido_data.get("qtd", 0),
                 cupom=pedido_data.get("cupom"),
+                cupons=pedido_data.get("cupons"),
             )
 
             # Executa o caso de uso
             resultado = self.processar_pedido_use_case.execute(dto)
             resultados.append(resultado)
 
-            # Log do resultado
             if resultado.sucesso:
                 valores.append(resultado.valor_final)
+            if log_pedidos:
+                self._registrar_pedido(resultado)
+            if not detalhado:
+                continue
+
+            # Log do resultado
+            if resultado.sucesso:
                 print(
                     f"✅ Pedido processado: {resultado.cliente} - "
                     f"{resultado.produto} - Valor: R$ {resultado.valor_final:.2f}"
@@ -40,8 +66,53 @@ class PedidoController:
             else:
                 print(f"❌ Erro ao processar pedido: {resultado.mensagem}")
 
+        total = sum(valores)
+        registrar(
+            logger,
+            logging.INFO,
+            "lote_pedidos",
+            pedidos=len(resultados),
+            processados=len(valores),
+            total=total,
+        )
+
         # Exibe total
+        if self.modo_saida == SAIDA_SILENCIOSA:
+            return resultados
+        if not detalhado and resultados:
+            falhas = len(resultados) - len(valores)
+            print(
+                f"📦 {len(resultados)} pedidos: {len(valores)} processados, "
+                f"{falhas} com erro"
+            )
         if valores:
-            print(f"\n💰 TOTAL: R$ {sum(valores):.2f}")
+            print(f"\n💰 TOTAL: R$ {total:.2f}")
 
         return resultados
+
+    @staticmethod
+    def _registrar_pedido(resultado: PedidoOutputDTO) -> None:
+        """Registra o evento estruturado de um pedido."""
+        if resultado.sucesso:
+            logger.debug(
+                "pedido_processado",
+                extra={
+                    "campos": {
+                        "cliente": resultado.cliente,
+                        "produto": resultado.produto,
+                        "quantidade": resultado.quantidade,
+                        "valor": resultado.valor_final,
+                    }
+                },
+            )
+        else:
+            logger.debug(
+                "pedido_rejeitado",
+                extra={
+                    "campos": {
+                        "cliente": resultado.cliente,
+                        "produto": resultado.produto,
+                        "motivo": resultado.mensagem,
+                    }
+                },
+            )
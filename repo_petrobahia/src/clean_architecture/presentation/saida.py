@@ -0,0 +1,16 @@
+"""Modos de saída dos controllers."""
+
+SAIDA_DETALHADA = "detalhado"  # Uma linha por item e o total
+SAIDA_RESUMO = "resumo"  # Apenas o resumo do lote
+SAIDA_SILENCIOSA = "silencioso"  # Nenhuma saída no terminal
+
+MODOS_SAIDA = (SAIDA_DETALHADA, SAIDA_RESUMO, SAIDA_SILENCIOSA)
+
+
+def validar_modo_saida(modo: str) -> str:
+    """Retorna o modo se for válido, senão gera ValueError."""
+    if modo not in MODOS_SAIDA:
+        raise ValueError(
+            f"Modo de saída desconhecido: {modo} (use {', '.join(MODOS_SAIDA)})"
+        )
+    return modo
@@ -1,6 +1,9 @@
+import logging
 from abc import ABC, abstractmethod
 from .domain import ProdutoTipo, BASES_PRECO, ProdutoNaoEncontradoError
 
+logger = logging.getLogger(__name__)
+
 # --- Interface (Strategy) ---
 
 class CalculoPrecoStrategy(ABC):
@@ -22,7 +25,7 @@ class CalculoDieselStrategy(CalculoPrecoStrategy):
             preco *= 0.90  # 10% de desconto
         elif qtd > 500:
             preco *= 0.95  # 5% de desconto
-        print(f"calc diesel: {preco}")
+        logger.debug("calc diesel: %s", preco)
         return preco
 
 class CalculoGasolinaStrategy(CalculoPrecoStrategy):
@@ -30,7 +33,7 @@ class CalculoGasolinaStrategy(CalculoPrecoStrategy):
         preco = self.preco_base * qtd
         if qtd > 200:
             preco -= 100  # Desconto fixo
-        print(f"calc gas: {preco}")
+        logger.debug("calc gas: %s", preco)
         return preco
 
 class CalculoEtanolStrategy(CalculoPrecoStrategy):
@@ -38,7 +41,7 @@ class CalculoEtanolStrategy(CalculoPrecoStrategy):
         preco = self.preco_base * qtd
         if qtd > 80:
             preco *= 0.97  # 3% de desconto
-        print(f"calc eta: {preco}")
+        logger.debug("calc eta: %s", preco)
         return preco
 
 class CalculoLubrificanteStrategy(CalculoPrecoStrategy):
@@ -62,7 +65,7 @@ class PrecoCalculadora:
     def calcular(self, tipo: ProdutoTipo, qtd: int) -> float:
         """Calcula o preço, delegando para a estratégia correta."""
         if tipo not in self._strategies:
-            print(f"tipo desconhecido {tipo}, devolvendo 0")
+            logger.warning("tipo desconhecido %s", tipo)
             raise ProdutoNaoEncontradoError(f"Estratégia de cálculo não encontrada para {tipo}")
 
         strategy = self._strategies[tipo]
@@ -1,6 +1,6 @@
 import re
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List
 from .domain import ValidacaoError
 
 # --- Definição de Responsabilidades (SRP) ---
@@ -29,6 +29,11 @@ class ClienteRepository(ABC):
     def salvar(self, cliente: Dict):
         pass
 
+    def salvar_lote(self, clientes: List[Dict]):
+        """Salva vários clientes (padrão: um salvar por cliente)."""
+        for cliente in clientes:
+            self.salvar(cliente)
+
 class ClienteFileRepository(ClienteRepository):
     """Implementação concreta que salva em arquivo (SRP)."""
     def __init__(self, filepath: str = "clientes_refatorado.txt"):
@@ -44,6 +49,15 @@ class ClienteFileRepository(ClienteRepository):
             # Em um app real, lançaria uma exceção de persistência
             raise
 
+    def salvar_lote(self, clientes: List[Dict]):
+        # Abre o arquivo uma vez e grava o lote com um único write
+        try:
+            with open(self.filepath, "a", encoding="utf-8") as f:
+                f.write("".join(str(cliente) + "\n" for cliente in clientes))
+        except IOError as e:
+            print(f"Erro ao salvar clientes no arquivo: {e}")
+            raise
+
 
 class NotificationService(ABC):
     """Interface para notificar usuários (SRP)."""
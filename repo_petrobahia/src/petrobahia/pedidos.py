@@ -1,9 +1,12 @@
+import logging
 from typing import Dict, Optional
 from .domain import ProdutoTipo, CupomTipo
 from .calculos import PrecoCalculadora
 from .descontos import DescontoService
 from .arredondamento import ArredondamentoService
 
+logger = logging.getLogger(__name__)
+
 class PedidoService:
     """Orquestra o processamento de pedidos (SRP)."""
     
@@ -33,7 +36,7 @@ class PedidoService:
             try:
                 cupom = CupomTipo(cupom_str)
             except ValueError:
-                print(f"Aviso: Cupom {cupom_str} desconhecido.")
+                logger.warning("Cupom %s desconhecido.", cupom_str)
                 
         return produto, qtd, cupom
 
@@ -45,18 +48,18 @@ class PedidoService:
         try:
             produto, qtd, cupom = self._parse_pedido(pedido_data)
         except ValueError as e:
-            print(f"Erro ao processar pedido: {e}")
+            logger.warning("Erro ao processar pedido: %s", e)
             return 0.0
 
         # 1. Validação (Gate Clause)
         if qtd <= 0:
-            print("qtd zero, retornando 0")
+            logger.debug("qtd zero, retornando 0")
             return 0.0
 
         # 2. Cálculo (Delega ao Strategy)
         preco = self.calculadora.calcular(produto, qtd)
         if preco < 0:
-            print("algo deu errado, preco negativo")
+            logger.warning("algo deu errado, preco negativo")
             preco = 0.0
 
         # 3. Desconto (Delega ao Strategy)
@@ -65,5 +68,8 @@ class PedidoService:
         # 4. Arredondamento (Delega ao Strategy)
         preco_final = self.arredondamento_svc.arredondar(preco_descontado, produto)
         
-        print(f"pedido ok: {pedido_data['cliente']} {produto.value} {qtd} => {preco_final}")
+        logger.debug(
+            "pedido ok: %s %s %s => %s",
+            pedido_data["cliente"], produto.value, qtd, preco_final,
+        )
         return preco_final
\ No newline at end of file
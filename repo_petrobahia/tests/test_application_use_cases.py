@@ -1,8 +1,15 @@
 """Testes para casos de uso - Application Layer."""
 
+import numpy as np
 import pytest
 from unittest.mock import Mock, call
-from clean_architecture.application.use_cases import CadastrarClienteUseCase, ProcessarPedidoUseCase
+from clean_architecture.application.use_cases import (
+    CadastrarClienteUseCase,
+    CalcularQuantidadeMaximaUseCase,
+    CotarCurvaUseCase,
+    ImportarClientesUseCase,
+    ProcessarPedidoUseCase,
+)
 from clean_architecture.application.dto import (
     ClienteInputDTO,
     ClienteOutputDTO,
@@ -12,6 +19,12 @@ from clean_architecture.application.dto import (
 from clean_architecture.domain.entities import Cliente, Pedido
 from clean_architecture.domain.value_objects import ProdutoTipo, CupomTipo
 from clean_architecture.domain.exceptions import ClienteInvalidoError
+from clean_architecture.infrastructure.cache import CotacaoCacheLRU
+from clean_architecture.infrastructure.services import (
+    ArredondamentoService,
+    CalculoPrecoService,
+    DescontoService,
+)
 
 
 class TestCadastrarClienteUseCase:
@@ -130,6 +143,93 @@ class TestCadastrarClienteUseCase:
         assert "Erro inesperado" in resultado.mensagem
         assert "Erro de conexão" in resultado.mensagem
 
+    def test_cadastrar_lote(self, mock_cliente_repository, mock_notification_service):
+        """Testa que o lote grava os válidos com um único salvar_lote."""
+        use_case = CadastrarClienteUseCase(
+            cliente_repository=mock_cliente_repository,
+            notification_service=mock_notification_service,
+        )
+        dtos = [
+            ClienteInputDTO(nome="A", email="a@test.com", cnpj="1"),
+            ClienteInputDTO(nome="B", email="invalido", cnpj="2"),
+            ClienteInputDTO(nome="C", email="c@test.com", cnpj="3"),
+        ]
+
+        resultados = use_case.execute_lote(dtos)
+
+        assert [r.sucesso for r in resultados] == [True, False, True]
+        assert "Erro de validação" in resultados[1].mensagem
+        mock_cliente_repository.salvar_lote.assert_called_once()
+        salvos = mock_cliente_repository.salvar_lote.call_args[0][0]
+        assert [c.email for c in salvos] == ["a@test.com", "c@test.com"]
+        mock_cliente_repository.salvar.assert_not_called()
+        assert mock_notification_service.enviar_boas_vindas.call_count == 2
+
+    def test_cadastrar_lote_erro_repositorio(
+        self, mock_cliente_repository, mock_notification_service
+    ):
+        """Testa que uma falha na gravação marca todos os válidos com erro."""
+        use_case = CadastrarClienteUseCase(
+            cliente_repository=mock_cliente_repository,
+            notification_service=mock_notification_service,
+        )
+        mock_cliente_repository.salvar_lote.side_effect = Exception("Disco cheio")
+        dtos = [
+            ClienteInputDTO(nome="A", email="a@test.com", cnpj="1"),
+            ClienteInputDTO(nome="B", email="invalido", cnpj="2"),
+        ]
+
+        resultados = use_case.execute_lote(dtos)
+
+        assert "Disco cheio" in resultados[0].mensagem
+        assert "Erro de validação" in resultados[1].mensagem
+        assert not any(r.sucesso for r in resultados)
+        mock_notification_service.enviar_boas_vindas.assert_not_called()
+
+    def test_email_duplicado(self, mock_cliente_repository, mock_notification_service):
+        """Testa que a guarda rejeita um email já cadastrado."""
+        guarda = Mock()
+        guarda.existe.side_effect = lambda email: email == "a@test.com"
+        use_case = CadastrarClienteUseCase(
+            cliente_repository=mock_cliente_repository,
+            notification_service=mock_notification_service,
+            guarda_duplicados=guarda,
+        )
+
+        duplicado = use_case.execute(
+            ClienteInputDTO(nome="A", email="a@test.com", cnpj="1")
+        )
+        novo = use_case.execute(ClienteInputDTO(nome="B", email="b@test.com", cnpj="2"))
+
+        assert not duplicado.sucesso
+        assert "Email já cadastrado" in duplicado.mensagem
+        assert novo.sucesso
+        mock_cliente_repository.salvar.assert_called_once()
+        guarda.registrar.assert_called_once_with(("b@test.com",))
+
+    def test_lote_com_duplicados(
+        self, mock_cliente_repository, mock_notification_service
+    ):
+        """Testa duplicados no repositório e repetidos dentro do lote."""
+        guarda = Mock()
+        guarda.existe.side_effect = lambda email: email == "a@test.com"
+        use_case = CadastrarClienteUseCase(
+            cliente_repository=mock_cliente_repository,
+            notification_service=mock_notification_service,
+            guarda_duplicados=guarda,
+        )
+        dtos = [
+            ClienteInputDTO(nome="A", email="a@test.com", cnpj="1"),
+            ClienteInputDTO(nome="B", email="b@test.com", cnpj="2"),
+            ClienteInputDTO(nome="B2", email="b@test.com", cnpj="3"),
+        ]
+
+        resultados = use_case.execute_lote(dtos)
+
+        assert [r.sucesso for r in resultados] == [False, True, False]
+        assert "repetido no lote" in resultados[2].mensagem
+        assert list(guarda.registrar.call_args[0][0]) == ["b@test.com"]
+
 
 class TestProcessarPedidoUseCase:
     """Testes para o caso de uso ProcessarPedidoUseCase."""
@@ -301,3 +401,355 @@ class TestProcessarPedidoUseCase:
             # Assert
             assert resultado.sucesso is True
             assert resultado.produto == produto
+
+
+class TestProcessarPedidoComCache:
+    """Testes para o caso de uso ProcessarPedidoUseCase com cache de cotações."""
+
+    def criar_use_case(self, calculo, desconto, arredondamento):
+        """Cria o caso de uso com um cache LRU real."""
+        calculo.tabela_vigente.return_value = Mock(versao="v1")
+        calculo.calcular.return_value = 399.0
+        desconto.aplicar_desconto.return_value = 359.1
+        arredondamento.arredondar.return_value = 359.0
+        return ProcessarPedidoUseCase(
+            calculo_preco_service=calculo,
+            desconto_service=desconto,
+            arredondamento_service=arredondamento,
+            cotacao_cache=CotacaoCacheLRU(tamanho_maximo=10),
+        )
+
+    def test_cotacao_repetida_usa_cache(
+        self,
+        mock_calculo_preco_service,
+        mock_desconto_service,
+        mock_arredondamento_service,
+    ):
+        """Testa que a mesma cotação não passa de novo pelo pipeline."""
+        use_case = self.criar_use_case(
+            mock_calculo_preco_service,
+            mock_desconto_service,
+            mock_arredondamento_service,
+        )
+        dto = PedidoInputDTO(cliente="X", produto="diesel", qtd=100, cupom="MEGA10")
+
+        primeiro = use_case.execute(dto)
+        segundo = use_case.execute(dto)
+
+        assert primeiro.valor_final == segundo.valor_final == 359.0
+        mock_calculo_preco_service.calcular.assert_called_once()
+        mock_desconto_service.aplicar_desconto.assert_called_once()
+        mock_arredondamento_service.arredondar.assert_called_once()
+        assert use_case.cotacao_cache.estatisticas()["acertos"] == 1
+
+    def test_troca_de_versao_invalida_cache(
+        self,
+        mock_calculo_preco_service,
+        mock_desconto_service,
+        mock_arredondamento_service,
+    ):
+        """Testa que uma nova versão de preços recalcula a cotação."""
+        use_case = self.criar_use_case(
+            mock_calculo_preco_service,
+            mock_desconto_service,
+            mock_arredondamento_service,
+        )
+        dto = PedidoInputDTO(cliente="X", produto="diesel", qtd=100)
+
+        use_case.execute(dto)
+        mock_calculo_preco_service.tabela_vigente.return_value = Mock(versao="v2")
+        resultado = use_case.execute(dto)
+
+        assert resultado.versao_preco == "v2"
+        assert mock_calculo_preco_service.calcular.call_count == 2
+        assert use_case.cotacao_cache.estatisticas()["invalidacoes"] == 1
+
+
+    def test_cotacao_de_versao_substituida_nao_volta_ao_cache(
+        self,
+        mock_calculo_preco_service,
+        mock_desconto_service,
+        mock_arredondamento_service,
+    ):
+        """Testa que um pedido iniciado antes da troca não guarda a versão antiga."""
+        use_case = self.criar_use_case(
+            mock_calculo_preco_service,
+            mock_desconto_service,
+            mock_arredondamento_service,
+        )
+        cache = use_case.cotacao_cache
+        cache.guardar((ProdutoTipo.DIESEL, 50, None, "v2"), 200.0)
+        pedido = Pedido(cliente="X", produto=ProdutoTipo.DIESEL, quantidade=100)
+        mock_calculo_preco_service.tabela_vigente.return_value = Mock(versao="v2")
+
+        use_case._cotar_com_cache(pedido, Mock(versao="v1"))
+
+        assert cache.obter((ProdutoTipo.DIESEL, 50, None, "v2")) == 200.0
+        assert len(cache) == 1
+
+
+class TestCotarCurvaUseCase:
+    """Testes para o caso de uso de cotação da curva de preços."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.calculo = CalculoPrecoService()
+        self.desconto = DescontoService()
+        self.arredondamento = ArredondamentoService()
+        self.use_case = CotarCurvaUseCase(
+            self.calculo, self.desconto, self.arredondamento
+        )
+        self.processar = ProcessarPedidoUseCase(
+            self.calculo, self.desconto, self.arredondamento
+        )
+
+    @pytest.mark.parametrize("produto", [p.value for p in ProdutoTipo])
+    @pytest.mark.parametrize("cupom", [None, "MEGA10", "NOVO5", "LUB2"])
+    def test_curva_igual_aos_pedidos(self, produto, cupom):
+        """Testa que cada ponto da curva é o preço do pedido equivalente."""
+        curva = self.use_case.execute(produto, cupom, 1, 1500)
+
+        esperado = [
+            self.processar.execute(PedidoInputDTO("X", produto, q, cupom)).valor_final
+            for q in range(1, 1501)
+        ]
+        assert curva.sucesso is True
+        assert curva.precos.tolist() == esperado
+        assert curva.versao_preco == "padrao"
+
+    def test_faixas_do_diesel(self):
+        """Testa as quantidades em que as faixas do diesel começam."""
+        curva = self.use_case.execute(ProdutoTipo.DIESEL, CupomTipo.MEGA10, 1, 20_000)
+
+        assert len(curva.precos) == 20_000
+        assert curva.faixas == [501, 1001]
+        assert curva.preco(1001) == self.processar.execute(
+            PedidoInputDTO("X", "diesel", 1001, "MEGA10")
+        ).valor_final
+
+    def test_faixas_fora_do_intervalo(self):
+        """Testa que só as mudanças de faixa dentro do intervalo aparecem."""
+        assert self.use_case.execute("diesel", None, 501, 900).faixas == []
+        assert self.use_case.execute("diesel", None, 500, 900).faixas == [501]
+        assert self.use_case.execute("lubrificante", None, 1, 900).faixas == []
+
+    def test_servicos_sem_lote_usam_chamadas_escalares(self):
+        """Testa o caminho escalar para serviços sem versão em lote."""
+        desconto = Mock(wraps=self.desconto, spec=["aplicar_desconto"])
+        use_case = CotarCurvaUseCase(self.calculo, desconto, self.arredondamento)
+
+        curva = use_case.execute("etanol", "NOVO5", 10, 20)
+
+        assert desconto.aplicar_desconto.call_count == 11
+        assert curva.precos.tolist() == self.use_case.execute(
+            "etanol", "NOVO5", 10, 20
+        ).precos.tolist()
+
+    @pytest.mark.parametrize(
+        "produto, qtd_min, qtd_max, mensagem",
+        [
+            ("diesel", 0, 10, "Erro de validação"),
+            ("diesel", 10, 5, "Erro de validação"),
+            ("querosene", 1, 10, "Erro de validação"),
+        ],
+    )
+    def test_parametros_invalidos(self, produto, qtd_min, qtd_max, mensagem):
+        """Testa que parâmetros inválidos geram resposta de erro."""
+        curva = self.use_case.execute(produto, None, qtd_min, qtd_max)
+
+        assert curva.sucesso is False
+        assert mensagem in curva.mensagem
+        assert len(curva.precos) == 0
+
+    def test_preco_fora_da_curva(self):
+        """Testa erro ao consultar quantidade fora do intervalo."""
+        curva = self.use_case.execute("diesel", None, 10, 20)
+
+        with pytest.raises(ValueError):
+            curva.preco(21)
+
+
+class TestCalcularQuantidadeMaximaUseCase:
+    """Testes para o caso de uso de quantidade máxima para um orçamento."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.calculo = CalculoPrecoService()
+        self.desconto = DescontoService()
+        self.arredondamento = ArredondamentoService()
+        self.use_case = CalcularQuantidadeMaximaUseCase(
+            self.calculo, self.desconto, self.arredondamento
+        )
+        self.curva = CotarCurvaUseCase(self.calculo, self.desconto, self.arredondamento)
+
+    def forca_bruta(self, produto, cupom, orcamento):
+        """Maior quantidade até 20000 com preço dentro do orçamento."""
+        precos = self.curva.execute(produto, cupom, 1, 20_000).precos
+        cabem = np.flatnonzero(precos <= orcamento)
+        return int(cabem[-1]) + 1 if cabem.size else 0
+
+    @pytest.mark.parametrize("produto", [p.value for p in ProdutoTipo])
+    @pytest.mark.parametrize("cupom", [None, "MEGA10", "NOVO5", "LUB2"])
+    def test_igual_a_forca_bruta(self, produto, cupom):
+        """Testa o solver contra a busca exaustiva."""
+        orcamentos = [1.0, 3.59, 100.0, 1795.5, 1796.0, 1900.0, 3591.0, 25_000.0]
+
+        for orcamento in orcamentos:
+            resultado = self.use_case.execute(produto, cupom, orcamento)
+
+            assert resultado.sucesso is True
+            assert resultado.quantidade == self.forca_bruta(produto, cupom, orcamento)
+
+    def test_diesel_com_mega10(self):
+        """Testa o exemplo de R$ 50.000 de diesel com MEGA10."""
+        resultado = self.use_case.execute("diesel", "MEGA10", 50_000.0)
+
+        processar = ProcessarPedidoUseCase(
+            self.calculo, self.desconto, self.arredondamento
+        )
+        cotar = lambda q: processar.execute(  # noqa: E731
+            PedidoInputDTO("X", "diesel", q, "MEGA10")
+        ).valor_final
+        assert resultado.valor_final == cotar(resultado.quantidade) <= 50_000.0
+        assert cotar(resultado.quantidade + 1) > 50_000.0
+        assert resultado.versao_preco == "padrao"
+
+    def test_faixa_com_desconto_pode_caber_mais(self):
+        """Testa que a queda de preço na faixa seguinte é considerada."""
+        # 500 L custam R$ 1995 sem desconto; na faixa de 5% cabem 526 L
+        resultado = self.use_case.execute("diesel", None, 1995.0)
+
+        assert resultado.quantidade == 526
+
+    def test_numero_de_cotacoes_logaritmico(self):
+        """Testa que o solver faz O(log n) cotações."""
+        arredondamento = Mock(wraps=self.arredondamento)
+        use_case = CalcularQuantidadeMaximaUseCase(
+            self.calculo, self.desconto, arredondamento
+        )
+
+        resultado = use_case.execute("lubrificante", None, 25_000_000.0)
+
+        assert resultado.quantidade == 1_000_000
+        assert arredondamento.arredondar.call_count < 60
+
+    def test_orcamento_insuficiente(self):
+        """Testa orçamento menor que o preço de uma unidade."""
+        resultado = self.use_case.execute("lubrificante", None, 10.0)
+
+        assert resultado.sucesso is True
+        assert resultado.quantidade == 0
+        assert resultado.valor_final == 0.0
+
+    @pytest.mark.parametrize("produto, orcamento", [("diesel", 0), ("nafta", 100)])
+    def test_parametros_invalidos(self, produto, orcamento):
+        """Testa que parâmetros inválidos geram resposta de erro."""
+        resultado = self.use_case.execute(produto, None, orcamento)
+
+        assert resultado.sucesso is False
+        assert "Erro de validação" in resultado.mensagem
+
+
+class FonteLista:
+    """Fonte de clientes em memória; a posição é o índice do registro + 1."""
+
+    def __init__(self, registros):
+        self.lista = registros
+
+    def registros(self, inicio=0):
+        for i in range(inicio, len(self.lista)):
+            yield i + 1, self.lista[i]
+
+
+def registro(i, email=None):
+    return {"nome": f"C{i}", "email": email or f"c{i}@test.com", "cnpj": str(i)}
+
+
+class TestImportarClientesUseCase:
+    """Testes para o caso de uso ImportarClientesUseCase."""
+
+    def test_importa_em_lotes(self, mock_cliente_repository):
+        """Testa a gravação dos válidos de cada lote com um salvar_lote."""
+        fonte = FonteLista(
+            [registro(0), registro(1, "invalido"), None, registro(3), registro(4)]
+        )
+        use_case = ImportarClientesUseCase(mock_cliente_repository, tamanho_lote=2)
+
+        resultado = use_case.execute(fonte)
+
+        lotes = [
+            [c.email for c in chamada[0][0]]
+            for chamada in mock_cliente_repository.salvar_lote.call_args_list
+        ]
+        assert lotes == [["c0@test.com"], ["c3@test.com"], ["c4@test.com"]]
+        assert (resultado.lidos, resultado.importados, resultado.rejeitados) == (
+            5,
+            3,
+            2,
+        )
+        assert resultado.posicao == 5
+        assert resultado.rejeicoes == [
+            "posição 1: Email inválido: invalido",
+            "posição 2: Registro ilegível.",
+        ]
+        assert resultado.vazao > 0
+
+    def test_retoma_do_checkpoint(self, mock_cliente_repository, tmp_path):
+        """Testa que uma importação interrompida continua da posição gravada."""
+        checkpoint = str(tmp_path / "importacao.json")
+        fonte = FonteLista([registro(i) for i in range(5)])
+        mock_cliente_repository.salvar_lote.side_effect = [None, IOError("falhou")]
+        use_case = ImportarClientesUseCase(
+            mock_cliente_repository, tamanho_lote=2, checkpoint_file=checkpoint
+        )
+
+        with pytest.raises(IOError):
+            use_case.execute(fonte)
+
+        mock_cliente_repository.salvar_lote.side_effect = None
+        resultado = use_case.execute(fonte)
+        assert resultado.posicao_inicial == 2
+        assert resultado.importados == 3
+        assert use_case.execute(fonte).lidos == 0
+
+    def test_inicio_explicito_e_progresso(self, mock_cliente_repository):
+        """Testa começar de uma posição e receber o andamento por lote."""
+        fonte = FonteLista([registro(i) for i in range(5)])
+        use_case = ImportarClientesUseCase(mock_cliente_repository, tamanho_lote=2)
+        posicoes = []
+
+        resultado = use_case.execute(
+            fonte, inicio=1, progresso=lambda r: posicoes.append(r.posicao)
+        )
+
+        assert posicoes == [3, 5]
+        assert resultado.importados == 4
+
+    def test_checkpoint_invalido(self, mock_cliente_repository, tmp_path):
+        """Testa erro para um checkpoint corrompido."""
+        checkpoint = tmp_path / "importacao.json"
+        checkpoint.write_text("{")
+        use_case = ImportarClientesUseCase(
+            mock_cliente_repository, checkpoint_file=str(checkpoint)
+        )
+
+        with pytest.raises(ValueError, match="Checkpoint"):
+            use_case.execute(FonteLista([]))
+
+    def test_validador_cnpj(self, mock_cliente_repository):
+        """Testa a rejeição dos CNPJs com dígitos verificadores errados."""
+        validador = Mock()
+        validador.validar_lote.side_effect = lambda cnpjs: [c != "1" for c in cnpjs]
+        fonte = FonteLista([registro(0), registro(1), None, registro(3)])
+        use_case = ImportarClientesUseCase(
+            mock_cliente_repository, validador_cnpj=validador
+        )
+
+        resultado = use_case.execute(fonte)
+
+        validador.validar_lote.assert_called_once_with(["0", "1", "", "3"])
+        assert resultado.importados == 2
+        assert resultado.rejeicoes == [
+            "posição 1: CNPJ inválido: 1",
+            "posição 2: Registro ilegível.",
+        ]
@@ -47,6 +47,21 @@ class TestCliente:
         with pytest.raises(ClienteInvalidoError, match="Email inválido"):
             Cliente(nome="João Silva", email="joao@", cnpj="12345678000100")
 
+    @pytest.mark.parametrize(
+        "campos",
+        [
+            ("U|Hacker", "v@x.com", "1"),
+            ("x\nD|v@x.com\ny", "a@x.com", "1"),
+            ("Nome\r", "a@x.com", "1"),
+            ("Nome", "a@x.com\n", "1"),
+            ("Nome", "a@x.com", "1|2"),
+        ],
+    )
+    def test_cliente_com_separadores(self, campos):
+        """Testa que '|' e quebras de linha são recusados em todos os campos."""
+        with pytest.raises(ClienteInvalidoError, match="não podem ter"):
+            Cliente(*campos)
+
     def test_cliente_email_valido_com_subdominios(self):
         """Testa que email com subdomínios é válido."""
         cliente = Cliente(nome="João Silva", email="joao@mail.company.com.br", cnpj="12345678000100")
@@ -1,7 +1,12 @@
 """Testes para value objects e exceções do domínio."""
 
 import pytest
-from clean_architecture.domain.value_objects import ProdutoTipo, CupomTipo, BASES_PRECO
+from clean_architecture.domain.value_objects import (
+    ProdutoTipo,
+    CupomTipo,
+    BASES_PRECO,
+    normalizar_cnpj,
+)
 from clean_architecture.domain.exceptions import (
     DomainException,
     ValidacaoError,
@@ -66,6 +71,22 @@ class TestValueObjects:
         for produto, preco in BASES_PRECO.items():
             assert isinstance(preco, (int, float)), f"Preço de {produto} deve ser numérico"
 
+    @pytest.mark.parametrize(
+        "cnpj, normalizado",
+        [
+            ("11.222.333/0001-81", "11222333000181"),
+            ("11222333000181", "11222333000181"),
+            ("123", "00000000000123"),
+            ("", None),
+            ("12.3a", None),
+            ("١٢٣", None),
+            ("112223330001811", None),
+        ],
+    )
+    def test_normalizar_cnpj(self, cnpj, normalizado):
+        """Testa a normalização do CNPJ para 14 dígitos."""
+        assert normalizar_cnpj(cnpj) == normalizado
+
 
 class TestExceptions:
     """Testes para exceções do domínio."""
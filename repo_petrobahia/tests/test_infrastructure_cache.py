@@ -0,0 +1,103 @@
+"""Testes para o cache de cotações."""
+
+import pytest
+
+from clean_architecture.di import Container
+from clean_architecture.domain.value_objects import CupomTipo, ProdutoTipo
+from clean_architecture.infrastructure.cache import CotacaoCacheLRU
+
+
+def chave(quantidade, versao="v1"):
+    """Monta uma chave de cotação de diesel com MEGA10."""
+    return (ProdutoTipo.DIESEL, quantidade, CupomTipo.MEGA10, versao)
+
+
+class TestCotacaoCacheLRU:
+    """Testes para o cache LRU de cotações."""
+
+    def test_falha_e_acerto(self):
+        """Testa contadores de acerto e falha."""
+        cache = CotacaoCacheLRU(tamanho_maximo=4)
+
+        assert cache.obter(chave(5000)) is None
+        cache.guardar(chave(5000), 17955.0)
+
+        assert cache.obter(chave(5000)) == 17955.0
+        estatisticas = cache.estatisticas()
+        assert estatisticas["acertos"] == 1
+        assert estatisticas["falhas"] == 1
+        assert estatisticas["taxa_acerto"] == 0.5
+
+    def test_remove_menos_recente(self):
+        """Testa que a entrada menos usada é removida ao passar do limite."""
+        cache = CotacaoCacheLRU(tamanho_maximo=2)
+        cache.guardar(chave(1), 1.0)
+        cache.guardar(chave(2), 2.0)
+        cache.obter(chave(1))  # chave 1 passa a ser a mais recente
+
+        cache.guardar(chave(3), 3.0)
+
+        assert len(cache) == 2
+        assert cache.obter(chave(2)) is None
+        assert cache.obter(chave(1)) == 1.0
+        assert cache.estatisticas()["remocoes"] == 1
+
+    def test_nova_versao_descarta_entradas(self):
+        """Testa invalidação automática quando a versão de preços muda."""
+        cache = CotacaoCacheLRU()
+        cache.guardar(chave(1), 1.0)
+
+        assert cache.obter(chave(1, versao="v2")) is None
+        cache.guardar(chave(1, versao="v2"), 2.0)
+
+        assert cache.obter(chave(1)) is None
+        assert len(cache) == 1
+        assert cache.estatisticas()["invalidacoes"] == 1
+
+    def test_versao_revertida_volta_a_ser_guardada(self):
+        """Testa que uma versão já substituída pode voltar a ser a vigente."""
+        cache = CotacaoCacheLRU()
+        cache.guardar(chave(1, versao="v1"), 1.0)
+        cache.guardar(chave(1, versao="v2"), 2.0)
+
+        cache.guardar(chave(1, versao="v1"), 1.0)
+
+        assert cache.obter(chave(1, versao="v1")) == 1.0
+        assert cache.obter(chave(1, versao="v2")) is None
+        assert cache.estatisticas()["invalidacoes"] == 2
+
+    def test_consulta_de_versao_antiga_nao_invalida(self):
+        """Testa que consultas de versão antiga não descartam a vigente."""
+        cache = CotacaoCacheLRU()
+        cache.guardar(chave(1), 1.0)
+        cache.guardar(chave(1, versao="v2"), 2.0)
+
+        assert cache.obter(chave(1, versao="v1")) is None
+
+        assert cache.obter(chave(1, versao="v2")) == 2.0
+        assert len(cache) == 1
+        assert cache.estatisticas()["invalidacoes"] == 1
+
+    def test_tamanho_invalido(self):
+        """Testa que o tamanho máximo deve ser positivo."""
+        with pytest.raises(ValueError):
+            CotacaoCacheLRU(tamanho_maximo=0)
+
+
+class TestContainerCache:
+    """Testes para a configuração do cache no container."""
+
+    def test_cache_desligado_por_padrao(self):
+        """Testa que o cache só é criado quando configurado."""
+        container = Container()
+        assert container.get_cotacao_cache() is None
+        assert container.get_processar_pedido_use_case().cotacao_cache is None
+
+    def test_cache_ligado_por_configuracao(self):
+        """Testa que o container injeta o cache configurado no caso de uso."""
+        container = Container({"cache_cotacoes": True, "cache_cotacoes_tamanho": 50})
+
+        use_case = container.get_processar_pedido_use_case()
+
+        assert isinstance(use_case.cotacao_cache, CotacaoCacheLRU)
+        assert use_case.cotacao_cache.tamanho_maximo == 50
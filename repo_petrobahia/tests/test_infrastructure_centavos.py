@@ -0,0 +1,154 @@
+"""Testes para o motor de preços em centavos inteiros."""
+
+import numpy as np
+import pytest
+
+from clean_architecture.domain.exceptions import (
+    ProdutoNaoEncontradoError,
+    ValidacaoError,
+)
+from clean_architecture.domain.value_objects import CupomTipo, ProdutoTipo
+from clean_architecture.infrastructure.services import (
+    MODO_COMPATIVEL,
+    ArredondamentoService,
+    CalculoPrecoService,
+    DescontoService,
+    MotorPrecoCentavos,
+    TabelaTarifaria,
+)
+
+CUPONS = [None, *CupomTipo]
+
+
+def criar_motor(modo="exato", tabela=None):
+    """Cria o motor com os serviços padrão."""
+    return MotorPrecoCentavos(
+        tabela or TabelaTarifaria(),
+        DescontoService(),
+        ArredondamentoService(),
+        modo=modo,
+    )
+
+
+def cotacao_float(produto, quantidade, cupom):
+    """Preço atual, calculado pelos três serviços em float."""
+    preco = CalculoPrecoService().calcular(produto, quantidade)
+    preco = DescontoService().aplicar_desconto(preco, produto, quantidade, cupom)
+    return ArredondamentoService().arredondar(preco, produto)
+
+
+class TestMotorPrecoCentavosExato:
+    """Testes para o modo exato."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.motor = criar_motor()
+
+    def test_corrige_centavo_perdido_em_float(self):
+        """Testa que 11 L de etanol valem exatamente R$ 39,49."""
+        assert cotacao_float(ProdutoTipo.ETANOL, 11, None) == 39.48
+        assert self.motor.cotar(ProdutoTipo.ETANOL, 11) == 3949
+
+    def test_diesel_em_reais_inteiros(self):
+        """Testa que o diesel é arredondado para reais inteiros."""
+        # 3.99 * 1200 * 0.90 * 0.90 = 3878.28
+        assert self.motor.cotar(ProdutoTipo.DIESEL, 1200, CupomTipo.MEGA10) == 387800
+
+    def test_gasolina_com_abatimento(self):
+        """Testa o abatimento de faixa da gasolina."""
+        # 5.19 * 300 - 100 = 1457.00
+        assert self.motor.cotar(ProdutoTipo.GASOLINA, 300) == 145700
+
+    def test_lubrificante_com_lub2(self):
+        """Testa o abatimento do cupom LUB2."""
+        # 25.00 * 3 - 2.00 = 73.00
+        assert self.motor.cotar(ProdutoTipo.LUBRIFICANTE, 3, CupomTipo.LUB2) == 7300
+
+    @pytest.mark.parametrize("produto", list(ProdutoTipo))
+    @pytest.mark.parametrize("cupom", CUPONS)
+    def test_proximo_do_float(self, produto, cupom):
+        """Testa que o modo exato difere do float em no máximo um centavo."""
+        unidade = 100 if produto == ProdutoTipo.DIESEL else 1
+        for qtd in range(1, 1500):
+            esperado = round(cotacao_float(produto, qtd, cupom) * 100)
+            assert abs(self.motor.cotar(produto, qtd, cupom) - esperado) <= unidade
+
+    def test_lote_igual_ao_escalar(self):
+        """Testa que o lote produz os mesmos centavos do cálculo escalar."""
+        aleatorio = np.random.default_rng(7)
+        produtos = [list(ProdutoTipo)[i] for i in aleatorio.integers(0, 4, 2000)]
+        cupons = [CUPONS[i] for i in aleatorio.integers(0, 4, 2000)]
+        quantidades = aleatorio.integers(1, 50_000, 2000)
+
+        lote = self.motor.cotar_lote(produtos, quantidades, cupons)
+
+        assert lote.dtype == np.int64
+        assert lote.tolist() == [
+            self.motor.cotar(p, int(q), c)
+            for p, q, c in zip(produtos, quantidades, cupons)
+        ]
+
+    def test_total_lote_exato(self):
+        """Testa que o total é a soma inteira das cotações."""
+        produtos = [ProdutoTipo.ETANOL] * 1000
+        quantidades = [11] * 1000
+
+        assert self.motor.total_lote(produtos, quantidades) == 3949 * 1000
+
+    def test_lote_vazio(self):
+        """Testa um lote sem pedidos."""
+        assert self.motor.cotar_lote([], []).shape == (0,)
+        assert self.motor.total_lote([], []) == 0
+
+    def test_tamanhos_diferentes(self):
+        """Testa erro quando os arrays do lote não têm o mesmo tamanho."""
+        with pytest.raises(ValueError):
+            self.motor.cotar_lote([ProdutoTipo.DIESEL], [1, 2])
+
+    def test_quantidade_grande_demais(self):
+        """Testa o erro de estouro do cálculo vetorizado."""
+        with pytest.raises(ValueError):
+            self.motor.cotar_lote([ProdutoTipo.LUBRIFICANTE], [10**12])
+
+    def test_produto_fora_da_tabela(self):
+        """Testa erro para produto que a tabela não define."""
+        motor = criar_motor(tabela=TabelaTarifaria({"diesel": {"base": 4.0}}))
+
+        with pytest.raises(ProdutoNaoEncontradoError):
+            motor.cotar(ProdutoTipo.ETANOL, 10)
+
+    def test_preco_base_fracionario(self):
+        """Testa erro para preço base que não é um número inteiro de centavos."""
+        with pytest.raises(ValidacaoError):
+            criar_motor(tabela=TabelaTarifaria({"diesel": {"base": 3.995}}))
+
+
+class TestMotorPrecoCentavosCompat:
+    """Testes para o modo de compatibilidade com o motor em float."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.motor = criar_motor(MODO_COMPATIVEL)
+
+    @pytest.mark.parametrize("produto", list(ProdutoTipo))
+    @pytest.mark.parametrize("cupom", CUPONS)
+    def test_reproduz_motor_float(self, produto, cupom):
+        """Testa que o modo compat reproduz centavo a centavo o float."""
+        quantidades = list(range(1, 1500))
+        esperado = [round(cotacao_float(produto, q, cupom) * 100) for q in quantidades]
+
+        lote = self.motor.cotar_lote(
+            [produto] * len(quantidades), quantidades, [cupom] * len(quantidades)
+        )
+
+        assert [self.motor.cotar(produto, q, cupom) for q in quantidades] == esperado
+        assert lote.tolist() == esperado
+
+    def test_mantem_desvio_do_float(self):
+        """Testa que o modo compat preserva o centavo perdido do etanol."""
+        assert self.motor.cotar(ProdutoTipo.ETANOL, 11) == 3948
+
+    def test_modo_invalido(self):
+        """Testa erro para modo de cálculo desconhecido."""
+        with pytest.raises(ValueError):
+            criar_motor("aproximado")
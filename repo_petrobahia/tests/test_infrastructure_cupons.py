@@ -0,0 +1,439 @@
+"""Testes para o registro de cupons."""
+
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from clean_architecture.application.dto import PedidoInputDTO
+from clean_architecture.di import Container
+from clean_architecture.domain.exceptions import CupomInvalidoError
+from clean_architecture.domain.value_objects import (
+    CODIGOS_PRODUTO,
+    CupomTipo,
+    ProdutoTipo,
+)
+from clean_architecture.infrastructure.services import (
+    ArredondamentoService,
+    CalculoPrecoService,
+    CombinadorCupons,
+    DescontoService,
+    MotorPrecoCentavos,
+    PipelinePrecoCompilado,
+    RegistroCupons,
+    TabelaTarifaria,
+)
+
+CUPONS = {
+    "MEGA10": {"percentual": 10},
+    "FIXO50": {"abatimento": 50.0},
+    "LUB2": {"abatimento": 2.0, "produtos": ["lubrificante"]},
+    "FROTA15": {"percentual": 15, "qtd_minima": 1000},
+    "COMBO": {"percentual": 3, "abatimento": 1.5, "produtos": ["diesel", "etanol"]},
+}
+
+
+def desconto_legado(preco, produto, cupom):
+    """Regras de cupom antes do registro (if/elif), usadas como referência."""
+    if cupom == CupomTipo.MEGA10:
+        return preco * 0.90
+    if cupom == CupomTipo.NOVO5:
+        return preco * 0.95
+    if cupom == CupomTipo.LUB2 and produto == ProdutoTipo.LUBRIFICANTE:
+        return preco - 2.0
+    return preco
+
+
+class TestRegistroCupons:
+    """Testes para o registro de cupons."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.registro = RegistroCupons(CUPONS)
+
+    @pytest.mark.parametrize("produto", list(ProdutoTipo))
+    @pytest.mark.parametrize("cupom", [None, *CupomTipo])
+    def test_cupons_padrao_iguais_ao_legado(self, produto, cupom):
+        """Testa que os cupons padrão reproduzem bit a bit as regras antigas."""
+        registro = RegistroCupons()
+
+        for preco in np.linspace(0.01, 50_000.0, 501).tolist():
+            obtido = registro.aplicar(cupom, preco, produto, 10)
+            assert obtido == desconto_legado(preco, produto, cupom)
+
+    def test_percentual_e_abatimento(self):
+        """Testa percentual e abatimento aplicados nessa ordem."""
+        assert self.registro.aplicar("FIXO50", 1000.0, ProdutoTipo.GASOLINA, 1) == 950.0
+        assert (
+            self.registro.aplicar("COMBO", 1000.0, ProdutoTipo.DIESEL, 1)
+            == 1000.0 * 0.97 - 1.5
+        )
+
+    def test_restricao_de_produto(self):
+        """Testa que o cupom não altera produtos fora da restrição."""
+        assert self.registro.aplicar("LUB2", 100.0, ProdutoTipo.DIESEL, 1) == 100.0
+        assert self.registro.aplicar("LUB2", 100.0, ProdutoTipo.LUBRIFICANTE, 1) == 98.0
+
+    def test_quantidade_minima(self):
+        """Testa que o cupom só vale a partir da quantidade mínima."""
+        assert self.registro.aplicar("FROTA15", 100.0, ProdutoTipo.DIESEL, 999) == 100.0
+        assert self.registro.aplicar("FROTA15", 100.0, ProdutoTipo.DIESEL, 1000) == 85.0
+
+    def test_aceita_cupom_tipo_e_texto(self):
+        """Testa que CupomTipo e o código em texto são equivalentes."""
+        assert CupomTipo.MEGA10 in self.registro
+        assert "MEGA10" in self.registro
+        assert "NOVO5" not in self.registro
+
+    def test_cupom_desconhecido(self):
+        """Testa erro para cupom fora do registro."""
+        with pytest.raises(CupomInvalidoError):
+            self.registro.aplicar("NAOEXISTE", 100.0, ProdutoTipo.DIESEL, 1)
+
+    @pytest.mark.parametrize("cupom", [None, *CUPONS])
+    def test_lote_igual_ao_escalar(self, cupom):
+        """Testa que o lote reproduz o cálculo escalar, com produtos misturados."""
+        aleatorio = np.random.default_rng(3)
+        produtos = aleatorio.integers(0, len(CODIGOS_PRODUTO), 3000)
+        quantidades = aleatorio.integers(1, 2000, 3000)
+        precos = aleatorio.uniform(0, 10_000, 3000)
+        por_codigo = {codigo: produto for produto, codigo in CODIGOS_PRODUTO.items()}
+
+        obtido = self.registro.aplicar_lote(cupom, precos, produtos, quantidades)
+
+        esperado = [
+            self.registro.aplicar(cupom, p, por_codigo[c], q)
+            for p, c, q in zip(precos.tolist(), produtos.tolist(), quantidades.tolist())
+        ]
+        assert obtido.tolist() == esperado
+
+    def test_milhares_de_cupons(self):
+        """Testa um registro com milhares de códigos promocionais."""
+        definicoes = {f"PROMO{i}": {"percentual": i % 50} for i in range(5000)}
+
+        registro = RegistroCupons(definicoes)
+
+        assert len(registro) == 5000
+        assert registro.aplicar("PROMO4321", 200.0, ProdutoTipo.ETANOL, 1) == 158.0
+
+    @pytest.mark.parametrize(
+        "definicao",
+        [
+            {"percentual": 120},
+            {"percentual": -1},
+            {"abatimento": -5},
+            {"qtd_minima": -1},
+            {"produtos": ["querosene"]},
+        ],
+    )
+    def test_definicao_invalida(self, definicao):
+        """Testa que definições inválidas são rejeitadas."""
+        with pytest.raises(CupomInvalidoError):
+            RegistroCupons({"RUIM": definicao})
+
+    def test_carrega_de_arquivo(self, tmp_path):
+        """Testa o carregamento a partir de um arquivo JSON."""
+        arquivo = tmp_path / "cupons.json"
+        arquivo.write_text(json.dumps(CUPONS), encoding="utf-8")
+
+        registro = RegistroCupons.de_arquivo(str(arquivo))
+
+        assert len(registro) == len(CUPONS)
+
+    def test_arquivo_invalido(self, tmp_path):
+        """Testa erro para arquivo inexistente ou malformado."""
+        arquivo = tmp_path / "cupons.json"
+        arquivo.write_text("{nao e json", encoding="utf-8")
+
+        with pytest.raises(CupomInvalidoError):
+            RegistroCupons.de_arquivo(str(arquivo))
+        with pytest.raises(CupomInvalidoError):
+            RegistroCupons.de_arquivo(str(tmp_path / "nao_existe.json"))
+
+
+class TestCuponsNosServicos:
+    """Testes para cupons do registro no desconto, pipeline e motor."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.calculo = CalculoPrecoService()
+        self.desconto = DescontoService(RegistroCupons(CUPONS))
+        self.arredondamento = ArredondamentoService()
+
+    def cotar(self, produto, quantidade, cupom):
+        """Cotação pelos três serviços."""
+        preco = self.calculo.calcular(produto, quantidade)
+        preco = self.desconto.aplicar_desconto(preco, produto, quantidade, cupom)
+        return self.arredondamento.arredondar(preco, produto)
+
+    @pytest.mark.parametrize("cupom", list(CUPONS))
+    def test_pipeline_igual_aos_servicos(self, cupom):
+        """Testa o pipeline compilado com cupons do registro."""
+        pipeline = PipelinePrecoCompilado(
+            self.calculo, self.desconto, self.arredondamento
+        )
+        tabela = self.calculo.tabela_vigente()
+
+        for produto in ProdutoTipo:
+            for qtd in range(900, 1100):
+                esperado = self.cotar(produto, qtd, cupom)
+                assert pipeline.cotar(produto, qtd, cupom, tabela) == esperado
+
+    @pytest.mark.parametrize("cupom", list(CUPONS))
+    def test_motor_centavos_compat_igual_aos_servicos(self, cupom):
+        """Testa o motor em centavos (compat) com cupons do registro."""
+        motor = MotorPrecoCentavos(
+            TabelaTarifaria(), self.desconto, self.arredondamento, modo="compat"
+        )
+        quantidades = list(range(900, 1100))
+
+        for produto in ProdutoTipo:
+            esperado = [round(self.cotar(produto, q, cupom) * 100) for q in quantidades]
+            lote = motor.cotar_lote(
+                [produto] * len(quantidades), quantidades, [cupom] * len(quantidades)
+            )
+            assert lote.tolist() == esperado
+            assert [motor.cotar(produto, q, cupom) for q in quantidades] == esperado
+
+    def test_motor_centavos_exato_respeita_minimo(self):
+        """Testa a quantidade mínima no motor em centavos exato."""
+        motor = MotorPrecoCentavos(
+            TabelaTarifaria(), self.desconto, self.arredondamento
+        )
+
+        # Lubrificante: 999 L sem desconto; a partir de 1000 L, 15% (FROTA15)
+        assert motor.cotar(ProdutoTipo.LUBRIFICANTE, 999, "FROTA15") == 2497500
+        assert motor.cotar(ProdutoTipo.LUBRIFICANTE, 1000, "FROTA15") == 2125000
+        assert motor.cotar_lote(
+            [ProdutoTipo.LUBRIFICANTE] * 2, [999, 1000], ["FROTA15"] * 2
+        ).tolist() == [2497500, 2125000]
+
+
+class TestCuponsNoCasoDeUso:
+    """Testes para cupons configurados no container."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        container = Container({"cupons": CUPONS})
+        self.use_case = container.get_processar_pedido_use_case()
+
+    def test_cupom_promocional(self):
+        """Testa um pedido com cupom que não está em CupomTipo."""
+        resultado = self.use_case.execute(
+            PedidoInputDTO(cliente="X", produto="lubrificante", qtd=10, cupom="FIXO50")
+        )
+
+        assert resultado.sucesso is True
+        assert resultado.valor_final == 200.0
+
+    def test_cupom_desconhecido(self):
+        """Testa erro de validação para cupom fora do registro."""
+        resultado = self.use_case.execute(
+            PedidoInputDTO(cliente="X", produto="diesel", qtd=10, cupom="SUMIU")
+        )
+
+        assert resultado.sucesso is False
+        assert "Cupom desconhecido" in resultado.mensagem
+
+    def test_cupom_fixo_fora_da_configuracao(self):
+        """Testa que um CupomTipo removido da configuração é rejeitado."""
+        resultado = self.use_case.execute(
+            PedidoInputDTO(cliente="X", produto="diesel", qtd=10, cupom="NOVO5")
+        )
+
+        assert resultado.sucesso is False
+        assert "Erro de validação" in resultado.mensagem
+
+
+CUPONS_ACUMULADOS = {
+    "MEGA10": {"percentual": 10, "grupo": "percentual"},
+    "NOVO5": {"percentual": 5, "grupo": "percentual"},
+    "LUB2": {"abatimento": 2.0, "produtos": ["lubrificante"]},
+    "FIXO50": {"abatimento": 50.0},
+    "FROTA15": {"percentual": 15, "qtd_minima": 1000, "grupo": "percentual"},
+    "SOZINHO": {"percentual": 30, "acumulavel": False},
+}
+
+
+def melhor_por_forca_bruta(registro, preco, produto, quantidade, cupons):
+    """Menor preço entre todos os subconjuntos permitidos de cupons."""
+    regras = [registro.obter(c) for c in cupons]
+    melhor = preco
+    for mascara in range(1, 1 << len(regras)):
+        escolha = [r for i, r in enumerate(regras) if mascara >> i & 1]
+        if any(
+            not r.aceita_produto(produto) or quantidade < r.qtd_minima for r in escolha
+        ):
+            continue
+        if any(
+            a.codigo != b.codigo and not a.compativel(b)
+            for a in escolha
+            for b in escolha
+        ):
+            continue
+        fator, abatimento = 1.0, 0.0
+        for regra in sorted(escolha, key=lambda r: r.codigo):
+            fator *= regra.fator
+            abatimento += regra.abatimento
+        melhor = min(melhor, max(preco * fator - abatimento, 0.0))
+    return melhor
+
+
+class TestCombinadorCupons:
+    """Testes para cupons acumulados em um mesmo pedido."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.registro = RegistroCupons(CUPONS_ACUMULADOS)
+        self.combinador = CombinadorCupons(self.registro)
+
+    def test_em_ordem_pula_conflitantes(self):
+        """Testa que o segundo cupom do mesmo grupo é ignorado."""
+        preco, aplicados = self.combinador.em_ordem(
+            100.0, ProdutoTipo.LUBRIFICANTE, 10, ["NOVO5", "MEGA10", "LUB2"]
+        )
+
+        assert aplicados == ("NOVO5", "LUB2")
+        assert preco == 100.0 * 0.95 - 2.0
+
+    def test_em_ordem_ignora_inelegiveis(self):
+        """Testa que cupom de outro produto ou sem quantidade mínima não vale."""
+        preco, aplicados = self.combinador.em_ordem(
+            100.0, ProdutoTipo.DIESEL, 10, ["FROTA15", "LUB2", "MEGA10"]
+        )
+
+        assert aplicados == ("MEGA10",)
+        assert preco == 90.0
+
+    def test_melhor_preco_escolhe_combinacao(self):
+        """Testa que o modo melhor preço troca de grupo conforme o pedido."""
+        cupons = ["NOVO5", "MEGA10", "FROTA15", "FIXO50", "SOZINHO"]
+
+        preco, aplicados = self.combinador.melhor_preco(
+            100.0, ProdutoTipo.DIESEL, 10, cupons
+        )
+        assert aplicados == ("MEGA10", "FIXO50")
+        assert preco == 100.0 * 0.9 - 50.0
+
+        preco, aplicados = self.combinador.melhor_preco(
+            10000.0, ProdutoTipo.DIESEL, 1000, cupons
+        )
+        assert aplicados == ("SOZINHO",)
+        assert preco == 10000.0 * 0.7
+
+    def test_preco_nunca_negativo(self):
+        """Testa que os abatimentos acumulados não deixam o preço negativo."""
+        preco, _ = self.combinador.melhor_preco(
+            10.0, ProdutoTipo.LUBRIFICANTE, 1, ["FIXO50", "LUB2"]
+        )
+        assert preco == 0.0
+
+    @pytest.mark.parametrize("semente", range(5))
+    def test_melhor_preco_igual_forca_bruta(self, semente):
+        """Testa o plano pré-calculado contra todos os subconjuntos."""
+        aleatorio = np.random.default_rng(semente)
+        definicoes = {
+            f"C{i}": {
+                "percentual": int(aleatorio.integers(0, 30)),
+                "abatimento": float(aleatorio.integers(0, 5)),
+                "qtd_minima": int(aleatorio.choice([0, 0, 500, 5000])),
+                "grupo": str(aleatorio.choice(["a", "b", "c"])),
+                "acumulavel": bool(aleatorio.random() > 0.1),
+            }
+            for i in range(12)
+        }
+        for i in range(0, 12, 3):
+            del definicoes[f"C{i}"]["grupo"]
+        registro = RegistroCupons(definicoes)
+        combinador = CombinadorCupons(registro)
+
+        for preco, quantidade in [(50.0, 10), (4000.0, 1000), (60000.0, 20000)]:
+            obtido, _ = combinador.melhor_preco(
+                preco, ProdutoTipo.DIESEL, quantidade, list(definicoes)
+            )
+            esperado = melhor_por_forca_bruta(
+                registro, preco, ProdutoTipo.DIESEL, quantidade, list(definicoes)
+            )
+            assert obtido == esperado
+
+    def test_plano_em_cache(self):
+        """Testa que o plano é reaproveitado para o mesmo conjunto de cupons."""
+        plano = self.combinador.planejar(ProdutoTipo.DIESEL, ["MEGA10", "FIXO50"])
+        assert (
+            self.combinador.planejar(ProdutoTipo.DIESEL, ["FIXO50", "MEGA10"]) is plano
+        )
+
+    def test_cache_de_planos_entre_threads(self):
+        """Testa o cache de planos pequeno disputado por várias threads."""
+
+        class PlanosLentos(OrderedDict):
+            """Cede a vez entre a consulta e o reordenamento do LRU."""
+
+            def get(self, chave, padrao=None):
+                plano = super().get(chave, padrao)
+                time.sleep(0.0001)
+                return plano
+
+        combinador = CombinadorCupons(self.registro, tamanho_cache=2)
+        combinador._planos = PlanosLentos()
+        conjuntos = [["MEGA10"], ["NOVO5"], ["FIXO50"], ["MEGA10", "FIXO50"]]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            planos = list(
+                executor.map(
+                    lambda i: combinador.planejar(ProdutoTipo.DIESEL, conjuntos[i % 4]),
+                    range(400),
+                )
+            )
+
+        assert len(planos) == 400
+        assert len(combinador._planos) == 2
+
+    def test_regra_de_acumulo_invalida(self):
+        """Testa a validação dos campos de acúmulo."""
+        with pytest.raises(CupomInvalidoError):
+            RegistroCupons({"X": {"percentual": 5, "acumulavel": "sim"}})
+
+
+class TestProcessarPedidoCuponsAcumulados:
+    """Testes do caso de uso com vários cupons."""
+
+    def test_modo_ordem(self):
+        """Testa que o modo padrão aplica os cupons na ordem informada."""
+        use_case = Container(
+            {"cupons": CUPONS_ACUMULADOS}
+        ).get_processar_pedido_use_case()
+
+        resultado = use_case.execute(
+            PedidoInputDTO("X", "lubrificante", 10, cupons=["MEGA10", "LUB2"])
+        )
+
+        assert resultado.sucesso is True
+        assert resultado.cupons_aplicados == ["MEGA10", "LUB2"]
+        assert resultado.valor_final == round(250.0 * 0.9 - 2.0, 2)
+
+    def test_modo_melhor_preco(self):
+        """Testa o modo melhor preço pelo container."""
+        container = Container({"cupons": CUPONS_ACUMULADOS, "modo_cupons": "melhor"})
+        use_case = container.get_processar_pedido_use_case()
+
+        resultado = use_case.execute(
+            PedidoInputDTO("X", "diesel", 10, cupom="NOVO5", cupons=["MEGA10"])
+        )
+
+        assert resultado.cupons_aplicados == ["MEGA10"]
+
+    def test_cupom_unico_na_lista(self):
+        """Testa que um cupom só em ``cupons`` segue o caminho de um cupom."""
+        use_case = Container(
+            {"cupons": CUPONS_ACUMULADOS}
+        ).get_processar_pedido_use_case()
+
+        unico = use_case.execute(PedidoInputDTO("X", "diesel", 10, cupons=["MEGA10"]))
+        simples = use_case.execute(PedidoInputDTO("X", "diesel", 10, cupom="MEGA10"))
+
+        assert unico.valor_final == simples.valor_final
+        assert unico.cupons_aplicados is None
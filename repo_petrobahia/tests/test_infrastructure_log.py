@@ -0,0 +1,87 @@
+"""Testes para o log estruturado."""
+
+import io
+import json
+import logging
+
+import pytest
+
+from clean_architecture.infrastructure.log import (
+    FormatadorEstruturado,
+    configurar_logging,
+    obter_logger,
+    registrar,
+)
+
+
+@pytest.fixture
+def saida():
+    """Configura o logger petrobahia para um buffer e restaura depois."""
+    raiz = logging.getLogger("petrobahia")
+    nivel, handlers, propagate = raiz.level, list(raiz.handlers), raiz.propagate
+    stream = io.StringIO()
+    yield stream
+    raiz.handlers[:] = handlers
+    raiz.setLevel(nivel)
+    raiz.propagate = propagate
+
+
+class TestLogEstruturado:
+    """Testes para o formatador e a configuração do log."""
+
+    def test_formato_texto(self, saida):
+        """Testa a saída chave=valor."""
+        configurar_logging(logging.INFO, stream=saida)
+
+        registrar(
+            obter_logger("pedidos"),
+            logging.INFO,
+            "lote_pedidos",
+            pedidos=2,
+            cliente="Empresa X",
+        )
+
+        assert saida.getvalue() == (
+            "nivel=INFO logger=petrobahia.pedidos evento=lote_pedidos "
+            'pedidos=2 cliente="Empresa X"\n'
+        )
+
+    def test_formato_json(self, saida):
+        """Testa a saída em JSON."""
+        configurar_logging(logging.INFO, formato="json", stream=saida)
+
+        registrar(obter_logger("pedidos"), logging.INFO, "lote", total=10.5)
+
+        assert json.loads(saida.getvalue()) == {
+            "nivel": "INFO",
+            "logger": "petrobahia.pedidos",
+            "evento": "lote",
+            "total": 10.5,
+        }
+
+    def test_nivel_desligado_nao_formata(self, saida):
+        """Testa que eventos abaixo do nível não chegam a ser formatados."""
+
+        class Explosivo:
+            def __str__(self):
+                raise AssertionError("não deveria formatar")
+
+        configurar_logging(logging.WARNING, stream=saida)
+
+        registrar(obter_logger("pedidos"), logging.DEBUG, "pedido", valor=Explosivo())
+
+        assert saida.getvalue() == ""
+
+    def test_reconfigurar_nao_duplica_handler(self, saida):
+        """Testa que configurar duas vezes não duplica as linhas."""
+        configurar_logging(logging.INFO, stream=saida)
+        configurar_logging(logging.INFO, stream=saida)
+
+        registrar(obter_logger("x"), logging.INFO, "evento")
+
+        assert saida.getvalue().count("evento=evento") == 1
+
+    def test_formato_invalido(self):
+        """Testa erro para formato desconhecido."""
+        with pytest.raises(ValueError):
+            FormatadorEstruturado("xml")
@@ -0,0 +1,1754 @@
+"""Testes para o repositório de clientes em arquivo."""
+
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from clean_architecture.application.dto import ClienteInputDTO
+from clean_architecture.application.use_cases import ImportarClientesUseCase
+from clean_architecture.di import Container
+from clean_architecture.domain.entities import Cliente
+from clean_architecture.domain.exceptions import ClienteInvalidoError
+from clean_architecture.domain.repositories import ClienteRepositoryInterface
+from clean_architecture.domain.value_objects import normalizar_cnpj
+from clean_architecture.infrastructure.persistence import (
+    DURABILIDADE_LOTE,
+    DURABILIDADE_NENHUMA,
+    DURABILIDADE_REGISTRO,
+    ClienteFileRepository,
+    ClienteSQLiteRepository,
+    ClienteWriteBehindRepository,
+    FiltroBloom,
+    GuardaDuplicadosBloom,
+    IndiceDominiosSidecar,
+    IndiceOrdenado,
+    IndiceTrigramas,
+    LeitorClientesLegado,
+    TravaArquivo,
+    chave_dominio,
+    ler_linha_legado,
+    sqlite,
+    travas,
+    trigramas,
+)
+
+
+def cliente(i: int, nome: str = "Cliente") -> Cliente:
+    return Cliente(nome=f"{nome} {i}", email=f"c{i}@petrobahia.com", cnpj=f"{i:014d}")
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    return str(tmp_path / "clientes.txt")
+
+
+class TestClienteFileRepository:
+    """Testes para o índice de emails do repositório."""
+
+    def test_busca_arquivo_inexistente(self, arquivo):
+        """Testa busca sem arquivo."""
+        assert ClienteFileRepository(arquivo).buscar_por_email("x@y.com") is None
+
+    def test_salvar_e_buscar(self, arquivo):
+        """Testa que clientes salvos são encontrados antes e depois do índice."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar(cliente(1))
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+
+        # Com o índice já montado, salvar o atualiza
+        repositorio.salvar(cliente(2, "Ação Ltda"))
+        assert repositorio.buscar_por_email("c2@petrobahia.com") == cliente(
+            2, "Ação Ltda"
+        )
+        assert repositorio.buscar_por_email("c3@petrobahia.com") is None
+
+    def test_primeira_linha_do_email_vale(self, arquivo):
+        """Testa que, como na leitura sequencial, vale a primeira ocorrência."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar(cliente(1, "Antigo"))
+        repositorio.buscar_por_email("c1@petrobahia.com")
+        repositorio.salvar(cliente(1, "Novo"))
+
+        assert repositorio.buscar_por_email("c1@petrobahia.com").nome == "Antigo 1"
+
+    def test_linhas_de_outro_processo(self, arquivo):
+        """Testa que linhas acrescentadas por fora são indexadas na busca."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar(cliente(1))
+        repositorio.buscar_por_email("c1@petrobahia.com")
+
+        ClienteFileRepository(arquivo).salvar(cliente(2))
+        repositorio.salvar(cliente(3))
+
+        assert repositorio.buscar_por_email("c2@petrobahia.com") == cliente(2)
+        assert repositorio.buscar_por_email("c3@petrobahia.com") == cliente(3)
+
+    def test_arquivo_reescrito(self, arquivo):
+        """Testa que o índice é refeito quando o arquivo muda por fora."""
+        repositorio = ClienteFileRepository(arquivo)
+        for i in range(3):
+            repositorio.salvar(cliente(i))
+        repositorio.buscar_por_email("c0@petrobahia.com")
+
+        with open(arquivo, "w", encoding="utf-8") as f:
+            f.write("Outro|c2@petrobahia.com|00000000000002\n")
+
+        assert repositorio.buscar_por_email("c2@petrobahia.com").nome == "Outro"
+        assert repositorio.buscar_por_email("c0@petrobahia.com") is None
+
+    def test_ignora_linhas_invalidas(self, arquivo):
+        """Testa que linhas fora do formato não atrapalham o índice."""
+        with open(arquivo, "w", encoding="utf-8") as f:
+            f.write("lixo\n\nA|a@b.com|1|extra\nB|b@b.com|00000000000001\n")
+
+        repositorio = ClienteFileRepository(arquivo)
+
+        assert repositorio.buscar_por_email("a@b.com") is None
+        assert repositorio.buscar_por_email("b@b.com").nome == "B"
+
+
+class TestIndicePersistente:
+    """Testes para o índice de emails em arquivo ``.idx``."""
+
+    def test_reabre_pelo_indice(self, arquivo):
+        """Testa que um repositório novo usa o índice e relê só o fim."""
+        repositorio = ClienteFileRepository(arquivo)
+        for i in range(50):
+            repositorio.salvar(cliente(i))
+        repositorio.salvar_indice()
+        repositorio.salvar(cliente(50))
+        repositorio.fechar()
+
+        reaberto = ClienteFileRepository(arquivo)
+        assert reaberto.buscar_por_email("c7@petrobahia.com") == cliente(7)
+        assert reaberto.buscar_por_email("c50@petrobahia.com") == cliente(50)
+        assert reaberto.buscar_por_email("c99@petrobahia.com") is None
+        # Só o cliente escrito depois do checkpoint foi relido
+        assert len(reaberto._indice) == 1
+
+    def test_primeira_linha_vale_com_indice(self, arquivo):
+        """Testa que a linha anterior ao checkpoint vence uma repetida depois."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar(cliente(1, "Antigo"))
+        repositorio.salvar_indice()
+        repositorio.salvar(cliente(1, "Novo"))
+
+        reaberto = ClienteFileRepository(arquivo)
+        assert reaberto.buscar_por_email("c1@petrobahia.com").nome == "Antigo 1"
+
+    def test_checkpoint_automatico(self, arquivo):
+        """Testa que o índice é gravado quando o dicionário cresce."""
+        repositorio = ClienteFileRepository(arquivo, checkpoint_indice=10)
+        repositorio.salvar(cliente(0))
+        repositorio.buscar_por_email("x@y.com")
+        for i in range(1, 25):
+            repositorio.salvar(cliente(i))
+
+        reaberto = ClienteFileRepository(arquivo)
+        assert reaberto.buscar_por_email("c3@petrobahia.com") == cliente(3)
+        assert reaberto.buscar_por_email("c24@petrobahia.com") == cliente(24)
+        # Checkpoints com 10 e 20 clientes: sobram 5 para reler
+        assert len(reaberto._indice) == 5
+
+    def test_indice_de_arquivo_reescrito_e_ignorado(self, arquivo):
+        """Testa que o índice não vale se o arquivo de dados mudou."""
+        repositorio = ClienteFileRepository(arquivo)
+        for i in range(5):
+            repositorio.salvar(cliente(i))
+        repositorio.salvar_indice()
+        repositorio.fechar()
+
+        with open(arquivo, "w", encoding="utf-8") as f:
+            for i in range(5):
+                f.write(f"Outro {i}|c{i}@petrobahia.com|{i:014d}\n")
+
+        reaberto = ClienteFileRepository(arquivo)
+        assert reaberto.buscar_por_email("c3@petrobahia.com").nome == "Outro 3"
+
+    def test_indice_corrompido_e_ignorado(self, arquivo):
+        """Testa que um índice truncado é ignorado."""
+        repositorio = ClienteFileRepository(arquivo)
+        for i in range(5):
+            repositorio.salvar(cliente(i))
+        repositorio.salvar_indice()
+        repositorio.fechar()
+        with open(f"{arquivo}.idx", "r+b") as f:
+            f.truncate(70)
+
+        assert ClienteFileRepository(arquivo).buscar_por_email(
+            "c4@petrobahia.com"
+        ) == cliente(4)
+
+    def test_salvar_indice_sem_arquivo(self, arquivo, tmp_path):
+        """Testa que não há índice a gravar antes do primeiro cliente."""
+        repositorio = ClienteFileRepository(arquivo)
+
+        repositorio.salvar_indice()
+
+        assert not (tmp_path / "clientes.txt.idx").exists()
+
+    def test_sem_indice_persistente(self, arquivo, tmp_path):
+        """Testa que o índice pode ficar só em memória."""
+        repositorio = ClienteFileRepository(arquivo, indice_persistente=False)
+        repositorio.salvar(cliente(1))
+        repositorio.salvar_indice()
+
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+        assert not (tmp_path / "clientes.txt.idx").exists()
+
+
+class TestSalvarLote:
+    """Testes para a gravação em lote e os modos de durabilidade."""
+
+    @pytest.fixture
+    def fsyncs(self, monkeypatch):
+        chamadas = []
+        original = os.fsync
+
+        def contar(fd):
+            chamadas.append(fd)
+            original(fd)
+
+        monkeypatch.setattr(os, "fsync", contar)
+        return chamadas
+
+    def test_lote_igual_a_salvar_um_a_um(self, tmp_path):
+        """Testa que o lote escreve o mesmo arquivo que salvar por cliente."""
+        um_a_um = ClienteFileRepository(str(tmp_path / "a.txt"))
+        for i in range(20):
+            um_a_um.salvar(cliente(i, "Ação"))
+        lote = ClienteFileRepository(str(tmp_path / "b.txt"))
+        lote.salvar_lote(cliente(i, "Ação") for i in range(20))
+
+        assert (tmp_path / "a.txt").read_bytes() == (tmp_path / "b.txt").read_bytes()
+
+    def test_lote_atualiza_indice(self, arquivo):
+        """Testa que clientes do lote são encontrados com o índice montado."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar(cliente(0))
+        repositorio.buscar_por_email("c0@petrobahia.com")
+        repositorio.salvar_lote([cliente(1), cliente(2), cliente(1, "Outro")])
+
+        assert repositorio.buscar_por_email("c2@petrobahia.com") == cliente(2)
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+        assert len(repositorio._indice) == 3
+
+    @pytest.mark.parametrize(
+        "durabilidade, esperados",
+        [
+            (DURABILIDADE_NENHUMA, 0),
+            (DURABILIDADE_LOTE, 3),
+            (DURABILIDADE_REGISTRO, 10),
+        ],
+    )
+    def test_fsync_por_modo(self, arquivo, fsyncs, durabilidade, esperados):
+        """Testa quantos fsync cada modo faz em um lote de 10 clientes."""
+        repositorio = ClienteFileRepository(
+            arquivo,
+            indice_persistente=False,
+            durabilidade=durabilidade,
+            fsync_registros=4,
+            fsync_ms=60_000,
+        )
+        repositorio.salvar_lote(cliente(i) for i in range(10))
+
+        # No modo lote: com 4 e 8 registros, e o resto no fim do lote
+        assert len(fsyncs) == esperados
+        assert repositorio.buscar_por_email("c9@petrobahia.com") == cliente(9)
+
+    def test_fsync_por_tempo(self, arquivo, fsyncs):
+        """Testa que, com intervalo zero, cada registro do lote é sincronizado."""
+        repositorio = ClienteFileRepository(
+            arquivo,
+            indice_persistente=False,
+            durabilidade=DURABILIDADE_LOTE,
+            fsync_registros=1000,
+            fsync_ms=0,
+        )
+        repositorio.salvar_lote(cliente(i) for i in range(5))
+
+        assert len(fsyncs) == 5
+
+    def test_durabilidade_invalida(self, arquivo):
+        """Testa erro para modo de durabilidade desconhecido."""
+        with pytest.raises(ValueError):
+            ClienteFileRepository(arquivo, durabilidade="sempre")
+
+    def test_container_repassa_durabilidade(self, arquivo):
+        """Testa a configuração da durabilidade pelo container."""
+        repositorio = Container(
+            {"cliente_file": arquivo, "cliente_durabilidade": DURABILIDADE_LOTE}
+        ).get_cliente_repository()
+
+        assert repositorio.durabilidade == DURABILIDADE_LOTE
+
+
+class TestClienteSQLiteRepository:
+    """Testes para o repositório de clientes em SQLite."""
+
+    @pytest.fixture
+    def banco(self, tmp_path):
+        repositorio = ClienteSQLiteRepository(str(tmp_path / "clientes.sqlite3"))
+        yield repositorio
+        repositorio.fechar()
+
+    def test_salvar_e_buscar(self, banco):
+        """Testa salvar um cliente e buscá-lo pelo email."""
+        banco.salvar(cliente(1, "Ação Ltda"))
+
+        assert banco.buscar_por_email("c1@petrobahia.com") == cliente(1, "Ação Ltda")
+        assert banco.buscar_por_email("c2@petrobahia.com") is None
+
+    def test_salvar_lote(self, banco):
+        """Testa gravar muitos clientes em uma transação."""
+        banco.salvar_lote(cliente(i) for i in range(1000))
+
+        assert banco.buscar_por_email("c999@petrobahia.com") == cliente(999)
+
+    def test_email_repetido_mantem_o_primeiro(self, banco):
+        """Testa que, como no arquivo, vale o primeiro cadastro do email."""
+        banco.salvar(cliente(1, "Antigo"))
+        banco.salvar_lote([cliente(1, "Novo"), cliente(2)])
+
+        assert banco.buscar_por_email("c1@petrobahia.com").nome == "Antigo 1"
+        assert banco.buscar_por_email("c2@petrobahia.com") == cliente(2)
+
+    def test_modo_wal_e_indice_unico(self, banco):
+        """Testa a configuração do banco."""
+        conexao = banco._conexao
+        assert conexao.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indices = conexao.execute("PRAGMA index_list(clientes)").fetchall()
+        assert any(nome == "clientes_email" and unico for _, nome, unico, *_ in indices)
+
+    def test_dados_persistem(self, tmp_path):
+        """Testa reabrir o banco."""
+        caminho = str(tmp_path / "clientes.sqlite3")
+        repositorio = ClienteSQLiteRepository(caminho)
+        repositorio.salvar(cliente(1))
+        repositorio.fechar()
+
+        assert ClienteSQLiteRepository(caminho).buscar_por_email(
+            "c1@petrobahia.com"
+        ) == cliente(1)
+
+    def test_container_seleciona_backend(self, tmp_path):
+        """Testa a escolha do backend pela configuração."""
+        container = Container(
+            {
+                "cliente_backend": "sqlite",
+                "cliente_db_file": str(tmp_path / "clientes.sqlite3"),
+            }
+        )
+        assert isinstance(container.get_cliente_repository(), ClienteSQLiteRepository)
+        container.get_cliente_repository().fechar()
+
+        with pytest.raises(ValueError):
+            Container({"cliente_backend": "nuvem"}).get_cliente_repository()
+
+
+class TestFiltroBloom:
+    """Testes para o filtro de Bloom."""
+
+    def test_sem_falsos_negativos(self):
+        """Testa que todo email adicionado é encontrado, um a um ou em bloco."""
+        filtro = FiltroBloom.para_capacidade(1000, 0.01)
+        filtro.adicionar("c0@petrobahia.com")
+        filtro.adicionar_varios(f"c{i}@petrobahia.com" for i in range(1, 1000))
+
+        assert all(filtro.contem(f"c{i}@petrobahia.com") for i in range(1000))
+        assert filtro.contagem == 1000
+
+    def test_bloco_igual_a_um_a_um(self):
+        """Testa que as posições calculadas com numpy são as mesmas."""
+        um_a_um = FiltroBloom.para_capacidade(500, 0.01)
+        bloco = FiltroBloom.para_capacidade(500, 0.01)
+        emails = [f"c{i}@petrobahia.com" for i in range(500)]
+        for email in emails:
+            um_a_um.adicionar(email)
+        bloco.adicionar_varios(emails)
+
+        assert um_a_um._dados == bloco._dados
+
+    def test_taxa_de_falsos_positivos(self):
+        """Testa que a taxa de falsos positivos fica perto da configurada."""
+        filtro = FiltroBloom.para_capacidade(10_000, 0.01)
+        filtro.adicionar_varios(f"c{i}@petrobahia.com" for i in range(10_000))
+        falsos = sum(filtro.contem(f"novo{i}@petrobahia.com") for i in range(10_000))
+
+        assert falsos < 200
+
+    def test_gravar_e_abrir(self, tmp_path):
+        """Testa a persistência do filtro, da marca e da assinatura."""
+        caminho = str(tmp_path / "f.bloom")
+        filtro = FiltroBloom.para_capacidade(100, 0.01)
+        filtro.adicionar("a@b.com")
+        filtro.gravar(caminho, 123, b"assinatura")
+
+        aberto, marca, assinatura = FiltroBloom.abrir(caminho)
+        assert (marca, assinatura) == (123, b"assinatura")
+        assert aberto.contem("a@b.com") and aberto.contagem == 1
+
+        with open(caminho, "r+b") as f:
+            f.truncate(60)
+        assert FiltroBloom.abrir(caminho) is None
+
+    def test_parametros_invalidos(self):
+        """Testa erro para capacidade ou taxa inválidas."""
+        with pytest.raises(ValueError):
+            FiltroBloom.para_capacidade(0, 0.01)
+        with pytest.raises(ValueError):
+            FiltroBloom.para_capacidade(100, 1.5)
+
+
+class TestGuardaDuplicadosBloom:
+    """Testes para a guarda de emails duplicados."""
+
+    def test_reconstroi_e_grava_filtro(self, arquivo, tmp_path):
+        """Testa montar o filtro a partir do arquivo do repositório."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(cliente(i) for i in range(100))
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=1000)
+
+        assert guarda.existe("c42@petrobahia.com")
+        assert not guarda.existe("c100@petrobahia.com")
+        assert (tmp_path / "clientes.txt.bloom").exists()
+
+    def test_email_novo_nao_consulta_repositorio(self, arquivo, monkeypatch):
+        """Testa que o filtro responde sem buscar no repositório."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(cliente(i) for i in range(100))
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=1000, taxa_falsos=1e-6)
+        buscas = []
+        original = repositorio.buscar_por_email
+        monkeypatch.setattr(
+            repositorio,
+            "buscar_por_email",
+            lambda email: buscas.append(email) or original(email),
+        )
+
+        assert not any(guarda.existe(f"novo{i}@petrobahia.com") for i in range(100))
+        assert buscas == []
+        assert guarda.existe("c1@petrobahia.com")
+        assert buscas == ["c1@petrobahia.com"]
+
+    def test_registrar(self, arquivo):
+        """Testa que emails registrados passam a existir."""
+        repositorio = ClienteFileRepository(arquivo)
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=100)
+        assert not guarda.existe("c1@petrobahia.com")
+
+        repositorio.salvar(cliente(1))
+        guarda.registrar(["c1@petrobahia.com"])
+
+        assert guarda.existe("c1@petrobahia.com")
+
+    def test_reabre_e_le_so_o_fim(self, arquivo):
+        """Testa que o filtro gravado é reaberto e completado pela marca."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(cliente(i) for i in range(50))
+        GuardaDuplicadosBloom(repositorio, capacidade=1000).fechar()
+        repositorio.salvar(cliente(50))
+
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=1000)
+        assert guarda.existe("c50@petrobahia.com")
+        assert guarda.existe("c0@petrobahia.com")
+        assert guarda._filtro.contagem == 51
+
+    def test_arquivo_menor_que_a_marca_reconstroi(self, arquivo):
+        """Testa que um repositório reescrito menor refaz o filtro."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(cliente(i) for i in range(50))
+        GuardaDuplicadosBloom(repositorio, capacidade=1000).fechar()
+        with open(arquivo, "w", encoding="utf-8") as f:
+            f.write("Outro|outro@petrobahia.com|00000000000001\n")
+
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=1000)
+        assert guarda.existe("outro@petrobahia.com")
+        assert guarda._filtro.contagem == 1
+
+    def test_compactado_e_maior_que_a_marca_reconstroi(self, arquivo):
+        """Testa que a compactação invalida a marca, mesmo com o arquivo maior."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(cliente(i) for i in range(200))
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=1000)
+        guarda.existe("c0@petrobahia.com")
+        guarda.salvar_filtro()
+        for i in range(150):
+            repositorio.remover(f"c{i}@petrobahia.com")
+        repositorio.compactar()
+        repositorio.salvar_lote(cliente(i) for i in range(200, 500))
+
+        # Uma guarda aberta antes e outra reaberta depois da compactação
+        guarda.sincronizar()
+        reaberta = GuardaDuplicadosBloom(repositorio, capacidade=1000)
+        for email in (f"c{i}@petrobahia.com" for i in range(150, 500)):
+            assert guarda.existe(email) and reaberta.existe(email)
+
+    def test_capacidade_excedida_dobra(self, arquivo):
+        """Testa que o filtro cresce quando passa da capacidade."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(cliente(i) for i in range(30))
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=10)
+
+        assert guarda.existe("c29@petrobahia.com")
+        assert guarda._filtro.capacidade >= 30
+
+    def test_sqlite(self, tmp_path):
+        """Testa a guarda sobre o repositório SQLite."""
+        banco = ClienteSQLiteRepository(str(tmp_path / "clientes.sqlite3"))
+        banco.salvar_lote(cliente(i) for i in range(25))
+        GuardaDuplicadosBloom(banco, capacidade=100).fechar()
+        banco.salvar(cliente(25))
+
+        guarda = GuardaDuplicadosBloom(banco, capacidade=100)
+        assert guarda.existe("c25@petrobahia.com")
+        assert not guarda.existe("c26@petrobahia.com")
+        assert guarda._filtro.contagem == 26
+        banco.fechar()
+
+    def test_sqlite_remocao_do_maior_id(self, tmp_path):
+        """Testa que o id removido não volta a ser usado, e a marca só cresce."""
+        caminho = str(tmp_path / "clientes.sqlite3")
+        banco = ClienteSQLiteRepository(caminho)
+        banco.salvar_lote(cliente(i) for i in range(1, 11))
+        GuardaDuplicadosBloom(banco, capacidade=100).fechar()
+        banco.remover("c10@petrobahia.com")
+        banco.salvar(Cliente(nome="Y", email="y@x.com", cnpj="1"))
+
+        assert banco.marca_emails() == 11
+        assert GuardaDuplicadosBloom(banco, capacidade=100).existe("y@x.com")
+        banco.fechar()
+
+    def test_sqlite_banco_sem_autoincremento(self, tmp_path):
+        """Testa que a tabela antiga é recriada com os mesmos ids."""
+        caminho = str(tmp_path / "clientes.sqlite3")
+        with sqlite3.connect(caminho) as conexao:
+            conexao.execute(
+                "CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT NOT NULL,"
+                " email TEXT NOT NULL, cnpj TEXT NOT NULL)"
+            )
+            conexao.executemany(
+                "INSERT INTO clientes (id, nome, email, cnpj) VALUES (?, 'A', ?, '1')",
+                [(3, "a@x.com"), (7, "b@x.com")],
+            )
+        conexao.close()
+
+        banco = ClienteSQLiteRepository(caminho)
+        banco.remover("b@x.com")
+        banco.salvar(Cliente(nome="C", email="c@x.com", cnpj="1"))
+
+        assert banco.marca_emails() == 8
+        assert list(banco.emails(3)) == ["c@x.com"]
+        assert banco.buscar_por_email("a@x.com").nome == "A"
+        indices = banco._conexao.execute("PRAGMA index_list(clientes)")
+        assert "clientes_email" in [linha[1] for linha in indices]
+        banco.fechar()
+
+    def test_repositorio_sem_listagem(self):
+        """Testa erro para repositório que não lista os emails."""
+
+        class Repositorio:
+            filepath = "x"
+
+        with pytest.raises(ValueError):
+            GuardaDuplicadosBloom(Repositorio())
+
+    def test_container(self, arquivo):
+        """Testa a guarda ligada pela configuração do container."""
+        assert Container({"cliente_file": arquivo}).get_guarda_duplicados() is None
+
+        container = Container(
+            {"cliente_file": arquivo, "cliente_guarda_duplicados": True}
+        )
+        use_case = container.get_cadastrar_cliente_use_case()
+        assert isinstance(use_case.guarda_duplicados, GuardaDuplicadosBloom)
+
+
+class RepositorioControlado(ClienteRepositoryInterface):
+    """Repositório em memória que só grava quando ``liberado`` está setado."""
+
+    def __init__(self):
+        self.clientes = {}
+        self.lotes = []
+        self.falhas = 0
+        self.liberado = threading.Event()
+        self.liberado.set()
+        self.fechado = False
+
+    def salvar(self, cliente):
+        self.salvar_lote([cliente])
+
+    def salvar_lote(self, clientes):
+        self.liberado.wait()
+        if self.falhas:
+            self.falhas -= 1
+            raise IOError("disco cheio")
+        clientes = list(clientes)
+        self.lotes.append(len(clientes))
+        for c in clientes:
+            self.clientes.setdefault(c.email, c)
+
+    def buscar_por_email(self, email):
+        return self.clientes.get(email)
+
+    def atualizar(self, cliente):
+        if cliente.email not in self.clientes:
+            return False
+        self.clientes[cliente.email] = cliente
+        return True
+
+    def remover(self, email):
+        return self.clientes.pop(email, None) is not None
+
+    def buscar_por_cnpj(self, cnpj):
+        cnpj = normalizar_cnpj(cnpj)
+        for c in self.clientes.values():
+            if cnpj is not None and normalizar_cnpj(c.cnpj) == cnpj:
+                return c
+        return None
+
+    def buscar_por_nome(self, consulta, limite=10):
+        consulta = consulta.lower()
+        achados = [c for c in self.clientes.values() if consulta in c.nome.lower()]
+        return achados[:limite]
+
+    def buscar_por_dominio(self, dominio, prefixo="", subdominios=False):
+        for email, c in self.clientes.items():
+            usuario, _, host = email.partition("@")
+            if usuario.startswith(prefixo) and (
+                host == dominio or subdominios and host.endswith(f".{dominio}")
+            ):
+                yield c
+
+    def fechar(self):
+        self.fechado = True
+
+
+class TestClienteWriteBehindRepository:
+    """Testes para o repositório com gravação adiada."""
+
+    @pytest.fixture
+    def decorado(self):
+        return RepositorioControlado()
+
+    @pytest.fixture
+    def repositorio(self, decorado):
+        repositorio = ClienteWriteBehindRepository(
+            decorado, tamanho_fila=4, tamanho_lote=2, intervalo=60
+        )
+        yield repositorio
+        decorado.liberado.set()
+        repositorio.fechar()
+
+    def test_busca_enxerga_pendentes(self, repositorio, decorado):
+        """Testa que clientes ainda não gravados são encontrados."""
+        decorado.liberado.clear()
+        repositorio.salvar(cliente(1))
+
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+        assert decorado.buscar_por_email("c1@petrobahia.com") is None
+
+    def test_primeiro_cadastro_vale(self, repositorio, decorado):
+        """Testa que a fila não sobrepõe um cliente já gravado."""
+        decorado.salvar(cliente(1, "Antigo"))
+        repositorio.salvar(cliente(1, "Novo"))
+
+        assert repositorio.buscar_por_email("c1@petrobahia.com").nome == "Antigo 1"
+
+    def test_grava_em_lotes(self, repositorio, decorado):
+        """Testa que a thread grava lotes de até ``tamanho_lote`` clientes."""
+        repositorio.salvar_lote(cliente(i) for i in range(5))
+        repositorio.esvaziar()
+
+        assert len(decorado.clientes) == 5
+        assert max(decorado.lotes) <= 2 and sum(decorado.lotes) == 5
+
+    def test_esvaziar_nao_espera_o_intervalo(self, repositorio, decorado):
+        """Testa que um lote incompleto é gravado ao esvaziar."""
+        repositorio.salvar(cliente(1))
+        repositorio.esvaziar()
+
+        assert decorado.buscar_por_email("c1@petrobahia.com") == cliente(1)
+
+    def test_intervalo(self, decorado):
+        """Testa que um lote incompleto é gravado depois do intervalo."""
+        repositorio = ClienteWriteBehindRepository(
+            decorado, tamanho_lote=100, intervalo=0.01
+        )
+        repositorio.salvar(cliente(1))
+        for _ in range(200):
+            if decorado.clientes:
+                break
+            threading.Event().wait(0.01)
+
+        assert decorado.buscar_por_email("c1@petrobahia.com") == cliente(1)
+        repositorio.fechar()
+
+    def test_fila_cheia_espera(self, repositorio, decorado):
+        """Testa a contrapressão com a fila cheia."""
+        decorado.liberado.clear()
+        repositorio.salvar_lote(cliente(i) for i in range(6))
+        salvou = threading.Event()
+
+        def salvar():
+            repositorio.salvar(cliente(6))
+            salvou.set()
+
+        threading.Thread(target=salvar, daemon=True).start()
+        # Um lote está sendo gravado e a fila tem 4 clientes
+        assert not salvou.wait(0.1)
+
+        decorado.liberado.set()
+        assert salvou.wait(5)
+        repositorio.esvaziar()
+        assert len(decorado.clientes) == 7
+
+    def test_falha_e_repassada_e_lote_e_mantido(self, repositorio, decorado):
+        """Testa que uma falha aparece para quem chama e o lote não se perde."""
+        decorado.falhas = 1
+        repositorio.salvar(cliente(1))
+
+        with pytest.raises(Exception, match="disco cheio"):
+            repositorio.esvaziar()
+        repositorio.esvaziar()
+
+        assert decorado.buscar_por_email("c1@petrobahia.com") == cliente(1)
+
+    def test_fechar(self, decorado):
+        """Testa que fechar grava a fila e fecha o repositório decorado."""
+        repositorio = ClienteWriteBehindRepository(decorado, intervalo=60)
+        repositorio.salvar(cliente(1))
+        repositorio.fechar()
+
+        assert decorado.buscar_por_email("c1@petrobahia.com") == cliente(1)
+        assert decorado.fechado
+        with pytest.raises(Exception, match="fechado"):
+            repositorio.salvar(cliente(2))
+
+    def test_container(self, arquivo):
+        """Testa o decorador ligado pela configuração do container."""
+        container = Container(
+            {
+                "cliente_file": arquivo,
+                "cliente_write_behind": True,
+                "cliente_guarda_duplicados": True,
+            }
+        )
+        repositorio = container.get_cliente_repository()
+        assert isinstance(repositorio, ClienteWriteBehindRepository)
+
+        use_case = container.get_cadastrar_cliente_use_case()
+        dto = ClienteInputDTO(nome="A", email="a@petrobahia.com", cnpj="1")
+        assert use_case.execute(dto).sucesso
+        assert not use_case.execute(dto).sucesso
+        repositorio.fechar()
+
+        assert ClienteFileRepository(arquivo).buscar_por_email("a@petrobahia.com")
+
+
+class TestLeitorClientesLegado:
+    """Testes para a leitura dos arquivos ``str(dict)`` do legado."""
+
+    @pytest.mark.parametrize(
+        "dados",
+        [
+            {"nome": "Ana Paula", "email": "ana@petrobahia.com", "cnpj": "123"},
+            {"email": "a@b.com", "nome": "O'Hara", "cnpj": "1", "extra": None},
+            {"nome": "Ação Ltda", "email": "", "cnpj": "0"},
+            {"nome": 'Aspas "duplas"', "email": "a@b.com", "cnpj": "1"},
+            {"nome": "Barra \\ e\ttab", "email": "a@b.com", "cnpj": "1"},
+            {},
+        ],
+    )
+    def test_igual_ao_literal_eval(self, dados):
+        """Testa que o parser lê o mesmo que ``ast.literal_eval``."""
+        assert ler_linha_legado(str(dados)) == dados
+
+    def test_inteiros_viram_texto(self):
+        """Testa que um CNPJ gravado como número é lido como texto."""
+        linha = str({"nome": "A", "email": "a@b.com", "cnpj": 123})
+        assert ler_linha_legado(linha)["cnpj"] == "123"
+
+    @pytest.mark.parametrize(
+        "linha",
+        [
+            "lixo",
+            "{'nome': 'A'",
+            "{'nome': ['A']}",
+            "{'nome': 'A\\', 'email': __import__('os')}",
+            "[1, 2]",
+        ],
+    )
+    def test_linhas_invalidas(self, linha):
+        """Testa que linhas fora do formato retornam None."""
+        assert ler_linha_legado(linha) is None
+
+    def test_registros_e_retomada(self, tmp_path):
+        """Testa a leitura do arquivo e a retomada pela posição."""
+        caminho = tmp_path / "clientes.txt"
+        # Linha vazia, linha que não é UTF-8 e última linha sem quebra
+        caminho.write_bytes(
+            b"{'nome': 'A', 'email': 'a@b.com', 'cnpj': '1'}\n\n\xff\n"
+            + "{'nome': 'Á', 'email': 'b@b.com', 'cnpj': '2'}".encode("utf-8")
+        )
+        leitor = LeitorClientesLegado(str(caminho))
+
+        registros = list(leitor.registros())
+        assert [dados and dados["email"] for _, dados in registros] == [
+            "a@b.com",
+            None,
+            "b@b.com",
+        ]
+        assert registros[-1][0] == caminho.stat().st_size
+
+        retomados = list(leitor.registros(registros[0][0]))
+        assert retomados == registros[1:]
+
+
+class TestIndiceOrdenado:
+    """Testes para o índice ordenado de chaves inteiras."""
+
+    def test_primeira_posicao_vale(self):
+        """Testa que cada chave guarda a menor posição, antes e depois da fusão."""
+        indice = IndiceOrdenado(limite_recentes=2)
+        indice.adicionar_varios(
+            np.array([7, 3, 7], dtype=np.uint64), np.array([0, 10, 20], dtype=np.uint64)
+        )
+        indice.adicionar(3, 30)
+        indice.adicionar(5, 40)
+        indice.adicionar(5, 50)
+        indice.adicionar(9, 60)
+        indice.adicionar(1, 70)  # Passa do limite: funde nos arrays
+
+        assert len(indice) == 5
+        assert [indice.posicao(c) for c in (1, 3, 5, 7, 9)] == [70, 10, 40, 0, 60]
+        assert indice.posicao(2) is None
+
+
+class TestBuscaPorCnpj:
+    """Testes para a busca de clientes pelo CNPJ normalizado."""
+
+    def test_arquivo(self, arquivo):
+        """Testa a busca com e sem pontuação e a atualização por salvar."""
+        repositorio = ClienteFileRepository(arquivo)
+        assert repositorio.buscar_por_cnpj("11.222.333/0001-81") is None
+
+        repositorio.salvar(Cliente(nome="A", email="a@b.com", cnpj="11222333000181"))
+        assert repositorio.buscar_por_cnpj("11.222.333/0001-81").email == "a@b.com"
+
+        repositorio.salvar_lote([cliente(1), cliente(2)])
+        assert repositorio.buscar_por_cnpj("2") == cliente(2)
+        assert repositorio.buscar_por_cnpj("00.000.000/0000-03") is None
+        assert repositorio.buscar_por_cnpj("não é cnpj") is None
+
+    def test_arquivo_primeiro_cadastro_vale(self, arquivo):
+        """Testa que vale a primeira linha do CNPJ, como na leitura sequencial."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar(cliente(1, "Antigo"))
+        repositorio.buscar_por_cnpj("1")
+        repositorio.salvar(Cliente(nome="Novo", email="n@b.com", cnpj="0001"))
+
+        assert repositorio.buscar_por_cnpj("1").nome == "Antigo 1"
+
+    def test_arquivo_alterado_por_fora(self, arquivo):
+        """Testa linhas de outro processo e um arquivo reescrito."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar(cliente(1))
+        repositorio.buscar_por_cnpj("1")
+
+        ClienteFileRepository(arquivo).salvar(cliente(2))
+        assert repositorio.buscar_por_cnpj("2") == cliente(2)
+
+        with open(arquivo, "w", encoding="utf-8") as f:
+            f.write("lixo\nOutro|o@b.com|00000000000002\n")
+        assert repositorio.buscar_por_cnpj("2").nome == "Outro"
+        assert repositorio.buscar_por_cnpj("1") is None
+
+    def test_sqlite(self, tmp_path):
+        """Testa a busca no SQLite, inclusive em um banco sem a coluna."""
+        caminho = str(tmp_path / "clientes.sqlite3")
+        with sqlite3.connect(caminho) as conexao:
+            conexao.execute(
+                "CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT NOT NULL,"
+                " email TEXT NOT NULL, cnpj TEXT NOT NULL)"
+            )
+            conexao.execute(
+                "INSERT INTO clientes (nome, email, cnpj) VALUES"
+                " ('A', 'a@b.com', '11.222.333/0001-81')"
+            )
+        conexao.close()
+
+        repositorio = ClienteSQLiteRepository(caminho)
+        repositorio.salvar_lote([cliente(1, "Antigo"), cliente(2)])
+        repositorio.salvar(Cliente(nome="Novo", email="n@b.com", cnpj="1"))
+
+        assert repositorio.buscar_por_cnpj("11222333000181").email == "a@b.com"
+        assert repositorio.buscar_por_cnpj("00.000.000/0000-01").nome == "Antigo 1"
+        assert repositorio.buscar_por_cnpj("3") is None
+        indices = repositorio._conexao.execute("PRAGMA index_list(clientes)")
+        assert "clientes_cnpj" in [linha[1] for linha in indices]
+        repositorio.fechar()
+
+    def test_write_behind_enxerga_pendentes(self):
+        """Testa que clientes ainda não gravados são encontrados pelo CNPJ."""
+        decorado = RepositorioControlado()
+        decorado.buscar_por_cnpj = lambda cnpj: None
+        repositorio = ClienteWriteBehindRepository(decorado, intervalo=60)
+        decorado.liberado.clear()
+        repositorio.salvar(cliente(1))
+
+        assert repositorio.buscar_por_cnpj("1") == cliente(1)
+        decorado.liberado.set()
+        repositorio.fechar()
+
+
+class TestBuscaPorDominio:
+    """Testes para o índice de emails por domínio."""
+
+    EMAILS = [
+        "bia@transportadora.com.br",
+        "ana@transportadora.com.br",
+        "ana@sul.transportadora.com.br",
+        "x@outra.com",
+        "zeca@TRANSPORTADORA.com.br",
+        "ana@transportadora.com",
+    ]
+
+    @pytest.fixture
+    def repositorio(self, arquivo):
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(
+            Cliente(nome=f"C{i}", email=email, cnpj="1")
+            for i, email in enumerate(self.EMAILS)
+        )
+        yield repositorio
+        repositorio.fechar()
+
+    @staticmethod
+    def emails(clientes):
+        return [c.email for c in clientes]
+
+    def test_chave_dominio(self):
+        """Testa a chave de domínio invertido e parte local."""
+        assert chave_dominio("Ana@Sul.Empresa.com") == b"com.empresa.sul@Ana"
+        assert chave_dominio("sem-dominio") is None
+        assert chave_dominio("a@") is None
+
+    def test_dominio_prefixo_e_subdominios(self, repositorio):
+        """Testa as consultas por domínio, prefixo da parte local e subdomínios."""
+        assert self.emails(repositorio.buscar_por_dominio("transportadora.com.br")) == [
+            "ana@transportadora.com.br",
+            "bia@transportadora.com.br",
+            "zeca@TRANSPORTADORA.com.br",
+        ]
+        assert self.emails(
+            repositorio.buscar_por_dominio("Transportadora.COM.br", "an")
+        ) == ["ana@transportadora.com.br"]
+        assert self.emails(
+            repositorio.buscar_por_dominio("transportadora.com.br", "a", True)
+        ) == ["ana@sul.transportadora.com.br", "ana@transportadora.com.br"]
+        assert self.emails(repositorio.buscar_por_dominio("com.br")) == []
+        assert self.emails(repositorio.buscar_por_dominio("nenhum.com")) == []
+
+    def test_resultado_e_gerador(self, repositorio):
+        """Testa que os clientes são lidos sob demanda."""
+        clientes = repositorio.buscar_por_dominio("transportadora.com.br")
+
+        assert next(clientes) == Cliente(
+            nome="C1", email="ana@transportadora.com.br", cnpj="1"
+        )
+
+    def test_primeiro_cadastro_e_salvar(self, repositorio):
+        """Testa que vale o primeiro cadastro e que salvar atualiza o índice."""
+        self.emails(repositorio.buscar_por_dominio("outra.com"))
+        repositorio.salvar_lote(
+            [
+                Cliente(nome="Novo", email="x@outra.com", cnpj="1"),
+                Cliente(nome="Y", email="y@outra.com", cnpj="1"),
+            ]
+        )
+
+        clientes = list(repositorio.buscar_por_dominio("outra.com"))
+        assert [(c.nome, c.email) for c in clientes] == [
+            ("C3", "x@outra.com"),
+            ("Y", "y@outra.com"),
+        ]
+
+    def test_indice_persistente(self, arquivo):
+        """Testa o checkpoint em ``.dom`` e a reabertura com linhas novas."""
+        repositorio = ClienteFileRepository(arquivo, checkpoint_indice=10)
+        repositorio.salvar_lote(cliente(i) for i in range(25))
+        assert len(list(repositorio.buscar_por_dominio("petrobahia.com"))) == 25
+        repositorio.fechar()
+
+        base = IndiceDominiosSidecar.abrir(f"{arquivo}.dom", arquivo)
+        assert len(base) == 25
+        assert base.chave(0) == b"com.petrobahia@c0"
+        base.fechar()
+
+        ClienteFileRepository(arquivo).salvar(cliente(25))
+        reaberto = ClienteFileRepository(arquivo, checkpoint_indice=10)
+        assert self.emails(reaberto.buscar_por_dominio("petrobahia.com", "c2")) == [
+            f"c{i}@petrobahia.com" for i in (2, 20, 21, 22, 23, 24, 25)
+        ]
+        reaberto.fechar()
+
+    def test_arquivo_reescrito(self, repositorio, arquivo):
+        """Testa que linhas que não conferem são puladas e o índice refeito."""
+        self.emails(repositorio.buscar_por_dominio("outra.com"))
+        novos = [f"cliente{i}@outra.com" for i in range(20)]
+        with open(arquivo, "w", encoding="utf-8") as f:
+            f.writelines(f"C|{email}|1\n" for email in novos)
+
+        # Mesmo com o índice antigo, só saem clientes do domínio
+        assert set(self.emails(repositorio.buscar_por_dominio("outra.com"))) <= set(
+            novos
+        )
+        assert self.emails(repositorio.buscar_por_dominio("outra.com")) == sorted(
+            novos, key=chave_dominio
+        )
+        assert self.emails(repositorio.buscar_por_dominio("transportadora.com")) == []
+
+    def test_sqlite(self, tmp_path):
+        """Testa as consultas no SQLite, inclusive em um banco sem a coluna."""
+        caminho = str(tmp_path / "clientes.sqlite3")
+        with sqlite3.connect(caminho) as conexao:
+            conexao.execute(
+                "CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT NOT NULL,"
+                " email TEXT NOT NULL, cnpj TEXT NOT NULL)"
+            )
+            conexao.execute(
+                "INSERT INTO clientes (nome, email, cnpj) VALUES"
+                " ('C0', 'bia@transportadora.com.br', '1')"
+            )
+        conexao.close()
+
+        repositorio = ClienteSQLiteRepository(caminho)
+        repositorio.salvar_lote(
+            Cliente(nome=f"C{i}", email=email, cnpj="1")
+            for i, email in enumerate(self.EMAILS)
+        )
+        assert self.emails(repositorio.buscar_por_dominio("transportadora.com.br")) == [
+            "ana@transportadora.com.br",
+            "bia@transportadora.com.br",
+            "zeca@TRANSPORTADORA.com.br",
+        ]
+        assert self.emails(
+            repositorio.buscar_por_dominio("Transportadora.COM.br", "an")
+        ) == ["ana@transportadora.com.br"]
+        assert self.emails(
+            repositorio.buscar_por_dominio("transportadora.com.br", "a", True)
+        ) == ["ana@sul.transportadora.com.br", "ana@transportadora.com.br"]
+        assert self.emails(repositorio.buscar_por_dominio("com.br")) == []
+
+        repositorio.remover("ana@transportadora.com.br")
+        assert self.emails(repositorio.buscar_por_dominio("transportadora.com.br")) == [
+            "bia@transportadora.com.br",
+            "zeca@TRANSPORTADORA.com.br",
+        ]
+        repositorio.fechar()
+
+    def test_sqlite_em_blocos(self, tmp_path, monkeypatch):
+        """Testa que a leitura em blocos não repete nem perde clientes."""
+        monkeypatch.setattr(sqlite, "_BLOCO_EMAILS", 7)
+        repositorio = ClienteSQLiteRepository(str(tmp_path / "clientes.sqlite3"))
+        repositorio.salvar_lote(cliente(i) for i in range(30))
+
+        assert self.emails(repositorio.buscar_por_dominio("petrobahia.com")) == sorted(
+            (f"c{i}@petrobahia.com" for i in range(30)), key=chave_dominio
+        )
+        repositorio.fechar()
+
+    def test_write_behind(self, arquivo):
+        """Testa que a fila é gravada antes da consulta."""
+        repositorio = ClienteWriteBehindRepository(
+            ClienteFileRepository(arquivo), intervalo=60
+        )
+        repositorio.salvar(cliente(1))
+
+        assert self.emails(repositorio.buscar_por_dominio("petrobahia.com")) == [
+            "c1@petrobahia.com"
+        ]
+        repositorio.fechar()
+
+
+class TestBuscaPorNome:
+    """Testes para a busca aproximada por nome (índice de trigramas)."""
+
+    NOMES = [
+        "Carlos Silva",
+        "Maria Souza",
+        "João Carlos da Silva",
+        "Carlos Souza",
+        "Ana Paula Ferreira",
+        "Carla Silveira",
+    ]
+
+    @pytest.fixture
+    def repositorio(self, arquivo):
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(
+            Cliente(nome=nome, email=f"c{i}@petrobahia.com", cnpj="1")
+            for i, nome in enumerate(self.NOMES)
+        )
+        yield repositorio
+        repositorio.fechar()
+
+    @staticmethod
+    def nomes(clientes):
+        return [c.nome for c in clientes]
+
+    def test_trigramas(self):
+        """Testa os trigramas, sem acentos nem pontuação."""
+        assert trigramas("Ana") == {"  a", " an", "ana", "na "}
+        assert trigramas("ANA") == trigramas("ána")
+        assert trigramas("Ana-Bia") == trigramas("ana bia")
+        assert trigramas(" !! ") == frozenset()
+
+    def test_indice_ordena_pela_semelhanca(self):
+        """Testa a semelhança, o desempate e ``semelhanca_minima``."""
+        indice = IndiceTrigramas()
+        for posicao, nome in enumerate(["Ana Maria", "Ana", "Mariana", "Ana"]):
+            indice.adicionar(nome, posicao * 10)
+
+        assert len(indice) == 4
+        # "Ana" inteiro vem antes de "Ana Maria"; "Mariana" não tem "  a"
+        assert indice.buscar("ana") == [(1.0, 10), (1.0, 30), (1.0, 0), (0.5, 20)]
+        assert indice.buscar("ana", limite=2) == [(1.0, 10), (1.0, 30)]
+        assert indice.buscar("ana", semelhanca_minima=0.6) == [
+            (1.0, 10),
+            (1.0, 30),
+            (1.0, 0),
+        ]
+        assert indice.buscar("xyz") == []
+        assert indice.buscar("") == []
+
+    def test_erros_de_digitacao_e_nome_parcial(self, repositorio):
+        """Testa consultas com erro de digitação, acentos e parte do nome."""
+        assert self.nomes(repositorio.buscar_por_nome("Carlos Slva", 3)) == [
+            "Carlos Silva",
+            "João Carlos da Silva",
+            "Carlos Souza",
+        ]
+        assert self.nomes(repositorio.buscar_por_nome("joao", 1)) == [
+            "João Carlos da Silva"
+        ]
+        assert self.nomes(repositorio.buscar_por_nome("ferreira")) == [
+            "Ana Paula Ferreira"
+        ]
+        assert repositorio.buscar_por_nome("Wxyz") == []
+
+    def test_primeiro_cadastro_e_salvar(self, repositorio):
+        """Testa que salvar atualiza o índice e que vale o primeiro cadastro."""
+        assert repositorio.buscar_por_nome("Beatriz") == []
+        repositorio.salvar_lote(
+            [
+                Cliente(nome="Beatriz Lima", email="c0@petrobahia.com", cnpj="1"),
+                Cliente(nome="Beatriz Lima", email="bia@petrobahia.com", cnpj="1"),
+            ]
+        )
+        repositorio.salvar(Cliente(nome="Beatriz Lins", email="b@x.com", cnpj="1"))
+
+        clientes = repositorio.buscar_por_nome("Beatriz Lima")
+        assert [(c.nome, c.email) for c in clientes] == [
+            ("Beatriz Lima", "bia@petrobahia.com"),
+            ("Beatriz Lins", "b@x.com"),
+        ]
+
+    def test_limite_com_emails_repetidos(self, arquivo):
+        """Testa que linhas repetidas não diminuem o número de resultados."""
+        repositorio = ClienteFileRepository(arquivo)
+        repositorio.salvar_lote(
+            Cliente(nome="Ana", email=f"a{i % 3}@x.com", cnpj="1") for i in range(30)
+        )
+        repositorio.salvar(Cliente(nome="Ana Lima", email="b@x.com", cnpj="1"))
+
+        clientes = repositorio.buscar_por_nome("ana", 4)
+        assert [c.email for c in clientes] == [
+            "a0@x.com",
+            "a1@x.com",
+            "a2@x.com",
+            "b@x.com",
+        ]
+        repositorio.fechar()
+
+    def test_arquivo_reescrito(self, repositorio, arquivo):
+        """Testa que o índice é refeito quando o arquivo muda por fora."""
+        assert self.nomes(repositorio.buscar_por_nome("Maria Souza", 1)) == [
+            "Maria Souza"
+        ]
+        with open(arquivo, "w", encoding="utf-8") as f:
+            f.write("Mariana Souto|m@x.com|1\n")
+
+        assert self.nomes(repositorio.buscar_por_nome("Maria Souza", 1)) == [
+            "Mariana Souto"
+        ]
+        os.remove(arquivo)
+        assert repositorio.buscar_por_nome("Maria Souza") == []
+
+    def test_sqlite(self, tmp_path):
+        """Testa a busca no SQLite, com atualização e remoção."""
+        repositorio = ClienteSQLiteRepository(str(tmp_path / "clientes.sqlite3"))
+        repositorio.salvar_lote(
+            Cliente(nome=nome, email=f"c{i}@petrobahia.com", cnpj="1")
+            for i, nome in enumerate(self.NOMES)
+        )
+        repositorio.salvar(Cliente(nome="Outro", email="c0@petrobahia.com", cnpj="1"))
+
+        assert self.nomes(repositorio.buscar_por_nome("Carlos Slva", 3)) == [
+            "Carlos Silva",
+            "João Carlos da Silva",
+            "Carlos Souza",
+        ]
+        assert self.nomes(repositorio.buscar_por_nome("joao", 1)) == [
+            "João Carlos da Silva"
+        ]
+        assert repositorio.buscar_por_nome("Wxyz") == []
+        assert repositorio.buscar_por_nome("Outro") == []
+
+        repositorio.atualizar(
+            Cliente(nome="Beatriz Lima", email="c1@petrobahia.com", cnpj="1")
+        )
+        repositorio.remover("c4@petrobahia.com")
+        assert self.nomes(repositorio.buscar_por_nome("Beatriz")) == ["Beatriz Lima"]
+        assert self.nomes(repositorio.buscar_por_nome("Maria Souza")) == [
+            "Carlos Souza"
+        ]
+        assert repositorio.buscar_por_nome("ferreira") == []
+        repositorio.fechar()
+
+    def test_sqlite_alterado_por_outra_conexao(self, tmp_path):
+        """Testa trocas, remoções e inclusões de outra conexão."""
+        caminho = str(tmp_path / "clientes.sqlite3")
+        repositorio = ClienteSQLiteRepository(caminho)
+        repositorio.salvar_lote(cliente(i, "Ana") for i in range(3))
+        assert len(repositorio.buscar_por_nome("Ana")) == 3
+
+        outro = ClienteSQLiteRepository(caminho)
+        outro.atualizar(cliente(0, "Beatriz"))
+        outro.remover("c2@petrobahia.com")
+        outro.salvar(Cliente(nome="Carla", email="carla@x.com", cnpj="1"))
+        outro.fechar()
+
+        assert self.nomes(repositorio.buscar_por_nome("Ana")) == ["Ana 1"]
+        assert self.nomes(repositorio.buscar_por_nome("Beatriz")) == ["Beatriz 0"]
+        assert self.nomes(repositorio.buscar_por_nome("Carla")) == ["Carla"]
+        repositorio.fechar()
+
+    def test_sqlite_banco_antigo(self, tmp_path):
+        """Testa que os nomes de um banco sem a tabela de trigramas são indexados."""
+        caminho = str(tmp_path / "clientes.sqlite3")
+        with sqlite3.connect(caminho) as conexao:
+            conexao.execute(
+                "CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT NOT NULL,"
+                " email TEXT NOT NULL, cnpj TEXT NOT NULL)"
+            )
+            conexao.executemany(
+                "INSERT INTO clientes (nome, email, cnpj) VALUES (?, ?, '1')",
+                [("Ana Maria", "a@x.com"), ("Ana", "b@x.com"), ("Mariana", "c@x.com")],
+            )
+        conexao.close()
+
+        repositorio = ClienteSQLiteRepository(caminho)
+        assert self.nomes(repositorio.buscar_por_nome("ana")) == [
+            "Ana",
+            "Ana Maria",
+            "Mariana",
+        ]
+        repositorio.fechar()
+
+    def test_write_behind(self, arquivo):
+        """Testa que a fila é gravada antes da consulta."""
+        repositorio = ClienteWriteBehindRepository(
+            ClienteFileRepository(arquivo), intervalo=60
+        )
+        repositorio.salvar(cliente(1, "Paulo"))
+
+        assert self.nomes(repositorio.buscar_por_nome("paulo")) == ["Paulo 1"]
+        repositorio.fechar()
+
+
+def esperar(condicao, segundos: float = 5.0) -> None:
+    limite = time.monotonic() + segundos
+    while not condicao():
+        assert time.monotonic() < limite, "condição não atingida"
+        time.sleep(0.001)
+
+
+def gravar_em_processo(arquivo: str, processo: int, quantidade: int) -> None:
+    repositorio = ClienteFileRepository(arquivo, multiprocesso=True)
+    threads = [
+        threading.Thread(
+            target=lambda inicio=inicio: [
+                repositorio.salvar(cliente(i, f"P{processo}"))
+                for i in range(inicio, (processo + 1) * quantidade, 2)
+            ]
+        )
+        for inicio in (processo * quantidade, processo * quantidade + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repositorio.fechar()
+
+
+def gravar_e_ler_em_processo(arquivo: str, processo: int, quantidade: int) -> None:
+    """Salva e relê cada cliente, com checkpoints frequentes dos índices."""
+    repositorio = ClienteFileRepository(
+        arquivo, checkpoint_indice=50, multiprocesso=True
+    )
+    repositorio.buscar_por_email("x@x.com")
+    list(repositorio.buscar_por_dominio("petrobahia.com"))
+    erros = []
+
+    def trabalhar(inicio: int) -> None:
+        for i in range(inicio, (processo + 1) * quantidade, 2):
+            esperado = cliente(i, f"P{processo}")
+            try:
+                repositorio.salvar(esperado)
+                if repositorio.buscar_por_email(esperado.email) != esperado:
+                    erros.append(f"{esperado.email} não encontrado")
+                if esperado not in repositorio.buscar_por_dominio(
+                    "petrobahia.com", f"c{i}"
+                ):
+                    erros.append(f"{esperado.email} fora do índice de domínios")
+            except Exception as e:
+                erros.append(repr(e))
+
+    threads = [
+        threading.Thread(target=trabalhar, args=(inicio,))
+        for inicio in (processo * quantidade, processo * quantidade + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repositorio.fechar()
+    assert not erros, erros[:5]
+
+
+class TestGravacaoMultiprocesso:
+    """Testes para a trava entre processos e a gravação em grupo."""
+
+    def test_linha_pela_metade_fica_de_fora(self, arquivo):
+        """Testa que buscas e listagens param antes de uma linha incompleta."""
+        with open(arquivo, "wb") as f:
+            f.write(b"A|a@x.com|1\nB|b@x.co")
+        repositorio = ClienteFileRepository(arquivo)
+
+        assert repositorio.buscar_por_email("b@x.co") is None
+        assert repositorio.marca_emails() == len(b"A|a@x.com|1\n")
+        assert list(repositorio.emails()) == ["a@x.com"]
+        assert repositorio.buscar_por_nome("B") == []
+
+        with open(arquivo, "ab") as f:
+            f.write(b"m|1\n")
+        assert repositorio.buscar_por_email("b@x.com") == Cliente(
+            nome="B", email="b@x.com", cnpj="1"
+        )
+        assert repositorio.marca_emails() == os.path.getsize(arquivo)
+        assert list(repositorio.emails()) == ["a@x.com", "b@x.com"]
+
+    def test_uma_trava_por_grupo(self, arquivo, monkeypatch):
+        """Testa que os clientes que esperam a trava são gravados juntos."""
+        repositorio = ClienteFileRepository(arquivo, multiprocesso=True)
+        repositorio.salvar(cliente(0))
+        repositorio.buscar_por_email("c0@petrobahia.com")
+        aquisicoes = []
+        original = travas.fcntl.flock
+
+        def contar(fd, operacao):
+            if operacao == travas.fcntl.LOCK_EX:
+                aquisicoes.append(fd)
+            original(fd, operacao)
+
+        outro_processo = TravaArquivo(f"{arquivo}.lock")
+        with outro_processo:
+            monkeypatch.setattr(travas.fcntl, "flock", contar)
+            threads = [
+                threading.Thread(target=repositorio.salvar, args=(cliente(i),))
+                for i in range(1, 9)
+            ]
+            threads[0].start()
+            esperar(lambda: aquisicoes)
+            for thread in threads[1:]:
+                thread.start()
+            esperar(lambda: len(repositorio._fila_grupo) == 7)
+        for thread in threads:
+            thread.join()
+
+        assert len(aquisicoes) == 2
+        for i in range(9):
+            assert repositorio.buscar_por_email(f"c{i}@petrobahia.com") == cliente(i)
+        assert len(repositorio._indice) == 9
+        outro_processo.fechar()
+        repositorio.fechar()
+
+    def test_um_fsync_por_grupo(self, arquivo, monkeypatch):
+        """Testa que a durabilidade por registro sincroniza o grupo uma vez."""
+        fsyncs = []
+        original = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), original(fd)))
+        repositorio = ClienteFileRepository(
+            arquivo, durabilidade=DURABILIDADE_REGISTRO, multiprocesso=True
+        )
+        repositorio.salvar_lote(cliente(i) for i in range(10))
+
+        assert len(fsyncs) == 1
+        assert repositorio.buscar_por_email("c9@petrobahia.com") == cliente(9)
+
+    def test_varios_processos(self, arquivo):
+        """Testa processos e threads gravando no mesmo arquivo ao mesmo tempo."""
+        contexto = multiprocessing.get_context("fork")
+        processos = [
+            contexto.Process(target=gravar_em_processo, args=(arquivo, p, 200))
+            for p in range(4)
+        ]
+        for processo in processos:
+            processo.start()
+        for processo in processos:
+            processo.join()
+            assert processo.exitcode == 0
+
+        with open(arquivo, "rb") as f:
+            linhas = f.read().splitlines()
+        assert len(linhas) == 800
+        repositorio = ClienteFileRepository(arquivo)
+        for i in range(800):
+            esperado = cliente(i, f"P{i // 200}")
+            assert repositorio.buscar_por_email(esperado.email) == esperado
+
+    def test_checkpoints_de_varios_processos(self, arquivo):
+        """Testa os índices persistentes gravados por processos ao mesmo tempo."""
+        contexto = multiprocessing.get_context("fork")
+        processos = [
+            contexto.Process(target=gravar_e_ler_em_processo, args=(arquivo, p, 300))
+            for p in range(3)
+        ]
+        for processo in processos:
+            processo.start()
+        for processo in processos:
+            processo.join()
+            assert processo.exitcode == 0
+
+        assert not [
+            nome
+            for nome in os.listdir(os.path.dirname(arquivo))
+            if nome.endswith(".tmp")
+        ]
+        repositorio = ClienteFileRepository(arquivo)
+        for i in range(900):
+            esperado = cliente(i, f"P{i // 300}")
+            assert repositorio.buscar_por_email(esperado.email) == esperado
+        assert len(list(repositorio.buscar_por_dominio("petrobahia.com"))) == 900
+        repositorio.fechar()
+
+    def test_erro_na_gravacao(self, tmp_path):
+        """Testa que a falha da gravação chega a quem chamou salvar."""
+        repositorio = ClienteFileRepository(
+            str(tmp_path / "nao_existe" / "clientes.txt"), multiprocesso=True
+        )
+        with pytest.raises(Exception, match="Erro ao salvar cliente"):
+            repositorio.salvar(cliente(1))
+        assert not repositorio._gravando_grupo
+
+    def test_sem_fcntl(self, arquivo, monkeypatch):
+        """Testa o erro em sistemas sem ``fcntl``."""
+        monkeypatch.setattr(travas, "fcntl", None)
+        with pytest.raises(ValueError):
+            ClienteFileRepository(arquivo, multiprocesso=True)
+
+    def test_container(self, arquivo):
+        """Testa a configuração pelo container."""
+        repositorio = Container(
+            {"cliente_file": arquivo, "cliente_multiprocesso": True}
+        ).get_cliente_repository()
+        repositorio.salvar(cliente(1))
+
+        assert os.path.exists(f"{arquivo}.lock")
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+        repositorio.fechar()
+
+
+class TestAtualizacaoERemocao:
+    """Testes para os registros de atualização e remoção e a compactação."""
+
+    @pytest.fixture
+    def repositorio(self, arquivo):
+        repositorio = ClienteFileRepository(arquivo, checkpoint_indice=4)
+        repositorio.salvar_lote(cliente(i) for i in range(10))
+        yield repositorio
+        repositorio.fechar()
+
+    def test_atualizar_e_remover(self, repositorio, arquivo):
+        """Testa que o último registro de cada email é o que vale."""
+        novo = Cliente(nome="Novo Nome", email="c3@petrobahia.com", cnpj="99")
+
+        assert repositorio.atualizar(novo)
+        assert repositorio.buscar_por_email("c3@petrobahia.com") == novo
+        assert repositorio.remover("c3@petrobahia.com")
+        assert repositorio.buscar_por_email("c3@petrobahia.com") is None
+        assert not repositorio.remover("c3@petrobahia.com")
+        assert not repositorio.atualizar(novo)
+        assert not repositorio.atualizar(cliente(50))
+
+        with open(arquivo, "rb") as f:
+            linhas = f.read().splitlines()
+        assert linhas[-2:] == [
+            b"U|Novo Nome|c3@petrobahia.com|99",
+            b"D|c3@petrobahia.com",
+        ]
+
+    @pytest.mark.parametrize(
+        "nome",
+        ["U|Hacker", "x\nD|c1@petrobahia.com\ny", "x\nU|Hacker|c1@petrobahia.com|1"],
+    )
+    def test_nome_nao_injeta_registros(self, repositorio, arquivo, tmp_path, nome):
+        """Testa que um nome com separadores não vira outro registro no log."""
+        tamanho = os.path.getsize(arquivo)
+        with pytest.raises(ClienteInvalidoError):
+            repositorio.salvar(Cliente(nome=nome, email="c1@petrobahia.com", cnpj="1"))
+        with pytest.raises(ClienteInvalidoError):
+            repositorio.salvar(Cliente(nome=nome, email="a@x.com", cnpj="1"))
+
+        # Pela importação do arquivo legado, o registro é rejeitado
+        legado = tmp_path / "legado.txt"
+        legado.write_text(
+            repr({"nome": nome, "email": "a@x.com", "cnpj": "1"}) + "\n",
+            encoding="utf-8",
+        )
+        resultado = ImportarClientesUseCase(repositorio).execute(
+            LeitorClientesLegado(str(legado))
+        )
+        assert resultado.rejeitados == 1
+        assert os.path.getsize(arquivo) == tamanho
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+
+    def test_salvar_depois_de_remover(self, repositorio):
+        """Testa que um email removido pode ser cadastrado de novo."""
+        repositorio.salvar(
+            Cliente(nome="Repetido", email="c1@petrobahia.com", cnpj="1")
+        )
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+
+        repositorio.remover("c1@petrobahia.com")
+        outro = Cliente(nome="Outro", email="c1@petrobahia.com", cnpj="2")
+        repositorio.salvar(outro)
+        repositorio.salvar(cliente(1))
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == outro
+
+    def test_reaberto_com_indice_persistente(self, repositorio, arquivo):
+        """Testa os registros antes e depois do checkpoint do índice gravado."""
+        repositorio.atualizar(cliente(2, "Atualizado"))
+        repositorio.remover("c4@petrobahia.com")
+        repositorio.salvar_indice()
+        repositorio.remover("c5@petrobahia.com")
+        repositorio.atualizar(cliente(4, "Ignorado"))
+        repositorio.salvar(cliente(4, "Volta"))
+
+        reaberto = ClienteFileRepository(arquivo, checkpoint_indice=4)
+        assert reaberto.buscar_por_email("c2@petrobahia.com") == cliente(
+            2, "Atualizado"
+        )
+        assert reaberto.buscar_por_email("c4@petrobahia.com") == cliente(4, "Volta")
+        assert reaberto.buscar_por_email("c5@petrobahia.com") is None
+        assert reaberto.buscar_por_email("c6@petrobahia.com") == cliente(6)
+        reaberto.salvar_indice()
+        reaberto.fechar()
+
+        # O índice fundido continua com um registro por email
+        sem_indice = ClienteFileRepository(arquivo, indice_persistente=False)
+        com_indice = ClienteFileRepository(arquivo)
+        for i in range(10):
+            email = f"c{i}@petrobahia.com"
+            assert com_indice.buscar_por_email(email) == sem_indice.buscar_por_email(
+                email
+            )
+        assert len(com_indice._base) == 10
+        com_indice.fechar()
+
+    def test_alteracao_por_outro_processo(self, repositorio, arquivo):
+        """Testa que a busca indexa os registros gravados por fora."""
+        assert repositorio.buscar_por_email("c7@petrobahia.com") == cliente(7)
+        with open(arquivo, "ab") as f:
+            f.write(b"U|Sete|c7@petrobahia.com|7\nD|c8@petrobahia.com\n")
+
+        assert repositorio.buscar_por_email("c7@petrobahia.com") == Cliente(
+            nome="Sete", email="c7@petrobahia.com", cnpj="7"
+        )
+        assert repositorio.buscar_por_email("c8@petrobahia.com") is None
+
+    def test_buscas_secundarias(self, repositorio):
+        """Testa que as buscas por CNPJ, domínio e nome veem o registro atual."""
+        assert repositorio.buscar_por_cnpj(f"{3:014d}") == cliente(3)
+        assert len(repositorio.buscar_por_nome("Cliente", 20)) == 10
+        repositorio.salvar(
+            Cliente(nome="Depois", email="depois@petrobahia.com", cnpj=f"{3:014d}")
+        )
+        repositorio.atualizar(
+            Cliente(nome="Trocado", email="c3@petrobahia.com", cnpj="77")
+        )
+        repositorio.remover("c5@petrobahia.com")
+
+        assert repositorio.buscar_por_cnpj(f"{3:014d}").email == "depois@petrobahia.com"
+        assert repositorio.buscar_por_cnpj("77").nome == "Trocado"
+        assert repositorio.buscar_por_cnpj(f"{5:014d}") is None
+        assert [c.email for c in repositorio.buscar_por_nome("Trocado", 1)] == [
+            "c3@petrobahia.com"
+        ]
+        assert len(repositorio.buscar_por_nome("Cliente", 20)) == 8
+        clientes = list(repositorio.buscar_por_dominio("petrobahia.com", "c"))
+        assert len(clientes) == 9
+        assert Cliente(nome="Trocado", email="c3@petrobahia.com", cnpj="77") in clientes
+        assert "c5@petrobahia.com" not in [c.email for c in clientes]
+
+    def test_compactar(self, repositorio, arquivo):
+        """Testa que a compactação deixa só o registro atual de cada email."""
+        for i in range(10):
+            repositorio.atualizar(cliente(i, "Versao"))
+        repositorio.remover("c0@petrobahia.com")
+        repositorio.salvar(cliente(1))
+        list(repositorio.buscar_por_dominio("petrobahia.com"))
+
+        antes, depois = repositorio.compactar()
+        assert antes > depois == os.path.getsize(arquivo)
+        with open(arquivo, "rb") as f:
+            linhas = f.read().splitlines()
+        assert linhas == [
+            f"Versao {i}|c{i}@petrobahia.com|{i:014d}".encode() for i in range(1, 10)
+        ]
+        assert not os.path.exists(f"{arquivo}.compactando")
+        assert not os.path.exists(f"{arquivo}.dom")
+
+        assert repositorio.buscar_por_email("c0@petrobahia.com") is None
+        assert repositorio.buscar_por_email("c9@petrobahia.com") == cliente(9, "Versao")
+        assert repositorio.buscar_por_cnpj(f"{2:014d}") == cliente(2, "Versao")
+        assert len(list(repositorio.buscar_por_dominio("petrobahia.com"))) == 9
+        assert repositorio.compactar() == (depois, depois)
+
+        reaberto = ClienteFileRepository(arquivo)
+        assert reaberto.buscar_por_email("c5@petrobahia.com") == cliente(5, "Versao")
+        assert reaberto._indexado_ate == depois
+        reaberto.fechar()
+
+    def test_arquivo_trocado_por_outro_processo(self, repositorio, arquivo):
+        """Testa que um arquivo compactado por outro repositório é reindexado."""
+        assert repositorio.buscar_por_email("c9@petrobahia.com") == cliente(9)
+        assert repositorio.buscar_por_cnpj(f"{9:014d}") == cliente(9)
+        outro = ClienteFileRepository(arquivo)
+        outro.remover("c0@petrobahia.com")
+        outro.compactar()
+        outro.fechar()
+        repositorio.salvar(cliente(10))
+
+        assert repositorio.buscar_por_email("c0@petrobahia.com") is None
+        assert repositorio.buscar_por_email("c9@petrobahia.com") == cliente(9)
+        assert repositorio.buscar_por_email("c10@petrobahia.com") == cliente(10)
+        assert repositorio.buscar_por_cnpj(f"{9:014d}") == cliente(9)
+
+    def test_compactar_apos(self, arquivo):
+        """Testa a compactação automática a cada tantas alterações."""
+        repositorio = ClienteFileRepository(arquivo, compactar_apos=3)
+        repositorio.salvar_lote(cliente(i) for i in range(5))
+        for i in range(3):
+            repositorio.remover(f"c{i}@petrobahia.com")
+
+        with open(arquivo, "rb") as f:
+            assert len(f.read().splitlines()) == 2
+        assert repositorio.buscar_por_email("c3@petrobahia.com") == cliente(3)
+        repositorio.fechar()
+
+    def test_compactar_multiprocesso(self, arquivo):
+        """Testa a compactação com gravações de várias threads ao mesmo tempo."""
+        repositorio = ClienteFileRepository(arquivo, multiprocesso=True)
+        repositorio.salvar_lote(cliente(i) for i in range(100))
+        for i in range(0, 100, 2):
+            repositorio.remover(f"c{i}@petrobahia.com")
+
+        threads = [
+            threading.Thread(target=repositorio.salvar, args=(cliente(i),))
+            for i in range(100, 150)
+        ]
+        for thread in threads:
+            thread.start()
+        repositorio.compactar()
+        for thread in threads:
+            thread.join()
+
+        with open(arquivo, "rb") as f:
+            assert len(f.read().splitlines()) == 100
+        reaberto = ClienteFileRepository(arquivo)
+        for i in range(150):
+            esperado = None if i < 100 and i % 2 == 0 else cliente(i)
+            assert reaberto.buscar_por_email(f"c{i}@petrobahia.com") == esperado
+        reaberto.fechar()
+        repositorio.fechar()
+
+    def test_guarda_bloom_depois_de_compactar(self, repositorio):
+        """Testa que o filtro de Bloom é refeito quando o arquivo encolhe."""
+        guarda = GuardaDuplicadosBloom(repositorio, capacidade=100)
+        assert guarda.existe("c9@petrobahia.com")
+        for i in range(9):
+            repositorio.remover(f"c{i}@petrobahia.com")
+        repositorio.compactar()
+        repositorio.salvar(cliente(20))
+
+        guarda.sincronizar()
+        assert guarda.existe("c20@petrobahia.com")
+        assert not guarda.existe("c0@petrobahia.com")
+
+    def test_write_behind_e_sqlite(self, tmp_path):
+        """Testa atualizar e remover pelo write-behind e no SQLite."""
+        base = ClienteSQLiteRepository(str(tmp_path / "clientes.sqlite3"))
+        repositorio = ClienteWriteBehindRepository(base, intervalo=10)
+        repositorio.salvar(cliente(1))
+
+        assert repositorio.atualizar(cliente(1, "Outro"))
+        assert base.buscar_por_email("c1@petrobahia.com") == cliente(1, "Outro")
+        assert base.buscar_por_cnpj("1") == cliente(1, "Outro")
+        assert repositorio.remover("c1@petrobahia.com")
+        assert repositorio.buscar_por_email("c1@petrobahia.com") is None
+        assert not repositorio.remover("c1@petrobahia.com")
+        assert not base.atualizar(cliente(2))
+        repositorio.salvar(cliente(1))
+        assert repositorio.buscar_por_email("c1@petrobahia.com") == cliente(1)
+        repositorio.fechar()
+
+    def test_interface_exige_alteracao_e_buscas(self):
+        """Testa que um repositório precisa implementar alteração e buscas."""
+
+        class SoInclusao(ClienteRepositoryInterface):
+            def salvar(self, cliente):
+                pass
+
+            def buscar_por_email(self, email):
+                return None
+
+        with pytest.raises(TypeError):
+            SoInclusao()
+        faltando = ClienteRepositoryInterface.__abstractmethods__ - {
+            "salvar",
+            "buscar_por_email",
+        }
+        assert faltando == {
+            "atualizar",
+            "remover",
+            "buscar_por_cnpj",
+            "buscar_por_nome",
+            "buscar_por_dominio",
+        }
+
+    def test_container(self, arquivo):
+        """Testa a configuração pelo container."""
+        repositorio = Container(
+            {"cliente_file": arquivo, "cliente_compactar_apos": 2}
+        ).get_cliente_repository()
+
+        assert repositorio.compactar_apos == 2
+        repositorio.fechar()
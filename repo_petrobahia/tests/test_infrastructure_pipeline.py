@@ -0,0 +1,135 @@
+"""Testes para o pipeline de cotação compilado."""
+
+import pytest
+
+from clean_architecture.application.dto import PedidoInputDTO
+from clean_architecture.di import Container
+from clean_architecture.domain.value_objects import BASES_PRECO, CupomTipo, ProdutoTipo
+from clean_architecture.infrastructure.services import (
+    ArredondamentoService,
+    CalculoPrecoService,
+    DescontoService,
+    PipelinePrecoCompilado,
+    TabelaPrecosFixa,
+    TabelaTarifaria,
+)
+
+CUPONS = [None, *CupomTipo]
+
+
+def cotacao_referencia(produto, quantidade, cupom):
+    """Pipeline original (if/elif em cada etapa), usado como referência."""
+    preco = BASES_PRECO[produto.value] * quantidade
+    if produto == ProdutoTipo.DIESEL:
+        if quantidade > 1000:
+            preco *= 0.90
+        elif quantidade > 500:
+            preco *= 0.95
+    elif produto == ProdutoTipo.GASOLINA:
+        if quantidade > 200:
+            preco -= 100
+    elif produto == ProdutoTipo.ETANOL:
+        if quantidade > 80:
+            preco *= 0.97
+
+    if cupom == CupomTipo.MEGA10:
+        preco = preco * 0.90
+    elif cupom == CupomTipo.NOVO5:
+        preco = preco * 0.95
+    elif cupom == CupomTipo.LUB2 and produto == ProdutoTipo.LUBRIFICANTE:
+        preco = preco - 2.0
+
+    if produto == ProdutoTipo.DIESEL:
+        return round(preco, 0)
+    if produto == ProdutoTipo.GASOLINA:
+        return round(preco, 2)
+    return float(int(preco * 100) / 100.0)
+
+
+class DescontoSemRegra(DescontoService):
+    """Serviço de desconto customizado que não expõe a sua regra."""
+
+    regra_desconto = None
+
+    def aplicar_desconto(self, preco, produto, quantidade, cupom):
+        return preco - 1.0 if cupom else preco
+
+
+class TestPipelinePrecoCompilado:
+    """Testes para o pipeline compilado."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.calculo = CalculoPrecoService()
+        self.desconto = DescontoService()
+        self.arredondamento = ArredondamentoService()
+        self.pipeline = PipelinePrecoCompilado(
+            self.calculo, self.desconto, self.arredondamento
+        )
+        self.pipeline.compilar()
+        self.tabela = self.calculo.tabela_vigente()
+
+    @pytest.mark.parametrize("produto", list(ProdutoTipo))
+    @pytest.mark.parametrize("cupom", CUPONS)
+    def test_identico_aos_servicos(self, produto, cupom):
+        """Testa que o pipeline reproduz bit a bit os três serviços."""
+        for qtd in range(1, 1600):
+            preco = self.calculo.calcular(produto, qtd)
+            preco = self.desconto.aplicar_desconto(preco, produto, qtd, cupom)
+            esperado = self.arredondamento.arredondar(preco, produto)
+
+            obtido = self.pipeline.cotar(produto, qtd, cupom, self.tabela)
+
+            assert obtido == esperado == cotacao_referencia(produto, qtd, cupom)
+
+    def test_servico_sem_regra_usa_composicao(self):
+        """Testa que serviços customizados continuam sendo respeitados."""
+        pipeline = PipelinePrecoCompilado(
+            self.calculo, DescontoSemRegra(), self.arredondamento
+        )
+
+        preco = pipeline.cotar(ProdutoTipo.GASOLINA, 10, CupomTipo.MEGA10, self.tabela)
+
+        assert preco == round(5.19 * 10 - 1.0, 2)
+
+    def test_recompila_para_nova_versao(self):
+        """Testa que uma nova versão da tabela gera novas funções."""
+        nova = TabelaTarifaria({"lubrificante": {"base": 30.0}}, versao="v2")
+
+        preco = self.pipeline.cotar(ProdutoTipo.LUBRIFICANTE, 2, None, nova)
+
+        assert preco == 60.0
+
+    def test_publica_compilacao_da_versao_vigente(self):
+        """Testa que a compilação da versão vigente é reaproveitada."""
+        provider = TabelaPrecosFixa(TabelaTarifaria(versao="v2"))
+        calculo = CalculoPrecoService(tabela_provider=provider)
+        pipeline = PipelinePrecoCompilado(calculo, self.desconto, self.arredondamento)
+
+        pipeline.cotar(ProdutoTipo.DIESEL, 10, None, provider.atual())
+        funcoes = pipeline._compilado[1]
+        pipeline.cotar(ProdutoTipo.DIESEL, 20, None, provider.atual())
+
+        assert pipeline._compilado[0] == "v2"
+        assert pipeline._compilado[1] is funcoes
+
+
+class TestContainerPipeline:
+    """Testes para o modo de pipeline compilado no container."""
+
+    def test_pipeline_desligado_por_padrao(self):
+        """Testa que o modo compilado só é usado quando configurado."""
+        assert Container().get_pipeline_preco() is None
+
+    def test_pedido_com_pipeline_compilado(self):
+        """Testa o processamento de pedidos com o pipeline compilado."""
+        padrao = Container().get_processar_pedido_use_case()
+        compilado = Container(
+            {"pipeline_compilado": True}
+        ).get_processar_pedido_use_case()
+        dto = PedidoInputDTO(
+            cliente="TransLog", produto="diesel", qtd=1200, cupom="MEGA10"
+        )
+
+        assert compilado.pipeline_preco is not None
+        assert compilado.execute(dto) == padrao.execute(dto)
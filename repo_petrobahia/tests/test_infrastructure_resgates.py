@@ -0,0 +1,249 @@
+"""Testes para os livros de resgates de cupons."""
+
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from clean_architecture.application.dto import PedidoInputDTO
+from clean_architecture.application.use_cases import ProcessarPedidoUseCase
+from clean_architecture.di import Container
+from clean_architecture.domain.exceptions import (
+    LimiteCupomError,
+    ProdutoNaoEncontradoError,
+    ValidacaoError,
+)
+from clean_architecture.infrastructure.resgates import (
+    LivroResgatesCompartilhado,
+    LivroResgatesMemoria,
+)
+from clean_architecture.infrastructure.services import (
+    ArredondamentoService,
+    DescontoService,
+    RegistroCupons,
+)
+
+CUPONS = {
+    "MEGA10": {"percentual": 10},
+    "RARO": {"percentual": 20, "limite_total": 100},
+    "UMAVEZ": {"percentual": 5, "limite_por_cliente": 1},
+    "AMBOS": {"percentual": 5, "limite_total": 50, "limite_por_cliente": 3},
+    "LUBUMA": {
+        "percentual": 5,
+        "produtos": ["lubrificante"],
+        "qtd_minima": 10,
+        "limite_por_cliente": 1,
+    },
+    "SOLO30": {"percentual": 30, "acumulavel": False, "limite_por_cliente": 1},
+}
+
+LIVROS = [LivroResgatesMemoria, LivroResgatesCompartilhado]
+
+_livro_processo = None
+
+
+def _iniciar_processo(livro):
+    global _livro_processo
+    _livro_processo = livro
+
+
+def _resgatar_no_processo(cliente):
+    try:
+        _livro_processo.reservar("AMBOS", cliente)
+        return True
+    except LimiteCupomError:
+        return False
+
+
+def _resgatar(livro, cupom, cliente):
+    try:
+        livro.reservar(cupom, cliente)
+        return True
+    except LimiteCupomError:
+        return False
+
+
+@pytest.fixture
+def registro():
+    return RegistroCupons(CUPONS)
+
+
+class TestLivroResgates:
+    """Testes comuns às duas implementações."""
+
+    @pytest.mark.parametrize("classe", LIVROS)
+    def test_cupom_sem_limite(self, registro, classe):
+        livro = classe(registro)
+        for _ in range(1000):
+            livro.reservar("MEGA10", "ana")
+        assert livro.resgates("MEGA10") == 0
+
+    @pytest.mark.parametrize("classe", LIVROS)
+    def test_limite_por_cliente(self, registro, classe):
+        livro = classe(registro)
+        livro.reservar("UMAVEZ", "ana")
+        livro.reservar("UMAVEZ", "bia")
+        with pytest.raises(LimiteCupomError, match="UMAVEZ"):
+            livro.reservar("UMAVEZ", "ana")
+        assert livro.resgates("UMAVEZ", "ana") == 1
+
+    @pytest.mark.parametrize("classe", LIVROS)
+    def test_recusa_nao_consome_outro_limite(self, registro, classe):
+        livro = classe(registro)
+        for _ in range(3):
+            livro.reservar("AMBOS", "ana")
+        with pytest.raises(LimiteCupomError):
+            livro.reservar("AMBOS", "ana")
+        assert livro.resgates("AMBOS") == 3
+
+    @pytest.mark.parametrize("classe", LIVROS)
+    def test_estorno_libera_resgate(self, registro, classe):
+        livro = classe(registro)
+        livro.reservar("UMAVEZ", "ana")
+        livro.estornar("UMAVEZ", "ana")
+        livro.reservar("UMAVEZ", "ana")
+        assert livro.resgates("UMAVEZ", "ana") == 1
+
+    @pytest.mark.parametrize("classe", LIVROS)
+    def test_threads_nunca_passam_do_limite(self, registro, classe):
+        livro = classe(registro, faixas=8)
+        clientes = [f"cliente{i % 40}" for i in range(2000)]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            aceitos = list(
+                executor.map(lambda c: _resgatar(livro, "RARO", c), clientes)
+            )
+            aceitos_ambos = list(
+                executor.map(lambda c: _resgatar(livro, "AMBOS", c), clientes)
+            )
+        assert sum(aceitos) == 100
+        assert livro.resgates("RARO") == 100
+        assert sum(aceitos_ambos) == 50
+        assert all(livro.resgates("AMBOS", f"cliente{i}") <= 3 for i in range(40))
+
+    @pytest.mark.parametrize("classe", LIVROS)
+    def test_checkpoint_ida_e_volta(self, registro, classe, tmp_path):
+        arquivo = str(tmp_path / "resgates.json")
+        livro = classe(registro, checkpoint_file=arquivo)
+        for cliente in ("ana", "bia", "caio"):
+            livro.reservar("AMBOS", cliente)
+        livro.reservar("UMAVEZ", "ana")
+        livro.salvar_checkpoint()
+
+        restaurado = classe(registro, checkpoint_file=arquivo)
+        assert restaurado.resgates("AMBOS") == 3
+        assert restaurado.resgates("AMBOS", "bia") == 1
+        with pytest.raises(LimiteCupomError):
+            restaurado.reservar("UMAVEZ", "ana")
+
+    @pytest.mark.parametrize("classe", LIVROS)
+    def test_checkpoint_periodico(self, registro, classe, tmp_path):
+        arquivo = tmp_path / "resgates.json"
+        livro = classe(registro, checkpoint_file=str(arquivo))
+        livro.iniciar_checkpoint(intervalo=60)
+        livro.reservar("RARO", "ana")
+        livro.parar_checkpoint()
+        assert arquivo.exists()
+        assert classe(registro, checkpoint_file=str(arquivo)).resgates("RARO") == 1
+
+    def test_checkpoint_de_outro_formato(self, registro, tmp_path):
+        arquivo = str(tmp_path / "resgates.json")
+        memoria = LivroResgatesMemoria(registro, checkpoint_file=arquivo)
+        memoria.reservar("RARO", "ana")
+        memoria.salvar_checkpoint()
+        with pytest.raises(ValidacaoError):
+            LivroResgatesCompartilhado(registro, checkpoint_file=arquivo)
+
+
+class TestLivroResgatesCompartilhado:
+    def test_processos_nunca_passam_do_limite(self, registro):
+        livro = LivroResgatesCompartilhado(registro, capacidade=1024, faixas=8)
+        clientes = [f"cliente{i % 30}" for i in range(400)]
+        with multiprocessing.Pool(
+            4, initializer=_iniciar_processo, initargs=(livro,)
+        ) as pool:
+            aceitos = pool.map(_resgatar_no_processo, clientes, chunksize=10)
+        assert sum(aceitos) == 50
+        assert livro.resgates("AMBOS") == 50
+
+    def test_livro_cheio(self, registro):
+        livro = LivroResgatesCompartilhado(registro, capacidade=4, faixas=1)
+        for cliente in ("ana", "bia", "caio"):
+            livro.reservar("UMAVEZ", cliente)
+        with pytest.raises(ValidacaoError, match="cheio"):
+            for cliente in ("duda", "edu"):
+                livro.reservar("UMAVEZ", cliente)
+
+
+class TestProcessarPedidoComResgates:
+    def test_limite_atingido_recusa_pedido(self):
+        container = Container({"cupons": CUPONS, "livro_resgates": "memoria"})
+        use_case = container.get_processar_pedido_use_case()
+
+        primeiro = use_case.execute(PedidoInputDTO("ana", "diesel", 10, "UMAVEZ"))
+        segundo = use_case.execute(PedidoInputDTO("ana", "diesel", 10, "UMAVEZ"))
+
+        assert primeiro.sucesso
+        assert not segundo.sucesso
+        assert "Erro de validação" in segundo.mensagem
+        assert "Limite de resgates" in segundo.mensagem
+
+    def test_cupom_que_nao_vale_nao_reserva(self):
+        """Testa que outro produto ou quantidade abaixo do mínimo não gastam o cupom."""
+        container = Container({"cupons": CUPONS, "livro_resgates": "memoria"})
+        use_case = container.get_processar_pedido_use_case()
+
+        assert use_case.execute(PedidoInputDTO("ana", "diesel", 10, "LUBUMA")).sucesso
+        assert use_case.execute(
+            PedidoInputDTO("ana", "lubrificante", 5, "LUBUMA")
+        ).sucesso
+        valido = use_case.execute(PedidoInputDTO("ana", "lubrificante", 10, "LUBUMA"))
+        repetido = use_case.execute(PedidoInputDTO("ana", "lubrificante", 10, "LUBUMA"))
+
+        assert valido.sucesso
+        assert not repetido.sucesso
+        assert "Limite de resgates" in repetido.mensagem
+
+    def test_melhor_combinacao_sem_cupom_esgotado(self):
+        """Testa que um cupom no limite cede a vez à próxima melhor combinação."""
+        container = Container(
+            {"cupons": CUPONS, "livro_resgates": "memoria", "modo_cupons": "melhor"}
+        )
+        use_case = container.get_processar_pedido_use_case()
+        livro = container.get_livro_resgates()
+        dto = PedidoInputDTO("ana", "diesel", 10, cupons=["MEGA10", "UMAVEZ", "SOLO30"])
+
+        resultados = [use_case.execute(dto) for _ in range(3)]
+
+        assert all(r.sucesso for r in resultados)
+        assert [r.cupons_aplicados for r in resultados] == [
+            ["SOLO30"],
+            ["MEGA10", "UMAVEZ"],
+            ["MEGA10"],
+        ]
+        assert livro.resgates("SOLO30", "ana") == 1
+        assert livro.resgates("UMAVEZ", "ana") == 1
+
+    def test_falha_na_cotacao_estorna_resgate(self, registro):
+        calculo = Mock()
+        calculo.calcular.side_effect = ProdutoNaoEncontradoError("diesel")
+        livro = LivroResgatesCompartilhado(registro)
+        use_case = ProcessarPedidoUseCase(
+            calculo_preco_service=calculo,
+            desconto_service=DescontoService(registro),
+            arredondamento_service=ArredondamentoService(),
+            livro_resgates=livro,
+        )
+
+        falha = use_case.execute(PedidoInputDTO("ana", "diesel", 10, "UMAVEZ"))
+
+        assert not falha.sucesso
+        assert livro.resgates("UMAVEZ", "ana") == 0
+
+    def test_sem_livro_nao_ha_limite(self):
+        container = Container({"cupons": CUPONS})
+        use_case = container.get_processar_pedido_use_case()
+        for _ in range(3):
+            assert use_case.execute(
+                PedidoInputDTO("ana", "diesel", 10, "UMAVEZ")
+            ).sucesso
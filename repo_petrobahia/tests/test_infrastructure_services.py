@@ -1,10 +1,15 @@
 """Testes para serviços da camada de infraestrutura."""
 
+import numpy as np
 import pytest
 from clean_architecture.infrastructure.services import (
     CalculoPrecoService,
     DescontoService,
     ArredondamentoService,
+    ValidadorCnpjVetorizado,
+    cnpj_valido,
+    codificar_produtos,
+    validar_cnpjs,
 )
 from clean_architecture.domain.value_objects import ProdutoTipo, CupomTipo
 from clean_architecture.domain.exceptions import ProdutoNaoEncontradoError
@@ -69,6 +74,77 @@ class TestCalculoPrecoService:
         assert preco == pytest.approx(300.0, rel=0.01)
 
 
+class TestCalculoPrecoServiceLote:
+    """Testes para o cálculo de preço vetorizado em lote."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.service = CalculoPrecoService()
+
+    def test_lote_identico_ao_escalar(self):
+        """Testa que o lote reproduz bit a bit o cálculo escalar."""
+        produtos = []
+        quantidades = []
+        for produto in ProdutoTipo:
+            for qtd in range(1, 1500, 7):
+                produtos.append(produto)
+                quantidades.append(qtd)
+
+        precos = self.service.calcular_lote(produtos, quantidades)
+
+        esperado = [
+            self.service.calcular(produto, qtd)
+            for produto, qtd in zip(produtos, quantidades)
+        ]
+        assert precos.dtype == np.float64
+        assert precos.tolist() == esperado
+
+    def test_lote_nas_fronteiras_das_faixas(self):
+        """Testa as quantidades exatamente nos limites das faixas."""
+        casos = [
+            (ProdutoTipo.DIESEL, 500),
+            (ProdutoTipo.DIESEL, 501),
+            (ProdutoTipo.DIESEL, 1000),
+            (ProdutoTipo.DIESEL, 1001),
+            (ProdutoTipo.GASOLINA, 200),
+            (ProdutoTipo.GASOLINA, 201),
+            (ProdutoTipo.ETANOL, 80),
+            (ProdutoTipo.ETANOL, 81),
+        ]
+        produtos, quantidades = zip(*casos)
+
+        precos = self.service.calcular_lote(list(produtos), list(quantidades))
+
+        assert precos.tolist() == [self.service.calcular(p, q) for p, q in casos]
+
+    def test_lote_aceita_codigos_inteiros(self):
+        """Testa lote com códigos de produto já codificados."""
+        codigos = codificar_produtos(["diesel", "gasolina", "lubrificante"])
+
+        precos = self.service.calcular_lote(codigos, np.array([1200, 300, 12]))
+
+        assert precos.tolist() == [
+            self.service.calcular(ProdutoTipo.DIESEL, 1200),
+            self.service.calcular(ProdutoTipo.GASOLINA, 300),
+            self.service.calcular(ProdutoTipo.LUBRIFICANTE, 12),
+        ]
+
+    def test_lote_vazio(self):
+        """Testa lote vazio."""
+        precos = self.service.calcular_lote([], [])
+        assert precos.shape == (0,)
+
+    def test_lote_produto_invalido(self):
+        """Testa que produto desconhecido no lote gera erro."""
+        with pytest.raises(ProdutoNaoEncontradoError):
+            self.service.calcular_lote(["diesel", "querosene"], [10, 10])
+
+    def test_lote_tamanhos_diferentes(self):
+        """Testa que produtos e quantidades devem ter o mesmo tamanho."""
+        with pytest.raises(ValueError):
+            self.service.calcular_lote(["diesel"], [10, 20])
+
+
 class TestDescontoService:
     """Testes para o serviço de desconto."""
 
@@ -222,3 +298,129 @@ class TestArredondamentoService:
         # Lubrificante: trunca em 2 casas
         lubrificante = self.service.arredondar(valor, ProdutoTipo.LUBRIFICANTE)
         assert lubrificante == pytest.approx(1234.56, rel=0.001)
+
+
+class TestServicosEmLote:
+    """Testes para as versões em lote do desconto e do arredondamento."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.desconto = DescontoService()
+        self.arredondamento = ArredondamentoService()
+
+    @pytest.mark.parametrize("cupom", [None, *CupomTipo])
+    def test_desconto_lote_identico_ao_escalar(self, cupom):
+        """Testa que o desconto em lote reproduz o escalar."""
+        precos = np.linspace(0.01, 5000.0, 997)
+
+        obtido = self.desconto.aplicar_desconto_lote(
+            precos, ProdutoTipo.LUBRIFICANTE, cupom
+        )
+
+        esperado = [
+            self.desconto.aplicar_desconto(p, ProdutoTipo.LUBRIFICANTE, 1, cupom)
+            for p in precos.tolist()
+        ]
+        assert obtido.tolist() == esperado
+
+    @pytest.mark.parametrize("produto", list(ProdutoTipo))
+    def test_arredondar_lote_identico_ao_escalar(self, produto):
+        """Testa que o arredondamento em lote reproduz o escalar."""
+        # Inclui empates em .5 e valores em que int(preco * 100) perde centavo
+        precos = np.concatenate(
+            [
+                np.arange(0, 2000) * 0.005,
+                np.arange(0, 2000) * 3.59,
+                np.array([0.125, 0.375, 2.675, 1.005, 39.49, 1234.5, -2.675]),
+            ]
+        )
+
+        obtido = self.arredondamento.arredondar_lote(precos, produto)
+
+        esperado = [self.arredondamento.arredondar(p, produto) for p in precos.tolist()]
+        assert obtido.tolist() == esperado
+
+    def test_arredondar_lote_misto_identico_ao_escalar(self):
+        """Testa o lote com produtos misturados, inclusive sinais de zero."""
+        aleatorio = np.random.default_rng(13)
+        precos = np.concatenate(
+            [
+                aleatorio.uniform(-50.0, 50_000.0, 4000),
+                np.arange(0, 4000) * 0.005,
+                np.array([0.29, 0.57, 1.005, 2.675, -0.001, -0.004, -0.5, 1e300]),
+            ]
+        )
+        produtos = aleatorio.choice(list(ProdutoTipo), precos.size)
+
+        obtido = self.arredondamento.arredondar_lote_misto(precos, produtos)
+
+        esperado = [
+            self.arredondamento.arredondar(p, produto)
+            for p, produto in zip(precos.tolist(), produtos)
+        ]
+        # repr distingue -0.0 de 0.0
+        assert [repr(v) for v in obtido.tolist()] == [repr(v) for v in esperado]
+
+    def test_arredondar_lote_misto_tamanhos_diferentes(self):
+        """Testa erro quando há mais preços que produtos."""
+        with pytest.raises(ValueError):
+            self.arredondamento.arredondar_lote_misto(
+                np.ones(3), [ProdutoTipo.DIESEL]
+            )
+
+
+def gerar_cnpj(base: str) -> str:
+    """Completa 12 dígitos com os dígitos verificadores."""
+    for pesos in (
+        (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2),
+        (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2),
+    ):
+        resto = sum(p * int(d) for p, d in zip(pesos, base)) % 11
+        base += str(0 if resto < 2 else 11 - resto)
+    return base
+
+
+class TestValidadorCnpj:
+    """Testes para a conferência dos dígitos verificadores de CNPJ."""
+
+    @pytest.mark.parametrize(
+        "cnpj, valido",
+        [
+            ("11.222.333/0001-81", True),
+            ("11222333000181", True),
+            ("11222333000182", False),
+            ("11222333000191", False),
+            ("1222333000181", False),
+            ("00000000000000", False),
+            ("11111111111111", False),
+            ("11.222.333/0001-8X", False),
+            ("112223330001811", False),
+            ("", False),
+            (None, False),
+        ],
+    )
+    def test_cnpj_valido(self, cnpj, valido):
+        """Testa CNPJs conhecidos, formatados e mal formados."""
+        assert cnpj_valido(cnpj) is valido
+        assert validar_cnpjs([cnpj]).tolist() == [valido]
+
+    def test_lote_identico_ao_escalar(self):
+        """Testa o lote contra a versão escalar, com e sem pontuação."""
+        aleatorio = np.random.default_rng(21)
+        bases = aleatorio.integers(0, 10, (3000, 12))
+        cnpjs = [gerar_cnpj("".join(map(str, base))) for base in bases.tolist()]
+        aleatorios = [f"{n:014d}" for n in aleatorio.integers(0, 10**14, 3000)]
+        formatados = [f"{c[:2]}.{c[2:5]}.{c[5:8]}/{c[8:12]}-{c[12:]}" for c in cnpjs]
+
+        for lote in (cnpjs + aleatorios, formatados + ["x", "1"]):
+            obtido = ValidadorCnpjVetorizado().validar_lote(lote)
+            assert obtido.tolist() == [cnpj_valido(c) for c in lote]
+        assert validar_cnpjs(cnpjs).all()
+        assert validar_cnpjs([]).tolist() == []
+
+    def test_lote_com_tamanhos_que_se_compensam(self):
+        """Testa que 13 + 15 dígitos não passam pelo caminho rápido como 2 x 14."""
+        lote = ["1122233300018", "111444777000161"]
+        assert [cnpj_valido(c) for c in lote] == [False, False]
+        assert validar_cnpjs(lote).tolist() == [False, False]
+        assert validar_cnpjs(["11222333000181"] + lote).tolist() == [True, False, False]
@@ -0,0 +1,210 @@
+"""Testes para os fornecedores da tabela de preços."""
+
+import io
+import json
+import time
+
+import pytest
+
+from clean_architecture.application.dto import PedidoInputDTO
+from clean_architecture.application.use_cases import ProcessarPedidoUseCase
+from clean_architecture.di import Container
+from clean_architecture.domain.exceptions import ValidacaoError
+from clean_architecture.domain.value_objects import TARIFAS_PADRAO, ProdutoTipo
+from clean_architecture.infrastructure.services import (
+    ArredondamentoService,
+    CalculoPrecoService,
+    DescontoService,
+    TabelaPrecosArquivoProvider,
+    TabelaPrecosFixa,
+    tabela_precos,
+)
+
+
+def escrever_tabela(caminho, versao=None, base_diesel=3.99):
+    """Escreve um arquivo de tabela de preços no formato do provider."""
+    tarifas = json.loads(json.dumps(TARIFAS_PADRAO))
+    tarifas["diesel"]["base"] = base_diesel
+    dados = {"tarifas": tarifas}
+    if versao is not None:
+        dados["versao"] = versao
+    caminho.write_text(json.dumps(dados), encoding="utf-8")
+
+
+class TestTabelaPrecosArquivoProvider:
+    """Testes para a tabela de preços recarregável de arquivo."""
+
+    def test_carrega_versao_do_arquivo(self, tmp_path):
+        """Testa carga da tabela com versão declarada."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+
+        assert provider.atual().versao == "v1"
+        assert provider.atual().calcular(ProdutoTipo.DIESEL, 100) == 3.99 * 100
+
+    def test_versao_derivada_do_conteudo(self, tmp_path):
+        """Testa que sem versão declarada a versão vem do conteúdo."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo)
+        versao_1 = TabelaPrecosArquivoProvider(str(arquivo)).atual().versao
+
+        escrever_tabela(arquivo, base_diesel=4.19)
+        versao_2 = TabelaPrecosArquivoProvider(str(arquivo)).atual().versao
+
+        assert versao_1 != versao_2
+
+    def test_recarregar_publica_nova_versao(self, tmp_path):
+        """Testa que a recarga troca a tabela sem afetar quem já a pegou."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+        tabela_antiga = provider.atual()
+
+        escrever_tabela(arquivo, versao="v2", base_diesel=4.19)
+        assert provider.recarregar() is True
+
+        assert provider.atual().versao == "v2"
+        assert provider.atual().calcular(ProdutoTipo.DIESEL, 100) == 4.19 * 100
+        # Pedido em andamento continua na versão antiga
+        assert tabela_antiga.versao == "v1"
+        assert tabela_antiga.calcular(ProdutoTipo.DIESEL, 100) == 3.99 * 100
+
+    def test_recarregar_sem_mudanca(self, tmp_path):
+        """Testa que recarregar o mesmo conteúdo não publica nova versão."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+        tabela = provider.atual()
+
+        assert provider.recarregar() is False
+        assert provider.recarregar_se_modificado() is False
+        assert provider.atual() is tabela
+
+    def test_arquivo_invalido_mantem_versao_vigente(self, tmp_path):
+        """Testa que um arquivo inválido não derruba a tabela vigente."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+
+        arquivo.write_text("{ inválido", encoding="utf-8")
+        with pytest.raises(ValidacaoError):
+            provider.recarregar()
+
+        assert provider.atual().versao == "v1"
+
+    def test_mudanca_de_preco_sem_mudar_versao(self, tmp_path):
+        """Testa que alterar preços sem trocar a versão é rejeitado."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+
+        escrever_tabela(arquivo, versao="v1", base_diesel=4.19)
+        with pytest.raises(ValidacaoError):
+            provider.recarregar()
+
+        assert provider.atual().calcular(ProdutoTipo.DIESEL, 100) == 3.99 * 100
+
+    def test_versao_repetida_nao_e_relida_sem_nova_mudanca(self, tmp_path):
+        """Testa que o arquivo rejeitado só volta a ser lido se mudar de novo."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+
+        escrever_tabela(arquivo, versao="v1", base_diesel=4.19)
+        with pytest.raises(ValidacaoError):
+            provider.recarregar_se_modificado()
+        assert provider.recarregar_se_modificado() is False
+
+        escrever_tabela(arquivo, versao="v2-com-mais-bytes", base_diesel=4.19)
+        assert provider.recarregar_se_modificado() is True
+        assert provider.atual().versao == "v2-com-mais-bytes"
+
+    def test_arquivo_alterado_durante_a_leitura(self, tmp_path, monkeypatch):
+        """Testa que uma escrita durante a leitura é vista na próxima verificação."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+        escrever_tabela(arquivo, versao="v2", base_diesel=4.19)
+
+        def abrir_e_alterar(caminho, modo):
+            # Lê a v2 e, antes de a leitura terminar, o arquivo vira v3
+            conteudo = arquivo.read_bytes()
+            escrever_tabela(arquivo, versao="v3-com-mais-bytes", base_diesel=4.29)
+            return io.BytesIO(conteudo)
+
+        monkeypatch.setattr(tabela_precos, "open", abrir_e_alterar, raising=False)
+        assert provider.recarregar_se_modificado() is True
+        assert provider.atual().versao == "v2"
+        monkeypatch.delattr(tabela_precos, "open")
+
+        assert provider.recarregar_se_modificado() is True
+        assert provider.atual().versao == "v3-com-mais-bytes"
+
+    def test_monitoramento_recarrega_automaticamente(self, tmp_path):
+        """Testa que a thread de monitoramento publica a nova versão."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+        provider.iniciar_monitoramento(intervalo=0.01)
+        try:
+            escrever_tabela(arquivo, versao="v2-com-mais-bytes", base_diesel=4.19)
+            for _ in range(500):
+                if provider.atual().versao != "v1":
+                    break
+                time.sleep(0.01)
+        finally:
+            provider.parar_monitoramento()
+
+        assert provider.atual().versao == "v2-com-mais-bytes"
+
+    def test_arquivo_inexistente(self, tmp_path):
+        """Testa erro ao carregar arquivo inexistente."""
+        with pytest.raises(ValidacaoError):
+            TabelaPrecosArquivoProvider(str(tmp_path / "nao_existe.json"))
+
+
+class TestVersaoPrecoNoPedido:
+    """Testes para o registro da versão de preço no pedido."""
+
+    def test_pedido_registra_versao(self, tmp_path):
+        """Testa que o pedido registra a versão da tabela que o precificou."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="v1")
+        provider = TabelaPrecosArquivoProvider(str(arquivo))
+        use_case = ProcessarPedidoUseCase(
+            calculo_preco_service=CalculoPrecoService(tabela_provider=provider),
+            desconto_service=DescontoService(),
+            arredondamento_service=ArredondamentoService(),
+        )
+        dto = PedidoInputDTO(cliente="TransLog", produto="diesel", qtd=100)
+
+        antes = use_case.execute(dto)
+        escrever_tabela(arquivo, versao="v2", base_diesel=4.19)
+        provider.recarregar()
+        depois = use_case.execute(dto)
+
+        assert (antes.versao_preco, antes.valor_final) == ("v1", 399.0)
+        assert (depois.versao_preco, depois.valor_final) == ("v2", 419.0)
+
+    def test_container_usa_arquivo_configurado(self, tmp_path):
+        """Testa que o container usa a tabela do arquivo configurado."""
+        arquivo = tmp_path / "precos.json"
+        escrever_tabela(arquivo, versao="2026-10")
+        container = Container({"tabela_precos_file": str(arquivo)})
+
+        use_case = container.get_processar_pedido_use_case()
+        resultado = use_case.execute(
+            PedidoInputDTO(cliente="TransLog", produto="diesel", qtd=10)
+        )
+
+        assert resultado.versao_preco == "2026-10"
+
+    def test_container_sem_arquivo_usa_tabela_padrao(self):
+        """Testa que sem arquivo o container usa a tabela padrão."""
+        container = Container()
+        provider = container.get_tabela_precos_provider()
+
+        assert isinstance(provider, TabelaPrecosFixa)
+        assert provider.atual().versao == "padrao"
@@ -0,0 +1,135 @@
+"""Testes para a tabela tarifária compilada."""
+
+import numpy as np
+import pytest
+
+from clean_architecture.domain.exceptions import (
+    ProdutoNaoEncontradoError,
+    ValidacaoError,
+)
+from clean_architecture.domain.value_objects import (
+    BASES_PRECO,
+    CODIGOS_PRODUTO,
+    ProdutoTipo,
+)
+from clean_architecture.infrastructure.services import (
+    CalculoPrecoService,
+    TabelaTarifaria,
+)
+
+
+def preco_referencia(produto: ProdutoTipo, quantidade: int) -> float:
+    """Regras de faixa originais (if/elif), usadas como referência."""
+    preco = BASES_PRECO[produto.value] * quantidade
+    if produto == ProdutoTipo.DIESEL:
+        if quantidade > 1000:
+            preco *= 0.90
+        elif quantidade > 500:
+            preco *= 0.95
+    elif produto == ProdutoTipo.GASOLINA:
+        if quantidade > 200:
+            preco -= 100
+    elif produto == ProdutoTipo.ETANOL:
+        if quantidade > 80:
+            preco *= 0.97
+    return preco
+
+
+class TestTabelaTarifaria:
+    """Testes para a compilação e consulta da tabela tarifária."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        self.tabela = TabelaTarifaria()
+
+    @pytest.mark.parametrize("produto", list(ProdutoTipo))
+    def test_tabela_padrao_identica_as_regras_originais(self, produto):
+        """Testa que a tabela padrão reproduz bit a bit as regras originais."""
+        for qtd in range(1, 2001):
+            assert self.tabela.calcular(produto, qtd) == preco_referencia(produto, qtd)
+
+    def test_limites_ordenados(self):
+        """Testa que os limites são compilados em ordem crescente."""
+        assert self.tabela.limites(ProdutoTipo.DIESEL) == (500, 1000)
+        assert self.tabela.limites(ProdutoTipo.LUBRIFICANTE) == ()
+
+    def test_faixas_fora_de_ordem_na_definicao(self):
+        """Testa que faixas declaradas fora de ordem são ordenadas."""
+        tabela = TabelaTarifaria(
+            {
+                "diesel": {
+                    "base": 4.0,
+                    "faixas": [
+                        {"limite": 1000, "fator": 0.80},
+                        {"limite": 100, "fator": 0.90},
+                    ],
+                }
+            }
+        )
+        assert tabela.calcular(ProdutoTipo.DIESEL, 100) == 400.0
+        assert tabela.calcular(ProdutoTipo.DIESEL, 101) == 4.0 * 101 * 0.90
+        assert tabela.calcular(ProdutoTipo.DIESEL, 1001) == 4.0 * 1001 * 0.80
+
+    def test_nova_faixa_sem_novo_codigo(self):
+        """Testa que uma nova faixa é só mais uma linha na definição."""
+        tabela = TabelaTarifaria(
+            {
+                "gasolina": {
+                    "base": 5.0,
+                    "faixas": [
+                        {"limite": 200, "abatimento": 100},
+                        {"limite": 5000, "fator": 0.98, "abatimento": 100},
+                    ],
+                }
+            }
+        )
+        assert tabela.calcular(ProdutoTipo.GASOLINA, 5000) == 5.0 * 5000 - 100
+        assert tabela.calcular(ProdutoTipo.GASOLINA, 5001) == (5.0 * 5001 * 0.98 - 100)
+
+    def test_lote_usa_a_mesma_tabela(self):
+        """Testa que o caminho vetorizado bate com o escalar."""
+        codigos = np.array(
+            [CODIGOS_PRODUTO[p] for p in ProdutoTipo for _ in range(3)],
+            dtype=np.int64,
+        )
+        quantidades = np.array([80, 500, 1001] * len(ProdutoTipo), dtype=np.int64)
+
+        precos = self.tabela.calcular_lote(codigos, quantidades)
+
+        produtos = list(ProdutoTipo)
+        assert precos.tolist() == [
+            self.tabela.calcular(produtos[c], int(q))
+            for c, q in zip(codigos, quantidades)
+        ]
+
+    def test_produto_ausente_na_definicao(self):
+        """Testa erro para produto que não está na tabela."""
+        tabela = TabelaTarifaria({"diesel": {"base": 4.0}})
+        with pytest.raises(ProdutoNaoEncontradoError):
+            tabela.calcular(ProdutoTipo.ETANOL, 10)
+
+    def test_produto_desconhecido_na_definicao(self):
+        """Testa erro para produto desconhecido na definição."""
+        with pytest.raises(ProdutoNaoEncontradoError):
+            TabelaTarifaria({"querosene": {"base": 4.0}})
+
+    def test_limites_repetidos(self):
+        """Testa que limites repetidos são rejeitados."""
+        with pytest.raises(ValidacaoError):
+            TabelaTarifaria(
+                {
+                    "etanol": {
+                        "base": 3.0,
+                        "faixas": [
+                            {"limite": 80, "fator": 0.97},
+                            {"limite": 80, "fator": 0.95},
+                        ],
+                    }
+                }
+            )
+
+    def test_servico_com_tabela_customizada(self):
+        """Testa o serviço de cálculo usando uma tabela injetada."""
+        tabela = TabelaTarifaria({"lubrificante": {"base": 30.0}})
+        service = CalculoPrecoService(tabela=tabela)
+        assert service.calcular(ProdutoTipo.LUBRIFICANTE, 2) == 60.0
@@ -1,5 +1,7 @@
 """Testes para controllers da camada de apresentação."""
 
+import logging
+
 import pytest
 from unittest.mock import Mock
 from clean_architecture.presentation.cliente_controller import ClienteController
@@ -22,13 +24,16 @@ class TestClienteController:
         controller = ClienteController(cadastrar_cliente_use_case=mock_use_case)
         
         # Simula resposta de sucesso do use case
-        mock_use_case.execute.return_value = ClienteOutputDTO(
-            nome="João Silva",
-            email="joao@test.com",
-            cnpj="12345678000100",
-            sucesso=True,
-            mensagem="Cliente cadastrado com sucesso",
-        )
+        mock_use_case.execute_lote.return_value = [
+            ClienteOutputDTO(
+                nome=nome,
+                email="joao@test.com",
+                cnpj="12345678000100",
+                sucesso=True,
+                mensagem="Cliente cadastrado com sucesso",
+            )
+            for nome in ("João Silva", "Maria Silva")
+        ]
         
         clientes_data = [
             {"nome": "João Silva", "email": "joao@test.com", "cnpj": "12345678000100"},
@@ -41,7 +46,9 @@ class TestClienteController:
         # Assert
         assert len(resultados) == 2
         assert all(r.sucesso for r in resultados)
-        assert mock_use_case.execute.call_count == 2
+        # Os dois clientes vão em um único lote
+        mock_use_case.execute_lote.assert_called_once()
+        assert len(mock_use_case.execute_lote.call_args[0][0]) == 2
 
     def test_cadastrar_clientes_com_falha(self, capsys):
         """Testa cadastro com falha em alguns clientes."""
@@ -50,7 +57,7 @@ class TestClienteController:
         controller = ClienteController(cadastrar_cliente_use_case=mock_use_case)
         
         # Simula respostas diferentes
-        mock_use_case.execute.side_effect = [
+        mock_use_case.execute_lote.return_value = [
             ClienteOutputDTO(
                 nome="João Silva",
                 email="joao@test.com",
@@ -96,7 +103,7 @@ class TestClienteController:
 
         # Assert
         assert len(resultados) == 0
-        mock_use_case.execute.assert_not_called()
+        mock_use_case.execute_lote.assert_not_called()
 
     def test_cadastrar_clientes_dados_faltando(self):
         """Testa cadastro com dados faltando."""
@@ -104,13 +111,15 @@ class TestClienteController:
         mock_use_case = Mock()
         controller = ClienteController(cadastrar_cliente_use_case=mock_use_case)
         
-        mock_use_case.execute.return_value = ClienteOutputDTO(
-            nome="",
-            email="",
-            cnpj="",
-            sucesso=False,
-            mensagem="Nome e email são obrigatórios",
-        )
+        mock_use_case.execute_lote.return_value = [
+            ClienteOutputDTO(
+                nome="",
+                email="",
+                cnpj="",
+                sucesso=False,
+                mensagem="Nome e email são obrigatórios",
+            )
+        ]
         
         # Dados incompletos
         clientes_data = [{"nome": ""}]  # Faltam email e cnpj
@@ -286,3 +295,113 @@ class TestPedidoController:
         # Assert
         assert len(resultados) == 1
         assert resultados[0].sucesso is False
+
+
+def pedido_ok(cliente, valor):
+    """Cria um resultado de pedido processado com sucesso."""
+    return PedidoOutputDTO(
+        cliente=cliente,
+        produto="diesel",
+        quantidade=100,
+        valor_final=valor,
+        sucesso=True,
+        mensagem="Pedido processado com sucesso",
+    )
+
+
+def pedido_com_erro():
+    """Cria um resultado de pedido rejeitado."""
+    return PedidoOutputDTO(
+        cliente="Empresa Z",
+        produto="invalido",
+        quantidade=0,
+        valor_final=0.0,
+        sucesso=False,
+        mensagem="Produto não encontrado",
+    )
+
+
+class TestModosSaida:
+    """Testes para os modos de saída dos controllers."""
+
+    def test_pedidos_modo_resumo(self, capsys):
+        """Testa que o modo resumo exibe só o resumo e o total."""
+        mock_use_case = Mock()
+        mock_use_case.execute.side_effect = [
+            pedido_ok("Empresa X", 100.0),
+            pedido_ok("Empresa Y", 50.5),
+            pedido_com_erro(),
+        ]
+        controller = PedidoController(mock_use_case, modo_saida="resumo")
+
+        resultados = controller.processar_pedidos([{}, {}, {}])
+
+        captured = capsys.readouterr()
+        assert len(resultados) == 3
+        assert "✅" not in captured.out
+        assert "❌" not in captured.out
+        assert "3 pedidos: 2 processados, 1 com erro" in captured.out
+        assert "TOTAL: R$ 150.50" in captured.out
+
+    def test_pedidos_modo_silencioso(self, capsys):
+        """Testa que o modo silencioso não escreve no terminal."""
+        mock_use_case = Mock()
+        mock_use_case.execute.return_value = pedido_ok("Empresa X", 100.0)
+        controller = PedidoController(mock_use_case, modo_saida="silencioso")
+
+        resultados = controller.processar_pedidos([{}, {}])
+
+        assert len(resultados) == 2
+        assert capsys.readouterr().out == ""
+
+    def test_clientes_modo_resumo(self, capsys):
+        """Testa o resumo do cadastro de clientes."""
+        mock_use_case = Mock()
+        mock_use_case.execute_lote.return_value = [
+            ClienteOutputDTO(nome="A", email="a@x.com", cnpj="1", sucesso=True),
+            ClienteOutputDTO(nome="B", email="b", cnpj="2", sucesso=False),
+        ]
+        controller = ClienteController(mock_use_case, modo_saida="resumo")
+
+        controller.cadastrar_clientes([{}, {}])
+
+        captured = capsys.readouterr()
+        assert "Cliente cadastrado" not in captured.out
+        assert "2 clientes: 1 cadastrados, 1 com erro" in captured.out
+
+    def test_modo_invalido(self):
+        """Testa erro para modo de saída desconhecido."""
+        with pytest.raises(ValueError):
+            PedidoController(Mock(), modo_saida="verboso")
+
+    def test_eventos_de_pedido_no_log(self, caplog):
+        """Testa os eventos estruturados de cada pedido em DEBUG."""
+        mock_use_case = Mock()
+        mock_use_case.execute.side_effect = [
+            pedido_ok("Empresa X", 100.0),
+            pedido_com_erro(),
+        ]
+        controller = PedidoController(mock_use_case, modo_saida="silencioso")
+
+        with caplog.at_level(logging.DEBUG, logger="petrobahia"):
+            controller.processar_pedidos([{}, {}])
+
+        eventos = [r.getMessage() for r in caplog.records]
+        assert eventos == ["pedido_processado", "pedido_rejeitado", "lote_pedidos"]
+        assert caplog.records[0].campos["valor"] == 100.0
+        assert caplog.records[2].campos == {
+            "pedidos": 2,
+            "processados": 1,
+            "total": 100.0,
+        }
+
+    def test_sem_eventos_de_pedido_fora_do_debug(self, caplog):
+        """Testa que, sem DEBUG, só o evento do lote é registrado."""
+        mock_use_case = Mock()
+        mock_use_case.execute.return_value = pedido_ok("Empresa X", 100.0)
+        controller = PedidoController(mock_use_case, modo_saida="silencioso")
+
+        with caplog.at_level(logging.INFO, logger="petrobahia"):
+            controller.processar_pedidos([{}, {}])
+
+        assert [r.getMessage() for r in caplog.records] == ["lote_pedidos"]